@@ -26,6 +26,7 @@ sys.path.append(str(Path(__file__).parent))
 from batman_github_integration import BatmanGitHubIntegration, IssueType, IssueSeverity
 from batman_mcp_manager import MCPManager, BatmanMCPInterface
 from src.task_manager import TaskManager, Task as TaskObj, TaskType, TaskPriority
+from src.incorporated import incorporated_src
 
 
 class AnalysisType(Enum):
@@ -93,7 +94,9 @@ class BatmanEnhancedNight:
                     'disk_usage': {
                         'enabled': True,
                         'threshold_gb': 100,
-                        'large_file_mb': 100
+                        'large_file_mb': 100,
+                        'index_max_age': 6 * 3600,
+                        'scan_timeout': 60
                     },
                     'log_analysis': {
                         'enabled': True,
@@ -184,18 +187,13 @@ class BatmanEnhancedNight:
         df_result = subprocess.run(['df', '-h', '/'], capture_output=True, text=True)
         
         # Buscar archivos grandes
-        if self.system_tools['fd']:
-            # Usar fd para buscar archivos grandes
-            cmd = ['fdfind', '--type', 'f', '--size', f'+{config["large_file_mb"]}M']
-        else:
-            # Fallback a find
-            cmd = ['find', '/', '-type', 'f', '-size', f'+{config["large_file_mb"]}M', '2>/dev/null']
-            
+        large_files = []
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
-            large_files = result.stdout.strip().split('\n') if result.stdout else []
+            large_files = self.find_large_files(config['large_file_mb'], config.get('scan_roots', ['/']),
+                                                max_age=config.get('index_max_age', 6 * 3600),
+                                                timeout=config.get('scan_timeout', 60))
             
-            if large_files and large_files[0]:
+            if large_files:
                 discovery = Discovery(
                     type='disk_usage',
                     severity='medium' if len(large_files) < 10 else 'high',
@@ -244,6 +242,45 @@ class BatmanEnhancedNight:
             )
             
         return discoveries
+    
+    def find_large_files(self, min_mb: float, roots: List[str],
+                         max_age: float = 6 * 3600, timeout: float = 60) -> List[str]:
+        """
+        Lista archivos mayores que `min_mb` MB, de mayor a menor.
+        
+        Con Batman Incorporated disponible se consulta su índice persistente
+        de archivos: solo se releen los directorios cuyo mtime cambió (sin
+        volver a hacer stat de todo el disco) y la sincronización se corta a
+        los `timeout` segundos; lo que falte se recorre la noche siguiente.
+        Sin él se recurre a fd/find con el mismo timeout.
+        
+        Args:
+            min_mb: Tamaño mínimo en MB
+            roots: Directorios a recorrer
+            max_age: Antigüedad aceptable del índice en segundos
+            timeout: Segundos máximos por directorio raíz
+        """
+        if incorporated_src():
+            from core.arsenal import Arsenal
+            
+            arsenal = Arsenal({'cache_dir': str(Path.home() / '.batman' / 'cache')})
+            try:
+                found = []
+                for root in roots:
+                    found.extend(arsenal.find_indexed(path=root, max_age=max_age,
+                                                      restat_files=False, timeout=timeout,
+                                                      min_size=int(min_mb * 1024 * 1024)))
+            finally:
+                arsenal.get_file_index().close()
+            found.sort(key=lambda f: f.size, reverse=True)
+            return [f.path for f in found]
+        
+        if self.system_tools['fd']:
+            cmd = ['fdfind', '--type', 'f', '--size', f'+{min_mb}M', '.', *roots]
+        else:
+            cmd = ['find', *roots, '-type', 'f', '-size', f'+{min_mb}M']
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+        return [line for line in result.stdout.splitlines() if line]
         
     def analyze_logs(self) -> List[Discovery]:
         """Analiza logs del sistema"""
@@ -708,26 +745,31 @@ class BatmanEnhancedNight:
         
         # Crear issues en GitHub si está habilitado
         if self.github and self.config['reporting']['create_github_issues'] and not test_mode:
-            # Issues para descubrimientos críticos
-            for discovery in self.discoveries:
-                if discovery.severity in ['critical', 'high']:
-                    try:
-                        issue_data = {
-                            'type': discovery.type,
-                            'severity': discovery.severity,
-                            'title': discovery.title,
-                            'description': discovery.description,
-                            'details': discovery.details,
-                            'location': discovery.location,
-                            'recommendations': '\n'.join(f'- {r}' for r in discovery.recommendations)
-                        }
+            # Issues para descubrimientos críticos: los nuevos se crean todos
+            # juntos y los que ya tenían issue abierto reciben un comentario
+            important = [d for d in self.discoveries if d.severity in ['critical', 'high']]
+            try:
+                issues = self.github.create_discovery_issues([{
+                    'type': discovery.type,
+                    'severity': discovery.severity,
+                    'title': discovery.title,
+                    'description': discovery.description,
+                    'details': discovery.details,
+                    'location': discovery.location,
+                    'recommendations': '\n'.join(f'- {r}' for r in discovery.recommendations)
+                } for discovery in important])
                         
-                        issue_num = self.github.create_discovery_issue(issue_data)
-                        if issue_num:
-                            self.logger.info(f"Issue creado: #{issue_num} - {discovery.title}")
+                comments = []
+                for discovery, (issue_num, repeated) in zip(important, issues):
+                    if issue_num and repeated:
+                        comments.append((issue_num, f"🦇 Detectado de nuevo el {datetime.now():%Y-%m-%d} "
+                                                    f"(severidad: {discovery.severity})\n\n{discovery.description}"))
+                    elif issue_num:
+                        self.logger.info(f"Issue creado: #{issue_num} - {discovery.title}")
+                self.github.add_issue_comments(comments)
                             
-                    except Exception as e:
-                        self.logger.error(f"Error creando issue: {e}")
+            except Exception as e:
+                self.logger.error(f"Error creando issues: {e}")
                         
             # Reporte diario
             if self.config['reporting']['daily_summary']:
@@ -16,6 +16,14 @@ import os
 from dataclasses import dataclass
 from enum import Enum
 
+from src.incorporated import incorporated_src
+
+# Cliente HTTP y caché de issues de Batman Incorporated (opcionales)
+GitHubAPIClient = GitHubCache = None
+if incorporated_src():
+    from integrations.github_api import GitHubAPIClient
+    from integrations.github_cache import GitHubCache
+
 
 class IssueType(Enum):
     """Tipos de issues que Batman puede crear"""
@@ -188,6 +196,15 @@ class BatmanGitHubIntegration:
         self.last_operation_time = 0
         self.min_operation_interval = 2  # segundos entre operaciones
         
+        # Cliente HTTP de Batman Incorporated: una conexión keep-alive en vez
+        # de un proceso gh por issue o comentario (None si no está disponible)
+        self.api = self._api_client()
+        
+        # Caché local de issues (la misma que usa Batman Incorporated) para
+        # detectar duplicados sin consultar GitHub
+        self.issue_cache = (GitHubCache(f"{self.config.owner}/{self.config.repo}")
+                            if GitHubCache is not None else None)
+        
     def load_config(self) -> GitHubConfig:
         """Carga o crea configuración"""
         if self.config_path.exists():
@@ -213,8 +230,28 @@ class BatmanGitHubIntegration:
                 
             return default_config
             
+    def _api_client(self):
+        """Crea el GitHubAPIClient de Batman Incorporated si hay token y está instalado"""
+        if GitHubAPIClient is None:
+            return None
+        
+        # Mismo ritmo sostenido que con gh (una petición cada
+        # min_operation_interval), pero con ráfaga: la sincronización de la
+        # caché y las mutaciones por lotes de la noche salen sin esperas
+        client = GitHubAPIClient.from_environment(
+            f"{self.config.owner}/{self.config.repo}",
+            rate=1.0 / self.min_operation_interval, burst=10
+        )
+        if client is None:
+            self.logger.info("Sin token de GitHub para la API, se usa gh")
+        return client
+    
     def _rate_limit(self):
         """Implementa rate limiting básico"""
+        if self.api is not None:
+            # El token bucket del cliente marca el ritmo y respeta Retry-After
+            return
+        
         current_time = time.time()
         elapsed = current_time - self.last_operation_time
         
@@ -225,16 +262,31 @@ class BatmanGitHubIntegration:
             
         self.last_operation_time = time.time()
         
-    def create_discovery_issue(self, discovery: Dict) -> Optional[int]:
-        """Crea un issue para un descubrimiento de Batman"""
-        self._rate_limit()
+    def _sync_issue_cache(self, force: bool = False):
+        """Trae de GitHub solo los issues actualizados desde la última sincronización"""
+        if self.issue_cache is None or (not force and self.issue_cache.is_fresh()):
+            return
         
-        issue_type = IssueType(discovery.get('type', 'discovery'))
+        try:
+            if self.api is not None:
+                self.issue_cache.sync_api(self.api)
+            else:
+                # gh api --paginate recorre todas las páginas, sin límite de resultados
+                self.issue_cache.sync_gh()
+        except Exception as e:
+            self.logger.warning(f"No se pudo sincronizar la caché de issues: {e}")
+    
+    def _discovery_issue(self, discovery: Dict) -> Tuple[str, str, List[str]]:
+        """Título, cuerpo y labels del issue de un descubrimiento"""
+        try:
+            issue_type = IssueType(discovery.get('type', 'discovery'))
+        except ValueError:
+            # Tipos propios del análisis nocturno (disk_usage, log_analysis...)
+            issue_type = IssueType.DISCOVERY
         severity = IssueSeverity(discovery.get('severity', 'medium'))
         
         # Generar título y cuerpo
         title = f"🦇 Batman: {discovery['title']}"
-        
         body = f"""## Descubrimiento Automático
 
 **Tipo**: {issue_type.value}
@@ -262,22 +314,88 @@ class BatmanGitHubIntegration:
 """
         
         # Seleccionar labels
-        labels = self.config.labels.get(issue_type.value, ['batman-found'])
+        labels = list(self.config.labels.get(issue_type.value, ['batman-found']))
         if severity in [IssueSeverity.CRITICAL, IssueSeverity.HIGH]:
             labels.append('urgent')
+        return title, body, labels
             
+    def _existing_issue(self, title: str) -> Optional[int]:
+        """Número del issue abierto con ese título según la caché local"""
+        existing = self.issue_cache.find_by_title(title) if self.issue_cache else []
+        return existing[0]['number'] if existing else None
+    
+    def _issue_created(self, number: int, title: str, labels: List[str]):
+        """Registra en la caché un issue recién creado y lo agrega al proyecto"""
+        if self.issue_cache:
+            self.issue_cache.upsert([{'number': number, 'kind': 'issue', 'title': title,
+                                      'state': 'open', 'labels': list(labels)}])
+        if self.config.project_number:
+            self.gh.add_to_project(number, "issue")
+    
+    def create_discovery_issue(self, discovery: Dict) -> Optional[int]:
+        """Crea un issue para un descubrimiento de Batman"""
+        title, body, labels = self._discovery_issue(discovery)
+        
+        # Un descubrimiento repetido cada noche no abre un issue nuevo
+        self._sync_issue_cache()
+        existing = self._existing_issue(title)
+        if existing:
+            self.logger.info(f"Issue ya abierto para '{discovery['title']}': #{existing}")
+            return existing
+        
+        self._rate_limit()
         try:
-            issue_number = self.gh.create_issue(title, body, labels)
-            
-            # Agregar a proyecto si está configurado
-            if self.config.project_number:
-                self.gh.add_to_project(issue_number, "issue")
-                
+            issue_number = self._create_issue(title, body, labels)
+            self._issue_created(issue_number, title, labels)
             return issue_number
             
         except Exception as e:
             self.logger.error(f"Error creando issue: {e}")
             return None
+    
+    def create_discovery_issues(self, discoveries: List[Dict]) -> List[Tuple[Optional[int], bool]]:
+        """
+        Crea los issues de varios descubrimientos de una vez.
+        
+        Con la API todos los issues nuevos salen en una sola mutación
+        GraphQL; sin ella se crean uno a uno con gh.
+        
+        Returns:
+            (número o None, si ya estaba abierto) por descubrimiento, en orden
+        """
+        self._sync_issue_cache()
+        planned = [self._discovery_issue(discovery) for discovery in discoveries]
+        numbers: Dict[str, Optional[int]] = {}
+        for title, _, _ in planned:
+            existing = self._existing_issue(title)
+            if existing:
+                numbers[title] = existing
+        repeated = set(numbers)
+        new = {title: (body, labels) for title, body, labels in planned if title not in repeated}
+        
+        if self.api is None:
+            for title, (body, labels) in new.items():
+                self._rate_limit()
+                try:
+                    numbers[title] = self._create_issue(title, body, labels)
+                    self._issue_created(numbers[title], title, labels)
+                except Exception as e:
+                    self.logger.error(f"Error creando issue: {e}")
+        elif new:
+            self._rate_limit()
+            try:
+                created = self.api.create_issues([{'title': title, 'body': body, 'labels': labels}
+                                                  for title, (body, labels) in new.items()])
+            except Exception as e:
+                self.logger.error(f"Error creando issues: {e}")
+                created = []
+            for (title, (_, labels)), issue in zip(new.items(), created):
+                if issue:
+                    numbers[title] = issue['number']
+                    self.logger.info(f"Issue creado: #{issue['number']}")
+                    self._issue_created(issue['number'], title, labels)
+        
+        return [(numbers.get(title), title in repeated) for title, _, _ in planned]
             
     def create_optimization_pr(self, branch_name: str, title: str, 
                              files_changed: List[str], 
@@ -398,10 +516,19 @@ Por favor revisa los cambios antes de hacer merge.
             labels.append('urgent')
             
         try:
-            return self.gh.create_issue(title, body, labels)
+            return self._create_issue(title, body, labels)
         except Exception as e:
             self.logger.error(f"Error creando reporte: {e}")
             return None
+    
+    def _create_issue(self, title: str, body: str, labels: List[str]) -> int:
+        """Crea un issue por la API (o con gh si no hay cliente) y retorna su número"""
+        if self.api is None:
+            return self.gh.create_issue(title, body, labels)
+        
+        issue_number = self.api.create_issue(title, body, labels)['number']
+        self.logger.info(f"Issue creado: #{issue_number}")
+        return issue_number
             
     def _format_discoveries(self, discoveries: List[Dict]) -> str:
         """Formatea lista de descubrimientos"""
@@ -454,35 +581,61 @@ Por favor revisa los cambios antes de hacer merge.
         return "\n".join(f"- [ ] {rec}" for rec in recommendations)
         
     def check_existing_issues(self, title_pattern: str) -> List[Dict]:
-        """Busca issues existentes por patrón de título"""
+        """Busca issues existentes por patrón de título (en la caché local si existe)"""
         try:
-            all_issues = self.gh.list_issues(state="all", labels=["batman-found"])
-            
-            matching = []
-            for issue in all_issues:
-                if title_pattern.lower() in issue.get('title', '').lower():
-                    matching.append(issue)
-                    
-            return matching
+            if self.issue_cache is not None:
+                self._sync_issue_cache()
+                found = self.issue_cache.find_by_title(title_pattern, state=None, exact=False)
+            else:
+                pattern = title_pattern.lower()
+                found = [issue for issue in self.gh.list_issues(state="all", labels=["batman-found"])
+                         if pattern in issue.get('title', '').lower()]
+            return [issue for issue in found
+                    if 'batman-found' in {label['name'] for label in issue.get('labels', [])}]
             
         except Exception as e:
             self.logger.error(f"Error buscando issues: {e}")
             return []
             
-    def update_issue_comment(self, issue_number: int, comment: str):
+    def add_issue_comments(self, comments: List[Tuple[int, str]]) -> List[bool]:
+        """
+        Agrega varios comentarios (por la API en una sola mutación GraphQL).
+        
+        Returns:
+            Si cada comentario se agregó, en el mismo orden
+        """
+        if not comments:
+            return []
+        if self.api is None:
+            return [self.update_issue_comment(number, comment) for number, comment in comments]
+        
+        self._rate_limit()
+        try:
+            added = self.api.add_comments(comments)
+        except Exception as e:
+            self.logger.error(f"Error agregando comentarios: {e}")
+            return [False] * len(comments)
+        self.logger.info(f"Comentarios agregados: {sum(added)}/{len(comments)}")
+        return added
+    
+    def update_issue_comment(self, issue_number: int, comment: str) -> bool:
         """Agrega un comentario a un issue existente"""
         self._rate_limit()
         
         try:
-            cmd = ['issue', 'comment', str(issue_number), 
-                   '--repo', f"{self.config.owner}/{self.config.repo}",
-                   '--body', comment]
-            
-            self.gh.run_gh_command(cmd, json_output=False)
+            if self.api is not None:
+                self.api.add_comment(issue_number, comment)
+            else:
+                cmd = ['issue', 'comment', str(issue_number), 
+                       '--repo', f"{self.config.owner}/{self.config.repo}",
+                       '--body', comment]
+                self.gh.run_gh_command(cmd, json_output=False)
             self.logger.info(f"Comentario agregado a issue #{issue_number}")
+            return True
             
         except Exception as e:
             self.logger.error(f"Error agregando comentario: {e}")
+            return False
 
 
 # Funciones de utilidad para integración con Batman
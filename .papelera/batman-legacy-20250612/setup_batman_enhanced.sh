@@ -107,7 +107,6 @@ echo "--------------------------------------"
 if [ ! -f "$BATMAN_DIR/requirements.txt" ]; then
     cat > "$BATMAN_DIR/requirements.txt" << 'EOF'
 pyyaml>=6.0
-networkx>=3.0
 matplotlib>=3.0
 requests>=2.28
 aiohttp>=3.8
@@ -279,7 +278,7 @@ echo "------------------------"
 
 # Probar importaciones
 echo "Verificando módulos Python..."
-if python3 -c "import yaml, networkx" 2>/dev/null; then
+if python3 -c "import yaml" 2>/dev/null; then
     echo -e "${GREEN}✓${NC} Módulos Python OK"
 else
     echo -e "${RED}✗${NC} Error con módulos Python"
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+DAG - Grafo de dependencias ligero y sin dependencias externas
+Sustituye a NetworkX en el TaskGraph: adyacencia en listas indexadas,
+niveles topológicos incrementales y conjunto de tareas listas en O(1)
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+
+class CycleError(ValueError):
+    """Una dependencia crearía un ciclo; `path` contiene el ciclo completo"""
+    
+    def __init__(self, path: List[str]):
+        self.path = path
+        super().__init__(f"Ciclo detectado en dependencias: {' -> '.join(path)}")
+
+
+class DAG:
+    """
+    Grafo dirigido acíclico con estado de ejecución.
+    
+    Cada nodo tiene un índice entero; sucesores y predecesores se guardan
+    en listas por índice. Se mantienen de forma incremental:
+    - `level`: longitud del camino más largo desde una raíz (fase de ejecución)
+    - `pending`: predecesores aún no completados
+    - `ready`: nodos no completados sin predecesores pendientes
+    
+    Un arco que cerraría un ciclo se rechaza con CycleError, así que el
+    grafo siempre es acíclico.
+    """
+    
+    def __init__(self):
+        self._index: Dict[str, int] = {}
+        self._ids: List[str] = []
+        self._data: List[Dict[str, Any]] = []
+        self._succ: List[List[int]] = []
+        self._pred: List[List[int]] = []
+        self._edge_type: Dict[tuple, str] = {}
+        self._level: List[int] = []
+        self._pending: List[int] = []
+        self._done = bytearray()
+        # dict como conjunto ordenado: conserva el orden de inserción
+        self._ready: Dict[int, None] = {}
+    
+    def __len__(self) -> int:
+        return len(self._ids)
+    
+    def __contains__(self, node_id: str) -> bool:
+        return node_id in self._index
+    
+    def _ensure(self, node_id: str) -> int:
+        """Índice del nodo, creándolo si no existe"""
+        index = self._index.get(node_id)
+        if index is None:
+            index = len(self._ids)
+            self._index[node_id] = index
+            self._ids.append(node_id)
+            self._data.append({})
+            self._succ.append([])
+            self._pred.append([])
+            self._level.append(0)
+            self._pending.append(0)
+            self._done.append(0)
+            self._ready[index] = None
+        return index
+    
+    def add_node(self, node_id: str, data: Optional[Dict[str, Any]] = None):
+        """Agrega un nodo (o actualiza sus datos si ya existe)"""
+        index = self._ensure(node_id)
+        if data:
+            self._data[index].update(data)
+    
+    def node_data(self, node_id: str) -> Dict[str, Any]:
+        """Datos asociados a un nodo"""
+        return self._data[self._index[node_id]]
+    
+    def find_path(self, source: str, target: str) -> Optional[List[str]]:
+        """Camino de `source` a `target` siguiendo arcos (None si no hay)"""
+        if source not in self._index or target not in self._index:
+            return None
+        start, goal = self._index[source], self._index[target]
+        parent = {start: -1}
+        stack = [start]
+        
+        while stack:
+            current = stack.pop()
+            if current == goal:
+                path = []
+                while current != -1:
+                    path.append(self._ids[current])
+                    current = parent[current]
+                return path[::-1]
+            for nxt in self._succ[current]:
+                if nxt not in parent:
+                    parent[nxt] = current
+                    stack.append(nxt)
+        
+        return None
+    
+    def check_edge(self, before: str, after: str):
+        """
+        Verifica que el arco before -> after no cree un ciclo.
+        
+        Raises:
+            CycleError: con el ciclo que se formaría
+        """
+        if before == after:
+            raise CycleError([before, after])
+        path = self.find_path(after, before)
+        if path:
+            raise CycleError(path + [after])
+    
+    def add_edge(self, before: str, after: str, edge_type: str = "completion"):
+        """
+        Agrega el arco before -> after (`after` depende de `before`).
+        
+        Raises:
+            CycleError: si el arco cerraría un ciclo (no se agrega)
+        """
+        self.check_edge(before, after)
+        u, v = self._ensure(before), self._ensure(after)
+        if (u, v) in self._edge_type:
+            self._edge_type[(u, v)] = edge_type
+            return
+        
+        self._succ[u].append(v)
+        self._pred[v].append(u)
+        self._edge_type[(u, v)] = edge_type
+        
+        if not self._done[u]:
+            self._pending[v] += 1
+            self._ready.pop(v, None)
+        
+        # Propagar el nuevo nivel solo por la parte afectada del grafo
+        if self._level[v] <= self._level[u]:
+            self._level[v] = self._level[u] + 1
+            stack = [v]
+            while stack:
+                current = stack.pop()
+                for nxt in self._succ[current]:
+                    if self._level[nxt] <= self._level[current]:
+                        self._level[nxt] = self._level[current] + 1
+                        stack.append(nxt)
+    
+    def successors(self, node_id: str) -> List[str]:
+        """Nodos que dependen directamente de `node_id`"""
+        index = self._index.get(node_id)
+        return [] if index is None else [self._ids[i] for i in self._succ[index]]
+    
+    def predecessors(self, node_id: str) -> List[str]:
+        """Dependencias directas de `node_id`"""
+        index = self._index.get(node_id)
+        return [] if index is None else [self._ids[i] for i in self._pred[index]]
+    
+    def edges(self) -> Iterable[tuple]:
+        """Arcos (before, after, tipo)"""
+        for (u, v), edge_type in self._edge_type.items():
+            yield self._ids[u], self._ids[v], edge_type
+    
+    # --- Estado de ejecución ----------------------------------------------
+    
+    def mark_done(self, node_id: str) -> List[str]:
+        """
+        Marca un nodo como completado.
+        
+        Returns:
+            Nodos que pasan a estar listos por esta finalización
+        """
+        index = self._ensure(node_id)
+        if self._done[index]:
+            return []
+        self._done[index] = 1
+        self._ready.pop(index, None)
+        
+        unlocked = []
+        for nxt in self._succ[index]:
+            self._pending[nxt] -= 1
+            if self._pending[nxt] == 0 and not self._done[nxt]:
+                self._ready[nxt] = None
+                unlocked.append(self._ids[nxt])
+        return unlocked
+    
+    def mark_pending(self, node_id: str):
+        """Revierte un nodo completado (por ejemplo, para reintentarlo)"""
+        index = self._index.get(node_id)
+        if index is None or not self._done[index]:
+            return
+        self._done[index] = 0
+        if self._pending[index] == 0:
+            self._ready[index] = None
+        for nxt in self._succ[index]:
+            self._pending[nxt] += 1
+            self._ready.pop(nxt, None)
+    
+    def is_done(self, node_id: str) -> bool:
+        index = self._index.get(node_id)
+        return index is not None and bool(self._done[index])
+    
+    def sync_done(self, completed: Set[str]):
+        """Ajusta el estado para que los completados sean exactamente `completed`"""
+        for index, node_id in enumerate(self._ids):
+            if self._done[index] and node_id not in completed:
+                self.mark_pending(node_id)
+        for node_id in completed:
+            if node_id in self._index:
+                self.mark_done(node_id)
+    
+    def ready(self) -> List[str]:
+        """Nodos listos para ejecutar, en orden de inserción"""
+        return [self._ids[i] for i in self._ready]
+    
+    # --- Orden topológico --------------------------------------------------
+    
+    def level(self, node_id: str) -> int:
+        """Fase de ejecución del nodo (0 = sin dependencias)"""
+        return self._level[self._index[node_id]]
+    
+    def topological_order(self) -> List[str]:
+        """Orden topológico estable (por nivel y orden de inserción)"""
+        order = sorted(range(len(self._ids)), key=lambda i: (self._level[i], i))
+        return [self._ids[i] for i in order]
+    
+    def levels(self, include_done: bool = True) -> List[List[str]]:
+        """
+        Agrupa los nodos en fases: todos los de una fase pueden ejecutarse
+        en paralelo una vez completadas las anteriores.
+        """
+        phases: List[List[str]] = []
+        for index in range(len(self._ids)):
+            if not include_done and self._done[index]:
+                continue
+            level = self._level[index]
+            while len(phases) <= level:
+                phases.append([])
+            phases[level].append(self._ids[index])
+        return [phase for phase in phases if phase]
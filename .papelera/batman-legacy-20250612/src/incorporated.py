@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Incorporated - Acceso a los módulos de Batman Incorporated
+El sistema nocturno reutiliza el índice de archivos y los clientes de GitHub
+de Batman Incorporated en lugar de mantener copias propias
+"""
+
+import os
+import sys
+from pathlib import Path
+from typing import Optional
+
+
+# Variable de entorno con la ruta al directorio `src` de Batman Incorporated
+SRC_ENV = 'BATMAN_INCORPORATED_SRC'
+
+# Ubicaciones conocidas, en orden de preferencia
+_REPO_ROOT = Path(__file__).resolve().parents[3]
+CANDIDATES = [
+    _REPO_ROOT / 'backups' / 'batman-20250611-155829' / 'src',
+    Path.home() / 'glados' / 'batman-incorporated' / 'src',
+]
+
+
+def incorporated_src() -> Optional[Path]:
+    """
+    Localiza Batman Incorporated y añade su `src` al path de importación.
+    
+    Returns:
+        Ruta del directorio `src` o None si no está instalado
+    """
+    candidates = [Path(os.environ[SRC_ENV]).expanduser()] if os.environ.get(SRC_ENV) else []
+    candidates.extend(CANDIDATES)
+    
+    for candidate in candidates:
+        if (candidate / 'core').is_dir():
+            if str(candidate) not in sys.path:
+                sys.path.insert(0, str(candidate))
+            return candidate
+    return None
@@ -5,13 +5,17 @@ Executes tasks with proper error handling, logging, and result tracking.
 """
 
 import os
+import re
+import heapq
+import itertools
 import subprocess
 import threading
 import queue
 import signal
 import time
+from collections import defaultdict, deque
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Any, Callable
+from typing import Dict, List, Optional, Set, Tuple, Any, Callable
 from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor, Future
 from dataclasses import dataclass, field
@@ -22,6 +26,15 @@ from task_parser import Task, TaskCondition, TaskPriority
 
 logger = get_logger()
 
+# Resource classes for per-resource concurrency caps
+RESOURCE_CLASSES = ("cpu", "io", "claude")
+DEFAULT_RESOURCE_LIMITS = {
+    "cpu": max(1, (os.cpu_count() or 2) // 2),
+    "io": 8,
+    "claude": 2,
+}
+_CLAUDE_COMMAND = re.compile(r'(^|[\s;&|/(])claude(\s|$)')
+
 
 class TaskStatus(Enum):
     """Task execution status."""
@@ -126,15 +139,333 @@ class ConditionChecker:
         return len(failed_conditions) == 0, failed_conditions
 
 
+def get_resource_class(task: Task) -> str:
+    """Get the resource class a task is capped under.
+    
+    Uses the explicit `resource` property when present, then a tag naming
+    a resource class, and finally infers `claude` from the command.
+    Anything else is treated as I/O-bound.
+    """
+    resource = task.metadata.get("resource")
+    if resource:
+        return str(resource).lower()
+    
+    for tag in task.tags:
+        if tag.lower() in RESOURCE_CLASSES:
+            return tag.lower()
+    
+    command = task.command if isinstance(task.command, str) else " ".join(task.command)
+    if _CLAUDE_COMMAND.search(command or ""):
+        return "claude"
+    return "io"
+
+
+class TaskScheduler:
+    """Dependency- and priority-aware dispatcher for a TaskExecutor.
+    
+    Tasks are held until every dependency has succeeded, then queued by
+    priority (highest first, FIFO within the same priority). A queued task
+    only starts when both the executor's worker limit and the cap of its
+    resource class allow it, so a CRITICAL task submitted later still
+    overtakes NORMAL tasks that are waiting. Tasks whose dependencies fail
+    are skipped, transitively.
+    """
+    
+    def __init__(self, executor: "TaskExecutor", resource_limits: Optional[Dict[str, int]] = None):
+        """Initialize the scheduler.
+        
+        Args:
+            executor: Executor that runs the tasks and stores the results
+            resource_limits: Max concurrent tasks per resource class
+        """
+        self.executor = executor
+        self.resource_limits = dict(DEFAULT_RESOURCE_LIMITS)
+        self.resource_limits.update(resource_limits or {})
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+        
+        self._waiting: Dict[str, Task] = {}              # blocked on dependencies
+        self._missing: Dict[str, Set[str]] = {}          # task_id -> unmet dependency IDs
+        self._dependents: Dict[str, List[str]] = defaultdict(list)
+        self._ready: List[Tuple[int, int, str]] = []     # heap of (-priority, seq, task_id)
+        self._queued: Dict[str, Task] = {}
+        self._running: Dict[str, str] = {}               # task_id -> resource class
+        self._in_use: Dict[str, int] = defaultdict(int)
+        self._callbacks: Dict[str, Optional[Callable[[TaskResult], None]]] = {}
+    
+    @property
+    def pending_count(self) -> int:
+        """Number of tasks waiting, queued or running."""
+        with self._cond:
+            return len(self._waiting) + len(self._queued) + len(self._running)
+    
+    def submit(self, tasks: List[Task],
+               callback: Optional[Callable[[TaskResult], None]] = None) -> None:
+        """Add tasks to the schedule.
+        
+        Dependencies may appear in any order within the batch, or be
+        submitted in a later call.
+        
+        Args:
+            tasks: Tasks to schedule
+            callback: Optional callback for each finished task
+        """
+        notifications = []
+        with self._cond:
+            batch = []
+            for task in tasks:
+                if self._is_pending(task.id):
+                    logger.warning(f"Task {task.id} is already scheduled, ignoring duplicate")
+                    continue
+                self._callbacks[task.id] = callback
+                batch.append(task)
+            batch_ids = {task.id for task in batch}
+            
+            for task in batch:
+                unmet = set()
+                failed = []
+                for dep_id in task.dependencies:
+                    if dep_id in batch_ids or self._is_pending(dep_id):
+                        unmet.add(dep_id)
+                        continue
+                    result = self.executor.results.get(dep_id)
+                    if result is None:
+                        # Unknown yet: it may arrive in a later submit
+                        unmet.add(dep_id)
+                    elif result.status != TaskStatus.SUCCESS:
+                        failed.append(dep_id)
+                
+                if failed:
+                    logger.info(f"Task {task.id} skipped - failed dependencies: {failed}")
+                    notifications += self._record(self._skipped_result(task.id, failed))
+                elif unmet:
+                    self._waiting[task.id] = task
+                    self._missing[task.id] = unmet
+                    for dep_id in unmet:
+                        self._dependents[dep_id].append(task.id)
+                else:
+                    self._enqueue(task)
+            
+            self._dispatch()
+            self._cond.notify_all()
+        self._notify(notifications)
+    
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every scheduled task has finished.
+        
+        Tasks still waiting for dependencies that were never submitted (or
+        that form a cycle) are skipped once nothing else can run.
+        
+        Args:
+            timeout: Maximum time to wait
+        
+        Returns:
+            True if all tasks finished, False on timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        notifications = []
+        with self._cond:
+            while self._running or self._queued or self._waiting:
+                if not self._running and not self._queued:
+                    notifications += self._skip_waiting()
+                    continue
+                
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            finished = not (self._running or self._queued or self._waiting)
+        self._notify(notifications)
+        return finished
+    
+    def cancel(self, task_id: str) -> bool:
+        """Cancel a task that has not started yet.
+        
+        Args:
+            task_id: ID of task to cancel
+        
+        Returns:
+            True if the task was waiting or queued, False otherwise
+        """
+        with self._cond:
+            task = self._waiting.pop(task_id, None) or self._queued.pop(task_id, None)
+            if task is None:
+                return False
+            self._missing.pop(task_id, None)
+            
+            logger.info(f"Cancelled task {task_id} before execution")
+            notifications = self._record(self._cancelled_result(task_id))
+            self._cond.notify_all()
+        self._notify(notifications)
+        return True
+    
+    def cancel_all(self) -> None:
+        """Cancel every task that has not started yet."""
+        with self._cond:
+            task_ids = list(self._waiting) + list(self._queued)
+        for task_id in task_ids:
+            self.cancel(task_id)
+    
+    def _is_pending(self, task_id: str) -> bool:
+        return task_id in self._waiting or task_id in self._queued or task_id in self._running
+    
+    def _enqueue(self, task: Task) -> None:
+        self._queued[task.id] = task
+        heapq.heappush(self._ready, (-task.priority.value, next(self._seq), task.id))
+    
+    def _has_capacity(self, resource: str) -> bool:
+        limit = self.resource_limits.get(resource)
+        return limit is None or self._in_use[resource] < max(1, limit)
+    
+    def _pop_runnable(self) -> Optional[Task]:
+        """Pop the highest priority queued task whose resource class has room."""
+        deferred = []
+        task = None
+        while self._ready:
+            entry = heapq.heappop(self._ready)
+            candidate = self._queued.get(entry[2])
+            if candidate is None:
+                continue  # cancelled while queued
+            if self._has_capacity(get_resource_class(candidate)):
+                del self._queued[entry[2]]
+                task = candidate
+                break
+            deferred.append(entry)
+        
+        for entry in deferred:
+            heapq.heappush(self._ready, entry)
+        return task
+    
+    def _dispatch(self) -> None:
+        """Start queued tasks while there are free workers. Caller holds the lock."""
+        while len(self._running) < self.executor.max_workers:
+            task = self._pop_runnable()
+            if task is None:
+                break
+            
+            resource = get_resource_class(task)
+            self._running[task.id] = resource
+            self._in_use[resource] += 1
+            
+            future = self.executor.executor.submit(self._run, task)
+            self.executor.task_futures[task.id] = future
+            future.add_done_callback(lambda f, task_id=task.id: self._on_future_done(f, task_id))
+    
+    def _run(self, task: Task) -> TaskResult:
+        try:
+            result = self.executor.execute_task(task)
+        except Exception as e:
+            logger.error(f"Error executing task {task.id}: {e}")
+            result = TaskResult(task_id=task.id, status=TaskStatus.FAILED,
+                                start_time=datetime.now(), end_time=datetime.now(), error=str(e))
+        
+        with self._cond:
+            self._release(task.id)
+            notifications = self._record(result)
+            self._dispatch()
+            self._cond.notify_all()
+        self._notify(notifications)
+        return result
+    
+    def _on_future_done(self, future: Future, task_id: str) -> None:
+        """Clean up a task whose future was cancelled before it ran."""
+        if not future.cancelled():
+            return
+        with self._cond:
+            if task_id not in self._running:
+                return
+            self._release(task_id)
+            notifications = self._record(self._cancelled_result(task_id))
+            self._dispatch()
+            self._cond.notify_all()
+        self._notify(notifications)
+    
+    def _release(self, task_id: str) -> None:
+        resource = self._running.pop(task_id, None)
+        if resource is not None:
+            self._in_use[resource] -= 1
+    
+    def _record(self, result: TaskResult) -> List[Tuple[Optional[Callable], TaskResult]]:
+        """Store a result and release (or skip) its dependents. Caller holds the lock.
+        
+        Returns:
+            List of (callback, result) to notify once the lock is released
+        """
+        notifications = []
+        pending = deque([result])
+        
+        while pending:
+            result = pending.popleft()
+            self.executor.results[result.task_id] = result
+            notifications.append((self._callbacks.pop(result.task_id, None), result))
+            succeeded = result.status == TaskStatus.SUCCESS
+            
+            for dependent_id in self._dependents.pop(result.task_id, []):
+                task = self._waiting.get(dependent_id)
+                if task is None:
+                    continue
+                
+                if succeeded:
+                    missing = self._missing[dependent_id]
+                    missing.discard(result.task_id)
+                    if not missing:
+                        del self._waiting[dependent_id]
+                        del self._missing[dependent_id]
+                        self._enqueue(task)
+                else:
+                    del self._waiting[dependent_id]
+                    unmet = sorted(self._missing.pop(dependent_id))
+                    logger.info(f"Task {dependent_id} skipped - dependency {result.task_id} "
+                                f"finished as {result.status.value}")
+                    pending.append(self._skipped_result(dependent_id, unmet))
+        
+        return notifications
+    
+    def _skip_waiting(self) -> List[Tuple[Optional[Callable], TaskResult]]:
+        """Skip every task still blocked when nothing else can run."""
+        notifications = []
+        for task_id in list(self._waiting):
+            if task_id not in self._waiting:
+                continue  # already skipped through a dependency
+            del self._waiting[task_id]
+            unmet = sorted(self._missing.pop(task_id))
+            logger.info(f"Task {task_id} skipped - unmet dependencies: {unmet}")
+            notifications += self._record(self._skipped_result(task_id, unmet))
+        return notifications
+    
+    @staticmethod
+    def _skipped_result(task_id: str, unmet: List[str]) -> TaskResult:
+        now = datetime.now()
+        result = TaskResult(task_id=task_id, status=TaskStatus.SKIPPED, start_time=now, end_time=now)
+        result.metadata["unmet_dependencies"] = unmet
+        return result
+    
+    @staticmethod
+    def _cancelled_result(task_id: str) -> TaskResult:
+        now = datetime.now()
+        return TaskResult(task_id=task_id, status=TaskStatus.CANCELLED, start_time=now, end_time=now)
+    
+    @staticmethod
+    def _notify(notifications: List[Tuple[Optional[Callable], TaskResult]]) -> None:
+        for callback, result in notifications:
+            if callback:
+                try:
+                    callback(result)
+                except Exception as e:
+                    logger.error(f"Error in task callback: {e}")
+
+
 class TaskExecutor:
     """Executes tasks with proper isolation and resource management."""
     
-    def __init__(self, max_workers: int = 4, default_timeout: int = 300):
+    def __init__(self, max_workers: int = 4, default_timeout: int = 300,
+                 resource_limits: Optional[Dict[str, int]] = None):
         """Initialize task executor.
         
         Args:
             max_workers: Maximum number of concurrent tasks
             default_timeout: Default timeout in seconds
+            resource_limits: Max concurrent tasks per resource class (cpu, io, claude)
         """
         self.max_workers = max_workers
         self.default_timeout = default_timeout
@@ -143,6 +474,7 @@ class TaskExecutor:
         self.task_futures: Dict[str, Future] = {}
         self.results: Dict[str, TaskResult] = {}
         self._lock = threading.Lock()
+        self.scheduler = TaskScheduler(self, resource_limits)
         
     def execute_task(self, task: Task, force: bool = False) -> TaskResult:
         """Execute a single task.
@@ -291,29 +623,14 @@ class TaskExecutor:
                            callback: Optional[Callable[[TaskResult], None]] = None) -> None:
         """Execute multiple tasks asynchronously.
         
+        Tasks wait for their dependencies instead of being skipped, and
+        start by priority within the per-resource concurrency caps.
+        
         Args:
             tasks: List of tasks to execute
             callback: Optional callback for each completed task
         """
-        def task_wrapper(task: Task) -> TaskResult:
-            result = self.execute_task(task)
-            self.results[task.id] = result
-            
-            if callback:
-                try:
-                    callback(result)
-                except Exception as e:
-                    logger.error(f"Error in task callback: {e}")
-                    
-            return result
-        
-        # Sort tasks by priority
-        sorted_tasks = sorted(tasks, key=lambda t: t.priority.value, reverse=True)
-        
-        # Submit tasks
-        for task in sorted_tasks:
-            future = self.executor.submit(task_wrapper, task)
-            self.task_futures[task.id] = future
+        self.scheduler.submit(tasks, callback)
     
     def wait_for_completion(self, timeout: Optional[float] = None) -> Dict[str, TaskResult]:
         """Wait for all tasks to complete.
@@ -324,23 +641,12 @@ class TaskExecutor:
         Returns:
             Dictionary of task results
         """
-        futures = list(self.task_futures.values())
-        
-        if futures:
-            if timeout:
-                from concurrent.futures import wait, TimeoutError
-                done, not_done = wait(futures, timeout=timeout)
-                
-                # Cancel timed out tasks
-                for future in not_done:
+        if not self.scheduler.wait(timeout):
+            # Cancel tasks that did not get to start
+            self.scheduler.cancel_all()
+            for future in list(self.task_futures.values()):
+                if not future.done():
                     future.cancel()
-            else:
-                # Wait for all to complete
-                for future in futures:
-                    try:
-                        future.result()
-                    except Exception as e:
-                        logger.error(f"Task future error: {e}")
         
         return self.results
     
@@ -353,6 +659,10 @@ class TaskExecutor:
         Returns:
             True if cancelled, False otherwise
         """
+        # Cancel task still held by the scheduler
+        if self.scheduler.cancel(task_id):
+            return True
+        
         with self._lock:
             # Cancel future if not started
             future = self.task_futures.get(task_id)
@@ -399,7 +709,8 @@ class TaskExecutor:
         logger.info("Shutting down task executor")
         
         # Cancel all pending tasks
-        for task_id, future in self.task_futures.items():
+        self.scheduler.cancel_all()
+        for task_id, future in list(self.task_futures.items()):
             if not future.done():
                 future.cancel()
         
@@ -12,12 +12,16 @@ from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Set, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
-import networkx as nx
 import yaml
 import logging
 from collections import defaultdict
 import hashlib
 
+try:
+    from .dag import DAG, CycleError
+except ImportError:
+    from dag import DAG, CycleError
+
 
 class TaskType(Enum):
     """Tipos de tareas soportadas"""
@@ -55,55 +59,80 @@ class TaskDependency:
     
     
 class TaskGraph:
-    """Grafo de dependencias de tareas usando NetworkX"""
+    """Grafo de dependencias de tareas sobre el DAG nativo (sin NetworkX)"""
     
     def __init__(self):
-        self.graph = nx.DiGraph()
+        self.dag = DAG()
         
     def add_task(self, task_id: str, task_data: Dict):
         """Agrega una tarea al grafo"""
-        self.graph.add_node(task_id, **task_data)
+        self.dag.add_node(task_id, task_data)
+    
+    def check_dependency(self, from_task: str, to_task: str):
+        """Lanza CycleError si la dependencia from_task -> to_task crearía un ciclo"""
+        self.dag.check_edge(to_task, from_task)
         
     def add_dependency(self, from_task: str, to_task: str, dep_type: str = "completion"):
         """Agrega dependencia: from_task depende de to_task"""
-        self.graph.add_edge(to_task, from_task, type=dep_type)
+        self.dag.add_edge(to_task, from_task, dep_type)
         
-    def get_ready_tasks(self, completed_tasks: Set[str]) -> List[str]:
-        """Obtiene tareas listas para ejecutar (sin dependencias pendientes)"""
-        ready = []
+    def mark_completed(self, task_id: str) -> List[str]:
+        """Marca una tarea como completada y devuelve las que se desbloquean"""
+        return self.dag.mark_done(task_id)
         
-        for node in self.graph.nodes():
-            if node in completed_tasks:
-                continue
+    def mark_pending(self, task_id: str):
+        """Vuelve a marcar una tarea como no completada"""
+        self.dag.mark_pending(task_id)
                 
-            # Verificar si todas las dependencias están completas
-            predecessors = list(self.graph.predecessors(node))
-            if all(pred in completed_tasks for pred in predecessors):
-                ready.append(node)
+    def successors(self, task_id: str) -> List[str]:
+        """Tareas que dependen directamente de task_id"""
+        return self.dag.successors(task_id)
                 
-        return ready
+    def predecessors(self, task_id: str) -> List[str]:
+        """Dependencias directas de task_id"""
+        return self.dag.predecessors(task_id)
+    
+    def get_ready_tasks(self, completed_tasks: Set[str] = None) -> List[str]:
+        """
+        Obtiene tareas listas para ejecutar (sin dependencias pendientes).
+        
+        Sin argumentos usa el estado de completado que mantiene el grafo;
+        con un conjunto explícito se sincroniza primero con él.
+        """
+        if completed_tasks is not None:
+            self.dag.sync_done(completed_tasks)
+        return self.dag.ready()
         
     def get_execution_order(self) -> List[str]:
         """Obtiene orden óptimo de ejecución respetando dependencias"""
-        try:
-            return list(nx.topological_sort(self.graph))
-        except nx.NetworkXUnfeasible:
-            # Hay ciclos, intentar resolverlos
-            cycles = list(nx.simple_cycles(self.graph))
-            raise ValueError(f"Ciclos detectados en dependencias: {cycles}")
+        # El DAG rechaza los ciclos al insertar, el orden siempre existe
+        return self.dag.topological_order()
+    
+    def get_execution_plan(self, include_completed: bool = True) -> List[List[str]]:
+        """Agrupa las tareas en fases ejecutables en paralelo (por defecto también las completadas)"""
+        return self.dag.levels(include_done=include_completed)
             
     def visualize(self, output_path: str = None):
-        """Genera visualización del grafo de tareas"""
+        """Genera visualización del grafo de tareas (capas por nivel)"""
         try:
             import matplotlib.pyplot as plt
             
-            pos = nx.spring_layout(self.graph)
+            pos = {}
+            for x, phase in enumerate(self.dag.levels()):
+                for y, task_id in enumerate(phase):
+                    pos[task_id] = (x, -y + (len(phase) - 1) / 2)
+            
             plt.figure(figsize=(12, 8))
             
-            # Dibujar nodos
-            nx.draw_networkx_nodes(self.graph, pos, node_size=500)
-            nx.draw_networkx_labels(self.graph, pos)
-            nx.draw_networkx_edges(self.graph, pos, edge_color='gray', arrows=True)
+            # Dibujar aristas y nodos
+            for before, after, _ in self.dag.edges():
+                (x1, y1), (x2, y2) = pos[before], pos[after]
+                plt.annotate("", xy=(x2, y2), xytext=(x1, y1),
+                             arrowprops=dict(arrowstyle="->", color='gray'))
+            for task_id, (x, y) in pos.items():
+                plt.scatter([x], [y], s=500)
+                plt.text(x, y, task_id, ha='center', va='center')
+            plt.axis('off')
             
             if output_path:
                 plt.savefig(output_path)
@@ -312,6 +341,15 @@ class TaskPersistence:
                 
             return tasks
             
+    def get_task_ids_by_status(self, statuses: List[str]) -> Set[str]:
+        """Obtiene los IDs de las tareas en alguno de los estados dados"""
+        placeholders = ', '.join('?' for _ in statuses)
+        with sqlite3.connect(self.db_path) as conn:
+            rows = conn.execute(
+                f"SELECT id FROM tasks WHERE status IN ({placeholders})", list(statuses)
+            ).fetchall()
+            return {row[0] for row in rows}
+    
     def update_task_status(self, task_id: str, status: str, **kwargs):
         """Actualiza el estado de una tarea"""
         with sqlite3.connect(self.db_path) as conn:
@@ -447,6 +485,8 @@ class TaskPersistence:
 class TaskManager:
     """Manager principal que coordina todo el sistema de tareas"""
     
+    DONE_STATUSES = ['completed', 'skipped']
+    
     def __init__(self, db_path: str = None):
         self.persistence = TaskPersistence(db_path)
         self.graph = TaskGraph()
@@ -460,11 +500,27 @@ class TaskManager:
         for task in tasks:
             self.graph.add_task(task['id'], task)
             
-            for dep in task.get('dependencies', []):
-                if isinstance(dep, dict):
-                    self.graph.add_dependency(task['id'], dep['depends_on'], dep.get('type', 'completion'))
-                else:
-                    self.graph.add_dependency(task['id'], dep)
+        for task in tasks:
+            for dep_id, dep_type in self._iter_dependencies(task):
+                try:
+                    self.graph.add_dependency(task['id'], dep_id, dep_type)
+                except CycleError as e:
+                    self.logger.error(f"Dependencia ignorada en {task['id']}: {e}")
+        
+        # El estado de completado se carga una sola vez; después se mantiene
+        # de forma incremental con mark_task_completed
+        for task_id in self.persistence.get_task_ids_by_status(self.DONE_STATUSES):
+            if task_id in self.graph.dag:
+                self.graph.mark_completed(task_id)
+    
+    @staticmethod
+    def _iter_dependencies(task: Dict):
+        """Itera (depends_on, tipo) de las dependencias de una tarea"""
+        for dep in task.get('dependencies', []):
+            if isinstance(dep, dict):
+                yield dep['depends_on'], dep.get('type', dep.get('dependency_type', 'completion'))
+            else:
+                yield dep, 'completion'
                     
     def add_task(self, task: Dict) -> str:
         """Agrega una nueva tarea"""
@@ -475,31 +531,28 @@ class TaskManager:
         if 'id' not in task:
             task['id'] = self._generate_task_id(task)
             
+        # Rechazar ciclos antes de persistir nada
+        dependencies = list(self._iter_dependencies(task))
+        for dep_id, _ in dependencies:
+            try:
+                self.graph.check_dependency(task['id'], dep_id)
+            except CycleError as e:
+                raise ValueError(str(e)) from e
+        
         # Guardar en DB
         task_id = self.persistence.save_task(task)
         
         # Actualizar grafo
         self.graph.add_task(task_id, task)
-        for dep in task.get('dependencies', []):
-            if isinstance(dep, dict):
-                self.graph.add_dependency(task_id, dep['depends_on'], dep.get('type', 'completion'))
-            else:
-                self.graph.add_dependency(task_id, dep)
+        for dep_id, dep_type in dependencies:
+            self.graph.add_dependency(task_id, dep_id, dep_type)
                 
         self.logger.info(f"Tarea agregada: {task_id} - {task['title']}")
         return task_id
         
     def get_ready_tasks(self, completed_tasks: Set[str] = None) -> List[Dict]:
         """Obtiene tareas listas para ejecutar"""
-        if completed_tasks is None:
-            # Obtener de DB
-            with sqlite3.connect(self.persistence.db_path) as conn:
-                rows = conn.execute("""
-                    SELECT id FROM tasks WHERE status IN ('completed', 'skipped')
-                """).fetchall()
-                completed_tasks = {row[0] for row in rows}
-                
-        # Obtener IDs listos del grafo
+        # Sin argumentos se usa el estado incremental del grafo (sin consultar la DB)
         ready_ids = self.graph.get_ready_tasks(completed_tasks)
         
         # Obtener datos completos
@@ -519,10 +572,10 @@ class TaskManager:
         self.persistence.update_task_status(task_id, 'completed')
         self.persistence.save_task_result(task_id, result)
         
-        # Verificar si esto desbloquea otras tareas
-        newly_ready = self.get_ready_tasks()
+        # Verificar si esto desbloquea otras tareas (solo sus sucesores)
+        newly_ready = self.graph.mark_completed(task_id)
         if newly_ready:
-            self.logger.info(f"Tareas desbloqueadas: {[t['id'] for t in newly_ready]}")
+            self.logger.info(f"Tareas desbloqueadas: {newly_ready}")
             
     def mark_task_failed(self, task_id: str, result: Dict):
         """Marca una tarea como fallida"""
@@ -530,7 +583,7 @@ class TaskManager:
         self.persistence.save_task_result(task_id, result)
         
         # Verificar si hay tareas que dependen de esta
-        dependent_tasks = list(self.graph.graph.successors(task_id))
+        dependent_tasks = self.graph.successors(task_id)
         if dependent_tasks:
             self.logger.warning(f"Tareas bloqueadas por fallo: {dependent_tasks}")
             
@@ -546,36 +599,8 @@ class TaskManager:
         
     def get_execution_plan(self) -> List[List[str]]:
         """Obtiene plan de ejecución en fases"""
-        try:
-            # Orden topológico
-            order = self.graph.get_execution_order()
-            
-            # Agrupar por niveles (tareas que pueden ejecutarse en paralelo)
-            levels = []
-            remaining = set(order)
-            completed = set()
-            
-            while remaining:
-                # Encontrar tareas sin dependencias pendientes
-                current_level = []
-                for task_id in remaining:
-                    predecessors = set(self.graph.graph.predecessors(task_id))
-                    if predecessors.issubset(completed):
-                        current_level.append(task_id)
-                        
-                if not current_level:
-                    # No se puede avanzar, hay ciclos
-                    break
-                    
-                levels.append(current_level)
-                completed.update(current_level)
-                remaining.difference_update(current_level)
-                
-            return levels
-            
-        except ValueError as e:
-            self.logger.error(f"Error generando plan: {e}")
-            return []
+        # Los niveles se mantienen al insertar dependencias; no hay que recalcularlos
+        return self.graph.get_execution_plan()
             
     def _validate_task(self, task: Dict):
         """Valida que una tarea tenga los campos requeridos"""
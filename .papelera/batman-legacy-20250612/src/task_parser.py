@@ -135,6 +135,7 @@ class TaskParser:
         priority: high
         frequency: daily
         schedule: 09:00
+        resource: cpu
         > echo "Running task"
         IF file_exists(/tmp/flag.txt)
         DEPENDS ON other-task
@@ -207,6 +208,8 @@ class TaskParser:
                     current_task.retry_count = int(prop_value)
                 elif prop_name == 'workdir':
                     current_task.working_directory = prop_value
+                elif prop_name == 'resource':
+                    current_task.metadata['resource'] = prop_value.lower()
                 continue
             
             # Schedule
@@ -344,6 +347,8 @@ class TaskParser:
                 task.tags = data['tags']
             if 'dependencies' in data:
                 task.dependencies = data['dependencies']
+            if 'resource' in data:
+                task.metadata['resource'] = str(data['resource']).lower()
             if 'conditions' in data:
                 for cond in data['conditions']:
                     condition = TaskCondition(
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Tests del DAG nativo y del TaskGraph que lo usa
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.dag import DAG, CycleError
+from src.task_manager import TaskGraph
+
+
+class TestDAG(unittest.TestCase):
+    """Niveles, tareas listas y ciclos"""
+    
+    def setUp(self):
+        # a -> b -> d, a -> c -> d, e independiente
+        self.dag = DAG()
+        for node in "abcde":
+            self.dag.add_node(node)
+        for before, after in [("a", "b"), ("a", "c"), ("b", "d"), ("c", "d")]:
+            self.dag.add_edge(before, after)
+    
+    def test_levels_and_order(self):
+        self.assertEqual(self.dag.levels(), [["a", "e"], ["b", "c"], ["d"]])
+        self.assertEqual(self.dag.topological_order(), ["a", "e", "b", "c", "d"])
+        self.assertEqual(self.dag.level("d"), 2)
+    
+    def test_levels_propagate_on_late_edges(self):
+        """Un arco nuevo desplaza a todos los descendientes"""
+        self.dag.add_edge("e", "a")
+        self.assertEqual(self.dag.levels(), [["e"], ["a"], ["b", "c"], ["d"]])
+    
+    def test_ready_follows_completion(self):
+        self.assertEqual(self.dag.ready(), ["a", "e"])
+        
+        self.assertEqual(self.dag.mark_done("a"), ["b", "c"])
+        self.assertEqual(self.dag.ready(), ["e", "b", "c"])
+        
+        self.assertEqual(self.dag.mark_done("b"), [])
+        self.assertEqual(self.dag.mark_done("c"), ["d"])
+        self.assertIn("d", self.dag.ready())
+        self.assertEqual(self.dag.mark_done("c"), [])
+    
+    def test_levels_without_done(self):
+        self.dag.mark_done("a")
+        self.dag.mark_done("e")
+        self.assertEqual(self.dag.levels(include_done=False), [["b", "c"], ["d"]])
+    
+    def test_cycle_is_rejected_with_path(self):
+        with self.assertRaises(CycleError) as ctx:
+            self.dag.add_edge("d", "a")
+        path = ctx.exception.path
+        self.assertEqual((path[0], path[-2], path[-1]), ("a", "d", "a"))
+        self.assertIn(path[1], ("b", "c"))
+        self.assertNotIn("a", self.dag.successors("d"))
+        
+        with self.assertRaises(CycleError):
+            self.dag.add_edge("e", "e")
+    
+    def test_mark_pending_blocks_successors_again(self):
+        self.dag.mark_done("a")
+        self.dag.mark_done("b")
+        self.dag.mark_done("c")
+        self.assertIn("d", self.dag.ready())
+        
+        self.dag.mark_pending("b")
+        self.assertFalse(self.dag.is_done("b"))
+        self.assertIn("b", self.dag.ready())
+        self.assertNotIn("d", self.dag.ready())
+        
+        self.assertEqual(self.dag.mark_done("b"), ["d"])
+    
+    def test_sync_done(self):
+        self.dag.sync_done({"a", "b"})
+        self.assertEqual(self.dag.ready(), ["e", "c"])
+        self.dag.sync_done({"a"})
+        self.assertCountEqual(self.dag.ready(), ["e", "b", "c"])
+
+
+class TestTaskGraph(unittest.TestCase):
+    """TaskGraph expresa las dependencias al revés que el DAG"""
+    
+    def test_execution_plan_includes_completed_by_default(self):
+        graph = TaskGraph()
+        for task_id in ("build", "test"):
+            graph.add_task(task_id, {})
+        graph.add_dependency("test", "build")
+        graph.mark_completed("build")
+        
+        self.assertEqual(graph.get_execution_plan(), [["build"], ["test"]])
+        self.assertEqual(graph.get_execution_plan(include_completed=False), [["test"]])
+        self.assertEqual(graph.get_ready_tasks(), ["test"])
+        
+        with self.assertRaises(CycleError):
+            graph.check_dependency("build", "test")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Tests de BatmanGitHubIntegration con el cliente HTTP de Batman Incorporated
+(contra el FakeGitHub de sus tests)
+"""
+
+import logging
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.incorporated import incorporated_src
+
+INCORPORATED = incorporated_src()
+if INCORPORATED:
+    sys.path.insert(0, str(INCORPORATED.parent / "tests"))
+
+from batman_github_integration import BatmanGitHubIntegration, GitHubConfig
+
+
+@unittest.skipIf(INCORPORATED is None, "Batman Incorporated no está disponible")
+class TestIntegrationWithAPI(unittest.TestCase):
+    """Issues y comentarios van por la API, sin lanzar gh"""
+    
+    def setUp(self):
+        from fake_github import FakeGitHub
+        from integrations.github_api import GitHubAPIClient
+        from integrations.github_cache import GitHubCache
+        
+        self.fake = FakeGitHub().start()
+        owner, repo = self.fake.repo.split('/')
+        
+        integration = BatmanGitHubIntegration.__new__(BatmanGitHubIntegration)
+        integration.config = GitHubConfig(owner=owner, repo=repo)
+        integration.logger = logging.getLogger(__name__)
+        integration.last_operation_time = 0
+        integration.min_operation_interval = 2
+        integration.gh = MagicMock()
+        integration.api = GitHubAPIClient(self.fake.repo, "test-token", base_url=self.fake.url,
+                                          rate=1000, burst=1000)
+        integration.issue_cache = GitHubCache(self.fake.repo, ":memory:")
+        self.integration = integration
+    
+    def tearDown(self):
+        self.integration.issue_cache.close()
+        self.integration.api.close()
+        self.fake.stop()
+    
+    def test_report_issue_and_comment(self):
+        number = self.integration.create_nightly_report_issue({'total_tasks': 2, 'successful_tasks': 2})
+        self.integration.update_issue_comment(number, "Todo en orden")
+        
+        self.assertEqual(self.fake.items[number]['title'].split(' - ')[0], "🦇 Reporte Nocturno")
+        self.assertEqual(self.fake.comments, [(number, "Todo en orden")])
+        self.integration.gh.assert_not_called()
+        self.integration.gh.create_issue.assert_not_called()
+        self.integration.gh.run_gh_command.assert_not_called()
+        self.assertEqual(len(self.fake.connections), 1)
+    
+    def test_discoveries_are_deduplicated_through_the_cache(self):
+        self.fake.add_item("🦇 Batman: Disco lleno", labels=["batman-found"])
+        discovery = {'type': 'alert', 'severity': 'high', 'title': 'Disco lleno'}
+        
+        self.assertEqual(self.integration.create_discovery_issue(discovery), 1)
+        self.assertEqual(len(self.fake.items), 1)
+        
+        discovery['title'] = 'Puerto abierto'
+        created = self.integration.create_discovery_issue(discovery)
+        self.assertEqual(self.integration.create_discovery_issue(discovery), created)
+        self.assertEqual(len(self.fake.items), 2)
+        
+        found = self.integration.check_existing_issues("disco")
+        self.assertEqual([issue['number'] for issue in found], [1])
+    
+    def test_night_discoveries_and_comments_are_batched(self):
+        self.fake.add_item("🦇 Batman: Disco lleno", labels=["batman-found"])
+        discoveries = [{'type': 'disk_usage', 'severity': 'high', 'title': 'Disco lleno'},
+                       {'type': 'security', 'severity': 'critical', 'title': 'Puerto abierto'},
+                       {'type': 'log_analysis', 'severity': 'high', 'title': 'Errores en logs'}]
+        
+        issues = self.integration.create_discovery_issues(discoveries)
+        self.assertEqual(issues[0], (1, True))
+        self.assertEqual([repeated for _, repeated in issues[1:]], [False, False])
+        self.assertEqual(len(self.fake.items), 3)
+        
+        requests = len(self.fake.requests)
+        self.assertEqual(self.integration.add_issue_comments([(1, "De nuevo"), (issues[1][0], "Sigue")]),
+                         [True, True])
+        self.assertEqual(self.fake.comments, [(1, "De nuevo"), (issues[1][0], "Sigue")])
+        self.assertEqual(len(self.fake.requests) - requests, 2)
+        
+        # La caché ya conoce los issues creados: la segunda noche no crea nada
+        self.assertEqual([repeated for _, repeated in self.integration.create_discovery_issues(discoveries)],
+                         [True, True, True])
+        self.assertEqual(len(self.fake.items), 3)
+        mutations = [path for method, path in self.fake.requests if method == 'POST']
+        self.assertNotIn(f"/repos/{self.fake.repo}/issues", mutations)
+        self.integration.gh.assert_not_called()
+    
+    def test_api_errors_are_logged(self):
+        self.integration.api.repo = "wayne/no-existe"
+        self.assertIsNone(self.integration.create_nightly_report_issue({}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Tests for the dependency-, priority- and resource-aware TaskScheduler
+"""
+
+import sys
+import threading
+import time
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from task_executor import TaskExecutor, TaskResult, TaskStatus, get_resource_class
+from task_parser import Task, TaskPriority
+
+
+class FakeExecutor(TaskExecutor):
+    """TaskExecutor that records runs instead of spawning processes."""
+    
+    def __init__(self, fail=(), delay=0.0, **kwargs):
+        super().__init__(**kwargs)
+        self.fail = set(fail)
+        self.delay = delay
+        self.order = []
+        self.active = {}
+        self.peak = {}
+        self._stats = threading.Lock()
+    
+    def execute_task(self, task, force=False):
+        resource = get_resource_class(task)
+        with self._stats:
+            self.order.append(task.id)
+            self.active[resource] = self.active.get(resource, 0) + 1
+            self.peak[resource] = max(self.peak.get(resource, 0), self.active[resource])
+        time.sleep(self.delay)
+        with self._stats:
+            self.active[resource] -= 1
+        
+        status = TaskStatus.FAILED if task.id in self.fail else TaskStatus.SUCCESS
+        return TaskResult(task_id=task.id, status=status,
+                          start_time=datetime.now(), end_time=datetime.now())
+
+
+def make_task(task_id, dependencies=(), priority=TaskPriority.NORMAL, resource=None):
+    metadata = {"resource": resource} if resource else {}
+    return Task(id=task_id, name=task_id, command="true", priority=priority,
+                dependencies=list(dependencies), metadata=metadata)
+
+
+class TestTaskScheduler(unittest.TestCase):
+    
+    def _executor(self, **kwargs):
+        executor = FakeExecutor(**kwargs)
+        self.addCleanup(executor.shutdown)
+        return executor
+    
+    def _run(self, executor, tasks):
+        executor.execute_tasks_async(tasks)
+        return executor.wait_for_completion(timeout=10)
+    
+    def test_dependencies_run_first_whatever_the_submit_order(self):
+        executor = self._executor(max_workers=4)
+        results = self._run(executor, [
+            make_task("deploy", ["test"]),
+            make_task("test", ["build"]),
+            make_task("build"),
+        ])
+        
+        self.assertEqual(executor.order, ["build", "test", "deploy"])
+        self.assertTrue(all(r.status == TaskStatus.SUCCESS for r in results.values()))
+    
+    def test_dependency_submitted_later(self):
+        executor = self._executor(max_workers=2)
+        executor.execute_tasks_async([make_task("report", ["fetch"])])
+        executor.execute_tasks_async([make_task("fetch")])
+        executor.wait_for_completion(timeout=10)
+        
+        self.assertEqual(executor.order, ["fetch", "report"])
+    
+    def test_priority_orders_ready_tasks(self):
+        executor = self._executor(max_workers=1)
+        results = self._run(executor, [
+            make_task("low", priority=TaskPriority.LOW),
+            make_task("normal"),
+            make_task("critical", priority=TaskPriority.CRITICAL),
+        ])
+        
+        self.assertEqual(len(results), 3)
+        self.assertEqual(executor.order, ["critical", "normal", "low"])
+    
+    def test_failed_dependency_skips_dependents_transitively(self):
+        executor = self._executor(max_workers=2, fail={"build"})
+        results = self._run(executor, [
+            make_task("build"),
+            make_task("test", ["build"]),
+            make_task("deploy", ["test"]),
+        ])
+        
+        self.assertEqual(executor.order, ["build"])
+        self.assertEqual(results["test"].status, TaskStatus.SKIPPED)
+        self.assertEqual(results["test"].metadata["unmet_dependencies"], ["build"])
+        self.assertEqual(results["deploy"].status, TaskStatus.SKIPPED)
+    
+    def test_dependency_that_already_failed(self):
+        executor = self._executor(max_workers=1, fail={"build"})
+        self._run(executor, [make_task("build")])
+        results = self._run(executor, [make_task("test", ["build"])])
+        
+        self.assertEqual(results["test"].status, TaskStatus.SKIPPED)
+        self.assertEqual(executor.order, ["build"])
+    
+    def test_missing_dependency_is_skipped_on_wait(self):
+        executor = self._executor(max_workers=2)
+        results = self._run(executor, [make_task("orphan", ["never-submitted"]), make_task("solo")])
+        
+        self.assertEqual(executor.order, ["solo"])
+        self.assertEqual(results["orphan"].status, TaskStatus.SKIPPED)
+        self.assertEqual(results["orphan"].metadata["unmet_dependencies"], ["never-submitted"])
+    
+    def test_resource_limits_cap_concurrency(self):
+        executor = self._executor(max_workers=6, delay=0.05,
+                                  resource_limits={"claude": 1, "io": 3})
+        tasks = [make_task(f"ai-{i}", resource="claude") for i in range(3)]
+        tasks += [make_task(f"io-{i}", resource="io") for i in range(6)]
+        results = self._run(executor, tasks)
+        
+        self.assertEqual(len(results), 9)
+        self.assertEqual(executor.peak["claude"], 1)
+        self.assertLessEqual(executor.peak["io"], 3)
+        self.assertGreater(executor.peak["io"], 1)
+    
+    def test_resource_class_inference(self):
+        self.assertEqual(get_resource_class(make_task("a", resource="CPU")), "cpu")
+        tagged = make_task("b")
+        tagged.tags = ["cpu"]
+        self.assertEqual(get_resource_class(tagged), "cpu")
+        ai = make_task("c")
+        ai.command = "cd repo && claude -p 'review'"
+        self.assertEqual(get_resource_class(ai), "claude")
+        self.assertEqual(get_resource_class(make_task("d")), "io")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,14 +4,125 @@ Claude Code Quota Monitor - Monitoreo local de uso sin consumir cuota.
 Rastrea prompts, tiempo hasta refresh (5h) y sugiere estrategias de uso.
 """
 
-import time
+import fcntl
 import json
 import os
 import sys
+import time
 from datetime import datetime, timedelta
 from pathlib import Path
 
 
+# Con Batman Incorporated en el path (o en BATMAN_INCORPORATED_SRC) se usa
+# su registro de prompts (core/quota.py), que además compacta. Sin él se
+# escribe y lee el mismo registro con SimpleQuotaLedger, así el script
+# sigue funcionando copiado fuera del repositorio.
+SRC_ENV = 'BATMAN_INCORPORATED_SRC'
+if os.environ.get(SRC_ENV):
+    sys.path.insert(0, os.path.expanduser(os.environ[SRC_ENV]))
+
+try:
+    from core.quota import QuotaLedger, QUOTA_PERIOD, DEFAULT_QUOTA_DIR as QUOTA_DIR
+except ImportError:
+    QuotaLedger = None
+    QUOTA_PERIOD = 5 * 60 * 60
+    QUOTA_DIR = Path.home() / '.config' / 'claude-code'
+
+
+class SimpleQuotaLedger:
+    """
+    Versión mínima del registro de prompts de Batman Incorporated.
+    
+    Añade eventos a quota_ledger.jsonl con un único write() sobre O_APPEND
+    (como core.quota) y suma el período actual desde la base compactada,
+    los segmentos pendientes y el registro activo. No compacta: lo hace
+    Batman la próxima vez que registre prompts.
+    """
+
+    LEDGER_FILE = 'quota_ledger.jsonl'
+    BASE_FILE = 'quota_ledger.base.json'
+
+    def __init__(self, directory, period=QUOTA_PERIOD):
+        self.dir = Path(directory).expanduser()
+        self.period = period
+    
+    @staticmethod
+    def _empty(period_start):
+        return {'period_start': period_start, 'prompt_count': 0, 'opus_count': 0,
+                'sonnet_count': 0, 'model_switches': [], 'morning_activation': None}
+    
+    def _append(self, event, **data):
+        record = {'ts': time.time(), 'event': event}
+        record.update(data)
+        line = (json.dumps(record, separators=(',', ':')) + "\n").encode('utf-8')
+        ledger = self.dir / self.LEDGER_FILE
+        
+        self.dir.mkdir(parents=True, exist_ok=True)
+        while True:
+            fd = os.open(ledger, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_SH)
+                # Si Batman rotó el registro entre open y flock, escribir en el nuevo
+                if os.fstat(fd).st_ino == os.stat(ledger).st_ino:
+                    os.write(fd, line)
+                    return
+            except FileNotFoundError:
+                pass
+            finally:
+                os.close(fd)
+    
+    def record(self, count=1, model='opus', morning=False):
+        """Registra prompts en el período actual."""
+        data = {'n': count, 'model': model}
+        if morning:
+            data['morning'] = True
+        self._append('prompt', **data)
+    
+    def reset(self):
+        """Cierra el período actual."""
+        self._append('reset')
+    
+    def _fold(self, state, event):
+        ts = event.get('ts', 0)
+        kind = event.get('event', 'prompt')
+        start = state['period_start']
+        if kind == 'reset' or start is None or ts - start >= self.period:
+            state.update(self._empty(ts))
+        if kind == 'prompt':
+            count = int(event.get('n', 1))
+            state['prompt_count'] += count
+            state['opus_count' if event.get('model', 'opus') == 'opus' else 'sonnet_count'] += count
+            if event.get('morning') and state['prompt_count'] == count:
+                state['morning_activation'] = ts
+    
+    def summary(self):
+        """Estado del período actual (vacío y empezando ahora si expiró)."""
+        state = self._empty(None)
+        folded = set()
+        try:
+            base = json.loads((self.dir / self.BASE_FILE).read_text())
+            state.update(base['state'])
+            folded = set(base['folded'])
+        except (OSError, ValueError, KeyError):
+            pass
+        
+        segments = [path for path in sorted(self.dir.glob('quota_ledger.*.seg')) if path.name not in folded]
+        for path in segments + [self.dir / self.LEDGER_FILE]:
+            try:
+                lines = path.read_bytes().splitlines()
+            except OSError:
+                continue  # compactado mientras se leía
+            for line in lines:
+                try:
+                    self._fold(state, json.loads(line))
+                except ValueError:
+                    continue
+        
+        if state['period_start'] is None or time.time() - state['period_start'] >= self.period:
+            return self._empty(time.time())
+        return state
+
+
 class ClaudeQuotaMonitor:
     """
     Monitorea el uso de Claude Code y tiempo hasta refresh.
@@ -19,8 +130,7 @@ class ClaudeQuotaMonitor:
     - Plan Max 20x: ~200-800 prompts por período
     """
     
-    QUOTA_PERIOD = 5 * 60 * 60  # 5 horas en segundos
-    QUOTA_FILE = Path.home() / '.config' / 'claude-code' / 'quota_tracking.json'
+    QUOTA_PERIOD = QUOTA_PERIOD
     
     # Límites aproximados por plan
     LIMITS = {
@@ -33,85 +143,29 @@ class ClaudeQuotaMonitor:
     
     def __init__(self, plan='max_20x'):
         self.plan = plan
+        self.ledger = (QuotaLedger or SimpleQuotaLedger)(QUOTA_DIR, self.QUOTA_PERIOD)
         self.load_state()
     
     def load_state(self):
-        """Carga el estado desde archivo o crea uno nuevo."""
-        if self.QUOTA_FILE.exists():
-            with open(self.QUOTA_FILE, 'r') as f:
-                self.state = json.load(f)
-        else:
-            self.state = {
-                'period_start': time.time(),
-                'prompt_count': 0,
-                'opus_count': 0,
-                'sonnet_count': 0,
-                'model_switches': [],
-                'morning_activation': None
-            }
-            self.save_state()
-    
-    def save_state(self):
-        """Guarda el estado actual."""
-        self.QUOTA_FILE.parent.mkdir(parents=True, exist_ok=True)
-        with open(self.QUOTA_FILE, 'w') as f:
-            json.dump(self.state, f, indent=2)
+        """Deriva el estado del período actual desde el registro de prompts."""
+        self.state = self.ledger.summary()
     
     def check_reset(self):
-        """Verifica si es hora de resetear la cuota."""
-        current_time = time.time()
-        if current_time - self.state['period_start'] >= self.QUOTA_PERIOD:
-            # Guardar estadísticas del período anterior
-            self.archive_period()
-            # Resetear
-            self.state = {
-                'period_start': current_time,
-                'prompt_count': 0,
-                'opus_count': 0,
-                'sonnet_count': 0,
-                'model_switches': [],
-                'morning_activation': None
-            }
-            self.save_state()
-            return True
-        return False
+        """Verifica si el período de cuota expiró (el siguiente prompt abre uno nuevo)."""
+        expired = time.time() - self.state['period_start'] >= self.QUOTA_PERIOD
+        if expired:
+            self.load_state()
+        return expired
     
-    def archive_period(self):
-        """Guarda estadísticas del período anterior."""
-        archive_file = self.QUOTA_FILE.parent / 'quota_history.json'
-        history = []
-        
-        if archive_file.exists():
-            with open(archive_file, 'r') as f:
-                history = json.load(f)
-        
-        history.append({
-            'period_end': time.time(),
-            'stats': self.state.copy()
-        })
-        
-        # Mantener solo últimos 30 días
-        cutoff = time.time() - (30 * 24 * 60 * 60)
-        history = [h for h in history if h['period_end'] > cutoff]
-        
-        with open(archive_file, 'w') as f:
-            json.dump(history, f, indent=2)
+    def reset(self):
+        """Cierra el período actual manualmente."""
+        self.ledger.reset()
+        self.load_state()
     
     def record_prompt(self, model='opus', is_morning_coffee=False):
-        """Registra un nuevo prompt."""
-        self.check_reset()
-        
-        self.state['prompt_count'] += 1
-        if model == 'opus':
-            self.state['opus_count'] += 1
-        else:
-            self.state['sonnet_count'] += 1
-        
-        # Registrar activación matutina
-        if is_morning_coffee and self.state['prompt_count'] == 1:
-            self.state['morning_activation'] = time.time()
-        
-        self.save_state()
+        """Registra un nuevo prompt (archivar el período cerrado lo hace la compactación)."""
+        self.ledger.record(1, model, morning=is_morning_coffee)
+        self.load_state()
     
     def get_time_remaining(self):
         """Retorna tiempo hasta el próximo reset."""
@@ -312,9 +366,7 @@ def main():
             print(f"   Total: {usage['current']} | Tiempo restante: {time_remaining['formatted']}")
             
         elif command == '--reset':
-            monitor.state['period_start'] = 0
-            monitor.save_state()
-            monitor.check_reset()
+            monitor.reset()
             print("✅ Cuota reseteada manualmente")
             
         elif command == '--morning' or command == '-m':
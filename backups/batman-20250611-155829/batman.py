@@ -33,6 +33,7 @@ Ejemplos:
   batman --auto                      # Modo automático 24/7
   batman --status                    # Ver estado actual
   batman --off                       # Detener elegantemente
+  batman --resume last               # Retomar la última sesión interrumpida
         """
     )
     
@@ -56,6 +57,8 @@ Ejemplos:
                         help='Detener el sistema elegantemente')
     parser.add_argument('--status', action='store_true',
                         help='Mostrar estado actual del sistema')
+    parser.add_argument('--resume', metavar='SESSION',
+                        help='Retomar una sesión interrumpida (ID o "last" para la última sin terminar)')
     parser.add_argument('--install-tools', action='store_true',
                         help='Instalar herramientas del Arsenal sin sudo')
     
@@ -74,7 +77,7 @@ Ejemplos:
     args = parser.parse_args()
     
     # Validar argumentos
-    if not any([args.task, args.auto, args.off, args.status, args.install_tools, args.infinity]):
+    if not any([args.task, args.auto, args.off, args.status, args.install_tools, args.infinity, args.resume]):
         parser.print_help()
         sys.exit(1)
     
@@ -125,6 +128,9 @@ Ejemplos:
             batman.stop()
         elif args.auto:
             batman.start_auto_mode()
+        elif args.resume:
+            if not batman.resume_session(args.resume):
+                sys.exit(1)
         elif args.task:
             batman.execute_task(args.task, mode=args.mode)
         
@@ -13,6 +13,10 @@ from pathlib import Path
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from core.admission import get_admission_controller
+
 class ParallelLauncher:
     """Lanzador paralelo para todas las operaciones de Batman Incorporated."""
     
@@ -20,20 +24,23 @@ class ParallelLauncher:
         self.base_dir = Path("/home/lauta/glados/batman-incorporated")
         self.results = {}
         self.start_time = time.time()
+        # El número de comandos simultáneos se ajusta según la carga del sistema
+        self.admission = get_admission_controller({'max_slots': 8})
         
     def run_command_parallel(self, commands):
         """Ejecuta múltiples comandos en paralelo."""
         def run_single_command(cmd_info):
             name, command, cwd = cmd_info
             try:
-                print(f"🚀 [{name}] Iniciando...")
-                result = subprocess.run(
-                    command, 
-                    shell=True, 
-                    capture_output=True, 
-                    text=True, 
-                    cwd=cwd
-                )
+                with self.admission.slot(name):
+                    print(f"🚀 [{name}] Iniciando...")
+                    result = subprocess.run(
+                        command, 
+                        shell=True, 
+                        capture_output=True, 
+                        text=True, 
+                        cwd=cwd
+                    )
                 
                 elapsed = time.time() - self.start_time
                 
@@ -49,8 +56,8 @@ class ParallelLauncher:
                 print(f"💥 [{name}] Excepción en {elapsed:.1f}s: {e}")
                 return (name, False, str(e), elapsed)
         
-        # Ejecutar en paralelo con ThreadPoolExecutor
-        with ThreadPoolExecutor(max_workers=8) as executor:
+        # Ejecutar en paralelo con ThreadPoolExecutor (la admisión limita cuántos corren)
+        with ThreadPoolExecutor(max_workers=self.admission.max_slots) as executor:
             futures = [executor.submit(run_single_command, cmd) for cmd in commands]
             
             for future in as_completed(futures):
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark de serialización de tareas.
+Compara el camino actual (to_dict + JSON) con el codec binario y pickle.
+
+Uso: python scripts/benchmark_task_codec.py [--count N]
+"""
+
+import argparse
+import json
+import pickle
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from core.task import Task, TaskPriority, TaskStatus, TaskType
+from core.task_codec import encode_tasks, decode_tasks
+
+
+AGENTS = ['alfred', 'robin', 'oracle', 'batgirl', 'lucius']
+
+
+def build_tasks(count: int):
+    """Genera tareas históricas representativas."""
+    tasks = []
+    for i in range(count):
+        task = Task(
+            title=f"Tarea histórica {i}",
+            description=f"Implementar endpoint /api/v1/recurso{i} con validación y tests",
+            type=list(TaskType)[i % len(TaskType)],
+            priority=list(TaskPriority)[i % len(TaskPriority)],
+            assigned_to=AGENTS[i % len(AGENTS)],
+            tags=['backend', 'api'] if i % 2 else ['docs'],
+            depends_on=[f"task-{i - 1}"] if i else [],
+            metrics={'files_modified': i % 7, 'duration': i * 0.5},
+        )
+        task.start()
+        task.complete(output=f"Tarea {i} completada: {i % 13} archivos modificados")
+        task.status = TaskStatus.COMPLETED
+        tasks.append(task)
+    return tasks
+
+
+def measure(label: str, encode, decode, tasks):
+    start = time.perf_counter()
+    data = encode(tasks)
+    encoded = time.perf_counter()
+    restored = decode(data)
+    decoded = time.perf_counter()
+    assert len(restored) == len(tasks)
+    print(f"{label:<16} encode {encoded - start:7.3f}s  decode {decoded - encoded:7.3f}s  "
+          f"size {len(data) / 1024 / 1024:7.2f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de serialización de Task")
+    parser.add_argument('--count', type=int, default=100000, help="Número de tareas")
+    args = parser.parse_args()
+    
+    tasks = build_tasks(args.count)
+    print(f"📊 {args.count} tareas")
+    
+    measure("dict + json",
+            lambda ts: json.dumps([t.to_dict() for t in ts]).encode('utf-8'),
+            lambda data: [Task.from_dict(d) for d in json.loads(data)],
+            tasks)
+    measure("pickle",
+            lambda ts: pickle.dumps(ts, protocol=pickle.HIGHEST_PROTOCOL),
+            pickle.loads,
+            tasks)
+    measure("task_codec", encode_tasks, decode_tasks, tasks)
+
+
+if __name__ == "__main__":
+    main()
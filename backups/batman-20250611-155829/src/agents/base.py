@@ -11,6 +11,9 @@ from typing import Dict, List, Optional, Any, Tuple
 from abc import ABC, abstractmethod
 from datetime import datetime
 
+from core.admission import get_admission_controller
+from core.prompt_builder import DEFAULT_BUDGET_TOKENS, ContextFiles, PromptBuilder, task_keywords
+from core.run_artifacts import RunArtifactStore, get_artifact_store
 from core.task import Task, TaskStatus
 from features.chapter_logger import ChapterLogger
 
@@ -36,6 +39,7 @@ class BaseAgent(ABC):
         self.stats = {
             'tasks_completed': 0,
             'tasks_failed': 0,
+            'prompts_sent': 0,
             'total_time': 0,
             'files_created': [],
             'files_modified': []
@@ -43,6 +47,12 @@ class BaseAgent(ABC):
         
         # Herramientas disponibles del Arsenal
         self.available_tools = {}
+        
+        # Tokens máximos (estimados) del prompt de cada tarea
+        self.prompt_budget_tokens = DEFAULT_BUDGET_TOKENS
+        
+        # Almacén de prompts/respuestas (None: el global de la sesión)
+        self.artifacts: Optional[RunArtifactStore] = None
     
     @abstractmethod
     def get_system_prompt(self) -> str:
@@ -117,75 +127,73 @@ class BaseAgent(ABC):
         Returns:
             Prompt completo formateado
         """
-        prompt_parts = []
+        builder = PromptBuilder(self.prompt_budget_tokens)
         
         # System prompt del agente
-        prompt_parts.append(self.get_system_prompt())
-        prompt_parts.append("")
+        builder.add("system", self.get_system_prompt() + "\n", required=True)
         
         # Información de la tarea
-        prompt_parts.append(f"## Tarea Actual")
-        prompt_parts.append(f"**Título**: {task.title}")
-        prompt_parts.append(f"**Descripción**: {task.description}")
-        prompt_parts.append(f"**Tipo**: {task.type.value}")
-        prompt_parts.append(f"**Prioridad**: {task.priority.value}")
-        
+        task_parts = [
+            "## Tarea Actual",
+            f"**Título**: {task.title}",
+            f"**Descripción**: {task.description}",
+            f"**Tipo**: {task.type.value}",
+            f"**Prioridad**: {task.priority.value}",
+        ]
         if task.tags:
-            prompt_parts.append(f"**Tags**: {', '.join(task.tags)}")
+            task_parts.append(f"**Tags**: {', '.join(task.tags)}")
+        task_parts.append("")
+        builder.add("task", "\n".join(task_parts), required=True)
         
-        prompt_parts.append("")
-        
-        # Contexto de archivos si se proporciona
-        if context_files:
-            prompt_parts.append("## Contexto del Proyecto")
-            for file_path in context_files:
-                if Path(file_path).exists():
-                    prompt_parts.append(f"\n### Archivo: {file_path}")
-                    prompt_parts.append("```")
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            content = f.read()
-                            # Limitar tamaño del archivo
-                            if len(content) > 10000:
-                                content = content[:10000] + "\n... (truncado)"
-                            prompt_parts.append(content)
-                    except Exception as e:
-                        prompt_parts.append(f"Error leyendo archivo: {e}")
-                    prompt_parts.append("```")
-            prompt_parts.append("")
+        # Contexto de archivos si se proporciona: extractos por relevancia
+        # dentro de lo que quede del presupuesto
+        files = ContextFiles(context_files or [], task_keywords(task))
+        if files:
+            builder.add("files", priority=1, render=files.render, min_tokens=files.min_tokens)
+        if files.skipped:
+            self._log(f"📎 Archivos con contenido repetido omitidos: {', '.join(files.skipped)}")
         
         # Arsenal de herramientas disponibles
         if self.available_tools:
-            prompt_parts.append("## Arsenal de Herramientas")
-            prompt_parts.append("Las siguientes herramientas optimizadas están disponibles:")
+            tool_parts = ["## Arsenal de Herramientas",
+                          "Las siguientes herramientas optimizadas están disponibles:"]
             for tool_type, tool_cmd in self.available_tools.items():
-                prompt_parts.append(f"- **{tool_type}**: `{tool_cmd}`")
-            prompt_parts.append("\nPrefiérelas sobre las herramientas estándar cuando sea posible.\n")
+                tool_parts.append(f"- **{tool_type}**: `{tool_cmd}`")
+            tool_parts.append("\nPrefiérelas sobre las herramientas estándar cuando sea posible.\n")
+            builder.add("arsenal", "\n".join(tool_parts), priority=0)
         
         # Instrucciones específicas
-        prompt_parts.append("## Instrucciones")
-        prompt_parts.append("1. Ejecuta la tarea descrita arriba")
-        prompt_parts.append("2. Usa las herramientas disponibles (Edit, Write, Bash, etc.)")
-        prompt_parts.append("3. Prefiere las herramientas del Arsenal cuando estén disponibles")
-        prompt_parts.append("4. Sé eficiente y directo")
-        prompt_parts.append("5. Reporta el progreso claramente")
-        prompt_parts.append("6. Si encuentras problemas, intenta resolverlos")
+        builder.add("instructions", "\n".join([
+            "## Instrucciones",
+            "1. Ejecuta la tarea descrita arriba",
+            "2. Usa las herramientas disponibles (Edit, Write, Bash, etc.)",
+            "3. Prefiere las herramientas del Arsenal cuando estén disponibles",
+            "4. Sé eficiente y directo",
+            "5. Reporta el progreso claramente",
+            "6. Si encuentras problemas, intenta resolverlos",
+        ]), required=True)
         
         # MCPs disponibles
-        prompt_parts.append("\n## MCPs Disponibles")
-        prompt_parts.append("- **filesystem**: Operaciones de archivos optimizadas")
-        prompt_parts.append("- **memory**: Compartir conocimiento entre agentes")
-        prompt_parts.append("- **everything**: Búsqueda global de archivos")
-        prompt_parts.append("- **sequentialthinking**: Razonamiento paso a paso")
+        builder.add("mcp_list", "\n".join([
+            "\n## MCPs Disponibles",
+            "- **filesystem**: Operaciones de archivos optimizadas",
+            "- **memory**: Compartir conocimiento entre agentes",
+            "- **everything**: Búsqueda global de archivos",
+            "- **sequentialthinking**: Razonamiento paso a paso",
+        ]), priority=3)
         
-        # Contexto MCP compartido si está disponible
+        # Contexto MCP compartido si está disponible, sin lo ya incluido
         if hasattr(self, 'mcp_prompt_section') and self.mcp_prompt_section:
-            prompt_parts.append(self.mcp_prompt_section)
+            builder.add("mcp_context", self.mcp_prompt_section, priority=2, dedupe=True)
         
         # Directorio de trabajo
-        prompt_parts.append(f"\n**Directorio de trabajo**: {self.working_dir}")
+        builder.add("working_dir", f"\n**Directorio de trabajo**: {self.working_dir}", required=True)
         
-        return "\n".join(prompt_parts)
+        prompt = builder.build()
+        if builder.dropped:
+            self._log(f"📏 Secciones fuera del presupuesto de {builder.budget_tokens} tokens: "
+                      f"{', '.join(builder.dropped)}")
+        return prompt
     
     def _execute_claude(self, prompt: str, task: Task) -> Tuple[bool, str, str]:
         """
@@ -200,9 +208,14 @@ class BaseAgent(ABC):
         """
         self._log("🤖 Ejecutando con Claude CLI...")
         
-        # Guardar prompt para debugging
-        prompt_file = Path(f"/tmp/batman_prompt_{task.id}.txt")
-        prompt_file.write_text(prompt, encoding='utf-8')
+        # Guardar prompt para debugging (archivo comprimido de la sesión)
+        artifacts = self.artifacts or get_artifact_store()
+        artifact_name = f"{self.name}/{task.id}"
+        artifacts.put('prompt', artifact_name, prompt, agent=self.name, task_id=task.id)
+        
+        # Límites según el historial de duraciones (ver core.duration)
+        max_turns = task.metadata.get('max_turns', 10)
+        timeout = task.metadata.get('timeout_seconds', 600)
         
         try:
             # Ejecutar Claude CLI
@@ -210,29 +223,38 @@ class BaseAgent(ABC):
                 'claude',
                 '--print',  # Modo no interactivo
                 '--dangerously-skip-permissions',  # Sin interrupciones
-                '--max-turns', '10',  # Máximo 10 turnos
+                '--output-format', 'json',  # Trae num_turns para la cuota
+                '--max-turns', str(max_turns),
                 prompt
             ]
             
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                cwd=str(self.working_dir),
-                timeout=600  # 10 minutos máximo
-            )
+            # Esperar a que la carga del sistema admita otra instancia
+            with get_admission_controller().slot(f"{self.name}:{task.id}"):
+                result = subprocess.run(
+                    cmd,
+                    capture_output=True,
+                    text=True,
+                    cwd=str(self.working_dir),
+                    timeout=timeout
+                )
+            
+            # Cada turno consume un prompt de la cuota; sin num_turns se
+            # cuenta lo peor, todos los turnos permitidos
+            output, turns = self._parse_claude_output(result.stdout)
+            self.stats['prompts_sent'] += turns or max_turns
             
             # Guardar respuesta para debugging
-            response_file = Path(f"/tmp/batman_response_{task.id}.txt")
-            response_file.write_text(result.stdout, encoding='utf-8')
+            artifacts.put('response', artifact_name, result.stdout,
+                          agent=self.name, task_id=task.id, returncode=result.returncode)
             
             if result.returncode == 0:
-                return True, result.stdout, ""
+                return True, output, ""
             else:
-                return False, result.stdout, result.stderr
+                return False, output, result.stderr
                 
         except subprocess.TimeoutExpired:
-            error = "Timeout: La tarea tomó más de 10 minutos"
+            self.stats['prompts_sent'] += max_turns
+            error = f"Timeout: La tarea tomó más de {timeout / 60:.0f} minutos"
             self._log(f"⏱️ {error}")
             return False, "", error
             
@@ -241,6 +263,24 @@ class BaseAgent(ABC):
             self._log(f"💥 {error}")
             return False, "", error
     
+    @staticmethod
+    def _parse_claude_output(stdout: str) -> Tuple[str, Optional[int]]:
+        """
+        Separa la respuesta de `claude --output-format json`.
+        
+        Returns:
+            Tupla (texto de la respuesta, turnos usados o None si la salida
+            no es el JSON esperado)
+        """
+        try:
+            data = json.loads(stdout)
+        except (TypeError, ValueError):
+            return stdout, None
+        if not isinstance(data, dict):
+            return stdout, None
+        turns = data.get('num_turns')
+        return data.get('result') or "", turns if isinstance(turns, int) and turns > 0 else None
+    
     def _log(self, message: str):
         """Helper para logging."""
         if self.logger:
@@ -0,0 +1,306 @@
+"""
+Control de admisión para lanzamientos de agentes de Batman Incorporated.
+Muestrea CPU, memoria, load average y presión de recursos (/proc/pressure)
+y ajusta dinámicamente cuántas instancias de Claude pueden correr a la vez.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+
+# Umbrales por defecto: por encima de cualquiera se considera sobrecarga
+DEFAULT_LIMITS = {
+    'cpu_percent': 85.0,
+    'memory_percent': 85.0,
+    'load_per_cpu': 1.5,
+    'cpu_pressure': 40.0,     # PSI "some avg10" en %
+    'memory_pressure': 10.0,
+    'io_pressure': 25.0,
+}
+
+
+# Espera mínima al reevaluar un lanzamiento bloqueado
+_MIN_WAIT = 0.05
+
+
+class AdmissionTimeout(TimeoutError):
+    """No se pudo admitir un lanzamiento dentro del tiempo de espera."""
+
+
+@dataclass
+class SystemLoad:
+    """Muestra de la carga del sistema (None = métrica no disponible)."""
+    cpu_percent: Optional[float] = None
+    memory_percent: Optional[float] = None
+    load_per_cpu: Optional[float] = None
+    cpu_pressure: Optional[float] = None
+    memory_pressure: Optional[float] = None
+    io_pressure: Optional[float] = None
+    timestamp: float = field(default_factory=time.monotonic)
+    
+    def pressure(self, limits: Dict[str, float]) -> float:
+        """
+        Presión relativa: el máximo de métrica/umbral.
+        
+        Returns:
+            0 sin carga, >= 1.0 si alguna métrica supera su umbral
+        """
+        ratios = [
+            value / limits[name]
+            for name, value in self.to_dict().items()
+            if value is not None and limits.get(name)
+        ]
+        return max(ratios, default=0.0)
+    
+    def to_dict(self) -> Dict[str, Optional[float]]:
+        return {
+            'cpu_percent': self.cpu_percent,
+            'memory_percent': self.memory_percent,
+            'load_per_cpu': self.load_per_cpu,
+            'cpu_pressure': self.cpu_pressure,
+            'memory_pressure': self.memory_pressure,
+            'io_pressure': self.io_pressure,
+        }
+
+
+class LoadSampler:
+    """
+    Lee la carga del sistema desde /proc (solo stdlib).
+    
+    El uso de CPU se calcula como delta entre dos muestras consecutivas;
+    la primera muestra usa los contadores desde el arranque. En sistemas
+    sin /proc solo se obtiene el load average.
+    """
+    
+    def __init__(self, proc_root: str = "/proc"):
+        self.proc_root = Path(proc_root)
+        self.cpu_count = os.cpu_count() or 1
+        self._last_cpu: Optional[tuple] = None
+    
+    def sample(self) -> SystemLoad:
+        """Toma una muestra de todas las métricas disponibles."""
+        return SystemLoad(
+            cpu_percent=self._cpu_percent(),
+            memory_percent=self._memory_percent(),
+            load_per_cpu=self._load_per_cpu(),
+            cpu_pressure=self._pressure('cpu'),
+            memory_pressure=self._pressure('memory'),
+            io_pressure=self._pressure('io'),
+        )
+    
+    def _read(self, name: str) -> Optional[str]:
+        try:
+            return (self.proc_root / name).read_text()
+        except OSError:
+            return None
+    
+    def _cpu_percent(self) -> Optional[float]:
+        text = self._read('stat')
+        if not text or not text.startswith('cpu '):
+            return None
+        # user nice system idle iowait irq softirq steal
+        values = [int(v) for v in text.split('\n', 1)[0].split()[1:9]]
+        idle = values[3] + (values[4] if len(values) > 4 else 0)
+        total = sum(values)
+        
+        previous = self._last_cpu
+        self._last_cpu = (idle, total)
+        if previous is not None and total > previous[1]:
+            idle, total = idle - previous[0], total - previous[1]
+        return 100.0 * (1 - idle / total) if total else None
+    
+    def _memory_percent(self) -> Optional[float]:
+        text = self._read('meminfo')
+        if not text:
+            return None
+        info = {}
+        for line in text.splitlines():
+            key, _, rest = line.partition(':')
+            if key in ('MemTotal', 'MemAvailable'):
+                info[key] = int(rest.split()[0])
+        total = info.get('MemTotal')
+        if not total or 'MemAvailable' not in info:
+            return None
+        return 100.0 * (1 - info['MemAvailable'] / total)
+    
+    def _load_per_cpu(self) -> Optional[float]:
+        try:
+            return os.getloadavg()[0] / self.cpu_count
+        except (OSError, AttributeError):
+            return None
+    
+    def _pressure(self, resource: str) -> Optional[float]:
+        """PSI `some avg10` (% del tiempo con tareas esperando el recurso)."""
+        text = self._read(f'pressure/{resource}')
+        if not text:
+            return None
+        for line in text.splitlines():
+            if line.startswith('some '):
+                for part in line.split()[1:]:
+                    key, _, value = part.partition('=')
+                    if key == 'avg10':
+                        return float(value)
+        return None
+
+
+class AdmissionController:
+    """
+    Decide cuándo se puede lanzar otro agente o tarea.
+    
+    Mantiene un límite dinámico de lanzamientos simultáneos con AIMD:
+    arranca en `min_slots`, sube de uno en uno mientras la presión del
+    sistema es baja y se reduce a la mitad cuando alguna métrica supera su
+    umbral. Además espacia los lanzamientos `launch_interval` segundos para
+    que la carga de uno se refleje antes de admitir el siguiente.
+    
+    Si no hay nada en ejecución, siempre admite: así nunca se bloquea el
+    progreso aunque la carga venga de otros procesos.
+    """
+    
+    def __init__(self, config: Optional[Dict[str, Any]] = None,
+                 sampler: Optional[LoadSampler] = None):
+        """
+        Inicializa el controlador.
+        
+        Args:
+            config: enabled, min_slots, max_slots, launch_interval,
+                sample_interval, headroom y limits (umbrales por métrica)
+            sampler: Fuente de muestras de carga
+        """
+        config = config or {}
+        self.enabled = config.get('enabled', True)
+        self.min_slots = max(1, int(config.get('min_slots', 1)))
+        self.max_slots = max(self.min_slots, int(config.get('max_slots', 5)))
+        self.launch_interval = float(config.get('launch_interval', 2.0))
+        self.sample_interval = float(config.get('sample_interval', 1.0))
+        self.headroom = float(config.get('headroom', 0.75))
+        self.limits = dict(DEFAULT_LIMITS)
+        self.limits.update(config.get('limits') or {})
+        self.sampler = sampler or LoadSampler()
+        
+        self.limit = self.min_slots
+        self._cond = threading.Condition()
+        self._active: Dict[str, int] = {}
+        self._last_admit = 0.0
+        self._last_load: Optional[SystemLoad] = None
+        self._pressure = 0.0
+    
+    @property
+    def active(self) -> int:
+        """Número de lanzamientos admitidos y aún no liberados."""
+        with self._cond:
+            return sum(self._active.values())
+    
+    def acquire(self, name: str = "", timeout: Optional[float] = None) -> bool:
+        """
+        Espera hasta que se pueda admitir un lanzamiento.
+        
+        Args:
+            name: Identificador del lanzamiento (para `status`)
+            timeout: Segundos máximos de espera (None = sin límite)
+        
+        Returns:
+            True si se admitió, False si se agotó el tiempo
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                delay = self._admission_delay() if self.enabled else 0.0
+                if delay <= 0:
+                    self._active[name] = self._active.get(name, 0) + 1
+                    self._last_admit = time.monotonic()
+                    return True
+                
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                    delay = min(delay, remaining)
+                self._cond.wait(delay)
+    
+    def release(self, name: str = ""):
+        """Libera un lanzamiento admitido con `acquire`."""
+        with self._cond:
+            count = self._active.get(name, 0)
+            if count <= 1:
+                self._active.pop(name, None)
+            else:
+                self._active[name] = count - 1
+            self._cond.notify_all()
+    
+    @contextmanager
+    def slot(self, name: str = "", timeout: Optional[float] = None) -> Iterator[None]:
+        """
+        Context manager que admite y libera un lanzamiento.
+        
+        Raises:
+            AdmissionTimeout: Si no se admitió dentro de `timeout`
+        """
+        if not self.acquire(name, timeout):
+            raise AdmissionTimeout(f"Sistema sobrecargado: no se admitió '{name}' en {timeout}s")
+        try:
+            yield
+        finally:
+            self.release(name)
+    
+    def _admission_delay(self) -> float:
+        """Segundos a esperar antes de reevaluar (0 = admitir ya). Requiere el lock."""
+        active = sum(self._active.values())
+        if not active:
+            return 0.0
+        
+        self._evaluate()
+        if active >= self.limit or self._pressure >= 1.0:
+            return max(self.sample_interval, _MIN_WAIT)
+        
+        since_last = time.monotonic() - self._last_admit
+        if since_last < self.launch_interval:
+            return self.launch_interval - since_last
+        return 0.0
+    
+    def _evaluate(self):
+        """Toma una muestra (como mucho una por `sample_interval`) y ajusta el límite."""
+        now = time.monotonic()
+        if self._last_load is not None and now - self._last_load.timestamp < self.sample_interval:
+            return
+        
+        self._last_load = self.sampler.sample()
+        self._pressure = self._last_load.pressure(self.limits)
+        if self._pressure >= 1.0:
+            self.limit = max(self.min_slots, self.limit // 2)
+        elif self._pressure < self.headroom:
+            self.limit = min(self.max_slots, self.limit + 1)
+    
+    def status(self) -> Dict[str, Any]:
+        """Estado actual: límite, lanzamientos activos y última muestra de carga."""
+        with self._cond:
+            self._evaluate()
+            return {
+                'enabled': self.enabled,
+                'limit': self.limit,
+                'max_slots': self.max_slots,
+                'active': dict(self._active),
+                'pressure': round(self._pressure, 3),
+                'load': {k: None if v is None else round(v, 2)
+                         for k, v in self._last_load.to_dict().items()},
+            }
+
+
+_admission_instance = None
+
+def get_admission_controller(config: Optional[Dict[str, Any]] = None) -> AdmissionController:
+    """
+    Obtiene la instancia global del AdmissionController.
+    
+    La configuración solo se aplica al crear el singleton; todos los
+    componentes del proceso comparten así el mismo límite.
+    """
+    global _admission_instance
+    if _admission_instance is None:
+        _admission_instance = AdmissionController(config)
+    return _admission_instance
@@ -12,6 +12,7 @@ import yaml
 
 from core.task import Task, TaskType, TaskPriority, TaskStatus
 from core.config import Config
+from core.run_artifacts import get_artifact_store
 from features.chapter_logger import ChapterLogger
 
 
@@ -194,9 +195,9 @@ class AIOrchestrator:
         self.logger.log("🤖 Consultando a Claude para análisis inteligente...")
         
         try:
-            # Save prompt for debugging
-            prompt_file = Path(f"/tmp/ai_orchestrator_prompt_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt")
-            prompt_file.write_text(prompt, encoding='utf-8')
+            # Save prompt for debugging (compressed session archive)
+            artifacts = get_artifact_store()
+            artifacts.put('prompt', 'ai_orchestrator', prompt)
             
             # Execute Claude
             cmd = [
@@ -214,6 +215,8 @@ class AIOrchestrator:
                 timeout=120  # 2 minutes for analysis
             )
             
+            artifacts.put('response', 'ai_orchestrator', result.stdout, returncode=result.returncode)
+            
             if result.returncode == 0:
                 # Extract JSON from response
                 response = result.stdout
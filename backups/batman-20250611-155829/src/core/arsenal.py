@@ -3,11 +3,128 @@ Arsenal de herramientas avanzadas para Batman Incorporated.
 Detecta y usa automáticamente las mejores herramientas disponibles.
 """
 
+import os
+import json
+import time
 import shutil
+import hashlib
 import subprocess
-from typing import List, Optional, Dict, Any
+from typing import Iterator, List, Optional, Dict, Any
 from pathlib import Path
 
+from core.command_runner import get_command_runner
+from core.text_search import TextSearcher, SearchMatch
+from core.file_index import FileIndex, IndexedFile
+
+
+DEFAULT_CACHE_DIR = Path.home() / ".glados" / "batman-incorporated" / "cache"
+
+
+class ToolCache:
+    """
+    Cache en disco de las resoluciones de `shutil.which`.
+    
+    Las entradas son válidas mientras no cambie el PATH ni el mtime de sus
+    directorios (instalar o borrar un binario cambia el mtime del directorio).
+    Las entradas positivas además verifican el mtime del propio binario.
+    """
+    
+    CACHE_VERSION = 1
+    
+    def __init__(self, cache_file: Optional[Path] = None):
+        self.cache_file = Path(cache_file) if cache_file else DEFAULT_CACHE_DIR / "arsenal_tools.json"
+        self._fingerprint: Optional[str] = None
+        self._entries: Optional[Dict[str, Any]] = None
+        self._dirty = False
+    
+    def _compute_fingerprint(self) -> str:
+        """Huella del PATH actual y del mtime de cada directorio."""
+        path_env = os.environ.get('PATH', '')
+        parts = [path_env]
+        for directory in path_env.split(os.pathsep):
+            try:
+                parts.append(str(os.stat(directory).st_mtime_ns))
+            except OSError:
+                parts.append('-')
+        return hashlib.sha1('\0'.join(parts).encode()).hexdigest()
+    
+    def _load(self):
+        """Carga las entradas del disco si siguen siendo válidas."""
+        self._fingerprint = self._compute_fingerprint()
+        self._entries = {}
+        try:
+            with open(self.cache_file, 'r') as f:
+                data = json.load(f)
+            if data.get('version') == self.CACHE_VERSION and data.get('fingerprint') == self._fingerprint:
+                self._entries = data.get('tools', {})
+        except (OSError, ValueError):
+            pass
+    
+    def which(self, binary: str, refresh: bool = False) -> Optional[str]:
+        """
+        Resuelve un binario usando la cache.
+        
+        Args:
+            binary: Nombre del ejecutable
+            refresh: Ignorar la cache y volver a consultar el sistema
+            
+        Returns:
+            Ruta del binario o None si no existe
+        """
+        if self._entries is None:
+            self._load()
+        
+        entry = self._entries.get(binary)
+        if entry is not None and not refresh:
+            path = entry.get('path')
+            if path is None:
+                return None
+            try:
+                if os.stat(path).st_mtime_ns == entry.get('mtime'):
+                    return path
+            except OSError:
+                pass
+        
+        path = shutil.which(binary)
+        mtime = None
+        if path:
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                path = None
+        self._entries[binary] = {'path': path, 'mtime': mtime}
+        self._dirty = True
+        return path
+    
+    def save(self):
+        """Escribe la cache en disco (escritura atómica)."""
+        if not self._dirty or self._entries is None:
+            return
+        
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.cache_file.with_suffix(f'.{os.getpid()}.tmp')
+            with open(tmp_file, 'w') as f:
+                json.dump({
+                    'version': self.CACHE_VERSION,
+                    'fingerprint': self._fingerprint,
+                    'tools': self._entries
+                }, f)
+            os.replace(tmp_file, self.cache_file)
+            self._dirty = False
+        except OSError:
+            # La cache es una optimización; si no se puede escribir, seguimos
+            pass
+    
+    def invalidate(self):
+        """Descarta la cache en memoria y en disco."""
+        self._entries = {}
+        self._dirty = False
+        try:
+            self.cache_file.unlink()
+        except OSError:
+            pass
+
 
 class Arsenal:
     """
@@ -69,10 +186,50 @@ class Arsenal:
     
     def __init__(self, config: Optional[Dict] = None):
         self.config = config or {}
-        self.available_tools = self._detect_available_tools()
+        self.runner = get_command_runner()
+        
+        self.cache_dir = Path(self.config.get('cache_dir') or DEFAULT_CACHE_DIR).expanduser()
+        self.tool_cache = ToolCache(self.config.get('tool_cache_file') or self.cache_dir / "arsenal_tools.json")
+        self._file_index: Optional[FileIndex] = None
+        
+        # Categorías resueltas bajo demanda: categoría -> herramienta (o None)
+        self._resolved: Dict[str, Optional[str]] = {}
+    
+    @property
+    def available_tools(self) -> Dict[str, str]:
+        """Herramientas disponibles por categoría (resuelve todas las pendientes)."""
+        pending = [c for c in self.TOOL_PREFERENCES if c not in self._resolved]
+        if pending:
+            for category in pending:
+                self._resolved[category] = self._resolve_category(category)
+            self.tool_cache.save()
+        return {c: tool for c, tool in self._resolved.items() if tool}
+    
+    @available_tools.setter
+    def available_tools(self, tools: Dict[str, str]):
+        """Fija las herramientas disponibles (las categorías ausentes quedan vacías)."""
+        self._resolved = {c: None for c in self.TOOL_PREFERENCES}
+        self._resolved.update(tools)
+    
+    def _resolve_category(self, category: str, refresh: bool = False) -> Optional[str]:
+        """Busca la mejor herramienta de una categoría."""
+        tools = self.TOOL_PREFERENCES.get(category)
+        if not tools:
+            return None
+        
+        # Buscar herramienta preferida
+        for tool in tools['preferred']:
+            if self.tool_cache.which(tool, refresh=refresh):
+                return tool
         
+        # Si no hay preferida, usar fallback
+        if tools['fallback'] and self.tool_cache.which(tools['fallback'], refresh=refresh):
+            return tools['fallback']
+        
+        return None
+    
     def _detect_available_tools(self) -> Dict[str, str]:
-        """Detecta qué herramientas están disponibles en el sistema."""
+        """Vuelve a detectar todas las herramientas ignorando la cache."""
         available = {}
         
         for category, tools in self.TOOL_PREFERENCES.items():
@@ -87,11 +244,32 @@ class Arsenal:
                 if shutil.which(tools['fallback']):
                     available[category] = tools['fallback']
         
+        self.available_tools = available
         return available
     
+    def refresh_tool(self, binary: str) -> Optional[str]:
+        """
+        Vuelve a resolver un binario recién instalado o eliminado.
+        
+        Sustituye su entrada en la cache (incluidas las negativas) y olvida
+        las categorías que lo usan para que se resuelvan de nuevo.
+        
+        Returns:
+            Ruta del binario o None si no existe
+        """
+        path = self.tool_cache.which(binary, refresh=True)
+        for category, tools in self.TOOL_PREFERENCES.items():
+            if binary in tools['preferred'] or binary == tools['fallback']:
+                self._resolved.pop(category, None)
+        self.tool_cache.save()
+        return path
+    
     def get_tool(self, category: str) -> Optional[str]:
         """Obtiene la mejor herramienta disponible para una categoría."""
-        return self.available_tools.get(category)
+        if category not in self._resolved:
+            self._resolved[category] = self._resolve_category(category)
+            self.tool_cache.save()
+        return self._resolved[category]
     
     def search_text(self, pattern: str, path: str = ".", options: List[str] = None) -> subprocess.CompletedProcess:
         """Busca texto usando la mejor herramienta disponible."""
@@ -115,7 +293,31 @@ class Arsenal:
             if options:
                 cmd.extend(options)
         
-        return subprocess.run(cmd, capture_output=True, text=True)
+        return self.runner.run(cmd).to_completed_process()
+    
+    def search(self, patterns, path: str = ".", ignore_case: bool = False,
+               fixed_strings: bool = False, max_matches: Optional[int] = None) -> Iterator[SearchMatch]:
+        """
+        Búsqueda estructurada: devuelve coincidencias tipadas en streaming.
+        
+        Acepta varios patrones y los busca en una sola pasada. Usa rg o grep
+        si están disponibles; con cualquier otra herramienta (o ninguna) usa
+        el motor en proceso con hilos y mmap.
+        
+        Args:
+            patterns: Patrón o lista de patrones (regex)
+            path: Archivo o directorio raíz
+            ignore_case: Ignorar mayúsculas/minúsculas
+            fixed_strings: Tratar los patrones como texto literal
+            max_matches: Parar tras este número de coincidencias
+        
+        Returns:
+            Iterador de SearchMatch
+        """
+        tool = self.get_tool('search')
+        searcher = TextSearcher(tool if tool in ('rg', 'grep') else None, self.runner)
+        return searcher.search(patterns, path, ignore_case=ignore_case,
+                               fixed_strings=fixed_strings, max_matches=max_matches)
     
     def find_files(self, pattern: str, path: str = ".", options: List[str] = None) -> subprocess.CompletedProcess:
         """Busca archivos usando la mejor herramienta disponible."""
@@ -132,7 +334,39 @@ class Arsenal:
             if options:
                 cmd.extend(options)
         
-        return subprocess.run(cmd, capture_output=True, text=True)
+        return self.runner.run(cmd).to_completed_process()
+    
+    def get_file_index(self) -> FileIndex:
+        """Índice persistente de archivos (se abre al primer uso)."""
+        if self._file_index is None:
+            self._file_index = FileIndex(self.config.get('file_index_path') or self.cache_dir / "file_index.db")
+        return self._file_index
+    
+    def find_indexed(self, pattern: Optional[str] = None, path: str = ".",
+                     max_age: float = 300, restat_files: bool = True,
+                     timeout: Optional[float] = None, **filters) -> List[IndexedFile]:
+        """
+        Busca archivos usando el índice persistente en lugar de recorrer el disco.
+        
+        El índice de `path` se sincroniza (de forma incremental) si su última
+        actualización tiene más de `max_age` segundos.
+        
+        Args:
+            pattern: Glob sobre el nombre del archivo (ej: "*.py")
+            path: Directorio raíz
+            max_age: Antigüedad máxima aceptable del índice en segundos
+            restat_files: Ver FileIndex.update (False: solo directorios que cambiaron)
+            timeout: Segundos máximos para sincronizar el índice
+            **filters: min_size, max_size, older_than, newer_than, order_by, limit
+        
+        Returns:
+            Lista de IndexedFile
+        """
+        index = self.get_file_index()
+        last_update = index.last_update(path)
+        if last_update is None or time.time() - last_update > max_age:
+            index.update(path, restat_files=restat_files, timeout=timeout)
+        return index.query(glob=pattern, under=path, **filters)
     
     def view_file(self, file_path: str, options: List[str] = None) -> subprocess.CompletedProcess:
         """Visualiza archivo con sintaxis highlighting si es posible."""
@@ -148,7 +382,7 @@ class Arsenal:
             if options:
                 cmd.extend(options)
         
-        return subprocess.run(cmd, capture_output=True, text=True)
+        return self.runner.run(cmd).to_completed_process()
     
     def list_directory(self, path: str = ".", options: List[str] = None) -> subprocess.CompletedProcess:
         """Lista directorio con información mejorada si es posible."""
@@ -164,7 +398,7 @@ class Arsenal:
             if options:
                 cmd.extend(options)
         
-        return subprocess.run(cmd, capture_output=True, text=True)
+        return self.runner.run(cmd).to_completed_process()
     
     def replace_text(self, old: str, new: str, files: List[str], options: List[str] = None) -> bool:
         """Reemplaza texto usando la herramienta más segura."""
@@ -176,7 +410,7 @@ class Arsenal:
                 cmd = [tool, old, new, file]
                 if options:
                     cmd.extend(options)
-                result = subprocess.run(cmd)
+                result = self.runner.run(cmd)
                 if result.returncode != 0:
                     return False
             return True
@@ -186,7 +420,7 @@ class Arsenal:
                 cmd = ['sed', '-i', f's/{old}/{new}/g', file]
                 if options:
                     cmd.extend(options)
-                result = subprocess.run(cmd)
+                result = self.runner.run(cmd)
                 if result.returncode != 0:
                     return False
             return True
@@ -199,12 +433,7 @@ class Arsenal:
             return None
         
         try:
-            result = subprocess.run(
-                [tool, query],
-                input=input_data,
-                capture_output=True,
-                text=True
-            )
+            result = self.runner.run([tool, query], input=input_data)
             if result.returncode == 0:
                 return result.stdout
         except:
@@ -218,7 +447,7 @@ class Arsenal:
         
         if tool == 'gh':
             cmd = [tool] + args
-            return subprocess.run(cmd, capture_output=True, text=True)
+            return self.runner.run(cmd).to_completed_process()
         else:
             # Fallback a git
             return subprocess.CompletedProcess(args=[], returncode=1, stdout="", stderr="gh not available")
@@ -317,11 +546,31 @@ class Arsenal:
         return suggestions
 
 
+def arsenal_config(config) -> Dict[str, Any]:
+    """
+    Construye la configuración del Arsenal a partir del Config global.
+    
+    Args:
+        config: Config (o cualquier objeto con `get(clave, default)`)
+    
+    Returns:
+        Sección `arsenal` con `cache_dir` tomado de `paths.cache`
+    """
+    settings = dict(config.get('arsenal', {}) or {})
+    settings.setdefault('cache_dir', config.get('paths.cache'))
+    return settings
+
+
 # Singleton global para fácil acceso
 _arsenal_instance = None
 
 def get_arsenal(config: Optional[Dict] = None) -> Arsenal:
-    """Obtiene la instancia global del Arsenal."""
+    """
+    Obtiene la instancia global del Arsenal.
+    
+    La detección de herramientas es perezosa, así que crear el singleton no
+    lanza ningún `which`.
+    """
     global _arsenal_instance
     if _arsenal_instance is None:
         _arsenal_instance = Arsenal(config)
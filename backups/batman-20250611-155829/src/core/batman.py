@@ -7,6 +7,8 @@ import os
 import sys
 import json
 import time
+import sqlite3
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Any
@@ -14,7 +16,16 @@ import subprocess
 
 from core.config import Config
 from core.task import Task, TaskBatch, TaskType, TaskPriority, TaskStatus
-from core.arsenal import Arsenal
+from core.admission import get_admission_controller
+from core.arsenal import arsenal_config, get_arsenal
+from core.command_runner import get_command_runner
+from core.quota import QuotaScheduler
+from core.duration import DurationModel, critical_path
+from core.prompt_builder import DEFAULT_BUDGET_TOKENS
+from core.file_cache import get_file_cache
+from core.repo_index import RepoIndex
+from core.run_artifacts import get_artifact_store
+from core.task_store import get_task_store, new_session_id
 from core.task_analyzer import TaskAnalyzer
 from features.chapter_logger import ChapterLogger
 from features.session_reporter import SessionReporter
@@ -67,6 +78,31 @@ class BatmanIncorporated:
         self.completed_tasks: List[str] = []
         self.session_start = None
         
+        # Sesión actual: sus tareas, estadísticas y worktrees se guardan en el
+        # TaskStore (SQLite) tras cada transición para poder retomarla
+        self.session_id: Optional[str] = None
+        self.session_worktrees: Dict[str, Dict[str, str]] = {}
+        self._restored_worktrees: Dict[str, Dict[str, str]] = {}
+        self.task_store = get_task_store(
+            Path(self.config.get('paths.tasks', '~/.glados/batman-incorporated/tasks')).expanduser() / "tasks.db"
+        )
+        
+        # Cuota de Claude: reserva por tarea, ritmo y tareas diferidas al próximo período
+        quota_config = dict(self.config.get('quota', {}) or {})
+        quota_config.setdefault('history_file', str(
+            Path(self.config.get('paths.cache', '~/.glados/batman-incorporated/cache')).expanduser()
+            / "prompt_history.json"
+        ))
+        self.quota = QuotaScheduler(quota_config)
+        self.deferred_tasks: List[str] = []
+        
+        # Duraciones reales por tipo/agente/tags/repo para estimar tiempos y timeouts
+        self.durations = DurationModel(
+            Path(self.config.get('paths.cache', '~/.glados/batman-incorporated/cache')).expanduser()
+            / "durations.db",
+            self.config.get('execution.durations', {}) or {}
+        )
+        
         # 🔥 STRESS TEST: Sistema de honestidad y reportes reales
         self.honesty_mode = True
         self.stress_monitor_file = "/home/lauta/glados/batman-incorporated/stress-monitor.txt"
@@ -81,12 +117,30 @@ class BatmanIncorporated:
             'time_saved_hours': 0
         }
         
+        # Control de admisión: limita las instancias de Claude según la carga del sistema
+        admission_config = dict(self.config.get('execution.admission', {}) or {})
+        admission_config.setdefault('max_slots', self.config.get('execution.max_agents', 5))
+        self.admission = get_admission_controller(admission_config)
+        
+        # Caché de contenido de archivos compartida por todos los agentes
+        self.file_cache = get_file_cache(
+            int(self.config.get('execution.file_cache_mb', 32)) * 1024 * 1024
+        )
+        
+        # Prompts y respuestas de los agentes, comprimidos por sesión
+        artifacts_config = dict(self.config.get('artifacts', {}) or {})
+        artifacts_config.setdefault('dir', self.config.get('paths.artifacts'))
+        self.artifacts = get_artifact_store(artifacts_config)
+        
+        # Índice de símbolos del repositorio (se abre con la primera tarea)
+        self.repo_index = None
+        
         # Inicializar agentes
         self.agents = self._initialize_agents()
         
-        # Inicializar Arsenal
-        self.arsenal = Arsenal()
-        self.logger.log(f"🛠️ Arsenal inicializado con {len(self.arsenal.available_tools)} herramientas")
+        # Inicializar Arsenal (singleton compartido, detección bajo demanda)
+        self.arsenal = get_arsenal(arsenal_config(self.config))
+        self.logger.log("🛠️ Arsenal inicializado (detección de herramientas bajo demanda)")
         
         # Inicializar MCP Integration si está habilitado
         if self.config.get('mcp.enabled', True):
@@ -113,6 +167,8 @@ class BatmanIncorporated:
         for agent_name, agent_class in agent_classes.items():
             if self.config.is_agent_enabled(agent_name):
                 agents[agent_name] = agent_class(logger=self.logger)
+                agents[agent_name].prompt_budget_tokens = self.config.get(
+                    'execution.prompt_budget_tokens', DEFAULT_BUDGET_TOKENS)
                 self.logger.log(f"✅ Agente {agent_name} inicializado")
         
         return agents
@@ -149,50 +205,282 @@ class BatmanIncorporated:
             
             self.logger.log(f"🎯 Modo de ejecución: {mode}")
             
-            # Ejecutar según el modo
-            self.logger.start_chapter(
-                "Desarrollo Principal",
-                "Ejecutar tareas según el modo seleccionado",
-                [f"Ejecutar en modo {mode}"]
-            )
-            
-            if mode == "seguro":
-                self._execute_safe_mode(tasks)
-            elif mode == "rapido":
-                self._execute_fast_mode(tasks)
-            elif mode == "redundante":
-                self._execute_redundant_mode(tasks)
-            elif mode == "infinity":
-                self._execute_infinity_mode(tasks)
-            else:
-                self._execute_auto_mode(tasks)
+            self._open_session(new_session_id(), task_description, mode)
+            self.task_store.save_tasks(tasks, self.session_id)
+            self.logger.log(f"💾 Sesión {self.session_id} (retomable con: batman --resume {self.session_id})")
             
-            # Optimizaciones
-            self.logger.start_chapter(
-                "Optimización",
-                "Optimizar código y rendimiento",
-                ["Analizar rendimiento", "Aplicar mejores prácticas", "Formatear código"]
-            )
-            self._run_optimizations()
-            
-            # Finalización
-            self.logger.start_chapter(
-                "Finalización",
-                "Finalizar sesión y generar reportes",
-                ["Actualizar historial", "Limpiar temporales", "Generar reporte"]
-            )
-            self._finalize_session()
+            ok = self._execute_plan(tasks, mode)
+            self._close_session(self._session_end_status() if ok else 'failed')
             
         except KeyboardInterrupt:
             self.logger.log("\n⚠️ Sesión interrumpida por el usuario")
+            self._close_session('interrupted')
             raise
         except Exception as e:
             self.logger.log(f"❌ Error: {str(e)}")
+            self._close_session('failed')
             raise
         finally:
             # Generar reporte
             self._generate_report()
     
+    def resume_session(self, session_id: str, retry_failed: bool = True) -> bool:
+        """
+        Retoma una sesión interrumpida desde el TaskStore.
+        
+        Las tareas completadas se omiten, las que estaban en curso (y las
+        fallidas, si `retry_failed`) se re-encolan y los worktrees que
+        sobrevivieron se reutilizan.
+        
+        Args:
+            session_id: ID de la sesión, o "last" para la más reciente sin terminar
+            retry_failed: Volver a ejecutar las tareas que fallaron
+        
+        Returns:
+            True si la sesión se retomó (o ya estaba terminada)
+        """
+        if session_id == "last":
+            session_id = self.task_store.latest_resumable_session()
+            if not session_id:
+                self.logger.log("❌ No hay sesiones para retomar")
+                return False
+        
+        session = self.task_store.get_session(session_id)
+        if session is None:
+            self.logger.log(f"❌ No se encontró la sesión {session_id}")
+            return False
+        if session['status'] == 'completed':
+            self.logger.log(f"✅ La sesión {session_id} ya había terminado")
+            return True
+        
+        failed = self.task_store.count_by_status(session_id).get(TaskStatus.FAILED.value, 0)
+        completed, pending = self.task_store.resume_session(session_id, retry_failed=retry_failed)
+        
+        self.session_start = datetime.now()
+        self.completed_tasks = list(completed)
+        state = session['state']
+        for key, value in state.get('stats', {}).items():
+            if isinstance(self.session_stats.get(key), set):
+                self.session_stats[key] = set(value)
+            else:
+                self.session_stats[key] = value
+        self._restored_worktrees = state.get('worktrees', {})
+        
+        self.logger.start_chapter(
+            "Análisis Inicial",
+            f"Retomar sesión {session_id}",
+            ["Cargar estado guardado", "Re-encolar tareas pendientes"]
+        )
+        self.logger.log(f"♻️ Retomando sesión {session_id}: {len(completed)} completadas, "
+                        f"{len(pending)} pendientes")
+        if failed:
+            if retry_failed:
+                self.session_stats['tasks_failed'] = max(0, self.session_stats.get('tasks_failed', 0) - failed)
+                self.logger.log(f"🔁 {failed} tareas fallidas se vuelven a intentar")
+            else:
+                self.logger.log(f"⏭️ {failed} tareas fallidas no se reintentan")
+        
+        try:
+            self._open_session(session_id)
+            ok = self._execute_plan(pending, session['mode'] or "auto")
+            self._close_session(self._session_end_status() if ok else 'failed')
+            return ok
+        except KeyboardInterrupt:
+            self.logger.log("\n⚠️ Sesión interrumpida por el usuario")
+            self._close_session('interrupted')
+            raise
+        except Exception as e:
+            self.logger.log(f"❌ Error: {str(e)}")
+            self._close_session('failed')
+            raise
+        finally:
+            self._generate_report()
+    
+    def _execute_plan(self, tasks: List[Task], mode: str) -> bool:
+        """
+        Ejecuta un plan ya analizado: desarrollo, optimización y finalización.
+        
+        Returns:
+            False si el modo de ejecución no pudo prepararse
+        """
+        self._estimate_durations(self._pending(tasks))
+        
+        # Ejecutar según el modo
+        self.logger.start_chapter(
+            "Desarrollo Principal",
+            "Ejecutar tareas según el modo seleccionado",
+            [f"Ejecutar en modo {mode}"]
+        )
+        
+        if mode == "seguro":
+            ok = self._execute_safe_mode(tasks)
+        elif mode == "rapido":
+            ok = self._execute_fast_mode(tasks)
+        elif mode == "redundante":
+            ok = self._execute_redundant_mode(tasks)
+        elif mode == "infinity":
+            ok = self._execute_infinity_mode(tasks)
+        else:
+            ok = self._execute_auto_mode(tasks)
+        if not ok:
+            return False
+        
+        # Optimizaciones
+        self.logger.start_chapter(
+            "Optimización",
+            "Optimizar código y rendimiento",
+            ["Analizar rendimiento", "Aplicar mejores prácticas", "Formatear código"]
+        )
+        self._run_optimizations()
+        
+        # Finalización
+        self.logger.start_chapter(
+            "Finalización",
+            "Finalizar sesión y generar reportes",
+            ["Actualizar historial", "Limpiar temporales", "Generar reporte"]
+        )
+        self._finalize_session()
+        return True
+    
+    def _estimate_durations(self, tasks: List[Task]):
+        """Ajusta estimaciones, timeouts y --max-turns con el historial de duraciones."""
+        adjusted = self.durations.apply(tasks, self.durations.repo_bucket(Path.cwd()))
+        if adjusted:
+            self.logger.log(f"⏱️ {adjusted}/{len(tasks)} estimaciones ajustadas con el historial de duraciones")
+        hours, path = critical_path(tasks)
+        if path:
+            self.logger.log(f"⏱️ Ruta crítica estimada: {hours:.1f}h ({len(path)} tareas)")
+    
+    def _record_duration(self, task: Task):
+        """
+        Guarda la duración real de una tarea ejecutada por un agente real.
+        
+        Las fallidas (timeouts incluidos) entran como muestras censuradas
+        para que el p90 no se quede solo con las que cupieron en el límite.
+        """
+        if task.status in (TaskStatus.COMPLETED, TaskStatus.FAILED):
+            self.durations.record(task, repo_bucket=self.durations.repo_bucket(Path.cwd()),
+                                  censored=task.status == TaskStatus.FAILED)
+    
+    def _open_session(self, session_id: str, description: Optional[str] = None,
+                      mode: Optional[str] = None):
+        """Registra (o reabre) la sesión en el TaskStore como 'running'."""
+        self.session_id = session_id
+        self.artifacts.start_session(session_id)
+        self.task_store.save_session(session_id, description, mode, state=self._session_state())
+    
+    def _close_session(self, status: str):
+        """Guarda el estado final de la sesión."""
+        if self.session_id:
+            self.task_store.save_session(self.session_id, status=status, state=self._session_state())
+    
+    def _session_state(self) -> Dict[str, Any]:
+        """Estadísticas y worktrees de la sesión, serializables a JSON."""
+        stats = {k: sorted(v) if isinstance(v, set) else v for k, v in self.session_stats.items()}
+        return {'stats': stats, 'worktrees': self.session_worktrees}
+    
+    def _session_end_status(self) -> str:
+        """
+        Estado final de la sesión según sus tareas en el TaskStore.
+        
+        Solo es 'completed' si no queda nada por ejecutar: con tareas
+        diferidas por cuota es 'deferred', con fallidas 'failed' y con
+        pendientes o en curso 'incomplete'; todas se pueden retomar.
+        """
+        if self.deferred_tasks:
+            self.logger.log(f"⏭️ {len(self.deferred_tasks)} tareas diferidas por cuota. "
+                            f"Retomar en el próximo período con: batman --resume {self.session_id}")
+            return 'deferred'
+        if not self.session_id:
+            return 'completed'
+        
+        counts = self.task_store.count_by_status(self.session_id)
+        unfinished = sum(counts.get(status.value, 0) for status in
+                         (TaskStatus.PENDING, TaskStatus.IN_PROGRESS, TaskStatus.BLOCKED))
+        failed = counts.get(TaskStatus.FAILED.value, 0)
+        if failed or unfinished:
+            self.logger.log(f"⚠️ Sesión sin terminar: {failed} fallidas, {unfinished} pendientes. "
+                            f"Retomar con: batman --resume {self.session_id}")
+            return 'failed' if failed else 'incomplete'
+        return 'completed'
+    
+    def _checkpoint_task(self, task: Task):
+        """Guarda el estado actual de una tarea y de la sesión en una transacción."""
+        if task.status == TaskStatus.COMPLETED and task.id not in self.completed_tasks:
+            self.completed_tasks.append(task.id)
+        if self.session_id:
+            with self.task_store.transaction():
+                self.task_store.update_task(task)
+                self.task_store.save_session(self.session_id, state=self._session_state())
+    
+    def _pending(self, tasks: List[Task]) -> List[Task]:
+        """Filtra las tareas ya completadas (al retomar una sesión)."""
+        pending = [t for t in tasks if t.id not in self.completed_tasks]
+        skipped = len(tasks) - len(pending)
+        if skipped:
+            self.logger.log(f"⏭️ Omitiendo {skipped} tareas ya completadas")
+        return pending
+    
+    def _run_tasks(self, mode, tasks: List[Task]):
+        """Ejecuta las tareas pendientes con el modo dado, con checkpoint por tarea."""
+        for task in self._pending(tasks):
+            agent = self._real_agent_for(task)
+            if agent is not None and not self._admit_quota(task):
+                continue
+            
+            task.start()
+            self._checkpoint_task(task)
+            
+            with self._quota_usage(task, agent):
+                if agent is not None:
+                    mode.execute(task, agent)
+                else:
+                    self._simulate_task_execution(task)
+            
+            if agent is not None:
+                self._record_duration(task)
+            self._checkpoint_task(task)
+    
+    def _real_agent_for(self, task: Task):
+        """Agente real que ejecutará la tarea (None si se simula)."""
+        if not self.config.get('execution.use_real_agents'):
+            return None
+        return self.agents.get(task.assigned_to or "batman")
+    
+    def _admit_quota(self, task: Task) -> bool:
+        """
+        Espera a que la cuota admita la tarea y reserva su estimación.
+        
+        Returns:
+            False si la tarea se difiere al próximo período de cuota
+        """
+        while True:
+            decision = self.quota.decide(task)
+            if decision.can_run:
+                self.quota.reserve(task, decision.estimate)
+                return True
+            
+            if decision.action == 'defer':
+                self.deferred_tasks.append(task.id)
+                self.logger.log(f"⏭️ Diferida al próximo período de cuota: {task.title} ({decision.reason})")
+                return False
+            
+            self.logger.log(f"⏳ Esperando {decision.delay / 60:.1f} min por cuota: {decision.reason}")
+            time.sleep(decision.delay)
+    
+    @contextmanager
+    def _quota_usage(self, task: Task, agent):
+        """Registra los prompts que el agente consumió durante la tarea."""
+        if agent is None:
+            yield
+            return
+        
+        before = agent.stats.get('prompts_sent', 0)
+        try:
+            yield
+        finally:
+            self.quota.settle(task, agent.stats.get('prompts_sent', 0) - before)
+    
     def _analyze_and_plan(self, task_description: str) -> List[Task]:
         """
         Analiza la descripción y genera un plan de tareas.
@@ -258,90 +546,117 @@ class BatmanIncorporated:
         else:
             return "seguro"  # Por defecto, modo seguro
     
-    def _execute_safe_mode(self, tasks: List[Task]):
+    def _execute_safe_mode(self, tasks: List[Task]) -> bool:
         """Ejecuta las tareas en modo seguro con Git worktrees."""
         mode = SafeMode(self.config.get('execution.safe_mode', {}), self.logger)
+        if self._restored_worktrees:
+            mode.restore_worktrees(self._restored_worktrees)
         
-        if not mode.prepare(tasks):
+        if not mode.prepare(self._pending(tasks)):
             self.logger.log("❌ Error preparando modo seguro")
-            return
+            return False
+        
+        self.session_worktrees = {
+            agent: {'path': str(path), 'branch': mode.branches.get(agent)}
+            for agent, path in mode.worktrees.items()
+        }
+        if self.session_id:
+            self.task_store.save_session(self.session_id, state=self._session_state())
         
         try:
-            for task in tasks:
-                agent_name = task.assigned_to or "batman"
-                if agent_name in self.agents and self.config.get('execution.use_real_agents'):
-                    mode.execute(task, self.agents[agent_name])
-                else:
-                    self._simulate_task_execution(task)
+            self._run_tasks(mode, tasks)
         finally:
             mode.cleanup()
+        return True
     
-    def _execute_fast_mode(self, tasks: List[Task]):
+    def _execute_fast_mode(self, tasks: List[Task]) -> bool:
         """Ejecuta las tareas en modo rápido sin branches."""
         mode = FastMode(self.config.get('execution.fast_mode', {}), self.logger)
         
         if not mode.prepare(tasks):
             self.logger.log("❌ Error preparando modo rápido")
-            return
+            return False
         
         try:
-            for task in tasks:
-                agent_name = task.assigned_to or "batman"
-                if agent_name in self.agents and self.config.get('execution.use_real_agents'):
-                    mode.execute(task, self.agents[agent_name])
-                else:
-                    self._simulate_task_execution(task)
+            self._run_tasks(mode, tasks)
         finally:
             mode.cleanup()
+        return True
     
-    def _execute_redundant_mode(self, tasks: List[Task]):
+    def _execute_redundant_mode(self, tasks: List[Task]) -> bool:
         """Ejecuta las tareas en modo redundante con múltiples implementaciones."""
         mode = RedundantMode(self.config.get('execution.redundant_mode', {}), self.logger)
         
         if not mode.prepare(tasks):
             self.logger.log("❌ Error preparando modo redundante")
-            return
+            return False
         
         try:
-            for task in tasks:
-                agent_name = task.assigned_to or "batman"
-                if agent_name in self.agents and self.config.get('execution.use_real_agents'):
-                    mode.execute(task, self.agents[agent_name])
-                else:
-                    self._simulate_task_execution(task)
+            self._run_tasks(mode, tasks)
         finally:
             mode.cleanup()
+        return True
     
-    def _execute_infinity_mode(self, tasks: List[Task]):
-        """Ejecuta las tareas en modo infinity con múltiples instancias reales."""
+    def _execute_infinity_mode(self, tasks: List[Task]) -> bool:
+        """
+        Ejecuta las tareas en modo infinity con múltiples instancias reales.
+        
+        Las tareas quedan en curso en el TaskStore mientras las instancias
+        trabajan; al terminar se completan las de los agentes que acabaron
+        bien y fallan (para reintentarlas con --resume) las demás.
+        """
         mode = InfinityMode(self.config.get('execution.infinity_mode', {}), self.logger)
+        pending = self._pending(tasks)
         
-        if not mode.prepare(tasks):
+        if not mode.prepare(pending):
             self.logger.log("❌ Error preparando modo infinity")
-            return
+            return False
         
         try:
-            # En infinity mode, creamos un batch con todas las tareas
-            batch = TaskBatch("Infinity Batch", tasks)
+            for task in pending:
+                task.start()
+                self._checkpoint_task(task)
+            
+            # En infinity mode, creamos un batch con todas las tareas pendientes
+            batch = TaskBatch(name="Infinity Batch", tasks=pending)
             results = mode.execute(batch)
             
-            # Procesar resultados
-            for agent_name, agent_results in results.get('agents', {}).items():
-                completed = agent_results.get('tasks_completed', 0)
-                self.session_stats['tasks_completed'] += completed
-                self.session_stats['agents_used'].add(agent_name)
+            # Procesar resultados por agente
+            agents = results.get('agents', {})
+            for task in pending:
+                agent_name = task.assigned_to or 'alfred'
+                agent_results = agents.get(agent_name, {})
+                if agent_results.get('status') == 'completed' and not agent_results.get('returncode'):
+                    task.complete()
+                    self.session_stats['tasks_completed'] += 1
+                    self.session_stats['agents_used'].add(agent_name)
+                else:
+                    task.fail(f"La instancia de {agent_name} no terminó "
+                              f"({agent_results.get('status', 'sin estado')})")
+                    self.session_stats['tasks_failed'] += 1
+                self._checkpoint_task(task)
             
-            self.logger.log(f"✅ Infinity mode completado con {len(results.get('agents', {}))} agentes")
+            self.logger.log(f"✅ Infinity mode completado con {len(agents)} agentes")
         finally:
             mode.cleanup()
+        return True
     
-    def _execute_auto_mode(self, tasks: List[Task]):
+    def _execute_auto_mode(self, tasks: List[Task]) -> bool:
         """Ejecuta las tareas en modo automático."""
         self.logger.log("🤖 Ejecutando en modo AUTOMÁTICO")
         
         # Por ahora, simulamos la ejecución
-        for task in tasks:
-            self._simulate_task_execution(task)
+        for task in self._pending(tasks):
+            agent = self._real_agent_for(task)
+            if agent is not None and not self._admit_quota(task):
+                continue
+            
+            with self._quota_usage(task, agent):
+                self._simulate_task_execution(task)
+            if agent is not None:
+                self._record_duration(task)
+            self._checkpoint_task(task)
+        return True
     
     def _simulate_task_execution(self, task: Task):
         """
@@ -434,10 +749,29 @@ class BatmanIncorporated:
     def _get_context_files_for_task(self, task: Task) -> List[str]:
         """
         Determina qué archivos incluir como contexto para una tarea.
+        
+        Primero los archivos de código más relevantes según el índice de
+        símbolos del repositorio; después los archivos básicos del proyecto.
         """
         context_files = []
-        
-        # Por ahora, incluir archivos básicos del proyecto si existen
+        context_config = self.config.get('execution.context', {}) or {}
+        
+        if context_config.get('repo_index', True):
+            root = Path.cwd()
+            try:
+                if self.repo_index is None:
+                    self.repo_index = RepoIndex(
+                        Path(self.config.get('paths.cache', '~/.glados/batman-incorporated/cache')).expanduser()
+                        / "repo_index.db"
+                    )
+                self.repo_index.update(root, max_age=context_config.get('index_max_age', 30))
+                query = " ".join([task.title, task.description] + list(task.tags))
+                for path, _ in self.repo_index.search(query, root, limit=context_config.get('max_files', 5)):
+                    context_files.append(os.path.relpath(path, root))
+            except (sqlite3.Error, OSError) as e:
+                self.logger.log(f"⚠️ Índice del repositorio no disponible: {e}")
+        
+        # Archivos básicos del proyecto si existen
         common_files = [
             "package.json",
             "requirements.txt", 
@@ -447,9 +781,8 @@ class BatmanIncorporated:
             "src/app.py"
         ]
         
-        for file in common_files:
-            if Path(file).exists():
-                context_files.append(file)
+        # El contenido lo leen los agentes desde la caché compartida
+        context_files.extend(f for f in self.file_cache.existing(common_files) if f not in context_files)
         
         return context_files
     
@@ -480,6 +813,13 @@ class BatmanIncorporated:
         # Limpiar archivos temporales
         self.logger.log("🧹 Limpiando archivos temporales...")
         
+        # Resumen de tiempo en subprocesos (git, rg, gh...)
+        command_metrics = get_command_runner().get_metrics()
+        if command_metrics:
+            self.logger.log("⏱️ Tiempo en comandos externos:")
+            for label, stats in list(command_metrics.items())[:5]:
+                self.logger.log(f"  • {label}: {stats['count']}x, {stats['total_time']:.2f}s total, máx {stats['max_time']:.2f}s")
+        
         # Commit final si está configurado
         if self.config.get('github.push.enabled'):
             self.logger.log("📤 Preparando para push a GitHub...")
@@ -517,6 +857,12 @@ class BatmanIncorporated:
         print(f"Agentes habilitados: {', '.join(self.agents.keys())}")
         print(f"Modo de ejecución por defecto: {self.config.get('execution.default_mode')}")
         print(f"GitHub Actions: {'Habilitado' if self.config.get('github.actions.enabled') else 'Deshabilitado'}")
+        quota = self.quota.status()
+        print(f"Cuota: {quota['used']}+{quota['reserved']} reservados de {quota['budget']} prompts "
+              f"(refresh en {quota['remaining_seconds'] / 3600:.1f}h)")
+        admission = self.admission.status()
+        print(f"Admisión: {sum(admission['active'].values())}/{admission['limit']} instancias "
+              f"(máx {admission['max_slots']}, presión {admission['pressure']:.0%})")
         print("=" * 50)
     
     def start_auto_mode(self):
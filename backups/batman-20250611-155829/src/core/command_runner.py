@@ -0,0 +1,368 @@
+"""
+Ejecutor de comandos compartido para Batman Incorporated.
+Ejecuta argv sin shell, con timeouts por comando, captura limitada,
+límite de concurrencia y métricas de tiempo por comando.
+"""
+
+import shlex
+import subprocess
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Union
+
+
+Command = Union[str, List[str]]
+
+
+@dataclass
+class CommandResult:
+    """Resultado de un comando ejecutado por el CommandRunner."""
+    argv: List[str]
+    returncode: int
+    stdout: str = ""
+    stderr: str = ""
+    duration: float = 0.0
+    timed_out: bool = False
+    truncated: bool = False
+    
+    @property
+    def success(self) -> bool:
+        """True si el comando terminó con código 0."""
+        return self.returncode == 0
+    
+    def to_completed_process(self) -> subprocess.CompletedProcess:
+        """Convierte a CompletedProcess para callers existentes."""
+        return subprocess.CompletedProcess(
+            args=self.argv,
+            returncode=self.returncode,
+            stdout=self.stdout,
+            stderr=self.stderr
+        )
+
+
+@dataclass
+class CommandStats:
+    """Métricas acumuladas para un tipo de comando."""
+    count: int = 0
+    failures: int = 0
+    timeouts: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+    
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            'count': self.count,
+            'failures': self.failures,
+            'timeouts': self.timeouts,
+            'total_time': round(self.total_time, 4),
+            'avg_time': round(self.total_time / self.count, 4) if self.count else 0.0,
+            'max_time': round(self.max_time, 4)
+        }
+
+
+class _LimitedBuffer:
+    """Guarda los primeros `head` bytes y los últimos `tail` bytes de un stream."""
+    
+    def __init__(self, head: int, tail: int):
+        self.head_limit = head
+        self.tail_limit = tail
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.truncated = False
+    
+    def write(self, chunk: bytes):
+        room = self.head_limit - len(self.head)
+        if room > 0:
+            self.head.extend(chunk[:room])
+            chunk = chunk[room:]
+        if not chunk:
+            return
+        
+        self.tail.extend(chunk)
+        overflow = len(self.tail) - self.tail_limit
+        if overflow > 0:
+            del self.tail[:overflow]
+            self.truncated = True
+    
+    def getvalue(self) -> str:
+        head = self.head.decode('utf-8', errors='replace')
+        tail = self.tail.decode('utf-8', errors='replace')
+        if self.truncated:
+            return f"{head}\n... [salida truncada] ...\n{tail}"
+        return head + tail
+
+
+class CommandRunner:
+    """
+    Ejecuta comandos del sistema sin shell.
+    
+    - Los comandos se pasan como argv (los strings se parten con shlex)
+    - Cada llamada puede fijar su propio timeout
+    - `capture_limit` limita la memoria guardando solo cabeza y cola
+    - Un semáforo limita los procesos simultáneos
+    - Se acumulan métricas de tiempo por comando (ej: "git status")
+    """
+    
+    # Comandos cuyo subcomando forma parte de la etiqueta de métricas
+    SUBCOMMAND_TOOLS = {'git', 'gh', 'npm', 'docker', 'cargo', 'pip'}
+    
+    def __init__(self, max_concurrent: int = 8, default_timeout: int = 300):
+        """
+        Inicializa el runner.
+        
+        Args:
+            max_concurrent: Número máximo de procesos simultáneos
+            default_timeout: Timeout por defecto en segundos
+        """
+        self.max_concurrent = max_concurrent
+        self.default_timeout = default_timeout
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._metrics: Dict[str, CommandStats] = {}
+        self._metrics_lock = threading.Lock()
+    
+    def _to_argv(self, command: Command) -> List[str]:
+        """Normaliza un comando a lista de argumentos."""
+        if isinstance(command, str):
+            return shlex.split(command)
+        return [str(arg) for arg in command]
+    
+    def _label(self, argv: List[str]) -> str:
+        """Etiqueta usada para agrupar métricas."""
+        if not argv:
+            return "<empty>"
+        tool = argv[0].rsplit('/', 1)[-1]
+        if tool in self.SUBCOMMAND_TOOLS and len(argv) > 1 and not argv[1].startswith('-'):
+            return f"{tool} {argv[1]}"
+        return tool
+    
+    def _record(self, label: str, result: CommandResult):
+        """Acumula métricas de una ejecución."""
+        with self._metrics_lock:
+            stats = self._metrics.setdefault(label, CommandStats())
+            stats.count += 1
+            stats.total_time += result.duration
+            stats.max_time = max(stats.max_time, result.duration)
+            if not result.success:
+                stats.failures += 1
+            if result.timed_out:
+                stats.timeouts += 1
+    
+    def run(self, command: Command, cwd: Optional[str] = None,
+            timeout: Optional[float] = None, input: Optional[str] = None,
+            env: Optional[Dict[str, str]] = None,
+            capture_limit: Optional[int] = None,
+            label: Optional[str] = None) -> CommandResult:
+        """
+        Ejecuta un comando y devuelve su resultado.
+        
+        Args:
+            command: argv o string (se parte con shlex, nunca pasa por shell)
+            cwd: Directorio de trabajo
+            timeout: Timeout en segundos (por defecto default_timeout)
+            input: Texto a enviar por stdin
+            env: Entorno del proceso (por defecto el heredado)
+            capture_limit: Máximo de bytes a conservar por stream
+                (mitad cabeza, mitad cola). None captura todo.
+            label: Etiqueta para métricas (por defecto el comando)
+        
+        Returns:
+            CommandResult con salida, código y duración
+        """
+        try:
+            argv = self._to_argv(command)
+        except ValueError as e:
+            # Comillas sin cerrar en un comando string
+            return CommandResult(argv=[], returncode=1, stderr=str(e))
+        label = label or self._label(argv)
+        timeout = timeout if timeout is not None else self.default_timeout
+        
+        if not argv:
+            return CommandResult(argv=argv, returncode=1, stderr="Empty command")
+        
+        with self._slots:
+            start = time.monotonic()
+            try:
+                if capture_limit is None:
+                    result = self._run_full(argv, cwd, timeout, input, env)
+                else:
+                    result = self._run_limited(argv, cwd, timeout, input, env, capture_limit)
+            except subprocess.TimeoutExpired:
+                result = CommandResult(argv=argv, returncode=-1,
+                                       stderr="Command timed out", timed_out=True)
+            except OSError as e:
+                # Binario inexistente, permisos, etc.
+                result = CommandResult(argv=argv, returncode=127, stderr=str(e))
+            result.duration = time.monotonic() - start
+        
+        self._record(label, result)
+        return result
+    
+    def _run_full(self, argv: List[str], cwd: Optional[str], timeout: float,
+                  input: Optional[str], env: Optional[Dict[str, str]]) -> CommandResult:
+        """Ejecución con captura completa (caso común, salida pequeña)."""
+        kwargs = {}
+        if input is not None:
+            kwargs['input'] = input
+        if env is not None:
+            kwargs['env'] = env
+        
+        completed = subprocess.run(
+            argv,
+            cwd=cwd,
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+            **kwargs
+        )
+        return CommandResult(
+            argv=argv,
+            returncode=completed.returncode,
+            stdout=completed.stdout,
+            stderr=completed.stderr
+        )
+    
+    def _run_limited(self, argv: List[str], cwd: Optional[str], timeout: float,
+                     input: Optional[str], env: Optional[Dict[str, str]],
+                     capture_limit: int) -> CommandResult:
+        """Ejecución que solo conserva cabeza y cola de cada stream."""
+        head = capture_limit // 2
+        buffers = {
+            'stdout': _LimitedBuffer(head, capture_limit - head),
+            'stderr': _LimitedBuffer(head, capture_limit - head)
+        }
+        
+        process = subprocess.Popen(
+            argv,
+            cwd=cwd,
+            env=env,
+            stdin=subprocess.PIPE if input is not None else subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+        
+        def pump(stream, buffer: _LimitedBuffer):
+            for chunk in iter(lambda: stream.read(65536), b''):
+                buffer.write(chunk)
+            stream.close()
+        
+        readers = [
+            threading.Thread(target=pump, args=(process.stdout, buffers['stdout']), daemon=True),
+            threading.Thread(target=pump, args=(process.stderr, buffers['stderr']), daemon=True)
+        ]
+        for reader in readers:
+            reader.start()
+        
+        if input is not None:
+            try:
+                process.stdin.write(input.encode('utf-8'))
+            except BrokenPipeError:
+                pass
+            finally:
+                process.stdin.close()
+        
+        timed_out = False
+        try:
+            process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+            timed_out = True
+        
+        for reader in readers:
+            reader.join()
+        
+        stderr = buffers['stderr'].getvalue()
+        if timed_out:
+            stderr = (stderr + "\nCommand timed out").lstrip('\n')
+        
+        return CommandResult(
+            argv=argv,
+            returncode=-1 if timed_out else process.returncode,
+            stdout=buffers['stdout'].getvalue(),
+            stderr=stderr,
+            timed_out=timed_out,
+            truncated=buffers['stdout'].truncated or buffers['stderr'].truncated
+        )
+    
+    def stream(self, command: Command, cwd: Optional[str] = None,
+               timeout: Optional[float] = None,
+               label: Optional[str] = None) -> Iterator[str]:
+        """
+        Ejecuta un comando y entrega su stdout línea a línea.
+        
+        El proceso se mata si se supera el timeout o si el consumidor deja
+        de iterar. stderr se descarta.
+        """
+        argv = self._to_argv(command)
+        label = label or self._label(argv)
+        timeout = timeout if timeout is not None else self.default_timeout
+        
+        if not argv:
+            return
+        
+        with self._slots:
+            start = time.monotonic()
+            result = CommandResult(argv=argv, returncode=-1)
+            try:
+                process = subprocess.Popen(
+                    argv,
+                    cwd=cwd,
+                    stdin=subprocess.DEVNULL,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                    text=True,
+                    errors='replace'
+                )
+            except OSError as e:
+                result.returncode = 127
+                result.stderr = str(e)
+                result.duration = time.monotonic() - start
+                self._record(label, result)
+                return
+            
+            expired = threading.Event()
+            
+            def on_timeout():
+                expired.set()
+                process.kill()
+            
+            watchdog = threading.Timer(timeout, on_timeout)
+            watchdog.daemon = True
+            watchdog.start()
+            try:
+                for line in process.stdout:
+                    yield line.rstrip('\n')
+                process.wait()
+                result.returncode = process.returncode
+            finally:
+                watchdog.cancel()
+                if process.poll() is None:
+                    process.kill()
+                    process.wait()
+                process.stdout.close()
+                result.timed_out = expired.is_set()
+                result.duration = time.monotonic() - start
+                self._record(label, result)
+    
+    def get_metrics(self) -> Dict[str, Dict[str, float]]:
+        """Métricas por comando ordenadas por tiempo total."""
+        with self._metrics_lock:
+            items = sorted(self._metrics.items(), key=lambda kv: kv[1].total_time, reverse=True)
+            return {label: stats.to_dict() for label, stats in items}
+    
+    def reset_metrics(self):
+        """Reinicia las métricas acumuladas."""
+        with self._metrics_lock:
+            self._metrics.clear()
+
+
+# Singleton global compartido por modos de ejecución y Arsenal
+_runner_instance = None
+
+def get_command_runner(max_concurrent: int = 8, default_timeout: int = 300) -> CommandRunner:
+    """Obtiene la instancia global del CommandRunner."""
+    global _runner_instance
+    if _runner_instance is None:
+        _runner_instance = CommandRunner(max_concurrent, default_timeout)
+    return _runner_instance
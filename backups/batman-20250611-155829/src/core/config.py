@@ -4,45 +4,176 @@ Maneja configuración por defecto y personalizada.
 """
 
 import os
+import re
 import yaml
+import threading
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 import copy
 
 
+USER_CONFIG_PATH = Path.home() / ".glados" / "batman-incorporated" / "config.yaml"
+
+# Referencias del tipo ${paths.base}
+_VARIABLE_PATTERN = re.compile(r'\$\{([^}]*)\}')
+
+_TRUE_STRINGS = {'1', 'true', 'yes', 'on', 'si', 'sí'}
+_FALSE_STRINGS = {'0', 'false', 'no', 'off', ''}
+
+
+@dataclass(frozen=True)
+class CompiledConfig:
+    """
+    Snapshot inmutable de una configuración ya cargada.
+    
+    `tree` es el diccionario anidado con las variables resueltas y `flat`
+    un mapa clave-con-puntos -> valor (incluye los nodos intermedios) para
+    que `Config.get` sea una sola búsqueda en un diccionario.
+    """
+    tree: Dict[str, Any]
+    flat: Dict[str, Any]
+    stamps: Tuple[Tuple[str, int, int], ...]
+
+
+# Snapshots compilados por lista de archivos fuente; se invalidan por mtime
+_compiled_cache: Dict[Tuple[str, ...], CompiledConfig] = {}
+_compiled_lock = threading.Lock()
+
+# Directorios ya creados en este proceso
+_created_dirs = set()
+
+
+def _flatten(tree: Dict[str, Any]) -> Dict[str, Any]:
+    """Aplana un diccionario anidado a claves con puntos."""
+    flat: Dict[str, Any] = {}
+    pending = [('', tree)]
+    
+    while pending:
+        prefix, node = pending.pop()
+        for key, value in node.items():
+            dotted = f"{prefix}{key}"
+            flat[dotted] = value
+            if isinstance(value, dict):
+                pending.append((dotted + '.', value))
+    
+    return flat
+
+
+def _file_stamps(paths: List[Path]) -> Optional[Tuple[Tuple[str, int, int], ...]]:
+    """Huella (ruta, mtime, tamaño) de los archivos fuente; None si alguno falla."""
+    stamps = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        stamps.append((str(path), st.st_mtime_ns, st.st_size))
+    return tuple(stamps)
+
+
+def clear_config_cache():
+    """Descarta los snapshots compilados (fuerza releer los YAML)."""
+    with _compiled_lock:
+        _compiled_cache.clear()
+
+
 class Config:
     """Gestor de configuración para Batman Incorporated."""
     
+    default_config_path = Path(__file__).parent.parent.parent / "config" / "default_config.yaml"
+    
     def __init__(self, config_path: Optional[Path] = None):
         """
         Inicializa la configuración.
         
+        Los YAML solo se parsean cuando cambian: el resultado (ya mezclado y
+        con variables resueltas) se guarda en un snapshot compartido que se
+        invalida por mtime. Cada instancia lo usa sin copiarlo hasta que
+        necesita modificarlo.
+        
         Args:
             config_path: Ruta al archivo de configuración personalizado
         """
-        # Cargar configuración por defecto
-        self.default_config_path = Path(__file__).parent.parent.parent / "config" / "default_config.yaml"
-        self.config = self._load_default_config()
+        sources = [Path(self.default_config_path)]
         
         # Cargar configuración del usuario si existe
-        if config_path and config_path.exists():
-            self._merge_user_config(config_path)
-        else:
+        if config_path and Path(config_path).exists():
+            sources.append(Path(config_path))
+        elif USER_CONFIG_PATH.exists():
             # Intentar cargar desde ubicación estándar
-            user_config = Path.home() / ".glados" / "batman-incorporated" / "config.yaml"
-            if user_config.exists():
-                self._merge_user_config(user_config)
+            sources.append(USER_CONFIG_PATH)
         
-        # Expandir variables
-        self._expand_variables()
+        snapshot = self._load_compiled(sources)
+        self._config = snapshot.tree
+        self._flat: Optional[Dict[str, Any]] = snapshot.flat
+        self._shared = True
         
         # Crear directorios necesarios
         self._create_directories()
     
+    def _load_compiled(self, sources: List[Path]) -> CompiledConfig:
+        """
+        Devuelve el snapshot compilado para `sources`, reconstruyéndolo si
+        algún archivo cambió desde la última vez.
+        
+        Args:
+            sources: Archivo por defecto y, opcionalmente, el del usuario
+        
+        Returns:
+            CompiledConfig compartido
+        """
+        key = tuple(str(path) for path in sources)
+        stamps = _file_stamps(sources)
+        self._shared = False
+        
+        with _compiled_lock:
+            cached = _compiled_cache.get(key)
+        if cached is not None and stamps is not None and cached.stamps == stamps:
+            return cached
+        
+        self._config = self._load_default_config()
+        for user_config in sources[1:]:
+            self._merge_user_config(user_config)
+        
+        # Expandir variables
+        self._expand_variables()
+        
+        snapshot = CompiledConfig(tree=self._config, flat=_flatten(self._config), stamps=stamps or ())
+        if stamps is not None:
+            with _compiled_lock:
+                _compiled_cache[key] = snapshot
+        return snapshot
+    
+    @property
+    def config(self) -> Dict[str, Any]:
+        """
+        Diccionario de configuración modificable.
+        
+        Al acceder se obtiene una copia privada del snapshot compartido, ya
+        que el llamador puede modificarla directamente.
+        """
+        self._make_private()
+        self._flat = None
+        return self._config
+    
+    @config.setter
+    def config(self, value: Dict[str, Any]):
+        self._config = value
+        self._flat = None
+        self._shared = False
+    
+    def _make_private(self):
+        """Copia el snapshot compartido antes de modificarlo (copy-on-write)."""
+        if self._shared:
+            self._config = copy.deepcopy(self._config)
+            self._flat = None
+            self._shared = False
+    
     def _load_default_config(self) -> Dict[str, Any]:
         """Carga la configuración por defecto."""
         with open(self.default_config_path, 'r') as f:
-            return yaml.safe_load(f)
+            return yaml.safe_load(f) or {}
     
     def _merge_user_config(self, config_path: Path):
         """
@@ -55,7 +186,9 @@ class Config:
             user_config = yaml.safe_load(f)
         
         if user_config:
-            self._deep_merge(self.config, user_config)
+            self._make_private()
+            self._deep_merge(self._config, user_config)
+            self._flat = None
     
     def _deep_merge(self, base: Dict, update: Dict):
         """
@@ -72,37 +205,62 @@ class Config:
                 base[key] = value
     
     def _expand_variables(self):
-        """Expande variables en la configuración (ej: ${paths.base})."""
-        def expand_value(value: Any, context: Dict) -> Any:
+        """
+        Expande variables en la configuración (ej: ${paths.base}).
+        
+        Cada clave se resuelve una sola vez (memoizada), de modo que las
+        referencias encadenadas se expanden por completo. Una referencia
+        circular lanza ValueError; las variables desconocidas se dejan
+        tal cual.
+        """
+        source = self._config
+        resolved: Dict[str, Any] = {}
+        resolving: List[str] = []
+        
+        def resolve(path: str, raw: Any) -> Any:
+            if path in resolved:
+                return resolved[path]
+            if path in resolving:
+                cycle = ' -> '.join(resolving[resolving.index(path):] + [path])
+                raise ValueError(f"Referencia circular en la configuración: {cycle}")
+            
+            resolving.append(path)
+            try:
+                value = expand_value(raw, path)
+            finally:
+                resolving.pop()
+            resolved[path] = value
+            return value
+        
+        def lookup(path: str) -> Any:
+            if path in resolved:
+                return resolved[path]
+            raw = self._get_nested_value(path, source)
+            return None if raw is None else resolve(path, raw)
+        
+        def substitute(match) -> str:
+            var_value = lookup(match.group(1))
+            return match.group(0) if var_value is None else str(var_value)
+        
+        def expand_value(value: Any, path: str) -> Any:
             if isinstance(value, str):
                 # Expandir ~ a home
                 if value.startswith('~'):
                     value = os.path.expanduser(value)
-                
-                # Expandir variables ${...}
-                while '${' in value:
-                    start = value.find('${')
-                    end = value.find('}', start)
-                    if end == -1:
-                        break
-                    
-                    var_path = value[start+2:end]
-                    var_value = self._get_nested_value(var_path, context)
-                    
-                    if var_value is not None:
-                        value = value[:start] + str(var_value) + value[end+1:]
-                    else:
-                        break
-                
+                if '${' in value:
+                    value = _VARIABLE_PATTERN.sub(substitute, value)
                 return value
             elif isinstance(value, dict):
-                return {k: expand_value(v, context) for k, v in value.items()}
+                return {
+                    k: resolve(f"{path}.{k}" if path else str(k), v)
+                    for k, v in value.items()
+                }
             elif isinstance(value, list):
-                return [expand_value(v, context) for v in value]
+                return [expand_value(v, path) for v in value]
             else:
                 return value
         
-        self.config = expand_value(self.config, self.config)
+        self.config = expand_value(source, '')
     
     def _get_nested_value(self, path: str, data: Dict) -> Any:
         """
@@ -127,7 +285,7 @@ class Config:
         return current
     
     def _create_directories(self):
-        """Crea los directorios necesarios si no existen."""
+        """Crea los directorios necesarios si no existen (una vez por proceso)."""
         paths_to_create = [
             self.get('paths.base'),
             self.get('paths.logs'),
@@ -138,9 +296,9 @@ class Config:
         ]
         
         for path_str in paths_to_create:
-            if path_str:
-                path = Path(path_str)
-                path.mkdir(parents=True, exist_ok=True)
+            if path_str and path_str not in _created_dirs:
+                os.makedirs(path_str, exist_ok=True)
+                _created_dirs.add(path_str)
     
     def get(self, key: str, default: Any = None) -> Any:
         """
@@ -151,10 +309,75 @@ class Config:
             default: Valor por defecto si no se encuentra
         
         Returns:
-            Valor de configuración o default
+            Valor de configuración o default. Mientras la instancia usa el
+            snapshot compartido, los dict/list se devuelven copiados para que
+            el llamador no pueda alterar la configuración de otras instancias.
         """
-        value = self._get_nested_value(key, self.config)
-        return value if value is not None else default
+        flat = self._flat
+        if flat is None:
+            flat = self._flat = _flatten(self._config)
+        value = flat.get(key)
+        if value is None:
+            return default
+        if self._shared and isinstance(value, (dict, list)):
+            return copy.deepcopy(value)
+        return value
+    
+    def get_str(self, key: str, default: str = "") -> str:
+        """Obtiene un valor como texto."""
+        value = self.get(key)
+        return default if value is None else str(value)
+    
+    def get_int(self, key: str, default: int = 0) -> int:
+        """Obtiene un valor entero; si no es convertible devuelve default."""
+        value = self.get(key)
+        if value is None or isinstance(value, bool):
+            return default
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return default
+    
+    def get_float(self, key: str, default: float = 0.0) -> float:
+        """Obtiene un valor decimal; si no es convertible devuelve default."""
+        value = self.get(key)
+        if value is None or isinstance(value, bool):
+            return default
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return default
+    
+    def get_bool(self, key: str, default: bool = False) -> bool:
+        """Obtiene un booleano (acepta true/false, yes/no, on/off, 1/0)."""
+        value = self.get(key)
+        if isinstance(value, bool):
+            return value
+        if isinstance(value, (int, float)):
+            return bool(value)
+        if isinstance(value, str):
+            lowered = value.strip().lower()
+            if lowered in _TRUE_STRINGS:
+                return True
+            if lowered in _FALSE_STRINGS:
+                return False
+        return default
+    
+    def get_list(self, key: str, default: Optional[List[Any]] = None) -> List[Any]:
+        """Obtiene una lista (un valor escalar se envuelve en lista)."""
+        value = self.get(key)
+        if value is None:
+            return list(default) if default is not None else []
+        if isinstance(value, (list, tuple, set)):
+            return list(value)
+        return [value]
+    
+    def get_path(self, key: str, default: Optional[Path] = None) -> Optional[Path]:
+        """Obtiene una ruta con ~ expandido."""
+        value = self.get(key)
+        if value is None:
+            return default
+        return Path(os.path.expanduser(str(value)))
     
     def set(self, key: str, value: Any):
         """
@@ -164,8 +387,9 @@ class Config:
             key: Clave en notación de puntos
             value: Valor a establecer
         """
+        self._make_private()
         keys = key.split('.')
-        current = self.config
+        current = self._config
         
         for i, k in enumerate(keys[:-1]):
             if k not in current:
@@ -173,6 +397,7 @@ class Config:
             current = current[k]
         
         current[keys[-1]] = value
+        self._flat = None
     
     def get_agent_config(self, agent_name: str) -> Dict[str, Any]:
         """
@@ -210,13 +435,13 @@ class Config:
             path: Ruta donde guardar (por defecto la ubicación estándar)
         """
         if path is None:
-            path = Path.home() / ".glados" / "batman-incorporated" / "config.yaml"
+            path = USER_CONFIG_PATH
         
-        path.parent.mkdir(parents=True, exist_ok=True)
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
         
         with open(path, 'w') as f:
-            yaml.dump(self.config, f, default_flow_style=False, sort_keys=False)
+            yaml.dump(self._config, f, default_flow_style=False, sort_keys=False)
     
     def to_dict(self) -> Dict[str, Any]:
         """Retorna la configuración como diccionario."""
-        return copy.deepcopy(self.config)
\ No newline at end of file
+        return copy.deepcopy(self._config)
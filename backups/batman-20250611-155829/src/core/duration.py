@@ -0,0 +1,294 @@
+"""
+Modelo histórico de duración de tareas para Batman Incorporated.
+Guarda la duración real de cada tarea por (tipo, agente, tags, tamaño del
+repo) y predice cuantiles para planificar, fijar timeouts y --max-turns.
+"""
+
+import math
+import sqlite3
+import subprocess
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from core.task import Task
+
+
+DEFAULT_DB_PATH = Path.home() / ".glados" / "batman-incorporated" / "cache" / "durations.db"
+
+# Valores de `execution.durations` en la configuración
+DEFAULT_SETTINGS = {
+    'window': 200,            # muestras más recientes consideradas por grupo
+    'min_samples': 3,         # muestras mínimas para confiar en un grupo
+    'timeout_factor': 1.5,    # margen sobre el p90 para el timeout
+    'min_timeout': 600,       # timeout fijo de antes de tener historial
+    'max_timeout': 3600,
+    'minutes_per_turn': 1.0,  # un turno de Claude ~ 1 minuto
+    'min_turns': 10,          # --max-turns fijo de antes de tener historial
+    'max_turns': 40,
+}
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS durations (
+        id INTEGER PRIMARY KEY,
+        task_type TEXT NOT NULL,
+        agent TEXT NOT NULL,
+        repo_bucket INTEGER NOT NULL,
+        tags TEXT NOT NULL,
+        hours REAL NOT NULL,
+        censored INTEGER NOT NULL DEFAULT 0,
+        recorded_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_durations_group
+        ON durations(task_type, agent, repo_bucket, recorded_at);
+"""
+
+# Niveles de agrupación, del más específico al más general
+_LEVELS = (
+    ("tipo+agente+repo", "task_type = ? AND agent = ? AND repo_bucket = ?"),
+    ("tipo+agente", "task_type = ? AND agent = ?"),
+    ("tipo", "task_type = ?"),
+)
+
+
+def repo_size_bucket(file_count: int) -> int:
+    """Orden de magnitud del número de archivos (0: <10, 1: <100, 2: <1000...)."""
+    return int(math.log10(file_count)) if file_count > 0 else 0
+
+
+def count_repo_files(path: Union[str, Path]) -> int:
+    """Archivos versionados del repo (0 si no es un repo git)."""
+    try:
+        result = subprocess.run(['git', 'ls-files', '-z'], cwd=str(path),
+                                capture_output=True, timeout=30)
+    except (OSError, subprocess.SubprocessError):
+        return 0
+    if result.returncode != 0:
+        return 0
+    return result.stdout.count(b"\0")
+
+
+def weighted_quantile(values: Sequence[float], weights: Sequence[float], q: float) -> float:
+    """Cuantil `q` (0-1) de `values` con pesos."""
+    pairs = sorted(zip(values, weights))
+    total = sum(w for _, w in pairs)
+    threshold = q * total
+    cumulative = 0.0
+    for value, weight in pairs:
+        cumulative += weight
+        if cumulative >= threshold:
+            return value
+    return pairs[-1][0]
+
+
+def _tag_key(tags: Sequence[str]) -> str:
+    return ",".join(sorted({tag.lower() for tag in tags}))
+
+
+@dataclass
+class DurationEstimate:
+    """Predicción de duración de una tarea."""
+    p50_hours: float
+    p90_hours: float
+    samples: int
+    basis: str  # nivel de agrupación usado
+    
+    def timeout_seconds(self, settings: Dict[str, Any]) -> int:
+        """Timeout para la ejecución: p90 con margen, dentro de los límites."""
+        seconds = self.p90_hours * 3600 * settings['timeout_factor']
+        return int(min(settings['max_timeout'], max(settings['min_timeout'], seconds)))
+    
+    def max_turns(self, settings: Dict[str, Any]) -> int:
+        """Turnos de Claude proporcionales a la duración p90."""
+        turns = round(self.p90_hours * 60 / settings['minutes_per_turn'])
+        return int(min(settings['max_turns'], max(settings['min_turns'], turns)))
+
+
+class DurationModel:
+    """
+    Historial de duraciones reales y predicción por cuantiles.
+    
+    Para predecir se usa el grupo más específico con al menos
+    `min_samples` muestras: (tipo, agente, tamaño del repo), luego
+    (tipo, agente) y por último solo el tipo. Dentro del grupo, las
+    muestras con tags en común con la tarea pesan más (1 + Jaccard).
+    """
+    
+    def __init__(self, db_path: Optional[Union[str, Path]] = None,
+                 settings: Optional[Dict[str, Any]] = None):
+        """
+        Abre (o crea) el historial.
+        
+        Args:
+            db_path: Ruta del archivo SQLite (":memory:" para pruebas)
+            settings: Valores de DEFAULT_SETTINGS a sobrescribir
+        """
+        if db_path == ":memory:":
+            self.db_path = db_path
+        else:
+            self.db_path = Path(db_path).expanduser() if db_path else DEFAULT_DB_PATH
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        self.settings = dict(DEFAULT_SETTINGS)
+        self.settings.update(settings or {})
+        self._lock = threading.Lock()
+        self._repo_buckets: Dict[str, int] = {}
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(durations)")}
+        if columns and 'censored' not in columns:
+            # Historiales creados antes de guardar las ejecuciones fallidas
+            self._conn.execute("ALTER TABLE durations ADD COLUMN censored INTEGER NOT NULL DEFAULT 0")
+        self._conn.executescript(_SCHEMA)
+    
+    def close(self):
+        """Cierra la conexión."""
+        with self._lock:
+            self._conn.close()
+    
+    def repo_bucket(self, repo: Union[str, Path]) -> int:
+        """Tamaño del repo (cacheado por ruta durante la vida del modelo)."""
+        key = str(Path(repo).resolve())
+        if key not in self._repo_buckets:
+            self._repo_buckets[key] = repo_size_bucket(count_repo_files(key))
+        return self._repo_buckets[key]
+    
+    def _group(self, task: Task, agent: Optional[str], repo_bucket: int) -> Tuple[str, str, int]:
+        return task.type.value, agent or task.assigned_to or "batman", repo_bucket
+    
+    def record(self, task: Task, agent: Optional[str] = None, repo_bucket: int = 0,
+               hours: Optional[float] = None, censored: bool = False):
+        """
+        Guarda la duración real de una tarea.
+        
+        Las ejecuciones fallidas o cortadas por timeout se guardan como
+        muestras censuradas: la tarea habría tardado al menos el timeout
+        que tenía, así que se registra como mínimo ese valor. Sin ellas
+        el p90 solo vería las tareas que cupieron en el límite.
+        
+        Args:
+            task: Tarea (se usa `actual_hours` si no se da `hours`)
+            agent: Agente que la ejecutó (por defecto `assigned_to`)
+            repo_bucket: Tamaño del repo (ver `repo_size_bucket`)
+            hours: Duración en horas
+            censored: La ejecución no terminó bien
+        """
+        hours = task.actual_hours if hours is None else hours
+        if censored:
+            timeout = task.metadata.get('timeout_seconds', self.settings['min_timeout'])
+            hours = max(hours or 0.0, timeout / 3600)
+        if not hours or hours <= 0:
+            return
+        task_type, agent, repo_bucket = self._group(task, agent, repo_bucket)
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO durations (task_type, agent, repo_bucket, tags, hours, censored, recorded_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (task_type, agent, repo_bucket, _tag_key(task.tags), hours, int(censored), time.time())
+            )
+            self._conn.commit()
+    
+    def predict(self, task: Task, agent: Optional[str] = None,
+                repo_bucket: int = 0) -> Optional[DurationEstimate]:
+        """
+        Predice la duración de una tarea.
+        
+        Returns:
+            DurationEstimate, o None si no hay historial suficiente
+        """
+        group = self._group(task, agent, repo_bucket)
+        tags = set(_tag_key(task.tags).split(",")) - {""}
+        
+        for basis, where in _LEVELS:
+            params = group[:where.count("?")]
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT hours, tags FROM durations WHERE {where} "
+                    f"ORDER BY recorded_at DESC LIMIT ?",
+                    params + (self.settings['window'],)
+                ).fetchall()
+            if len(rows) < self.settings['min_samples']:
+                continue
+            
+            hours = [row[0] for row in rows]
+            weights = []
+            for _, sample_tags in rows:
+                sample = set(sample_tags.split(",")) - {""}
+                union = tags | sample
+                weights.append(1.0 + (len(tags & sample) / len(union) if union else 0.0))
+            return DurationEstimate(
+                p50_hours=weighted_quantile(hours, weights, 0.5),
+                p90_hours=weighted_quantile(hours, weights, 0.9),
+                samples=len(rows),
+                basis=basis
+            )
+        return None
+    
+    def apply(self, tasks: List[Task], repo_bucket: int = 0) -> int:
+        """
+        Ajusta las tareas con las predicciones del historial.
+        
+        Sustituye `estimated_hours` por el p50 y deja en `metadata` el p90,
+        `timeout_seconds` y `max_turns` para la ejecución. Las tareas sin
+        historial suficiente conservan su estimación.
+        
+        Returns:
+            Número de tareas ajustadas
+        """
+        adjusted = 0
+        for task in tasks:
+            estimate = self.predict(task, repo_bucket=repo_bucket)
+            if estimate is None:
+                continue
+            task.estimated_hours = round(estimate.p50_hours, 3)
+            task.metadata['duration_p90_hours'] = round(estimate.p90_hours, 3)
+            task.metadata['timeout_seconds'] = estimate.timeout_seconds(self.settings)
+            task.metadata['max_turns'] = estimate.max_turns(self.settings)
+            adjusted += 1
+        return adjusted
+
+
+def critical_path(tasks: List[Task]) -> Tuple[float, List[str]]:
+    """
+    Ruta crítica del plan según `estimated_hours` y `depends_on`.
+    
+    Returns:
+        Tupla (horas, IDs de las tareas de la ruta en orden)
+    """
+    by_id = {task.id: task for task in tasks}
+    finish: Dict[str, float] = {}
+    previous: Dict[str, Optional[str]] = {}
+    visiting = set()
+    
+    def visit(task_id: str) -> float:
+        if task_id in finish:
+            return finish[task_id]
+        if task_id in visiting:
+            return 0.0  # ciclo: se ignora el arco
+        visiting.add(task_id)
+        best, best_dep = 0.0, None
+        for dep in by_id[task_id].depends_on:
+            if dep in by_id:
+                dep_finish = visit(dep)
+                if dep_finish > best:
+                    best, best_dep = dep_finish, dep
+        visiting.discard(task_id)
+        finish[task_id] = best + by_id[task_id].estimated_hours
+        previous[task_id] = best_dep
+        return finish[task_id]
+    
+    for task in tasks:
+        visit(task.id)
+    if not finish:
+        return 0.0, []
+    
+    end = max(finish, key=finish.get)
+    path = []
+    node: Optional[str] = end
+    while node is not None:
+        path.append(node)
+        node = previous[node]
+    return finish[end], path[::-1]
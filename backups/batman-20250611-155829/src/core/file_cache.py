@@ -0,0 +1,173 @@
+"""
+Caché compartida de contenido de archivos para Batman Incorporated.
+Los agentes de una sesión leen una y otra vez los mismos archivos de
+contexto (README, package.json...): se guardan decodificados, indexados por
+ruta y validados con (mtime, tamaño, inode), y el texto se comparte entre
+rutas con el mismo contenido (hash SHA-1).
+"""
+
+import hashlib
+import mmap
+import os
+import stat
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+DEFAULT_MAX_ENTRIES = 512
+
+# A partir de este tamaño el archivo se decodifica directamente desde mmap
+MMAP_THRESHOLD = 64 * 1024
+
+
+@dataclass(frozen=True)
+class CachedFile:
+    """Contenido de un archivo tal y como estaba en (mtime_ns, size)."""
+    path: str
+    mtime_ns: int
+    size: int
+    sha1: str
+    text: str
+
+
+class FileCache:
+    """
+    Caché LRU de archivos de texto decodificados.
+    
+    Cada lectura hace un `stat`; si mtime, tamaño e inode coinciden con la
+    entrada guardada se devuelve sin tocar el disco. Las entradas con el
+    mismo contenido comparten el texto y solo cuentan una vez para
+    `max_bytes`.
+    """
+    
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Inicializa la caché.
+        
+        Args:
+            max_bytes: Tamaño máximo (en bytes de los archivos) del contenido guardado
+            max_entries: Rutas máximas recordadas
+        """
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # ruta -> ((mtime_ns, size, inode), CachedFile)
+        self._entries: "OrderedDict[str, Tuple[Tuple[int, int, int], CachedFile]]" = OrderedDict()
+        # sha1 -> rutas que lo usan
+        self._blobs: Dict[str, set] = {}
+        self._bytes = 0
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    @property
+    def size_bytes(self) -> int:
+        """Bytes de contenido distinto guardados."""
+        return self._bytes
+    
+    def existing(self, paths: Iterable[Union[str, Path]]) -> List[str]:
+        """Rutas de `paths` que son archivos regulares."""
+        result = []
+        for path in paths:
+            try:
+                if stat.S_ISREG(os.stat(path).st_mode):
+                    result.append(str(path))
+            except OSError:
+                continue
+        return result
+    
+    def read(self, path: Union[str, Path]) -> CachedFile:
+        """
+        Lee un archivo de texto UTF-8, desde la caché si no ha cambiado.
+        
+        Raises:
+            OSError: Si el archivo no existe o no se puede leer
+            UnicodeDecodeError: Si no es UTF-8 válido
+        """
+        key = str(path)
+        st = os.stat(key)
+        signature = (st.st_mtime_ns, st.st_size, st.st_ino)
+        
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] == signature:
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return entry[1]
+            self.stats['misses'] += 1
+        
+        text = self._load(key, st.st_size)
+        cached = CachedFile(key, st.st_mtime_ns, st.st_size,
+                            hashlib.sha1(text.encode('utf-8')).hexdigest(), text)
+        
+        with self._lock:
+            self._discard(key)
+            users = self._blobs.get(cached.sha1)
+            if users:
+                # Mismo contenido que otra ruta: se reutiliza su texto
+                other = self._entries[next(iter(users))][1]
+                cached = CachedFile(key, cached.mtime_ns, cached.size, cached.sha1, other.text)
+            else:
+                users = self._blobs[cached.sha1] = set()
+                self._bytes += cached.size
+            users.add(key)
+            self._entries[key] = (signature, cached)
+            self._evict()
+        return cached
+    
+    def read_text(self, path: Union[str, Path]) -> str:
+        """Contenido de un archivo (ver `read`)."""
+        return self.read(path).text
+    
+    def invalidate(self, path: Optional[Union[str, Path]] = None):
+        """Olvida una ruta, o toda la caché si no se indica."""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self._blobs.clear()
+                self._bytes = 0
+            else:
+                self._discard(str(path))
+    
+    @staticmethod
+    def _load(path: str, size: int) -> str:
+        with open(path, 'rb') as f:
+            if size < MMAP_THRESHOLD:
+                return f.read().decode('utf-8')
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return str(data, 'utf-8')
+    
+    def _discard(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        cached = entry[1]
+        users = self._blobs[cached.sha1]
+        users.discard(key)
+        if not users:
+            del self._blobs[cached.sha1]
+            self._bytes -= cached.size
+    
+    def _evict(self):
+        while self._entries and (self._bytes > self.max_bytes or len(self._entries) > self.max_entries):
+            oldest = next(iter(self._entries))
+            self._discard(oldest)
+            self.stats['evictions'] += 1
+
+
+# Instancia global compartida por los agentes de la sesión
+_file_cache_instance = None
+
+
+def get_file_cache(max_bytes: int = DEFAULT_MAX_BYTES,
+                   max_entries: int = DEFAULT_MAX_ENTRIES) -> FileCache:
+    """Obtiene la instancia global de FileCache."""
+    global _file_cache_instance
+    if _file_cache_instance is None:
+        _file_cache_instance = FileCache(max_bytes, max_entries)
+    return _file_cache_instance
@@ -0,0 +1,318 @@
+"""
+Índice persistente de archivos para Batman Incorporated.
+Guarda ruta, tamaño, mtime e inode en SQLite y se actualiza de forma
+incremental comparando el mtime de los directorios.
+"""
+
+import os
+import sqlite3
+import stat
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+
+DEFAULT_INDEX_PATH = Path.home() / ".glados" / "batman-incorporated" / "cache" / "file_index.db"
+
+# Pseudo-sistemas de archivos que nunca se indexan
+SKIP_ROOTS = {'/proc', '/sys', '/dev', '/run'}
+
+# Directorios de VCS, dependencias y artefactos que no se recorren por defecto
+SKIP_DIRS = {'.git', '.hg', '.svn', 'node_modules', '__pycache__', '.venv', 'venv',
+             'dist', 'build', '.next', '.mypy_cache', '.pytest_cache', '.tox'}
+
+
+@dataclass
+class IndexedFile:
+    """Entrada del índice de archivos."""
+    path: str
+    size: int
+    mtime: float
+    inode: int
+    
+    @property
+    def modified(self) -> datetime:
+        return datetime.fromtimestamp(self.mtime)
+
+
+class FileIndex:
+    """
+    Índice de archivos en SQLite con actualización incremental.
+    
+    En cada `update` solo se relee (readdir) el contenido de los directorios
+    cuyo mtime cambió desde la última pasada; en el resto se reutiliza la
+    lista de entradas guardada. Las consultas por glob, tamaño y antigüedad
+    usan índices SQL y no tocan el sistema de archivos.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS files (
+            path TEXT PRIMARY KEY,
+            dir TEXT NOT NULL,
+            name TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            mtime REAL NOT NULL,
+            inode INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_files_dir ON files(dir);
+        CREATE INDEX IF NOT EXISTS idx_files_name ON files(name);
+        CREATE INDEX IF NOT EXISTS idx_files_size ON files(size);
+        CREATE INDEX IF NOT EXISTS idx_files_mtime ON files(mtime);
+        
+        CREATE TABLE IF NOT EXISTS dirs (
+            path TEXT PRIMARY KEY,
+            parent TEXT,
+            mtime_ns INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_dirs_parent ON dirs(parent);
+        
+        CREATE TABLE IF NOT EXISTS roots (
+            path TEXT PRIMARY KEY,
+            updated_at REAL NOT NULL
+        );
+    """
+    
+    def __init__(self, db_path: Optional[Union[str, Path]] = None,
+                 skip_dirs: Optional[Set[str]] = None):
+        """
+        Abre (o crea) el índice.
+        
+        Args:
+            db_path: Ruta del archivo SQLite
+            skip_dirs: Nombres de directorio a no recorrer (por defecto
+                SKIP_DIRS; un conjunto vacío lo recorre todo)
+        """
+        self.db_path = Path(db_path) if db_path else DEFAULT_INDEX_PATH
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.skip_dirs = set(SKIP_DIRS if skip_dirs is None else skip_dirs)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+    
+    def close(self):
+        """Cierra la conexión."""
+        with self._lock:
+            self._conn.close()
+    
+    @staticmethod
+    def _prefix_range(root: str) -> Tuple[str, str]:
+        """Rango [lo, hi) de rutas bajo `root` (usa el índice de la PK)."""
+        base = root.rstrip('/') + '/'
+        return base, base[:-1] + '0'  # '0' es el carácter siguiente a '/'
+    
+    def update(self, root: Union[str, Path], restat_files: bool = True,
+               timeout: Optional[float] = None) -> Dict[str, int]:
+        """
+        Sincroniza el índice con el sistema de archivos bajo `root`.
+        
+        Si se agota `timeout`, se guarda lo recorrido hasta entonces pero no
+        se borran directorios ni se marca `root` como actualizado: la
+        siguiente pasada reutiliza lo ya escaneado y sigue avanzando.
+        
+        Args:
+            root: Directorio raíz a indexar
+            restat_files: Volver a hacer stat de archivos en directorios sin
+                cambios (detecta archivos que crecieron). Con False solo se
+                procesan directorios cuyo mtime cambió.
+            timeout: Segundos máximos de recorrido (None: sin límite)
+        
+        Returns:
+            Estadísticas: directorios escaneados/reutilizados, archivos
+            añadidos/actualizados/eliminados y si se agotó el tiempo
+        """
+        root = os.path.abspath(os.path.expanduser(str(root)))
+        stats = {'dirs_scanned': 0, 'dirs_reused': 0,
+                 'files_added': 0, 'files_updated': 0, 'files_removed': 0, 'timed_out': 0}
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        
+        with self._lock:
+            lo, hi = self._prefix_range(root)
+            known_dirs = {
+                path: mtime_ns for path, mtime_ns in self._conn.execute(
+                    "SELECT path, mtime_ns FROM dirs WHERE path = ? OR (path >= ? AND path < ?)",
+                    (root, lo, hi))
+            }
+            seen_dirs: Set[str] = set()
+            pending = [root]
+            
+            while pending:
+                if deadline is not None and time.monotonic() >= deadline:
+                    stats['timed_out'] = 1
+                    break
+                directory = pending.pop()
+                if directory in SKIP_ROOTS:
+                    continue
+                try:
+                    dir_stat = os.stat(directory, follow_symlinks=False)
+                except OSError:
+                    continue
+                if not stat.S_ISDIR(dir_stat.st_mode):
+                    continue
+                seen_dirs.add(directory)
+                
+                known_files = {
+                    path: (size, mtime, inode) for path, size, mtime, inode in self._conn.execute(
+                        "SELECT path, size, mtime, inode FROM files WHERE dir = ?", (directory,))
+                }
+                
+                if known_dirs.get(directory) == dir_stat.st_mtime_ns:
+                    # Sin entradas nuevas ni borradas: reutilizar la lista guardada
+                    stats['dirs_reused'] += 1
+                    pending.extend(
+                        path for (path,) in self._conn.execute(
+                            "SELECT path FROM dirs WHERE parent = ?", (directory,))
+                    )
+                    if restat_files:
+                        self._restat_known(known_files, stats)
+                    continue
+                
+                stats['dirs_scanned'] += 1
+                self._scan_directory(directory, dir_stat, known_files, pending, stats)
+            
+            if not stats['timed_out']:
+                # Directorios que ya no existen (y sus archivos)
+                removed_dirs = [d for d in known_dirs if d not in seen_dirs]
+                for directory in removed_dirs:
+                    cursor = self._conn.execute("DELETE FROM files WHERE dir = ?", (directory,))
+                    stats['files_removed'] += cursor.rowcount
+                self._conn.executemany("DELETE FROM dirs WHERE path = ?", [(d,) for d in removed_dirs])
+            
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO roots(path, updated_at) VALUES (?, ?)", (root, time.time()))
+            self._conn.commit()
+        
+        return stats
+    
+    def _restat_known(self, known_files: Dict[str, Tuple[int, float, int]], stats: Dict[str, int]):
+        """Actualiza tamaño/mtime de archivos conocidos de un directorio sin cambios."""
+        updates = []
+        for path, (size, mtime, inode) in known_files.items():
+            try:
+                st = os.stat(path, follow_symlinks=False)
+            except OSError:
+                continue
+            if (st.st_size, st.st_mtime, st.st_ino) != (size, mtime, inode):
+                updates.append((st.st_size, st.st_mtime, st.st_ino, path))
+        if updates:
+            self._conn.executemany(
+                "UPDATE files SET size = ?, mtime = ?, inode = ? WHERE path = ?", updates)
+            stats['files_updated'] += len(updates)
+    
+    def _scan_directory(self, directory: str, dir_stat: os.stat_result,
+                        known_files: Dict[str, Tuple[int, float, int]],
+                        pending: List[str], stats: Dict[str, int]):
+        """Relee un directorio que cambió y aplica las diferencias."""
+        current: Dict[str, Tuple[str, int, float, int]] = {}
+        subdirs = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name not in self.skip_dirs:
+                                subdirs.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            st = entry.stat(follow_symlinks=False)
+                            current[entry.path] = (entry.name, st.st_size, st.st_mtime, st.st_ino)
+                    except OSError:
+                        continue
+        except OSError:
+            # Sin permisos: se indexa como vacío
+            pass
+        
+        added = [(p, directory, n, s, m, i) for p, (n, s, m, i) in current.items() if p not in known_files]
+        changed = [(s, m, i, p) for p, (n, s, m, i) in current.items()
+                   if p in known_files and known_files[p] != (s, m, i)]
+        removed = [(p,) for p in known_files if p not in current]
+        
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO files(path, dir, name, size, mtime, inode) VALUES (?, ?, ?, ?, ?, ?)", added)
+        self._conn.executemany("UPDATE files SET size = ?, mtime = ?, inode = ? WHERE path = ?", changed)
+        self._conn.executemany("DELETE FROM files WHERE path = ?", removed)
+        stats['files_added'] += len(added)
+        stats['files_updated'] += len(changed)
+        stats['files_removed'] += len(removed)
+        
+        # Subdirectorios desaparecidos se eliminan al final de update()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO dirs(path, parent, mtime_ns) VALUES (?, ?, ?)",
+            (directory, os.path.dirname(directory), dir_stat.st_mtime_ns))
+        pending.extend(subdirs)
+    
+    def last_update(self, root: Union[str, Path]) -> Optional[float]:
+        """Timestamp de la última actualización de `root` (None si nunca)."""
+        root = os.path.abspath(os.path.expanduser(str(root)))
+        with self._lock:
+            row = self._conn.execute("SELECT updated_at FROM roots WHERE path = ?", (root,)).fetchone()
+        return row[0] if row else None
+    
+    def query(self, glob: Optional[str] = None, under: Optional[Union[str, Path]] = None,
+              min_size: Optional[int] = None, max_size: Optional[int] = None,
+              older_than: Optional[float] = None, newer_than: Optional[float] = None,
+              order_by: str = "path", limit: Optional[int] = None) -> List[IndexedFile]:
+        """
+        Consulta el índice.
+        
+        Args:
+            glob: Patrón glob sobre el nombre (o sobre la ruta si contiene '/')
+            under: Limitar a archivos bajo este directorio
+            min_size: Tamaño mínimo en bytes
+            max_size: Tamaño máximo en bytes
+            older_than: Solo archivos no modificados en estos segundos
+            newer_than: Solo archivos modificados en estos segundos
+            order_by: 'path', 'size' (descendente) o 'mtime' (ascendente)
+            limit: Máximo de resultados
+        
+        Returns:
+            Lista de IndexedFile
+        """
+        clauses, params = [], []
+        if glob:
+            clauses.append("path GLOB ?" if '/' in glob else "name GLOB ?")
+            params.append(glob if '/' not in glob or glob.startswith(('/', '*')) else '*/' + glob)
+        if under:
+            lo, hi = self._prefix_range(os.path.abspath(os.path.expanduser(str(under))))
+            clauses.append("path >= ? AND path < ?")
+            params.extend([lo, hi])
+        if min_size is not None:
+            clauses.append("size >= ?")
+            params.append(min_size)
+        if max_size is not None:
+            clauses.append("size <= ?")
+            params.append(max_size)
+        now = time.time()
+        if older_than is not None:
+            clauses.append("mtime < ?")
+            params.append(now - older_than)
+        if newer_than is not None:
+            clauses.append("mtime >= ?")
+            params.append(now - newer_than)
+        
+        order = {'path': 'path', 'size': 'size DESC', 'mtime': 'mtime'}.get(order_by, 'path')
+        sql = "SELECT path, size, mtime, inode FROM files"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += f" ORDER BY {order}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [IndexedFile(*row) for row in rows]
+    
+    def large_files(self, min_size_mb: float, under: Optional[Union[str, Path]] = None,
+                    limit: Optional[int] = None) -> List[IndexedFile]:
+        """Archivos mayores que `min_size_mb`, de mayor a menor."""
+        return self.query(under=under, min_size=int(min_size_mb * 1024 * 1024),
+                          order_by='size', limit=limit)
+    
+    def stale_files(self, days: float, under: Optional[Union[str, Path]] = None,
+                    limit: Optional[int] = None) -> List[IndexedFile]:
+        """Archivos sin modificar en los últimos `days` días, más antiguos primero."""
+        return self.query(under=under, older_than=days * 86400, order_by='mtime', limit=limit)
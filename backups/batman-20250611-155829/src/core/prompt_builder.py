@@ -0,0 +1,332 @@
+"""
+Ensamblador de prompts con presupuesto de tokens para Batman Incorporated.
+Estima el tamaño de cada sección, reparte el presupuesto por prioridad,
+recorta los archivos de contexto quedándose con los bloques (funciones,
+clases) que mencionan la tarea y omite lo que ya aparece en el prompt.
+"""
+
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from core.file_cache import FileCache, get_file_cache
+from integrations.knowledge_index import estimate_tokens, tokenize
+
+
+DEFAULT_BUDGET_TOKENS = 8000
+
+# Tope por archivo aunque sobre presupuesto, y mínimo para que merezca la pena
+MAX_FILE_CHARS = 10000
+MIN_FILE_CHARS = 400
+
+TRUNCATED = "... (truncado)"
+
+# Líneas más cortas no se deduplican (llaves, `return`, separadores...)
+MIN_DEDUPE_LINE = 24
+
+# Inicio de un símbolo: def/class de Python, funciones y clases de JS/TS,
+# funciones de Go/Rust/shell. Los decoradores se quedan con su símbolo.
+_SYMBOL = re.compile(
+    r'(?:@\w|(?:async\s+)?def\s|class\s|(?:export\s+)?(?:default\s+)?(?:async\s+)?function\b'
+    r'|(?:export\s+)?(?:const|let)\s+\w+\s*=\s*(?:async\s*)?\(|func\s|(?:pub\s+)?fn\s|impl\b|\w+\s*\(\)\s*\{)'
+)
+
+
+def task_keywords(task) -> Set[str]:
+    """Tokens de título, descripción y tags de la tarea."""
+    return set(tokenize(" ".join([task.title, task.description] + list(task.tags))))
+
+
+def _symbol_blocks(lines: List[str], start: int, end: int, indent: str = "") -> List[Tuple[int, int]]:
+    """
+    Divide las líneas [start, end) en bloques que empiezan en un símbolo
+    con la indentación dada. Lo anterior al primer símbolo (imports,
+    docstring del módulo) queda como primer bloque.
+    """
+    blocks = []
+    block_start = start
+    for i in range(start, end):
+        line = lines[i]
+        if not line.startswith(indent) or line[len(indent):len(indent) + 1].isspace():
+            continue
+        if not _SYMBOL.match(line[len(indent):]) or i == block_start:
+            continue
+        previous = lines[i - 1].strip()
+        if previous.startswith('@'):
+            continue
+        blocks.append((block_start, i))
+        block_start = i
+    blocks.append((block_start, end))
+    return blocks
+
+
+def _expand_large_blocks(lines: List[str], blocks: List[Tuple[int, int]],
+                         max_chars: int) -> List[Tuple[int, int]]:
+    """Parte las clases que no caben en métodos (un nivel)."""
+    result = []
+    for start, end in blocks:
+        size = sum(len(line) + 1 for line in lines[start:end])
+        inner = next((line for line in lines[start + 1:end] if line.strip()), "")
+        indent = inner[:len(inner) - len(inner.lstrip())]
+        if size <= max_chars or not indent or lines[start].startswith((' ', '\t')):
+            result.append((start, end))
+            continue
+        result.extend(_symbol_blocks(lines, start, end, indent))
+    return result
+
+
+def _head(content: str, max_chars: int) -> str:
+    return content[:max(max_chars - len(TRUNCATED) - 1, 0)] + "\n" + TRUNCATED
+
+
+def excerpt(content: str, keywords: Iterable[str], max_chars: int = MAX_FILE_CHARS) -> str:
+    """
+    Recorta un archivo a `max_chars` caracteres por relevancia.
+    
+    Divide el contenido en símbolos, puntúa cada uno por las apariciones
+    de `keywords` (la firma cuenta el triple) y conserva los mejores en su
+    orden original, marcando los huecos. Sin coincidencias se queda con el
+    principio del archivo.
+    
+    Args:
+        content: Contenido del archivo
+        keywords: Tokens de la tarea (ver `task_keywords`)
+        max_chars: Tamaño máximo del extracto
+    
+    Returns:
+        El contenido completo si cabe, o el extracto terminado en
+        "... (truncado)"
+    """
+    if len(content) <= max_chars:
+        return content
+    
+    keywords = set(keywords)
+    lines = content.split("\n")
+    blocks = _expand_large_blocks(lines, _symbol_blocks(lines, 0, len(lines)), max_chars // 2)
+    
+    scored = []
+    for index, (start, end) in enumerate(blocks):
+        signature = tokenize(lines[start])
+        tokens = tokenize("\n".join(lines[start + 1:end]))
+        score = 3 * sum(t in keywords for t in signature) + sum(t in keywords for t in tokens)
+        size = sum(len(line) + 1 for line in lines[start:end])
+        scored.append((score, index, size))
+    
+    # Hueco para los marcadores de omisión y el de truncado
+    room = max_chars - len(TRUNCATED) - 1
+    chosen = set()
+    for score, index, size in sorted(scored, key=lambda item: (-item[0], item[1])):
+        if score == 0:
+            break
+        if size + 40 <= room:
+            chosen.add(index)
+            room -= size + 40
+    if not chosen:
+        return _head(content, max_chars)
+    
+    # El preámbulo (imports) si aún cabe
+    if 0 not in chosen and scored[0][2] + 40 <= room:
+        chosen.add(0)
+    
+    parts = []
+    next_line = 0
+    for index in sorted(chosen):
+        start, end = blocks[index]
+        if start > next_line:
+            parts.append(f"... ({start - next_line} líneas omitidas)")
+        parts.extend(lines[start:end])
+        next_line = end
+    parts.append(TRUNCATED)
+    return "\n".join(parts)
+
+
+@dataclass
+class PromptSection:
+    """
+    Sección del prompt.
+    
+    Las secciones fijas (`text`) entran enteras o no entran; las elásticas
+    (`render`) se generan para los tokens que se les asignen, a partir de
+    `min_tokens`.
+    """
+    name: str
+    text: str = ""
+    priority: int = 0
+    required: bool = False
+    dedupe: bool = False
+    render: Optional[Callable[[int], str]] = None
+    min_tokens: int = 0
+
+
+class ContextFiles:
+    """
+    Archivos de contexto como sección elástica del prompt.
+    
+    Lee a través de la caché compartida de archivos (`core.file_cache`),
+    omite rutas repetidas y archivos con el mismo contenido, reparte los
+    caracteres disponibles entre los archivos (lo que no usa uno pequeño
+    pasa a los demás) y recorta cada uno con `excerpt`.
+    """
+    
+    def __init__(self, paths: Iterable[str], keywords: Iterable[str] = (),
+                 max_file_chars: int = MAX_FILE_CHARS, cache: Optional[FileCache] = None):
+        cache = cache if cache is not None else get_file_cache()
+        self.keywords = set(keywords)
+        self.max_file_chars = max_file_chars
+        self.files: List[Tuple[str, str]] = []
+        self.skipped: List[str] = []
+        
+        seen_paths: Set[Path] = set()
+        seen_hashes: Set[str] = set()
+        for file_path in paths:
+            path = Path(file_path)
+            if not path.exists():
+                continue
+            resolved = path.resolve()
+            if resolved in seen_paths:
+                continue
+            seen_paths.add(resolved)
+            try:
+                cached = cache.read(file_path)
+            except Exception as e:
+                self.files.append((file_path, f"Error leyendo archivo: {e}"))
+                continue
+            if cached.sha1 in seen_hashes:
+                self.skipped.append(file_path)
+                continue
+            seen_hashes.add(cached.sha1)
+            self.files.append((file_path, cached.text))
+    
+    def __bool__(self) -> bool:
+        return bool(self.files)
+    
+    def _allocate(self, max_chars: Optional[int]) -> Dict[str, int]:
+        """
+        Caracteres por archivo. Los pequeños ceden lo que no usan; si el
+        reparto deja algún archivo por debajo del mínimo, se descartan los
+        últimos (los menos relevantes) y se reparte de nuevo.
+        """
+        sizes = {path: min(len(content), self.max_file_chars) for path, content in self.files}
+        files = [path for path, _ in self.files]
+        if max_chars is None:
+            return sizes
+        while files:
+            remaining = max_chars - sum(len(path) + 40 for path in files)
+            allowance = {}
+            pending = sorted(files, key=sizes.get)
+            while pending:
+                path = pending.pop(0)
+                allowance[path] = max(min(sizes[path], remaining // (len(pending) + 1)), 0)
+                remaining -= allowance[path]
+            if all(allowance[path] >= min(MIN_FILE_CHARS, sizes[path]) for path in files):
+                return allowance
+            files.pop()
+        return {}
+    
+    def render(self, max_tokens: Optional[int] = None) -> str:
+        """
+        Sección "## Contexto del Proyecto" en `max_tokens` (sin límite
+        global si es None; cada archivo sigue limitado a `max_file_chars`).
+        """
+        allowance = self._allocate(None if max_tokens is None else max_tokens * 4 - 30)
+        parts = ["## Contexto del Proyecto"]
+        for path, content in self.files:
+            if path not in allowance:
+                continue
+            parts.append(f"\n### Archivo: {path}")
+            parts.append("```")
+            parts.append(excerpt(content, self.keywords, allowance[path]))
+            parts.append("```")
+        if len(parts) == 1:
+            return ""
+        parts.append("")
+        return "\n".join(parts)
+    
+    @property
+    def min_tokens(self) -> int:
+        """Tokens para incluir al menos el primer archivo."""
+        path, content = self.files[0]
+        return estimate_tokens("x" * (min(len(content), MIN_FILE_CHARS) + len(path) + 60))
+
+
+class PromptBuilder:
+    """
+    Ensambla secciones en un presupuesto de tokens.
+    
+    Las secciones obligatorias entran siempre. El resto se admite por
+    prioridad (menor número, más importante) mientras quepa su tamaño
+    mínimo, y lo que sobra se reparte entre las elásticas en el mismo
+    orden. Las secciones con `dedupe` pierden las líneas que ya aparecen
+    en secciones anteriores. El resultado conserva el orden de inserción.
+    """
+    
+    def __init__(self, budget_tokens: int = DEFAULT_BUDGET_TOKENS):
+        self.budget_tokens = budget_tokens
+        self.sections: List[PromptSection] = []
+        # Tokens usados por sección y secciones que no entraron
+        self.usage: Dict[str, int] = {}
+        self.dropped: List[str] = []
+    
+    def add(self, name: str, text: str = "", priority: int = 0, required: bool = False,
+            dedupe: bool = False, render: Optional[Callable[[int], str]] = None,
+            min_tokens: int = 0) -> 'PromptBuilder':
+        self.sections.append(PromptSection(name, text, priority, required, dedupe, render, min_tokens))
+        return self
+    
+    @staticmethod
+    def _dedupe(text: str, seen: Set[str]) -> str:
+        kept = []
+        for line in text.split("\n"):
+            key = " ".join(line.split())
+            if len(key) >= MIN_DEDUPE_LINE and not key.startswith('#') and key in seen:
+                continue
+            kept.append(line)
+        return "\n".join(kept)
+    
+    def build(self) -> str:
+        """Prompt final; rellena `usage` y `dropped`."""
+        self.usage = {}
+        self.dropped = []
+        
+        # Deduplicación en orden de aparición
+        seen: Set[str] = set()
+        texts: Dict[int, str] = {}
+        for i, section in enumerate(self.sections):
+            if section.render is not None:
+                continue
+            text = self._dedupe(section.text, seen) if section.dedupe else section.text
+            texts[i] = text
+            seen.update(" ".join(line.split()) for line in text.split("\n"))
+        
+        remaining = self.budget_tokens
+        admitted: Set[int] = set()
+        for i, section in enumerate(self.sections):
+            if section.required:
+                admitted.add(i)
+                remaining -= estimate_tokens(texts[i])
+        
+        optional = sorted((i for i, s in enumerate(self.sections) if not s.required),
+                          key=lambda i: (self.sections[i].priority, i))
+        for i in optional:
+            section = self.sections[i]
+            cost = section.min_tokens if section.render else estimate_tokens(texts[i])
+            if cost <= remaining:
+                admitted.add(i)
+                remaining -= cost
+            else:
+                self.dropped.append(section.name)
+        
+        for i in optional:
+            section = self.sections[i]
+            if i not in admitted or section.render is None:
+                continue
+            texts[i] = section.render(section.min_tokens + max(remaining, 0))
+            remaining -= estimate_tokens(texts[i]) - section.min_tokens
+        
+        parts = []
+        for i, section in enumerate(self.sections):
+            if i in admitted and texts[i]:
+                parts.append(texts[i])
+                self.usage[section.name] = estimate_tokens(texts[i])
+        return "\n".join(parts)
@@ -0,0 +1,569 @@
+"""
+Planificación de tareas según la cuota de Claude.
+Reserva prompts por tarea (estimados con el historial por tipo de tarea),
+reparte los lanzamientos a lo largo de la ventana de 5 horas y difiere
+las tareas de baja prioridad al siguiente período.
+El uso se lleva en un registro append-only compartido con claude-quota-monitor.
+"""
+
+import fcntl
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from core.task import Task, TaskPriority
+
+
+# Mismos valores que claude-quota-monitor (ventana de 5h, plan Max 20x)
+QUOTA_PERIOD = 5 * 60 * 60
+DEFAULT_QUOTA_DIR = Path.home() / '.config' / 'claude-code'
+DEFAULT_BUDGET = 500
+
+# Registro de prompts compartido con claude-quota-monitor (mismo formato)
+LEDGER_FILE = 'quota_ledger.jsonl'
+LEDGER_BASE_FILE = 'quota_ledger.base.json'
+LEDGER_LOCK_FILE = 'quota_ledger.lock'
+SUMMARY_FILE = 'quota_tracking.json'
+HISTORY_FILE = 'quota_history.jsonl'
+COMPACT_BYTES = 64 * 1024
+HISTORY_RETENTION = 30 * 24 * 60 * 60
+
+# Fracción del presupuesto del período que puede consumir cada prioridad;
+# lo que queda por encima se reserva para las prioridades superiores
+DEFAULT_PRIORITY_SHARES = {
+    TaskPriority.TRIVIAL: 0.4,
+    TaskPriority.LOW: 0.6,
+    TaskPriority.MEDIUM: 0.85,
+    TaskPriority.HIGH: 1.0,
+    TaskPriority.CRITICAL: None,  # sin límite: nunca se difiere
+}
+
+
+def _empty_state(period_start: Optional[float]) -> Dict[str, Any]:
+    return {
+        'period_start': period_start,
+        'prompt_count': 0,
+        'opus_count': 0,
+        'sonnet_count': 0,
+        'model_switches': [],
+        'morning_activation': None
+    }
+
+
+def _fold(state: Dict[str, Any], event: Dict[str, Any], period: int) -> Optional[Dict[str, Any]]:
+    """
+    Aplica un evento del registro al estado del período.
+    
+    Returns:
+        Estadísticas del período que este evento cierra (None si no cierra ninguno)
+    """
+    ts = event.get('ts', 0)
+    kind = event.get('event', 'prompt')
+    start = state['period_start']
+    closed = None
+    
+    if kind == 'reset' or start is None or ts - start >= period:
+        if state['prompt_count']:
+            closed = {'period_end': ts if kind == 'reset' else min(ts, start + period),
+                      'stats': dict(state)}
+        state.clear()
+        state.update(_empty_state(ts))
+    
+    if kind == 'prompt':
+        count = int(event.get('n', 1))
+        state['prompt_count'] += count
+        key = 'opus_count' if event.get('model', 'opus') == 'opus' else 'sonnet_count'
+        state[key] += count
+        if event.get('morning') and state['prompt_count'] == count:
+            state['morning_activation'] = ts
+    return closed
+
+
+class QuotaLedger:
+    """
+    Registro append-only de prompts, compartido entre procesos.
+    
+    Cada evento es una línea JSON escrita con un único write() sobre un
+    descriptor O_APPEND: los escritores concurrentes (agentes en paralelo,
+    claude-quota) nunca se pisan ni leen-modifican-escriben nada. Solo
+    toman un flock compartido sobre el registro, que únicamente la
+    compactación excluye. El estado del período se deriva de:
+    - la base compactada (quota_ledger.base.json)
+    - los segmentos rotados aún sin compactar (quota_ledger.*.seg)
+    - el registro activo (quota_ledger.jsonl)
+    
+    quota_tracking.json es una caché del resumen con el formato de siempre;
+    guarda hasta qué byte del registro activo está incluido, así cada
+    lectura solo procesa los eventos nuevos.
+    
+    Compactar rota el registro activo a un segmento y, con un flock no
+    bloqueante (un solo compactador a la vez), pliega los segmentos en la
+    base y archiva los períodos cerrados en quota_history.jsonl.
+    """
+    
+    def __init__(self, directory: Union[str, Path] = DEFAULT_QUOTA_DIR,
+                 period: int = QUOTA_PERIOD, compact_bytes: int = COMPACT_BYTES):
+        self.dir = Path(directory).expanduser()
+        self.period = period
+        self.compact_bytes = compact_bytes
+        self.ledger_file = self.dir / LEDGER_FILE
+        self.base_file = self.dir / LEDGER_BASE_FILE
+        self.summary_file = self.dir / SUMMARY_FILE
+        self.history_file = self.dir / HISTORY_FILE
+    
+    # --- Escritura -----------------------------------------------------------
+    
+    def append(self, event: str = 'prompt', **data) -> int:
+        """
+        Añade un evento al registro activo.
+        
+        Returns:
+            Tamaño del registro activo tras la escritura
+        """
+        record = {'ts': time.time(), 'event': event}
+        record.update(data)
+        line = (json.dumps(record, separators=(',', ':')) + "\n").encode('utf-8')
+        
+        self.dir.mkdir(parents=True, exist_ok=True)
+        while True:
+            fd = os.open(self.ledger_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_SH)
+                # Si se rotó entre open y flock, escribir en el registro nuevo
+                if os.fstat(fd).st_ino == os.stat(self.ledger_file).st_ino:
+                    os.write(fd, line)
+                    return os.fstat(fd).st_size
+            except FileNotFoundError:
+                pass
+            finally:
+                os.close(fd)
+    
+    def record(self, count: int = 1, model: str = 'opus', morning: bool = False):
+        """Registra prompts; compacta al cambiar de período o si el registro crece."""
+        if count <= 0:
+            return
+        current = self._current_state()
+        rolled = current['period_start'] is None or time.time() - current['period_start'] >= self.period
+        
+        data = {'n': count, 'model': model}
+        if morning:
+            data['morning'] = True
+        size = self.append('prompt', **data)
+        if rolled or size >= self.compact_bytes:
+            self.compact()
+    
+    def reset(self):
+        """Cierra el período actual manualmente."""
+        self.append('reset')
+        self.compact()
+    
+    # --- Lectura -------------------------------------------------------------
+    
+    def summary(self) -> Dict[str, Any]:
+        """
+        Estado del período actual (claves de quota_tracking.json).
+        
+        Si el período expiró, devuelve uno vacío que empieza ahora: el
+        siguiente prompt abrirá el nuevo período.
+        """
+        state = self._current_state()
+        if state['period_start'] is None or time.time() - state['period_start'] >= self.period:
+            return _empty_state(time.time())
+        return state
+    
+    def _current_state(self) -> Dict[str, Any]:
+        # Base y segmentos deben leerse de la misma versión: si una
+        # compactación termina en medio, se vuelve a leer
+        base = self._load_base()
+        while True:
+            segments = {}
+            for path in self._segments(base):
+                try:
+                    segments[path.name] = path.stat().st_size
+                except OSError:
+                    pass  # compactado entre glob y stat
+            latest = self._load_base()
+            if latest['version'] == base['version']:
+                break
+            base = latest
+        
+        try:
+            stat = os.stat(self.ledger_file)
+            inode, size = stat.st_ino, stat.st_size
+        except OSError:
+            inode, size = None, 0
+        
+        key = {'base_version': base['version'], 'segments': segments, 'inode': inode}
+        cache = self._load_json(self.summary_file) or {}
+        position = cache.pop('_ledger', None) or {}
+        cached_key = {k: position.get(k) for k in key}
+        offset = position.get('offset', 0)
+        
+        if cached_key == key and offset <= size:
+            state = cache
+        else:
+            state, offset = dict(base['state']), 0
+            for name in segments:
+                for event in self._read_events(self.dir / name)[0]:
+                    _fold(state, event, self.period)
+        
+        if inode is not None and offset < size:
+            events, offset = self._read_events(self.ledger_file, offset)
+            for event in events:
+                _fold(state, event, self.period)
+        
+        if cached_key != key or position.get('offset') != offset:
+            key['offset'] = offset
+            self._write_json(self.summary_file, dict(state, _ledger=key))
+        return state
+    
+    def _load_base(self) -> Dict[str, Any]:
+        base = self._load_json(self.base_file)
+        if base is not None:
+            return base
+        # Migración: un quota_tracking.json sin registro es el estado de partida
+        legacy = self._load_json(self.summary_file)
+        state = _empty_state(None)
+        if legacy and '_ledger' not in legacy:
+            state.update({k: legacy[k] for k in state if k in legacy})
+        base = {'version': 0, 'state': state, 'folded': []}
+        if not self._create_json(self.base_file, base):
+            # Otro proceso la creó (o ya compactó): no sobrescribirla
+            return self._load_json(self.base_file) or base
+        return base
+    
+    def _segments(self, base: Dict[str, Any]) -> List[Path]:
+        """Segmentos rotados aún no plegados en la base, en orden de rotación."""
+        folded = set(base['folded'])
+        return [path for path in sorted(self.dir.glob('quota_ledger.*.seg'))
+                if path.name not in folded]
+    
+    @staticmethod
+    def _read_events(path: Path, offset: int = 0):
+        """Eventos desde `offset` hasta la última línea completa (y el nuevo offset)."""
+        try:
+            with open(path, 'rb') as f:
+                f.seek(offset)
+                data = f.read()
+        except OSError:
+            return [], offset
+        
+        end = data.rfind(b"\n") + 1
+        events = []
+        for line in data[:end].splitlines():
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                continue
+        return events, offset + end
+    
+    # --- Compactación --------------------------------------------------------
+    
+    def compact(self):
+        """Rota el registro activo y pliega en la base los segmentos cerrados."""
+        self.dir.mkdir(parents=True, exist_ok=True)
+        with open(self.dir / LEDGER_LOCK_FILE, 'a') as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                return  # otro proceso está compactando
+            
+            try:
+                if os.path.getsize(self.ledger_file):
+                    os.rename(self.ledger_file, self.dir / f"quota_ledger.{time.time_ns():020d}.seg")
+            except OSError:
+                pass
+            
+            base = self._load_base()
+            state = dict(base['state'])
+            folded = [name for name in base['folded'] if (self.dir / name).exists()]
+            closed_periods = []
+            
+            for path in self._segments(base):
+                with open(path, 'rb') as segment:
+                    # Esperar a los escritores que abrieron el registro antes de rotarlo
+                    fcntl.flock(segment, fcntl.LOCK_EX)
+                    for event in self._read_events(path)[0]:
+                        closed = _fold(state, event, self.period)
+                        if closed:
+                            closed_periods.append(closed)
+                folded.append(path.name)
+            
+            if folded == base['folded']:
+                return
+            if closed_periods:
+                self._archive(closed_periods)
+            self._write_json(self.base_file, {'version': base['version'] + 1,
+                                              'state': state, 'folded': folded})
+            for name in folded:
+                try:
+                    (self.dir / name).unlink()
+                except OSError:
+                    pass
+    
+    def _archive(self, periods: List[Dict[str, Any]]):
+        """Añade períodos cerrados al historial (requiere el lock de compactación)."""
+        history, _ = self._read_events(self.history_file)
+        cutoff = time.time() - HISTORY_RETENTION
+        if history and history[0].get('period_end', 0) < cutoff:
+            # Reescribir sin los períodos caducados (ni duplicados de una compactación cortada)
+            seen = set()
+            kept = []
+            for entry in history + periods:
+                start = entry['stats'].get('period_start')
+                if entry.get('period_end', 0) > cutoff and start not in seen:
+                    seen.add(start)
+                    kept.append(entry)
+            tmp = self.history_file.with_suffix(f'.{os.getpid()}.tmp')
+            tmp.write_text(''.join(json.dumps(entry) + "\n" for entry in kept))
+            os.replace(tmp, self.history_file)
+        else:
+            with open(self.history_file, 'a') as f:
+                f.write(''.join(json.dumps(entry) + "\n" for entry in periods))
+    
+    @staticmethod
+    def _load_json(path: Path) -> Optional[Dict[str, Any]]:
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    @staticmethod
+    def _create_json(path: Path, data: Dict[str, Any]) -> bool:
+        """Crea el archivo solo si no existe (os.link no sobrescribe)."""
+        tmp = path.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp, 'w') as f:
+                json.dump(data, f, indent=2)
+            os.link(tmp, path)
+            return True
+        except OSError:
+            return False
+        finally:
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+    
+    @staticmethod
+    def _write_json(path: Path, data: Dict[str, Any]):
+        """Reemplazo atómico; un fallo solo deja la caché sin actualizar."""
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+            with open(tmp, 'w') as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp, path)
+        except OSError:
+            pass
+
+
+class QuotaUsage:
+    """
+    Uso de prompts del período actual.
+    
+    Usa el mismo registro que claude-quota-monitor, así `claude-quota`
+    muestra también los prompts lanzados por Batman.
+    """
+    
+    def __init__(self, quota_dir: Union[str, Path] = DEFAULT_QUOTA_DIR,
+                 period: int = QUOTA_PERIOD):
+        self.ledger = QuotaLedger(quota_dir, period)
+        self.period = period
+    
+    def snapshot(self) -> Dict[str, float]:
+        """
+        Estado del período actual.
+        
+        Returns:
+            Dict con period_start, used, elapsed y remaining (segundos)
+        """
+        state = self.ledger.summary()
+        elapsed = time.time() - state['period_start']
+        return {
+            'period_start': state['period_start'],
+            'used': state['prompt_count'],
+            'elapsed': elapsed,
+            'remaining': self.period - elapsed,
+        }
+    
+    def record_prompts(self, count: int = 1, model: str = 'opus'):
+        """Suma prompts al período actual (abriendo uno nuevo si expiró)."""
+        self.ledger.record(count, model)
+
+
+class PromptHistory:
+    """
+    Prompts consumidos por tarea, agrupados por tipo de tarea.
+    
+    Guarda las últimas `window` muestras por tipo y estima con un
+    percentil alto para no quedarse corto al reservar.
+    """
+    
+    def __init__(self, path: Union[str, Path], window: int = 50,
+                 default_estimate: int = 3, percentile: float = 0.8):
+        self.path = Path(path).expanduser()
+        self.window = window
+        self.default_estimate = default_estimate
+        self.percentile = percentile
+        self._lock = threading.Lock()
+        self._samples: Dict[str, List[int]] = {}
+        try:
+            with open(self.path, 'r') as f:
+                self._samples = {k: list(v) for k, v in json.load(f).items()}
+        except (OSError, ValueError):
+            pass
+    
+    def estimate(self, task: Task) -> int:
+        """Prompts que se espera que consuma la tarea."""
+        samples = self._samples.get(task.type.value)
+        if not samples:
+            return self.default_estimate
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(self.percentile * len(ordered)))
+        return max(1, ordered[index])
+    
+    def record(self, task: Task, prompts: int):
+        """Añade una muestra y persiste el historial."""
+        with self._lock:
+            samples = self._samples.setdefault(task.type.value, [])
+            samples.append(prompts)
+            del samples[:-self.window]
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = self.path.with_suffix('.tmp')
+                tmp.write_text(json.dumps(self._samples))
+                os.replace(tmp, self.path)
+            except OSError:
+                pass
+
+
+@dataclass
+class QuotaDecision:
+    """Resultado de consultar la cuota antes de lanzar una tarea."""
+    action: str          # run, wait o defer
+    estimate: int = 0
+    delay: float = 0.0   # segundos a esperar (wait) o hasta el próximo período (defer)
+    reason: str = ""
+    
+    @property
+    def can_run(self) -> bool:
+        return self.action == 'run'
+
+
+class QuotaScheduler:
+    """
+    Decide si una tarea se lanza ya, espera o se difiere al próximo período.
+    
+    - Reserva: cada tarea admitida reserva su estimación hasta que se
+      registra su consumo real, así las tareas en curso cuentan.
+    - Ritmo: LOW y MEDIUM siguen una curva lineal de consumo a lo largo de
+      la ventana (más una ráfaga inicial `burst`) para no gastar toda la
+      cuota en la primera hora.
+    - Prioridad: cada prioridad solo puede llenar su fracción del
+      presupuesto; CRITICAL nunca se difiere.
+    """
+    
+    def __init__(self, config: Optional[Dict[str, Any]] = None,
+                 usage: Optional[QuotaUsage] = None,
+                 history: Optional[PromptHistory] = None):
+        """
+        Inicializa el planificador.
+        
+        Args:
+            config: budget, burst, max_wait, priority_shares, quota_dir,
+                history_file y default_task_prompts
+            usage: Fuente del uso del período actual
+            history: Historial de prompts por tipo de tarea
+        """
+        config = config or {}
+        self.enabled = config.get('enabled', True)
+        self.budget = int(config.get('budget', DEFAULT_BUDGET))
+        self.burst = float(config.get('burst', 0.2))
+        self.max_wait = float(config.get('max_wait', 900))
+        self.shares = dict(DEFAULT_PRIORITY_SHARES)
+        for name, share in (config.get('priority_shares') or {}).items():
+            self.shares[TaskPriority[name.upper()]] = share
+        
+        self.usage = usage or QuotaUsage(config.get('quota_dir', DEFAULT_QUOTA_DIR))
+        self.history = history or PromptHistory(
+            config.get('history_file', '~/.glados/batman-incorporated/cache/prompt_history.json'),
+            default_estimate=config.get('default_task_prompts', 3)
+        )
+        self._reserved: Dict[str, int] = {}
+        self._lock = threading.Lock()
+    
+    @property
+    def reserved(self) -> int:
+        with self._lock:
+            return sum(self._reserved.values())
+    
+    def decide(self, task: Task) -> QuotaDecision:
+        """
+        Consulta la cuota para una tarea.
+        
+        Args:
+            task: Tarea a lanzar
+        
+        Returns:
+            QuotaDecision con la acción a tomar
+        """
+        estimate = self.history.estimate(task)
+        if not self.enabled:
+            return QuotaDecision('run', estimate)
+        
+        period = self.usage.snapshot()
+        committed = period['used'] + self.reserved + estimate
+        share = self.shares.get(task.priority, 1.0)
+        
+        if share is None:
+            return QuotaDecision('run', estimate, reason="prioridad crítica")
+        
+        if committed > self.budget * share:
+            return QuotaDecision(
+                'defer', estimate, delay=period['remaining'],
+                reason=f"cuota de prioridad {task.priority.name} agotada "
+                       f"({period['used']}+{self.reserved} de {self.budget * share:.0f})"
+            )
+        
+        if task.priority.value < TaskPriority.HIGH.value:
+            # Curva de consumo permitido hasta ahora
+            allowed = self.budget * (self.burst + period['elapsed'] / self.usage.period)
+            if committed > allowed:
+                ready_at = (committed / self.budget - self.burst) * self.usage.period
+                delay = ready_at - period['elapsed']
+                if delay > period['remaining']:
+                    return QuotaDecision('defer', estimate, delay=period['remaining'],
+                                         reason="no cabe en el ritmo de este período")
+                return QuotaDecision('wait', estimate, delay=min(delay, self.max_wait),
+                                     reason="ritmo de consumo por encima de lo previsto")
+        
+        return QuotaDecision('run', estimate)
+    
+    def reserve(self, task: Task, estimate: int):
+        """Reserva la estimación de una tarea admitida."""
+        with self._lock:
+            self._reserved[task.id] = estimate
+    
+    def settle(self, task: Task, prompts: int, model: str = 'opus'):
+        """Libera la reserva y registra el consumo real de la tarea."""
+        with self._lock:
+            self._reserved.pop(task.id, None)
+        self.usage.record_prompts(prompts, model)
+        self.history.record(task, prompts)
+    
+    def status(self) -> Dict[str, Any]:
+        """Resumen del período para mostrar en el estado del sistema."""
+        period = self.usage.snapshot()
+        return {
+            'used': period['used'],
+            'reserved': self.reserved,
+            'budget': self.budget,
+            'remaining_seconds': period['remaining'],
+        }
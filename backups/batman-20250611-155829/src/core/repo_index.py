@@ -0,0 +1,352 @@
+"""
+Índice de símbolos del repositorio para Batman Incorporated.
+Recorre el proyecto con FileIndex (incremental por mtime), extrae de cada
+archivo de código sus símbolos de nivel superior, imports y docstrings
+(`ast` para Python, expresiones regulares para JS/TS) y puntúa con BM25
+qué archivos son relevantes para una tarea.
+"""
+
+import ast
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+from core.file_index import SKIP_DIRS, FileIndex
+from integrations.knowledge_index import tokenize
+
+
+DEFAULT_INDEX_PATH = Path.home() / ".glados" / "batman-incorporated" / "cache" / "repo_index.db"
+
+LANGUAGES = {
+    '.py': 'python',
+    '.js': 'javascript', '.jsx': 'javascript', '.mjs': 'javascript', '.cjs': 'javascript',
+    '.ts': 'typescript', '.tsx': 'typescript',
+}
+
+# Archivos mayores no se analizan (generados, minificados...)
+MAX_FILE_SIZE = 512 * 1024
+
+# Peso de los tokens de la ruta y de los nombres de símbolo frente a
+# imports y docstrings
+PATH_WEIGHT = 3
+SYMBOL_WEIGHT = 2
+
+# Parte de la puntuación de un archivo que reciben los módulos que importa
+IMPORT_BOOST = 0.25
+
+_PY_SYMBOL = re.compile(r'^([ \t]*)(?:async[ \t]+)?(def|class)[ \t]+(\w+)', re.M)
+_PY_IMPORT = re.compile(r'^[ \t]*(?:from\s+(\.*[\w.]*)\s+import|import\s+([\w.]+))', re.M)
+
+_JS_SYMBOL = re.compile(
+    r'^[ \t]*(?:export\s+)?(?:default\s+)?(?:declare\s+)?(?:async\s+)?'
+    r'(?:function\s*\*?\s*(?P<function>\w+)'
+    r'|(?:abstract\s+)?class\s+(?P<class>\w+)'
+    r'|(?:const|let|var)\s+(?P<const>\w+)\s*(?::[^=]+)?=\s*(?:async\s+)?(?:function\b|\([^)]*\)\s*(?::[^=]+)?=>|\w+\s*=>)'
+    r'|interface\s+(?P<interface>\w+)'
+    r'|type\s+(?P<type>\w+)\s*(?:<[^>]*>)?\s*='
+    r'|enum\s+(?P<enum>\w+))',
+    re.M
+)
+_JS_IMPORT = re.compile(r'''(?:\bimport\s+(?:[\w*{}\s,]+\s+from\s+)?|\brequire\(\s*|\bimport\(\s*)['"]([^'"]+)['"]''')
+_JS_COMMENT = re.compile(r'/\*\*(.*?)\*/', re.S)
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS sources (
+        path TEXT PRIMARY KEY,
+        root TEXT NOT NULL,
+        lang TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        mtime REAL NOT NULL,
+        length INTEGER NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_sources_root ON sources(root);
+    
+    CREATE TABLE IF NOT EXISTS symbols (
+        path TEXT NOT NULL,
+        name TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        line INTEGER NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_symbols_path ON symbols(path);
+    CREATE INDEX IF NOT EXISTS idx_symbols_name ON symbols(name);
+    
+    CREATE TABLE IF NOT EXISTS imports (
+        path TEXT NOT NULL,
+        module TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_imports_path ON imports(path);
+    
+    CREATE TABLE IF NOT EXISTS terms (
+        term TEXT NOT NULL,
+        path TEXT NOT NULL,
+        tf INTEGER NOT NULL,
+        PRIMARY KEY (term, path)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_terms_path ON terms(path);
+"""
+
+
+def scan_python(text: str) -> Tuple[List[Tuple[str, str, int]], List[str], List[str]]:
+    """
+    Símbolos, imports y docstrings de un módulo Python.
+    
+    Returns:
+        Tupla (símbolos como (nombre, tipo, línea), módulos importados
+        con los puntos de los imports relativos, docstrings)
+    """
+    try:
+        tree = ast.parse(text)
+    except (SyntaxError, ValueError):
+        # Código que no compila: aproximación por expresiones regulares
+        symbols = []
+        for match in _PY_SYMBOL.finditer(text):
+            indent, kind, name = match.groups()
+            if kind == 'def':
+                kind = 'method' if indent else 'function'
+            symbols.append((name, kind, text.count('\n', 0, match.start()) + 1))
+        imports = [a or b for a, b in _PY_IMPORT.findall(text)]
+        return symbols, imports, []
+    
+    symbols, docs = [], [ast.get_docstring(tree) or ""]
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            symbols.append((node.name, 'function', node.lineno))
+            docs.append(ast.get_docstring(node) or "")
+        elif isinstance(node, ast.ClassDef):
+            symbols.append((node.name, 'class', node.lineno))
+            docs.append(ast.get_docstring(node) or "")
+            for item in node.body:
+                if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                    symbols.append((f"{node.name}.{item.name}", 'method', item.lineno))
+    
+    imports = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            imports.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            imports.append("." * node.level + (node.module or ""))
+    return symbols, imports, [doc for doc in docs if doc]
+
+
+def scan_javascript(text: str) -> Tuple[List[Tuple[str, str, int]], List[str], List[str]]:
+    """Símbolos, imports y comentarios JSDoc de un módulo JS/TS (ver `scan_python`)."""
+    symbols = []
+    for match in _JS_SYMBOL.finditer(text):
+        kind = match.lastgroup
+        symbols.append((match.group(kind), 'function' if kind == 'const' else kind,
+                        text.count('\n', 0, match.start()) + 1))
+    return symbols, _JS_IMPORT.findall(text), _JS_COMMENT.findall(text)
+
+
+class RepoIndex:
+    """
+    Índice de archivos de código y sus símbolos, en SQLite.
+    
+    `update` usa FileIndex para saber qué cambió y solo vuelve a analizar
+    esos archivos. `search` puntúa cada archivo con BM25 sobre los tokens
+    de su ruta, símbolos, imports y docstrings, y da un extra a los módulos
+    importados por los mejores resultados.
+    """
+    
+    def __init__(self, db_path: Optional[Union[str, Path]] = None,
+                 skip_dirs: Optional[Set[str]] = None, k1: float = 1.2, b: float = 0.75):
+        """
+        Abre (o crea) el índice.
+        
+        Args:
+            db_path: Ruta del archivo SQLite (compartido con el FileIndex interno)
+            skip_dirs: Nombres de directorio a no recorrer
+            k1: Parámetro de saturación de BM25
+            b: Parámetro de normalización por longitud de BM25
+        """
+        self.db_path = Path(db_path) if db_path else DEFAULT_INDEX_PATH
+        self.k1 = k1
+        self.b = b
+        self.files = FileIndex(self.db_path, skip_dirs=skip_dirs)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+    
+    def close(self):
+        """Cierra las conexiones."""
+        self.files.close()
+        with self._lock:
+            self._conn.close()
+    
+    def update(self, root: Union[str, Path], max_age: Optional[float] = None) -> Dict[str, int]:
+        """
+        Sincroniza el índice con el código bajo `root`.
+        
+        Args:
+            root: Raíz del repositorio
+            max_age: Si la última actualización tiene menos de estos
+                segundos, no se hace nada
+        
+        Returns:
+            Estadísticas: archivos analizados, sin cambios y eliminados
+        """
+        root = os.path.abspath(os.path.expanduser(str(root)))
+        stats = {'parsed': 0, 'unchanged': 0, 'removed': 0}
+        last = self.files.last_update(root)
+        if max_age is not None and last is not None and time.time() - last < max_age:
+            return stats
+        
+        self.files.update(root)
+        current = {f.path: f for f in self.files.query(under=root)
+                   if Path(f.path).suffix in LANGUAGES and f.size <= MAX_FILE_SIZE}
+        
+        with self._lock:
+            known = {path: (size, mtime) for path, size, mtime in self._conn.execute(
+                "SELECT path, size, mtime FROM sources WHERE root = ?", (root,))}
+        
+        for path in known.keys() - current.keys():
+            with self._lock:
+                self._delete(path)
+            stats['removed'] += 1
+        
+        for path, indexed in current.items():
+            if known.get(path) == (indexed.size, indexed.mtime):
+                stats['unchanged'] += 1
+                continue
+            try:
+                with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                    text = f.read()
+            except OSError:
+                continue
+            with self._lock:
+                self._index_file(root, path, indexed.size, indexed.mtime, text)
+            stats['parsed'] += 1
+        
+        with self._lock:
+            self._conn.commit()
+        return stats
+    
+    def _delete(self, path: str):
+        for table in ('sources', 'symbols', 'imports', 'terms'):
+            self._conn.execute(f"DELETE FROM {table} WHERE path = ?", (path,))
+    
+    def _index_file(self, root: str, path: str, size: int, mtime: float, text: str):
+        lang = LANGUAGES[Path(path).suffix]
+        scan = scan_python if lang == 'python' else scan_javascript
+        symbols, imports, docs = scan(text)
+        
+        relative = os.path.splitext(os.path.relpath(path, root))[0]
+        tokens = tokenize(relative.replace(os.sep, ' ')) * PATH_WEIGHT
+        for name, _, _ in symbols:
+            tokens += tokenize(name.replace('.', ' ')) * SYMBOL_WEIGHT
+        for module in imports:
+            tokens += tokenize(module.replace('.', ' ').replace('/', ' '))
+        for doc in docs:
+            tokens += tokenize(doc)
+        counts: Dict[str, int] = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        
+        self._delete(path)
+        self._conn.execute(
+            "INSERT INTO sources(path, root, lang, size, mtime, length) VALUES (?, ?, ?, ?, ?, ?)",
+            (path, root, lang, size, mtime, len(tokens)))
+        self._conn.executemany("INSERT INTO symbols(path, name, kind, line) VALUES (?, ?, ?, ?)",
+                               [(path, name, kind, line) for name, kind, line in symbols])
+        self._conn.executemany("INSERT INTO imports(path, module) VALUES (?, ?)",
+                               [(path, module) for module in set(imports)])
+        self._conn.executemany("INSERT INTO terms(term, path, tf) VALUES (?, ?, ?)",
+                               [(term, path, tf) for term, tf in counts.items()])
+    
+    def symbols(self, path: Union[str, Path]) -> List[Tuple[str, str, int]]:
+        """Símbolos de un archivo indexado como (nombre, tipo, línea)."""
+        with self._lock:
+            return [tuple(row) for row in self._conn.execute(
+                "SELECT name, kind, line FROM symbols WHERE path = ? ORDER BY line",
+                (os.path.abspath(str(path)),))]
+    
+    def imports(self, path: Union[str, Path]) -> List[str]:
+        """Módulos que importa un archivo indexado."""
+        with self._lock:
+            return sorted(module for (module,) in self._conn.execute(
+                "SELECT module FROM imports WHERE path = ?", (os.path.abspath(str(path)),)))
+    
+    def _resolve_imports(self, root: str, path: str, modules: List[str]) -> List[str]:
+        """Rutas indexadas a las que apuntan los imports de `path`."""
+        candidates = []
+        directory = os.path.dirname(path)
+        for module in modules:
+            if Path(path).suffix == '.py':
+                level = len(module) - len(module.lstrip('.'))
+                parts = module.lstrip('.').split('.') if module.strip('.') else []
+                if level:
+                    base = directory
+                    for _ in range(level - 1):
+                        base = os.path.dirname(base)
+                    bases = [os.path.join(base, *parts)]
+                else:
+                    # Absoluto: desde la raíz o desde cualquier directorio `src`
+                    bases = [os.path.join(root, *parts), os.path.join(root, 'src', *parts)]
+                for base in bases:
+                    candidates += [base + '.py', os.path.join(base, '__init__.py')]
+            elif module.startswith('.'):
+                base = os.path.normpath(os.path.join(directory, module))
+                candidates += [base] + [base + suffix for suffix in LANGUAGES if suffix != '.py']
+                candidates += [os.path.join(base, 'index' + suffix) for suffix in ('.js', '.ts', '.tsx')]
+        if not candidates:
+            return []
+        placeholders = ",".join("?" * len(candidates))
+        return [p for (p,) in self._conn.execute(
+            f"SELECT path FROM sources WHERE path IN ({placeholders})", candidates)]
+    
+    def search(self, query: str, root: Union[str, Path], limit: int = 5) -> List[Tuple[str, float]]:
+        """
+        Archivos de `root` más relevantes para `query`.
+        
+        Args:
+            query: Texto de la tarea
+            root: Raíz del repositorio (ya actualizada con `update`)
+            limit: Máximo de resultados
+        
+        Returns:
+            Lista de (ruta absoluta, puntuación), de mayor a menor
+        """
+        root = os.path.abspath(os.path.expanduser(str(root)))
+        terms = sorted(set(tokenize(query)))
+        if not terms:
+            return []
+        
+        with self._lock:
+            n_docs, avg_length = self._conn.execute(
+                "SELECT COUNT(*), AVG(length) FROM sources WHERE root = ?", (root,)).fetchone()
+            if not n_docs:
+                return []
+            avg_length = avg_length or 1.0
+            placeholders = ",".join("?" * len(terms))
+            rows = self._conn.execute(
+                f"SELECT t.term, t.path, t.tf, s.length FROM terms t JOIN sources s ON s.path = t.path "
+                f"WHERE s.root = ? AND t.term IN ({placeholders})", [root] + terms).fetchall()
+            
+            postings: Dict[str, List[Tuple[str, int, int]]] = {}
+            for term, path, tf, length in rows:
+                postings.setdefault(term, []).append((path, tf, length))
+            
+            scores: Dict[str, float] = {}
+            for entries in postings.values():
+                idf = math.log(1 + (n_docs - len(entries) + 0.5) / (len(entries) + 0.5))
+                for path, tf, length in entries:
+                    norm = self.k1 * (1 - self.b + self.b * length / avg_length)
+                    scores[path] = scores.get(path, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+            
+            # Los módulos que usan los mejores resultados suelen hacer falta también
+            top = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+            for path, score in top:
+                modules = [m for (m,) in self._conn.execute(
+                    "SELECT module FROM imports WHERE path = ?", (path,))]
+                for target in self._resolve_imports(root, path, modules):
+                    if target != path:
+                        scores[target] = scores.get(target, 0.0) + IMPORT_BOOST * score
+        
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
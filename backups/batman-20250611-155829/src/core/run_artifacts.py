@@ -0,0 +1,331 @@
+"""
+Almacén de artefactos de ejecución para Batman Incorporated.
+Los prompts y respuestas de Claude se guardan por sesión en un único
+archivo comprimido (zstd si está instalado, gzip si no) con un índice
+SQLite, en lugar de archivos sueltos en /tmp. Las escrituras se hacen en
+un hilo aparte y hay límites de tamaño y retención por antigüedad.
+"""
+
+import atexit
+import gzip
+import json
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from core.task_store import new_session_id
+
+try:
+    import zstandard
+except ImportError:  # Dependencia opcional: sin ella se usa gzip
+    zstandard = None
+
+
+DEFAULT_BASE_DIR = Path.home() / ".glados" / "batman-incorporated" / "artifacts"
+
+DEFAULT_MAX_ARTIFACT_BYTES = 2 * 1024 * 1024
+DEFAULT_MAX_SESSION_BYTES = 200 * 1024 * 1024
+DEFAULT_MAX_TOTAL_BYTES = 1024 * 1024 * 1024
+DEFAULT_RETENTION_DAYS = 7
+
+SUFFIXES = {'zstd': ".zst", 'gzip': ".gz"}
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS sessions (
+        session TEXT PRIMARY KEY,
+        archive TEXT NOT NULL,
+        codec TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        updated_at REAL NOT NULL,
+        bytes INTEGER NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS artifacts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        session TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        name TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        offset INTEGER NOT NULL,
+        length INTEGER NOT NULL,
+        size INTEGER NOT NULL,
+        truncated INTEGER NOT NULL,
+        meta TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_artifacts_session ON artifacts(session);
+    CREATE INDEX IF NOT EXISTS idx_artifacts_name ON artifacts(name);
+"""
+
+
+def _compress(codec: str, data: bytes) -> bytes:
+    if codec == 'zstd':
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def _decompress(codec: str, data: bytes) -> bytes:
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("El paquete 'zstandard' es necesario para leer esta sesión")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class RunArtifactStore:
+    """
+    Artefactos (prompts, respuestas...) comprimidos por sesión.
+    
+    Cada sesión es un archivo `<sesión>.gz` (o `.zst`) en el que cada
+    artefacto es un miembro comprimido independiente: el índice guarda su
+    desplazamiento y tamaño, así que se lee uno sin descomprimir el resto,
+    y el archivo completo sigue siendo legible con `zcat`/`zstdcat`.
+    
+    `put` encola y vuelve enseguida; un hilo escribe en orden. Si una
+    sesión supera `max_session_bytes` los artefactos siguientes se
+    descartan (y se cuentan en `stats`). Las sesiones más antiguas que
+    `retention_days`, o las más viejas cuando el total supera
+    `max_total_bytes`, se borran al abrir el almacén o cambiar de sesión.
+    """
+    
+    def __init__(self, base_dir: Optional[Union[str, Path]] = None, session_id: Optional[str] = None,
+                 compression: str = "auto",
+                 max_artifact_bytes: int = DEFAULT_MAX_ARTIFACT_BYTES,
+                 max_session_bytes: int = DEFAULT_MAX_SESSION_BYTES,
+                 max_total_bytes: int = DEFAULT_MAX_TOTAL_BYTES,
+                 retention_days: float = DEFAULT_RETENTION_DAYS,
+                 asynchronous: bool = True):
+        """
+        Abre (o crea) el almacén.
+        
+        Args:
+            base_dir: Directorio de archivos e índice
+            session_id: Sesión inicial (una nueva si no se indica)
+            compression: 'zstd', 'gzip' o 'auto' (zstd si está instalado)
+            max_artifact_bytes: Tamaño máximo de un artefacto (se trunca)
+            max_session_bytes: Tamaño comprimido máximo de una sesión
+            max_total_bytes: Tamaño comprimido máximo de todas las sesiones
+            retention_days: Días que se conserva una sesión sin escrituras
+            asynchronous: Escribir en un hilo aparte (False para escribir en `put`)
+        """
+        if compression == "auto":
+            compression = 'zstd' if zstandard is not None else 'gzip'
+        if compression not in SUFFIXES:
+            raise ValueError(f"Compresión no soportada: {compression}")
+        if compression == 'zstd' and zstandard is None:
+            raise ValueError("Compresión zstd solicitada pero 'zstandard' no está instalado")
+        
+        self.base_dir = Path(base_dir).expanduser() if base_dir else DEFAULT_BASE_DIR
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        self.codec = compression
+        self.max_artifact_bytes = max_artifact_bytes
+        self.max_session_bytes = max_session_bytes
+        self.max_total_bytes = max_total_bytes
+        self.retention_days = retention_days
+        self.asynchronous = asynchronous
+        self.session_id = session_id or new_session_id()
+        self.stats = {'written': 0, 'dropped': 0, 'truncated': 0, 'errors': 0}
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.base_dir / "index.db"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(_SCHEMA)
+        
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self.prune()
+    
+    # --- Escritura -----------------------------------------------------------
+    
+    def start_session(self, session_id: str):
+        """Los artefactos siguientes van a `session_id`."""
+        self.flush()
+        self.session_id = session_id
+        self.prune()
+    
+    def put(self, kind: str, name: str, text: str, **meta):
+        """
+        Guarda un artefacto en la sesión actual.
+        
+        Args:
+            kind: Tipo ('prompt', 'response'...)
+            name: Identificador (ej: "alfred/<id de tarea>")
+            text: Contenido
+            **meta: Datos adicionales para el índice (serializables a JSON)
+        """
+        entry = (self.session_id, kind, name, time.time(), text, meta)
+        if not self.asynchronous:
+            self._write(entry)
+            return
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._run_writer, name="run-artifacts", daemon=True)
+                self._writer.start()
+        self._queue.put(entry)
+    
+    def flush(self):
+        """Espera a que se escriban los artefactos encolados."""
+        self._queue.join()
+    
+    def close(self):
+        """Escribe lo pendiente y cierra el índice."""
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join()
+            self._writer = None
+        with self._lock:
+            self._conn.close()
+    
+    def _run_writer(self):
+        while True:
+            entry = self._queue.get()
+            try:
+                if entry is None:
+                    return
+                self._write(entry)
+            except Exception:
+                self.stats['errors'] += 1
+            finally:
+                self._queue.task_done()
+    
+    def _write(self, entry: tuple):
+        session, kind, name, created_at, text, meta = entry
+        data = text.encode('utf-8')
+        truncated = len(data) > self.max_artifact_bytes
+        if truncated:
+            # Sin partir un carácter multibyte
+            data = data[:self.max_artifact_bytes].decode('utf-8', 'ignore').encode('utf-8')
+        
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT archive, codec, bytes FROM sessions WHERE session = ?", (session,)).fetchone()
+            archive, codec, used = row if row else (f"{session}{SUFFIXES[self.codec]}", self.codec, 0)
+            frame = _compress(codec, data)
+            if used + len(frame) > self.max_session_bytes:
+                self.stats['dropped'] += 1
+                return
+            
+            with open(self.base_dir / archive, 'ab') as f:
+                offset = f.tell()
+                f.write(frame)
+            
+            self._conn.execute(
+                "INSERT INTO artifacts(session, kind, name, created_at, offset, length, size, truncated, meta) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (session, kind, name, created_at, offset, len(frame), len(data), int(truncated),
+                 json.dumps(meta, default=str) if meta else None))
+            self._conn.execute(
+                "INSERT INTO sessions(session, archive, codec, created_at, updated_at, bytes) "
+                "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(session) DO UPDATE SET "
+                "updated_at = excluded.updated_at, bytes = bytes + ?",
+                (session, archive, codec, created_at, created_at, len(frame), len(frame)))
+            self._conn.commit()
+            self.stats['written'] += 1
+            if truncated:
+                self.stats['truncated'] += 1
+    
+    # --- Retención -----------------------------------------------------------
+    
+    def prune(self, now: Optional[float] = None) -> List[str]:
+        """
+        Borra sesiones caducadas y, si el total supera `max_total_bytes`,
+        las más antiguas. La sesión actual nunca se borra.
+        
+        Returns:
+            Sesiones eliminadas
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT session, archive, updated_at, bytes FROM sessions ORDER BY updated_at").fetchall()
+            total = sum(row[3] for row in rows)
+            removed = []
+            for session, archive, updated_at, size in rows:
+                if session == self.session_id:
+                    continue
+                expired = now - updated_at > self.retention_days * 86400
+                if not expired and total <= self.max_total_bytes:
+                    continue
+                (self.base_dir / archive).unlink(missing_ok=True)
+                self._conn.execute("DELETE FROM artifacts WHERE session = ?", (session,))
+                self._conn.execute("DELETE FROM sessions WHERE session = ?", (session,))
+                total -= size
+                removed.append(session)
+            self._conn.commit()
+        return removed
+    
+    # --- Lectura -------------------------------------------------------------
+    
+    def sessions(self) -> List[Dict[str, Any]]:
+        """Sesiones guardadas, más recientes primero."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT session, archive, codec, created_at, updated_at, bytes FROM sessions "
+                "ORDER BY updated_at DESC").fetchall()
+        keys = ('session', 'archive', 'codec', 'created_at', 'updated_at', 'bytes')
+        return [dict(zip(keys, row)) for row in rows]
+    
+    def list(self, session: Optional[str] = None, kind: Optional[str] = None,
+             name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Artefactos del índice, en orden de escritura.
+        
+        Args:
+            session: Filtrar por sesión
+            kind: Filtrar por tipo
+            name: Filtrar por identificador
+        """
+        clauses, params = [], []
+        for column, value in (('session', session), ('kind', kind), ('name', name)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        sql = "SELECT id, session, kind, name, created_at, size, truncated, meta FROM artifacts"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY id", params).fetchall()
+        return [{'id': row[0], 'session': row[1], 'kind': row[2], 'name': row[3],
+                 'created_at': row[4], 'size': row[5], 'truncated': bool(row[6]),
+                 'meta': json.loads(row[7]) if row[7] else {}} for row in rows]
+    
+    def read(self, artifact_id: int) -> str:
+        """Contenido de un artefacto."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT s.archive, s.codec, a.offset, a.length FROM artifacts a "
+                "JOIN sessions s ON s.session = a.session WHERE a.id = ?", (artifact_id,)).fetchone()
+        if row is None:
+            raise KeyError(artifact_id)
+        archive, codec, offset, length = row
+        with open(self.base_dir / archive, 'rb') as f:
+            f.seek(offset)
+            return _decompress(codec, f.read(length)).decode('utf-8')
+
+
+# Instancia global compartida por agentes y orquestador
+_artifact_store_instance = None
+
+
+def get_artifact_store(config: Optional[Dict[str, Any]] = None) -> RunArtifactStore:
+    """
+    Obtiene la instancia global del RunArtifactStore.
+    
+    La configuración (sección `artifacts`) solo se aplica al crear el
+    singleton. Lo pendiente se escribe al salir del proceso.
+    """
+    global _artifact_store_instance
+    if _artifact_store_instance is None:
+        config = config or {}
+        _artifact_store_instance = RunArtifactStore(
+            base_dir=config.get('dir'),
+            compression=config.get('compression', 'auto'),
+            max_artifact_bytes=int(config.get('max_artifact_kb', DEFAULT_MAX_ARTIFACT_BYTES // 1024) * 1024),
+            max_session_bytes=int(config.get('max_session_mb', DEFAULT_MAX_SESSION_BYTES // 2 ** 20) * 2 ** 20),
+            max_total_bytes=int(config.get('max_total_mb', DEFAULT_MAX_TOTAL_BYTES // 2 ** 20) * 2 ** 20),
+            retention_days=config.get('retention_days', DEFAULT_RETENTION_DAYS),
+        )
+        atexit.register(_artifact_store_instance.close)
+    return _artifact_store_instance
@@ -3,13 +3,31 @@ Sistema unificado de tareas para Batman Incorporated.
 Una sola definición de Task para todo el sistema.
 """
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from enum import Enum
 from typing import List, Optional, Dict, Any
 from datetime import datetime
+import sys
 import uuid
 
 
+def _slotted(cls):
+    """
+    Recrea una dataclass con __slots__ (equivale a `slots=True` de Python 3.10+,
+    que no está disponible en 3.8). Elimina el __dict__ por instancia, lo que
+    reduce memoria y acelera el acceso a atributos.
+    """
+    field_names = tuple(f.name for f in fields(cls))
+    cls_dict = dict(cls.__dict__)
+    cls_dict['__slots__'] = field_names
+    for name in field_names:
+        # Los valores por defecto ya están en __init__ y en __dataclass_fields__
+        cls_dict.pop(name, None)
+    cls_dict.pop('__dict__', None)
+    cls_dict.pop('__weakref__', None)
+    return type(cls)(cls.__name__, cls.__bases__, cls_dict)
+
+
 class TaskStatus(Enum):
     """Estados posibles de una tarea."""
     PENDING = "pending"
@@ -41,6 +59,7 @@ class TaskType(Enum):
     MAINTENANCE = "maintenance"
 
 
+@_slotted
 @dataclass
 class Task:
     """Tarea unificada para todo el sistema Batman Incorporated."""
@@ -119,6 +138,8 @@ class Task:
         self.completed_at = datetime.now()
         if error:
             self.error = error
+        if self.started_at:
+            self.actual_hours = (self.completed_at - self.started_at).total_seconds() / 3600
     
     def is_ready(self, completed_tasks: List[str]) -> bool:
         """Verifica si la tarea está lista para ejecutarse."""
@@ -153,24 +174,43 @@ class Task:
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Task':
         """Crea una tarea desde un diccionario."""
-        task = cls()
+        kwargs = {}
         for key, value in data.items():
-            if hasattr(task, key):
-                if key in ['type', 'priority', 'status'] and value:
-                    # Convertir strings a enums
-                    if key == 'type':
-                        value = TaskType(value)
-                    elif key == 'priority':
-                        value = TaskPriority(value)
-                    elif key == 'status':
-                        value = TaskStatus(value)
-                elif key.endswith('_at') and value:
-                    # Convertir strings a datetime
-                    value = datetime.fromisoformat(value)
-                setattr(task, key, value)
-        return task
+            if key not in _TASK_FIELDS:
+                continue
+            if value:
+                converter = _FIELD_CONVERTERS.get(key)
+                if converter is not None:
+                    value = converter(value)
+            kwargs[key] = value
+        return cls(**kwargs)
+
+
+def _intern_optional(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _to_datetime(value: Any) -> datetime:
+    return value if isinstance(value, datetime) else datetime.fromisoformat(value)
+
+
+_TASK_FIELDS = frozenset(f.name for f in fields(Task))
+
+# Conversión de valores serializados a sus tipos (strings a enums/datetime);
+# los nombres de agente se internan porque se repiten en miles de tareas
+_FIELD_CONVERTERS = {
+    'type': TaskType,
+    'priority': TaskPriority,
+    'status': TaskStatus,
+    'created_at': _to_datetime,
+    'started_at': _to_datetime,
+    'completed_at': _to_datetime,
+    'assigned_to': _intern_optional,
+    'created_by': _intern_optional,
+}
 
 
+@_slotted
 @dataclass
 class TaskBatch:
     """Grupo de tareas relacionadas."""
@@ -0,0 +1,289 @@
+"""
+Codec binario compacto para Task.
+Serializa lotes de tareas en formato columnar con un esquema versionado:
+enums como códigos de un byte, agentes y tags en una tabla de strings
+compartida y cada columna de texto en un único bloque UTF-8.
+"""
+
+import json
+import struct
+import sys
+from array import array
+from datetime import datetime, timedelta
+from itertools import accumulate
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from core.task import Task, TaskPriority, TaskStatus, TaskType
+
+
+SCHEMA_VERSION = 1
+MAGIC = b'BTSK'
+
+# Códigos estables de enums. Solo se puede AÑADIR al final: reordenar
+# rompe la lectura de datos ya guardados (requiere subir SCHEMA_VERSION).
+_TYPE_ORDER = [
+    TaskType.DEVELOPMENT, TaskType.TESTING, TaskType.DOCUMENTATION,
+    TaskType.INFRASTRUCTURE, TaskType.SECURITY, TaskType.OPTIMIZATION,
+    TaskType.RESEARCH, TaskType.MAINTENANCE,
+]
+_STATUS_ORDER = [
+    TaskStatus.PENDING, TaskStatus.IN_PROGRESS, TaskStatus.COMPLETED,
+    TaskStatus.FAILED, TaskStatus.CANCELLED, TaskStatus.BLOCKED,
+]
+_TYPE_CODES = {member: code for code, member in enumerate(_TYPE_ORDER)}
+_STATUS_CODES = {member: code for code, member in enumerate(_STATUS_ORDER)}
+_PRIORITIES = {member.value: member for member in TaskPriority}
+
+_HEADER = struct.Struct('<4sBI')
+_SECTION = struct.Struct('<I')
+# type, priority, status, flags, progress, estimated, actual,
+# created_at, started_at, completed_at, max_parallel_instances
+_FIXED = struct.Struct('<BBBBdddqqqi')
+
+_NO_TIME = -(2 ** 63)
+_EPOCH = datetime(1970, 1, 1)
+_ONE_US = timedelta(microseconds=1)
+_FLAG_ALLOW_PARALLEL = 0x01
+
+# Columnas por tipo de codificación (el orden forma parte del esquema)
+_STRING_FIELDS = ('id', 'title', 'description', 'command', 'working_dir', 'output', 'error')
+_REF_FIELDS = ('assigned_to', 'created_by', 'parallel_mode')
+_REF_LIST_FIELDS = ('tags',)
+_STRING_LIST_FIELDS = ('depends_on', 'blocks', 'artifacts')
+_MAPPING_FIELDS = ('environment', 'metrics', 'metadata')
+
+
+class TaskCodecError(ValueError):
+    """Datos corruptos o de una versión de esquema no soportada."""
+
+
+def _time_to_int(value: Optional[datetime]) -> int:
+    """Datetime -> microsegundos desde epoch (los aware se pasan a hora local)."""
+    if value is None:
+        return _NO_TIME
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return (value - _EPOCH) // _ONE_US
+
+
+def _int_to_time(value: int) -> Optional[datetime]:
+    return None if value == _NO_TIME else _EPOCH + timedelta(microseconds=value)
+
+
+def _int_array(typecode: str, values: Iterable[int]) -> bytes:
+    """Array de enteros en little-endian."""
+    data = array(typecode, values)
+    if sys.byteorder == 'big':
+        data.byteswap()
+    return data.tobytes()
+
+
+def _read_int_array(typecode: str, data: bytes) -> array:
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+def _encode_strings(values: Sequence[Optional[str]]) -> List[bytes]:
+    """Columna de strings: longitudes en caracteres (-1 = None) + texto UTF-8."""
+    lengths = _int_array('i', (-1 if v is None else len(v) for v in values))
+    text = ''.join(v for v in values if v is not None).encode('utf-8', errors='surrogatepass')
+    return [lengths, text]
+
+
+def _decode_strings(lengths_data: bytes, text_data: bytes) -> List[Optional[str]]:
+    lengths = _read_int_array('i', lengths_data)
+    text = text_data.decode('utf-8', errors='surrogatepass')
+    ends = accumulate(max(length, 0) for length in lengths)
+    result = []
+    start = 0
+    for length, end in zip(lengths, ends):
+        result.append(None if length < 0 else text[start:end])
+        start = end
+    return result
+
+
+def _split(values: List[Any], counts: Iterable[int]) -> List[List[Any]]:
+    """Reparte una columna aplanada en listas según `counts`."""
+    result = []
+    start = 0
+    for count in counts:
+        result.append(values[start:start + count])
+        start += count
+    return result
+
+
+def encode_tasks(tasks: Iterable[Task]) -> bytes:
+    """
+    Serializa un lote de tareas.
+    
+    Formato: cabecera (magic, versión, número de tareas) seguida de
+    secciones con prefijo de longitud: registros fijos, tabla de strings
+    compartida y una sección por columna. Todos los campos se conservan
+    (a diferencia de `Task.to_dict`, que recorta output/error).
+    
+    Args:
+        tasks: Tareas a serializar
+    
+    Returns:
+        Bytes del lote
+    """
+    tasks = list(tasks)
+    sections: List[bytes] = []
+    
+    sections.append(b''.join([
+        _FIXED.pack(
+            _TYPE_CODES[t.type],
+            t.priority.value,
+            _STATUS_CODES[t.status],
+            _FLAG_ALLOW_PARALLEL if t.allow_parallel else 0,
+            t.progress,
+            t.estimated_hours,
+            t.actual_hours,
+            _time_to_int(t.created_at),
+            _time_to_int(t.started_at),
+            _time_to_int(t.completed_at),
+            t.max_parallel_instances,
+        )
+        for t in tasks
+    ]))
+    
+    # Tabla de strings repetidos (agentes, modos, tags)
+    table: Dict[str, int] = {}
+    ref_columns = []
+    for name in _REF_FIELDS:
+        ref_columns.append(_int_array('i', (
+            -1 if v is None else table.setdefault(v, len(table))
+            for v in (getattr(t, name) for t in tasks)
+        )))
+    for name in _REF_LIST_FIELDS:
+        lists = [getattr(t, name) for t in tasks]
+        ref_columns.append(_int_array('I', (len(values) for values in lists)))
+        ref_columns.append(_int_array('i', (
+            table.setdefault(v, len(table)) for values in lists for v in values
+        )))
+    sections.extend(_encode_strings(list(table)))
+    sections.extend(ref_columns)
+    
+    for name in _STRING_FIELDS:
+        sections.extend(_encode_strings([getattr(t, name) for t in tasks]))
+    
+    for name in _STRING_LIST_FIELDS:
+        lists = [getattr(t, name) for t in tasks]
+        sections.append(_int_array('I', (len(values) for values in lists)))
+        sections.extend(_encode_strings([v for values in lists for v in values]))
+    
+    for name in _MAPPING_FIELDS:
+        # Diccionarios libres (métricas, metadata): un único JSON por columna
+        sections.append(json.dumps(
+            [getattr(t, name) for t in tasks], separators=(',', ':'), default=str
+        ).encode('utf-8'))
+    
+    parts = [_HEADER.pack(MAGIC, SCHEMA_VERSION, len(tasks))]
+    for section in sections:
+        parts.append(_SECTION.pack(len(section)))
+        parts.append(section)
+    return b''.join(parts)
+
+
+def decode_tasks(data: bytes) -> List[Task]:
+    """
+    Deserializa un lote creado con `encode_tasks`.
+    
+    Args:
+        data: Bytes del lote
+    
+    Returns:
+        Lista de tareas
+    
+    Raises:
+        TaskCodecError: Si los datos no son válidos o la versión no se soporta
+    """
+    if len(data) < _HEADER.size:
+        raise TaskCodecError("Datos demasiado cortos")
+    magic, version, count = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise TaskCodecError("No es un lote de tareas")
+    if version != SCHEMA_VERSION:
+        raise TaskCodecError(f"Versión de esquema no soportada: {version}")
+    
+    try:
+        return _decode_body(memoryview(data), count)
+    except (struct.error, ValueError, IndexError, KeyError, TypeError) as e:
+        raise TaskCodecError(f"Lote de tareas corrupto: {e}") from e
+
+
+def _decode_body(view: memoryview, count: int) -> List[Task]:
+    pos = _HEADER.size
+    
+    def section() -> bytes:
+        nonlocal pos
+        size, = _SECTION.unpack_from(view, pos)
+        start = pos + _SECTION.size
+        pos = start + size
+        if pos > len(view):
+            raise ValueError("datos truncados")
+        return bytes(view[start:pos])
+    
+    fixed = list(_FIXED.iter_unpack(section()))
+    if len(fixed) != count:
+        raise ValueError("número de registros incorrecto")
+    
+    # Los strings repetidos (agentes, tags) se internan una sola vez
+    table = [sys.intern(v) for v in _decode_strings(section(), section())]
+    columns: Dict[str, List[Any]] = {}
+    for name in _REF_FIELDS:
+        columns[name] = [None if i < 0 else table[i] for i in _read_int_array('i', section())]
+    for name in _REF_LIST_FIELDS:
+        counts = _read_int_array('I', section())
+        columns[name] = _split([table[i] for i in _read_int_array('i', section())], counts)
+    
+    for name in _STRING_FIELDS:
+        columns[name] = _decode_strings(section(), section())
+    
+    for name in _STRING_LIST_FIELDS:
+        counts = _read_int_array('I', section())
+        columns[name] = _split(_decode_strings(section(), section()), counts)
+    
+    for name in _MAPPING_FIELDS:
+        columns[name] = json.loads(section().decode('utf-8'))
+    
+    names = list(columns)
+    tasks = []
+    for record, values in zip(fixed, zip(*(columns[name] for name in names))):
+        (type_code, priority, status_code, flags, progress, estimated, actual,
+         created_at, started_at, completed_at, max_instances) = record
+        
+        # Construcción directa sin pasar por __init__ (evita default_factory)
+        task = Task.__new__(Task)
+        task.type = _TYPE_ORDER[type_code]
+        task.priority = _PRIORITIES[priority]
+        task.status = _STATUS_ORDER[status_code]
+        task.allow_parallel = bool(flags & _FLAG_ALLOW_PARALLEL)
+        task.progress = progress
+        task.estimated_hours = estimated
+        task.actual_hours = actual
+        task.created_at = _int_to_time(created_at)
+        task.started_at = _int_to_time(started_at)
+        task.completed_at = _int_to_time(completed_at)
+        task.max_parallel_instances = max_instances
+        for name, value in zip(names, values):
+            setattr(task, name, value)
+        tasks.append(task)
+    
+    return tasks
+
+
+def encode_task(task: Task) -> bytes:
+    """Serializa una sola tarea."""
+    return encode_tasks([task])
+
+
+def decode_task(data: bytes) -> Task:
+    """Deserializa una sola tarea."""
+    tasks = decode_tasks(data)
+    if len(tasks) != 1:
+        raise TaskCodecError(f"Se esperaba 1 tarea, hay {len(tasks)}")
+    return tasks[0]
@@ -0,0 +1,479 @@
+"""
+Almacén persistente de tareas para Batman Incorporated.
+Guarda Task/TaskBatch en SQLite (WAL) con una conexión de larga duración
+para que una sesión interrumpida pueda retomarse donde se quedó.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+from core.task import Task, TaskBatch, TaskStatus
+from core.task_codec import encode_task, decode_task
+
+
+DEFAULT_DB_PATH = Path.home() / ".glados" / "batman-incorporated" / "tasks" / "tasks.db"
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS sessions (
+        id TEXT PRIMARY KEY,
+        description TEXT,
+        mode TEXT,
+        status TEXT NOT NULL DEFAULT 'running',
+        state TEXT,
+        created_at REAL NOT NULL,
+        updated_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_sessions_updated ON sessions(updated_at);
+    
+    CREATE TABLE IF NOT EXISTS batches (
+        id TEXT PRIMARY KEY,
+        session_id TEXT,
+        name TEXT,
+        description TEXT,
+        parallel INTEGER NOT NULL DEFAULT 0,
+        created_at REAL
+    );
+    
+    CREATE TABLE IF NOT EXISTS tasks (
+        id TEXT PRIMARY KEY,
+        session_id TEXT,
+        batch_id TEXT,
+        position INTEGER NOT NULL DEFAULT 0,
+        title TEXT,
+        status TEXT NOT NULL,
+        priority INTEGER NOT NULL,
+        assigned_to TEXT,
+        created_at REAL,
+        started_at REAL,
+        completed_at REAL,
+        updated_at REAL NOT NULL,
+        payload BLOB NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status);
+    CREATE INDEX IF NOT EXISTS idx_tasks_priority ON tasks(priority);
+    CREATE INDEX IF NOT EXISTS idx_tasks_assigned ON tasks(assigned_to);
+    CREATE INDEX IF NOT EXISTS idx_tasks_session ON tasks(session_id, position);
+    CREATE INDEX IF NOT EXISTS idx_tasks_batch ON tasks(batch_id, position);
+"""
+
+# Sentencias fijas: sqlite3 las prepara una vez y las reutiliza de su caché
+_UPSERT_TASK = """
+    INSERT INTO tasks (id, session_id, batch_id, position, title, status, priority,
+                       assigned_to, created_at, started_at, completed_at, updated_at, payload)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(id) DO UPDATE SET
+        session_id = COALESCE(excluded.session_id, tasks.session_id),
+        batch_id = COALESCE(excluded.batch_id, tasks.batch_id),
+        title = excluded.title,
+        status = excluded.status,
+        priority = excluded.priority,
+        assigned_to = excluded.assigned_to,
+        started_at = excluded.started_at,
+        completed_at = excluded.completed_at,
+        updated_at = excluded.updated_at,
+        payload = excluded.payload
+"""
+_UPDATE_TASK = """
+    UPDATE tasks SET title = ?, status = ?, priority = ?, assigned_to = ?,
+                     started_at = ?, completed_at = ?, updated_at = ?, payload = ?
+    WHERE id = ?
+"""
+_UPSERT_SESSION = """
+    INSERT INTO sessions (id, description, mode, status, state, created_at, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(id) DO UPDATE SET
+        description = COALESCE(excluded.description, sessions.description),
+        mode = COALESCE(excluded.mode, sessions.mode),
+        status = excluded.status,
+        state = COALESCE(excluded.state, sessions.state),
+        updated_at = excluded.updated_at
+"""
+_SESSION_COLUMNS = ('id', 'description', 'mode', 'status', 'state', 'created_at', 'updated_at')
+
+
+def new_session_id() -> str:
+    """Genera un ID de sesión ordenable por fecha."""
+    return f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+def _timestamp(value: Optional[datetime]) -> Optional[float]:
+    return value.timestamp() if value else None
+
+
+class TaskStore:
+    """
+    Almacén de tareas en SQLite.
+    
+    - Modo WAL con `synchronous=NORMAL`: lectores y escritor no se bloquean
+    - Una sola conexión por almacén, compartida entre hilos con un lock
+    - Sentencias fijas reutilizadas desde la caché de sqlite3
+    - Inserciones y actualizaciones por lotes en una transacción
+    - Columnas indexadas (status, priority, assigned_to) para consultas;
+      la tarea completa se guarda con `task_codec` sin perder campos
+    """
+    
+    def __init__(self, db_path: Optional[Union[str, Path]] = None):
+        """
+        Abre (o crea) el almacén.
+        
+        Args:
+            db_path: Ruta del archivo SQLite (":memory:" para pruebas)
+        """
+        if db_path == ":memory:":
+            self.db_path = db_path
+        else:
+            self.db_path = Path(db_path).expanduser() if db_path else DEFAULT_DB_PATH
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._conn = sqlite3.connect(
+            str(self.db_path),
+            check_same_thread=False,
+            isolation_level=None,  # Transacciones explícitas
+            cached_statements=256
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(sessions)")}
+        if columns and 'state' not in columns:
+            # Bases creadas antes de guardar el estado de la sesión
+            self._conn.execute("ALTER TABLE sessions ADD COLUMN state TEXT")
+        self._conn.executescript(_SCHEMA)
+    
+    def close(self):
+        """Cierra la conexión."""
+        with self._lock:
+            self._conn.close()
+    
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Agrupa varias operaciones en una sola transacción (anidable).
+        
+        Yields:
+            Conexión SQLite
+        """
+        with self._lock:
+            if self._depth == 0:
+                self._conn.execute("BEGIN IMMEDIATE")
+            self._depth += 1
+            try:
+                yield self._conn
+            except BaseException:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._conn.execute("ROLLBACK")
+                raise
+            else:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._conn.execute("COMMIT")
+    
+    # --- Escritura ---------------------------------------------------------
+    
+    def _task_row(self, task: Task, session_id: Optional[str], batch_id: Optional[str],
+                  position: int, now: float) -> Tuple[Any, ...]:
+        return (
+            task.id, session_id, batch_id, position, task.title, task.status.value,
+            task.priority.value, task.assigned_to, _timestamp(task.created_at),
+            _timestamp(task.started_at), _timestamp(task.completed_at), now,
+            encode_task(task)
+        )
+    
+    def save_tasks(self, tasks: Iterable[Task], session_id: Optional[str] = None,
+                   batch_id: Optional[str] = None) -> int:
+        """
+        Inserta o actualiza varias tareas en una sola transacción.
+        
+        El orden de `tasks` se guarda como posición dentro de la sesión o
+        batch, y es el orden en que se devuelven al retomar.
+        
+        Args:
+            tasks: Tareas a guardar
+            session_id: Sesión a la que pertenecen
+            batch_id: Batch al que pertenecen
+        
+        Returns:
+            Número de tareas guardadas
+        """
+        now = time.time()
+        rows = [self._task_row(task, session_id, batch_id, position, now)
+                for position, task in enumerate(tasks)]
+        with self.transaction() as conn:
+            conn.executemany(_UPSERT_TASK, rows)
+        return len(rows)
+    
+    def save_task(self, task: Task, session_id: Optional[str] = None,
+                  batch_id: Optional[str] = None):
+        """Inserta o actualiza una tarea."""
+        self.save_tasks([task], session_id, batch_id)
+    
+    def update_tasks(self, tasks: Iterable[Task]) -> int:
+        """
+        Actualiza el estado de tareas ya guardadas (sin tocar su posición).
+        
+        Args:
+            tasks: Tareas modificadas
+        
+        Returns:
+            Número de filas actualizadas
+        """
+        now = time.time()
+        rows = [
+            (task.title, task.status.value, task.priority.value, task.assigned_to,
+             _timestamp(task.started_at), _timestamp(task.completed_at), now,
+             encode_task(task), task.id)
+            for task in tasks
+        ]
+        with self.transaction() as conn:
+            cursor = conn.executemany(_UPDATE_TASK, rows)
+        return cursor.rowcount
+    
+    def update_task(self, task: Task) -> bool:
+        """Actualiza una tarea ya guardada."""
+        return self.update_tasks([task]) == 1
+    
+    def save_batch(self, batch: TaskBatch, session_id: Optional[str] = None):
+        """
+        Guarda un batch y todas sus tareas.
+        
+        Args:
+            batch: Batch a guardar
+            session_id: Sesión a la que pertenece
+        """
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO batches (id, session_id, name, description, parallel, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (batch.id, session_id, batch.name, batch.description, int(batch.parallel),
+                 _timestamp(batch.created_at))
+            )
+            self.save_tasks(batch.tasks, session_id, batch.id)
+    
+    def save_session(self, session_id: str, description: Optional[str] = None,
+                     mode: Optional[str] = None, status: str = "running",
+                     state: Optional[Dict[str, Any]] = None):
+        """
+        Registra o actualiza una sesión.
+        
+        Args:
+            session_id: Identificador de la sesión
+            description: Descripción de la tarea original
+            mode: Modo de ejecución
+            status: running, completed, deferred, failed o interrupted
+            state: Estado serializable a JSON (estadísticas, worktrees...);
+                None conserva el guardado
+        """
+        now = time.time()
+        encoded = json.dumps(state, ensure_ascii=False, default=str) if state is not None else None
+        with self.transaction() as conn:
+            conn.execute(_UPSERT_SESSION, (session_id, description, mode, status, encoded, now, now))
+    
+    def delete_session(self, session_id: str):
+        """Elimina una sesión con sus batches y tareas."""
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM tasks WHERE session_id = ?", (session_id,))
+            conn.execute("DELETE FROM batches WHERE session_id = ?", (session_id,))
+            conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+    
+    # --- Lectura -----------------------------------------------------------
+    
+    def _query(self, sql: str, params: Tuple[Any, ...] = ()) -> List[Tuple[Any, ...]]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+    
+    def get_task(self, task_id: str) -> Optional[Task]:
+        """Obtiene una tarea por ID."""
+        rows = self._query("SELECT payload FROM tasks WHERE id = ?", (task_id,))
+        return decode_task(rows[0][0]) if rows else None
+    
+    def load_tasks(self, session_id: Optional[str] = None, batch_id: Optional[str] = None,
+                   status: Optional[Union[TaskStatus, Iterable[TaskStatus]]] = None,
+                   assigned_to: Optional[str] = None, order_by: str = "position",
+                   limit: Optional[int] = None) -> List[Task]:
+        """
+        Consulta tareas.
+        
+        Args:
+            session_id: Filtrar por sesión
+            batch_id: Filtrar por batch
+            status: Estado o estados a incluir
+            assigned_to: Filtrar por agente
+            order_by: 'position' (orden del plan) o 'priority' (mayor primero)
+            limit: Máximo de resultados
+        
+        Returns:
+            Lista de tareas
+        """
+        clauses, params = [], []
+        if session_id is not None:
+            clauses.append("session_id = ?")
+            params.append(session_id)
+        if batch_id is not None:
+            clauses.append("batch_id = ?")
+            params.append(batch_id)
+        if status is not None:
+            statuses = [status] if isinstance(status, TaskStatus) else list(status)
+            clauses.append(f"status IN ({','.join('?' * len(statuses))})")
+            params.extend(s.value for s in statuses)
+        if assigned_to is not None:
+            clauses.append("assigned_to = ?")
+            params.append(assigned_to)
+        
+        sql = "SELECT payload FROM tasks"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        if order_by == "priority":
+            sql += " ORDER BY priority DESC, position"
+        else:
+            sql += " ORDER BY position, created_at"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        
+        return [decode_task(payload) for (payload,) in self._query(sql, tuple(params))]
+    
+    def load_batch(self, batch_id: str) -> Optional[TaskBatch]:
+        """Reconstruye un batch con sus tareas en el orden original."""
+        rows = self._query(
+            "SELECT id, name, description, parallel, created_at FROM batches WHERE id = ?", (batch_id,))
+        if not rows:
+            return None
+        batch_id, name, description, parallel, created_at = rows[0]
+        return TaskBatch(
+            id=batch_id,
+            name=name or "",
+            description=description or "",
+            tasks=self.load_tasks(batch_id=batch_id),
+            parallel=bool(parallel),
+            created_at=datetime.fromtimestamp(created_at) if created_at else datetime.now()
+        )
+    
+    def count_by_status(self, session_id: Optional[str] = None) -> Dict[str, int]:
+        """Número de tareas por estado (usa el índice de status)."""
+        if session_id is None:
+            rows = self._query("SELECT status, COUNT(*) FROM tasks GROUP BY status")
+        else:
+            rows = self._query(
+                "SELECT status, COUNT(*) FROM tasks WHERE session_id = ? GROUP BY status", (session_id,))
+        return dict(rows)
+    
+    def _session_row(self, row: Tuple[Any, ...]) -> Dict[str, Any]:
+        session = dict(zip(_SESSION_COLUMNS, row))
+        session['state'] = json.loads(session['state']) if session['state'] else {}
+        return session
+    
+    def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Datos de una sesión (None si no existe)."""
+        rows = self._query(
+            f"SELECT {', '.join(_SESSION_COLUMNS)} FROM sessions WHERE id = ?", (session_id,))
+        return self._session_row(rows[0]) if rows else None
+    
+    def list_sessions(self, status: Optional[str] = None, limit: int = 20,
+                      exclude_status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Sesiones más recientes primero.
+        
+        Args:
+            status: Solo sesiones con este estado
+            limit: Máximo de resultados
+            exclude_status: Omitir sesiones con este estado (ej: 'completed')
+        """
+        sql = f"SELECT {', '.join(_SESSION_COLUMNS)} FROM sessions"
+        clauses, params = [], []
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        if exclude_status:
+            clauses.append("status != ?")
+            params.append(exclude_status)
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY updated_at DESC LIMIT ?"
+        params.append(limit)
+        return [self._session_row(row) for row in self._query(sql, tuple(params))]
+    
+    def latest_resumable_session(self) -> Optional[str]:
+        """ID de la sesión más reciente que no terminó correctamente."""
+        sessions = self.list_sessions(exclude_status="completed", limit=1)
+        return sessions[0]['id'] if sessions else None
+    
+    def resume_session(self, session_id: str,
+                       retry_failed: bool = True) -> Tuple[List[str], List[Task]]:
+        """
+        Prepara una sesión interrumpida para continuar.
+        
+        Las tareas completadas y canceladas no se repiten. Las que quedaron
+        IN_PROGRESS vuelven a PENDING (su ejecución se perdió con el
+        proceso), igual que las FAILED si `retry_failed`; los cambios se
+        guardan en una transacción.
+        
+        Args:
+            session_id: Sesión a retomar
+            retry_failed: Re-encolar las tareas fallidas
+        
+        Returns:
+            (IDs de tareas ya completadas, tareas pendientes en orden del plan)
+        """
+        tasks = self.load_tasks(session_id=session_id)
+        completed: List[str] = []
+        pending: List[Task] = []
+        requeued: List[Task] = []
+        
+        for task in tasks:
+            if task.status == TaskStatus.COMPLETED:
+                completed.append(task.id)
+                continue
+            if task.status == TaskStatus.CANCELLED:
+                continue
+            if task.status == TaskStatus.FAILED and not retry_failed:
+                continue
+            if task.status in (TaskStatus.IN_PROGRESS, TaskStatus.FAILED):
+                task.status = TaskStatus.PENDING
+                task.started_at = None
+                task.completed_at = None
+                task.error = ""
+                task.progress = 0.0
+                requeued.append(task)
+            pending.append(task)
+        
+        if requeued:
+            self.update_tasks(requeued)
+        self.save_session(session_id, status="running")
+        return completed, pending
+    
+    def completed_ids(self, session_id: str) -> Set[str]:
+        """IDs de tareas completadas de una sesión."""
+        rows = self._query(
+            "SELECT id FROM tasks WHERE session_id = ? AND status = ?",
+            (session_id, TaskStatus.COMPLETED.value))
+        return {task_id for (task_id,) in rows}
+
+
+# Singleton global
+_task_store_instance = None
+
+
+def get_task_store(db_path: Optional[Union[str, Path]] = None) -> TaskStore:
+    """
+    Obtiene la instancia global del almacén de tareas.
+    
+    Args:
+        db_path: Ruta de la base de datos (solo se usa al crearla)
+    
+    Returns:
+        TaskStore compartido
+    """
+    global _task_store_instance
+    if _task_store_instance is None:
+        _task_store_instance = TaskStore(db_path)
+    return _task_store_instance
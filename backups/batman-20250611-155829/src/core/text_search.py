@@ -0,0 +1,260 @@
+"""
+Búsqueda de texto estructurada para Batman Incorporated.
+Devuelve coincidencias tipadas en streaming usando rg/grep o, si no hay
+binario disponible, un motor en proceso con hilos y mmap.
+"""
+
+import os
+import re
+import json
+import mmap
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Union
+
+from core.command_runner import CommandRunner, get_command_runner
+
+
+@dataclass(frozen=True)
+class SearchMatch:
+    """Una línea que coincide con alguno de los patrones buscados."""
+    path: str
+    line_number: int
+    line: str
+    pattern: str
+    
+    def to_dict(self):
+        return {
+            'path': self.path,
+            'line_number': self.line_number,
+            'line': self.line,
+            'pattern': self.pattern
+        }
+
+
+class TextSearcher:
+    """
+    Busca varios patrones en una sola pasada.
+    
+    Backends:
+    - `rg`: `rg --json` con todos los patrones (`-e`), parseado en streaming
+    - `grep`: `grep -rnHZ -E` con todos los patrones
+    - `python`: pool de hilos sobre archivos, leídos con mmap
+    
+    Los patrones son expresiones regulares (o literales con
+    `fixed_strings=True`). Cada coincidencia indica qué patrón la produjo.
+    """
+    
+    # Directorios que el motor en proceso no recorre
+    SKIP_DIRS = {'.git', '.hg', '.svn', 'node_modules', '__pycache__', '.venv', 'venv'}
+    
+    # Escapes cuyo significado cambia entre regex de bytes (ASCII) y de texto
+    _UNICODE_CLASSES = re.compile(r'(?<!\\)(?:\\\\)*\\[wWbBsSdD]')
+    
+    def __init__(self, tool: Optional[str] = None, runner: Optional[CommandRunner] = None,
+                 max_workers: Optional[int] = None):
+        """
+        Inicializa el buscador.
+        
+        Args:
+            tool: 'rg', 'grep' o None para el motor en proceso
+            runner: CommandRunner a usar (por defecto el global)
+            max_workers: Hilos del motor en proceso
+        """
+        self.tool = tool if tool in ('rg', 'grep') else None
+        self.runner = runner or get_command_runner()
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) * 4)
+    
+    def search(self, patterns: Union[str, Sequence[str]], path: str = ".",
+               ignore_case: bool = False, fixed_strings: bool = False,
+               max_matches: Optional[int] = None) -> Iterator[SearchMatch]:
+        """
+        Busca los patrones y entrega coincidencias a medida que aparecen.
+        
+        Args:
+            patterns: Patrón o lista de patrones
+            path: Archivo o directorio raíz
+            ignore_case: Ignorar mayúsculas/minúsculas
+            fixed_strings: Tratar los patrones como texto literal
+            max_matches: Parar tras este número de coincidencias
+        
+        Yields:
+            SearchMatch por cada línea coincidente
+        """
+        if isinstance(patterns, str):
+            patterns = [patterns]
+        patterns = [p for p in patterns if p]
+        if not patterns:
+            return
+        
+        flags = re.IGNORECASE if ignore_case else 0
+        compiled = [
+            (p, re.compile(re.escape(p) if fixed_strings else p, flags))
+            for p in patterns
+        ]
+        
+        if self.tool == 'rg':
+            matches = self._search_rg(patterns, path, ignore_case, fixed_strings, compiled)
+        elif self.tool == 'grep':
+            matches = self._search_grep(patterns, path, ignore_case, fixed_strings, compiled)
+        else:
+            matches = self._search_in_process(path, compiled)
+        
+        count = 0
+        for match in matches:
+            yield match
+            count += 1
+            if max_matches is not None and count >= max_matches:
+                matches.close()
+                return
+    
+    def search_all(self, patterns: Union[str, Sequence[str]], path: str = ".",
+                   **kwargs) -> List[SearchMatch]:
+        """Versión no streaming de `search`."""
+        return list(self.search(patterns, path, **kwargs))
+    
+    def _which_pattern(self, line: str, compiled) -> Optional[str]:
+        """Identifica el primer patrón que coincide con una línea."""
+        for pattern, regex in compiled:
+            if regex.search(line):
+                return pattern
+        return None
+    
+    def _search_rg(self, patterns, path, ignore_case, fixed_strings, compiled) -> Iterator[SearchMatch]:
+        """Backend ripgrep con salida JSON."""
+        cmd = ['rg', '--json', '--no-messages']
+        if ignore_case:
+            cmd.append('-i')
+        if fixed_strings:
+            cmd.append('-F')
+        for pattern in patterns:
+            cmd.extend(['-e', pattern])
+        cmd.extend(['--', path])
+        
+        for raw in self.runner.stream(cmd, label='rg search'):
+            try:
+                event = json.loads(raw)
+            except ValueError:
+                continue
+            if event.get('type') != 'match':
+                continue
+            
+            data = event['data']
+            file_path = data['path'].get('text')
+            line = data['lines'].get('text')
+            if file_path is None or line is None:
+                # Rutas o líneas no UTF-8 llegan en base64; se omiten
+                continue
+            line = line.rstrip('\r\n')
+            yield SearchMatch(
+                path=file_path,
+                line_number=data['line_number'],
+                line=line,
+                pattern=self._which_pattern(line, compiled) or patterns[0]
+            )
+    
+    def _search_grep(self, patterns, path, ignore_case, fixed_strings, compiled) -> Iterator[SearchMatch]:
+        """Backend grep; -Z separa el nombre de archivo con NUL."""
+        cmd = ['grep', '-rnHZI', '-F' if fixed_strings else '-E']
+        if ignore_case:
+            cmd.append('-i')
+        for pattern in patterns:
+            cmd.extend(['-e', pattern])
+        cmd.extend(['--', path])
+        
+        for raw in self.runner.stream(cmd, label='grep search'):
+            file_path, sep, rest = raw.partition('\0')
+            if not sep:
+                continue
+            line_number, sep, line = rest.partition(':')
+            if not sep or not line_number.isdigit():
+                continue
+            yield SearchMatch(
+                path=file_path,
+                line_number=int(line_number),
+                line=line,
+                pattern=self._which_pattern(line, compiled) or patterns[0]
+            )
+    
+    def _iter_files(self, root: Path) -> Iterator[Path]:
+        """Recorre archivos regulares saltando directorios de VCS/dependencias."""
+        if root.is_file():
+            yield root
+            return
+        
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = [d for d in dirnames if d not in self.SKIP_DIRS]
+            for name in filenames:
+                yield Path(dirpath) / name
+    
+    def _scan_file(self, file_path: Path, combined: "re.Pattern", compiled) -> List[SearchMatch]:
+        """
+        Busca en un archivo con mmap; omite binarios y archivos vacíos.
+        
+        Con un prefiltro de bytes se recorre el mmap directamente; con uno de
+        texto se decodifica el archivo entero antes de buscar.
+        """
+        try:
+            with open(file_path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return []
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    if b'\0' in data[:8192]:
+                        return []
+                    if isinstance(combined.pattern, str):
+                        return self._scan_data(file_path, data[:].decode('utf-8', errors='replace'),
+                                               '\n', combined, compiled)
+                    return self._scan_data(file_path, data, b'\n', combined, compiled)
+        except (OSError, ValueError):
+            return []
+    
+    def _scan_data(self, file_path: Path, data, newline, combined, compiled) -> List[SearchMatch]:
+        """Extrae las líneas donde coincide el prefiltro (bytes o texto)."""
+        results = []
+        line_number = 1
+        last_pos = 0
+        last_line_end = -1
+        for hit in combined.finditer(data):
+            start = data.rfind(newline, 0, hit.start()) + 1
+            if start <= last_line_end:
+                # Otra coincidencia en la misma línea
+                continue
+            end = data.find(newline, hit.start())
+            if end == -1:
+                end = len(data)
+            line_number += data[last_pos:start].count(newline)
+            last_pos = start
+            last_line_end = end
+            
+            line = data[start:end]
+            if isinstance(line, bytes):
+                line = line.decode('utf-8', errors='replace')
+            line = line.rstrip('\r')
+            pattern = self._which_pattern(line, compiled)
+            if pattern is not None:
+                results.append(SearchMatch(str(file_path), line_number, line, pattern))
+        return results
+    
+    def _search_in_process(self, path: str, compiled) -> Iterator[SearchMatch]:
+        """Motor en proceso: un hilo por archivo, resultados en orden de llegada."""
+        # Un único regex con todos los patrones para filtrar rápido; las líneas
+        # candidatas se verifican luego con cada patrón por separado. En bytes,
+        # \w, \b, \s, \d e IGNORECASE solo entienden ASCII, así que el prefiltro
+        # de bytes se reserva a patrones ASCII, sin esas clases y sin -i.
+        ignore_case = compiled[0][1].flags & re.IGNORECASE
+        source = '|'.join('(?:' + regex.pattern + ')' for _, regex in compiled)
+        if source.isascii() and not ignore_case and not self._UNICODE_CLASSES.search(source):
+            combined = re.compile(source.encode('ascii'), re.MULTILINE)
+        else:
+            combined = re.compile(source, re.MULTILINE | ignore_case)
+        
+        root = Path(path)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = [pool.submit(self._scan_file, f, combined, compiled) for f in self._iter_files(root)]
+            try:
+                for future in as_completed(futures):
+                    yield from future.result()
+            finally:
+                for future in futures:
+                    future.cancel()
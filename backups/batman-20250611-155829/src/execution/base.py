@@ -4,10 +4,10 @@ Define la interfaz común para todos los modos de ejecución.
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
 from pathlib import Path
-import subprocess
 
+from core.command_runner import get_command_runner
 from core.task import Task, TaskBatch
 from features.chapter_logger import ChapterLogger
 
@@ -91,30 +91,29 @@ class ExecutionMode(ABC):
         else:
             print(f"[{self.name.upper()}] {message}")
     
-    def _run_command(self, command: str, cwd: Optional[Path] = None) -> tuple[bool, str, str]:
+    def _run_command(self, command: Union[str, List[str]], cwd: Optional[Path] = None,
+                     timeout: Optional[float] = None) -> tuple[bool, str, str]:
         """
-        Ejecuta un comando del sistema.
+        Ejecuta un comando del sistema sin shell.
         
         Args:
-            command: Comando a ejecutar
+            command: argv o string (se parte con shlex, no pasa por shell)
             cwd: Directorio de trabajo (opcional)
+            timeout: Timeout en segundos (por defecto `command_timeout` o 300)
             
         Returns:
             Tupla (success, stdout, stderr)
         """
+        if timeout is None:
+            timeout = self.config.get('command_timeout', 300)
+        
         try:
-            result = subprocess.run(
+            result = get_command_runner().run(
                 command,
-                shell=True,
                 cwd=str(cwd or self.working_dir),
-                capture_output=True,
-                text=True,
-                timeout=300  # 5 minutos
+                timeout=timeout
             )
+            return result.success, result.stdout, result.stderr
             
-            return result.returncode == 0, result.stdout, result.stderr
-            
-        except subprocess.TimeoutExpired:
-            return False, "", "Command timed out"
         except Exception as e:
             return False, "", str(e)
\ No newline at end of file
@@ -3,10 +3,11 @@ Fast Mode - Ejecución directa sin branches.
 Rápido pero sin protección contra conflictos.
 """
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from pathlib import Path
 
 from .base import ExecutionMode
+from .git_helper import GitHelper
 from core.task import Task
 
 
@@ -20,20 +21,22 @@ class FastMode(ExecutionMode):
     def __init__(self, config: Dict[str, Any], logger=None):
         super().__init__("Fast Mode", config, logger)
         self.completed_tasks = []
+        self.git = GitHelper(self.working_dir)
+        self.stash_ref: Optional[str] = None
         
     def prepare(self, tasks: List[Task]) -> bool:
         """Preparación mínima para modo rápido."""
         self._log("⚡ Preparando modo RÁPIDO (sin branches)")
         
         # Verificar que no haya cambios sin commitear
-        success, status, _ = self._run_command("git status --porcelain")
-        
-        if success and status.strip():
+        if self.git.has_worktree_changes():
             self._log("⚠️ Hay cambios sin commitear en el repositorio")
             self._log("   Considera hacer commit antes de continuar")
         
-        # Guardar estado actual
-        self._run_command("git stash create")
+        # Guardar estado actual como punto de recuperación manual
+        self.stash_ref = self.git.snapshot("batman: fast mode snapshot")
+        if self.stash_ref:
+            self._log(f"   💾 Estado guardado: git stash apply {self.stash_ref}")
         
         return True
     
@@ -54,19 +57,11 @@ class FastMode(ExecutionMode):
         return success
     
     def _auto_commit(self, task: Task, agent_name: str):
-        """Hace commit automático de cambios."""
-        # Add cambios
-        self._run_command("git add -A")
-        
-        # Verificar si hay cambios
-        success, status, _ = self._run_command("git status --porcelain")
-        
-        if success and status.strip():
-            # Commit
-            commit_msg = f"{agent_name}: {task.title} (fast mode)"
-            self._run_command(f'git commit -m "{commit_msg}"')
+        """Hace commit automático de cambios (solo si el índice cambió)."""
+        commit_msg = f"{agent_name}: {task.title} (fast mode)"
+        if self.git.commit_all(commit_msg):
             self._log(f"  💾 Auto-commit realizado")
-    
+        
     def cleanup(self) -> bool:
         """Limpieza mínima para modo rápido."""
         self._log("✅ Modo rápido completado")
@@ -76,8 +71,7 @@ class FastMode(ExecutionMode):
         
         # Si no hay auto-commit, recordar al usuario
         if not self.config.get('auto_commit', False):
-            success, status, _ = self._run_command("git status --porcelain")
-            if success and status.strip():
+            if self.git.has_worktree_changes():
                 self._log("  ⚠️ Hay cambios sin commitear")
                 self._log("     Ejecuta: git add . && git commit")
         
@@ -88,4 +82,4 @@ class FastMode(ExecutionMode):
         Fast mode NO soporta paralelización segura.
         Las tareas se ejecutan secuencialmente.
         """
-        return False
\ No newline at end of file
+        return False
@@ -0,0 +1,103 @@
+"""
+Helper de Git para los modos de ejecución.
+Agrupa las operaciones add/commit/stash sin pasar por el shell.
+"""
+
+from typing import List, Optional
+from pathlib import Path
+
+from core.command_runner import get_command_runner
+
+
+class GitHelper:
+    """
+    Operaciones Git baratas para commits por tarea.
+    
+    En lugar de `git status --porcelain` (que recorre todo el árbol de
+    trabajo, incluidos los archivos no trackeados) compara el índice
+    contra HEAD con `git diff --cached --quiet`, que solo mira el índice.
+    """
+    
+    def __init__(self, cwd: Optional[Path] = None, timeout: int = 300):
+        """
+        Inicializa el helper.
+        
+        Args:
+            cwd: Directorio del repositorio (por defecto el actual)
+            timeout: Timeout en segundos para cada comando git
+        """
+        self.cwd = Path(cwd) if cwd else Path.cwd()
+        self.timeout = timeout
+        self.stash_ref: Optional[str] = None
+    
+    def _git(self, *args: str) -> tuple[bool, str, str]:
+        """
+        Ejecuta git con argv directo (sin shell).
+        
+        Returns:
+            Tupla (success, stdout, stderr)
+        """
+        result = get_command_runner().run(
+            ['git', *args],
+            cwd=str(self.cwd),
+            timeout=self.timeout
+        )
+        return result.success, result.stdout, result.stderr
+    
+    def has_staged_changes(self) -> bool:
+        """
+        Indica si el índice difiere de HEAD.
+        
+        `git diff --cached --quiet` devuelve 1 cuando hay diferencias y
+        0 cuando no las hay; no escanea archivos no trackeados. En un repo
+        sin commits compara contra el árbol vacío.
+        """
+        success, _, stderr = self._git('diff', '--cached', '--quiet')
+        return not success and not stderr
+    
+    def has_worktree_changes(self) -> bool:
+        """Indica si hay cambios sin commitear (trackeados o no)."""
+        success, stdout, _ = self._git('status', '--porcelain', '--untracked-files=normal')
+        return success and bool(stdout.strip())
+    
+    def commit_all(self, message: str, paths: Optional[List[str]] = None) -> bool:
+        """
+        Añade cambios y hace commit solo si el índice cambió.
+        
+        Args:
+            message: Mensaje del commit
+            paths: Rutas a añadir (por defecto todo el árbol)
+        
+        Returns:
+            True si se creó un commit
+        """
+        add_args = ['add', '-A']
+        if paths:
+            add_args.extend(['--', *paths])
+        success, _, _ = self._git(*add_args)
+        if not success:
+            return False
+        
+        if not self.has_staged_changes():
+            return False
+        
+        # El mensaje viaja como argumento, sin escapar comillas para el shell
+        success, _, _ = self._git('commit', '-q', '-m', message)
+        return success
+    
+    def snapshot(self, message: str = "batman: snapshot") -> Optional[str]:
+        """
+        Guarda el estado actual sin tocar el árbol de trabajo.
+        
+        `git stash create` devuelve el SHA del commit de stash (vacío si no
+        hay cambios). El SHA solo se guarda en memoria: no se registra con
+        `git stash store`, así que la lista de stashes del usuario no crece.
+        Se puede recuperar a mano con `git stash apply <sha>`.
+        
+        Returns:
+            SHA del stash o None si no había cambios
+        """
+        success, stdout, _ = self._git('stash', 'create', message)
+        self.stash_ref = stdout.strip() if success and stdout.strip() else None
+        return self.stash_ref
+        
\ No newline at end of file
@@ -13,6 +13,7 @@ from typing import List, Dict, Any, Optional
 from datetime import datetime
 
 from .base import ExecutionMode
+from core.admission import get_admission_controller
 from core.task import Task, TaskBatch
 
 
@@ -33,6 +34,11 @@ class InfinityMode(ExecutionMode):
         self.shared_dir.mkdir(parents=True, exist_ok=True)
         self.session_id = str(uuid.uuid4())
         self.instances = {}
+        self.admission = get_admission_controller(
+            config.get('admission') or {'max_slots': config.get('max_agents', 5)}
+        )
+        # Espera máxima para admitir un lanzamiento antes de dejarlo en manual
+        self.admission_timeout = config.get('admission_timeout', 300)
         
     def prepare(self, tasks: List[Task]) -> bool:
         """Prepara el entorno para múltiples instancias."""
@@ -233,21 +239,31 @@ cat {agent_file}
                 self.instances[agent_name]['status'] = 'error'
                 self.instances[agent_name]['error'] = str(e)
         
-        # Lanzar todos los agentes
+        # Lanzar los agentes a medida que la carga del sistema lo admite
         threads = []
         for agent_name, inst in instructions.items():
+            if not self.admission.acquire(agent_name, timeout=self.admission_timeout):
+                self._log(f"  ⏸️ Sistema sobrecargado: {agent_name} queda para lanzamiento manual")
+                self.instances[agent_name]['status'] = 'deferred'
+                continue
+            self.instances[agent_name]['admitted'] = True
+            
             thread = threading.Thread(
                 target=launch_agent_terminal,
                 args=(agent_name, inst)
             )
             thread.start()
             threads.append(thread)
-            time.sleep(3)  # Pausa entre lanzamientos para evitar conflicts
         
         # Esperar a que todos se lancen
         for thread in threads:
             thread.join(timeout=15)
         
+        # Los lanzamientos fallidos no ocupan plaza
+        for agent_name, info in self.instances.items():
+            if info.get('status') == 'error':
+                self._release_admission(agent_name)
+        
         launched_count = sum(1 for inst in self.instances.values() if inst.get('status') == 'launched')
         self._log(f"\n✅ {launched_count}/{len(self.instances)} instancias lanzadas en terminales separadas")
         
@@ -332,6 +348,7 @@ Iniciado: {datetime.now()}
                         all_complete = False
                     else:
                         info['status'] = 'completed'
+                        info['returncode'] = process.returncode
                         if process.returncode != 0:
                             self._log(f"⚠️ {agent} terminó con código {process.returncode}")
                 else:
@@ -345,6 +362,11 @@ Iniciado: {datetime.now()}
                         info['status'] = 'waiting'
                         all_complete = False
             
+            # Liberar la plaza de los agentes que terminaron
+            for agent, info in self.instances.items():
+                if info['status'] == 'completed':
+                    self._release_admission(agent)
+            
             # Mostrar progreso
             self._show_progress()
             
@@ -361,8 +383,14 @@ Iniciado: {datetime.now()}
         # Recopilar resultados
         return self._collect_results()
     
+    def _release_admission(self, agent: str) -> None:
+        """Libera la plaza de admisión de un agente (una sola vez)."""
+        info = self.instances.get(agent, {})
+        if info.pop('admitted', False):
+            self.admission.release(agent)
+    
     def _collect_results(self) -> Dict[str, Any]:
-        """Recopila los resultados de todas las instancias."""
+        """Recopila los resultados y el estado final de cada instancia."""
         results = {
             'session_id': self.session_id,
             'mode': 'infinity',
@@ -371,11 +399,10 @@ Iniciado: {datetime.now()}
         
         results_dir = self.shared_dir / 'results'
         
-        for agent in self.instances:
+        for agent, info in self.instances.items():
             agent_results_dir = results_dir / agent
+            agent_results = []
             if agent_results_dir.exists():
-                agent_results = []
-                
                 # Leer todos los archivos de resultados del agente
                 for result_file in agent_results_dir.glob('*.json'):
                     try:
@@ -384,10 +411,12 @@ Iniciado: {datetime.now()}
                     except:
                         pass
                 
-                results['agents'][agent] = {
-                    'tasks_completed': len(agent_results),
-                    'results': agent_results
-                }
+            results['agents'][agent] = {
+                'status': info.get('status'),
+                'returncode': info.get('returncode'),
+                'tasks_completed': len(agent_results),
+                'results': agent_results
+            }
         
         return results
     
@@ -478,6 +507,9 @@ Iniciado: {datetime.now()}
         """Limpieza post-ejecución."""
         self._log("🧹 Limpiando archivos temporales de Infinity Mode")
         
+        for agent in self.instances:
+            self._release_admission(agent)
+        
         # Archivar la sesión
         archive_dir = self.shared_dir / 'archive' / self.session_id
         archive_dir.mkdir(parents=True, exist_ok=True)
@@ -49,6 +49,9 @@ class SafeMode(ExecutionMode):
         agents = set(task.assigned_to for task in tasks if task.assigned_to)
         
         for agent in agents:
+            if agent in self.worktrees:
+                self._log(f"  ♻️ Reutilizando worktree de {agent}: {self.worktrees[agent]}")
+                continue
             if not self._create_worktree_for_agent(agent):
                 self._log(f"❌ Error creando worktree para {agent}")
                 return False
@@ -56,6 +59,21 @@ class SafeMode(ExecutionMode):
         self._log(f"✅ Creados {len(self.worktrees)} worktrees")
         return True
     
+    def restore_worktrees(self, worktrees: Dict[str, Dict[str, str]]):
+        """
+        Reutiliza worktrees de una sesión anterior interrumpida.
+        
+        Args:
+            worktrees: agente -> {'path': ..., 'branch': ...}; se ignoran
+                los que ya no existen en disco
+        """
+        for agent_name, info in worktrees.items():
+            path = Path(info.get('path', ''))
+            branch = info.get('branch')
+            if branch and path.is_dir():
+                self.worktrees[agent_name] = path
+                self.branches[agent_name] = branch
+    
     def _create_worktree_for_agent(self, agent_name: str) -> bool:
         """Crea un worktree para un agente específico."""
         # Generar nombres únicos
@@ -68,7 +86,7 @@ class SafeMode(ExecutionMode):
         
         # Crear nuevo branch basado en el actual
         success, _, error = self._run_command(
-            f"git worktree add -b {branch_name} {worktree_path} HEAD"
+            ['git', 'worktree', 'add', '-b', branch_name, str(worktree_path), 'HEAD']
         )
         
         if not success:
@@ -122,7 +140,7 @@ class SafeMode(ExecutionMode):
         if success and status.strip():
             # Hacer commit
             commit_msg = f"{agent_name}: {task.title}\n\nTask ID: {task.id}"
-            self._run_command(f'git commit -m "{commit_msg}"', cwd=worktree)
+            self._run_command(['git', 'commit', '-m', commit_msg], cwd=worktree)
             self._log(f"  💾 Commit realizado para {agent_name}")
     
     def cleanup(self) -> bool:
@@ -130,14 +148,14 @@ class SafeMode(ExecutionMode):
         self._log("🧹 Limpiando y haciendo merge de cambios")
         
         # Volver al branch principal
-        self._run_command(f"git checkout {self.main_branch}")
+        self._run_command(['git', 'checkout', self.main_branch])
         
         # Merge cada branch
         for agent_name, branch_name in self.branches.items():
             self._log(f"  🔀 Merging {branch_name}")
             
             # Intentar merge automático
-            success, _, error = self._run_command(f"git merge --no-ff {branch_name}")
+            success, _, error = self._run_command(['git', 'merge', '--no-ff', branch_name])
             
             if not success:
                 self._log(f"    ⚠️ Conflicto en merge, requiere resolución manual")
@@ -153,11 +171,11 @@ class SafeMode(ExecutionMode):
                 self._log(f"  🗑️ Eliminando worktree {agent_name}")
                 
                 # Eliminar worktree
-                self._run_command(f"git worktree remove --force {worktree_path}")
+                self._run_command(['git', 'worktree', 'remove', '--force', str(worktree_path)])
                 
                 # Eliminar branch si se mergeó exitosamente
                 branch = self.branches[agent_name]
-                self._run_command(f"git branch -d {branch}")
+                self._run_command(['git', 'branch', '-d', branch])
         
         return True
     
@@ -3,11 +3,23 @@ Integraciones de Batman Incorporated.
 """
 
 from .github_integration import GitHubIntegration
+from .github_api import GitHubAPIClient, GitHubAPIError
+from .github_cache import GitHubCache
+from .diff_analyzer import DiffAnalyzer, analyze_staged_changes
+from .knowledge_index import KnowledgeIndex
+from .mcp_store import SharedStateStore
 from .mcp_integration import MCPIntegration, MCPFileSystemIntegration, get_mcp_integration
 
 __all__ = [
     'GitHubIntegration',
+    'GitHubAPIClient',
+    'GitHubAPIError',
+    'GitHubCache',
+    'DiffAnalyzer',
+    'analyze_staged_changes',
+    'KnowledgeIndex',
     'MCPIntegration',
     'MCPFileSystemIntegration',
+    'SharedStateStore',
     'get_mcp_integration'
 ]
\ No newline at end of file
@@ -0,0 +1,305 @@
+"""
+Análisis de diffs en una sola pasada para Batman Incorporated.
+Lee `git diff --cached --numstat -p` en streaming y calcula estadísticas
+por archivo, lenguajes, tipos de cambio y hunks relevantes para seguridad
+sin cargar el diff completo en memoria.
+"""
+
+import re
+import subprocess
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, IO, Iterator, List, Optional, Set, Tuple
+
+
+# Extensión -> lenguaje
+LANGUAGES = {
+    '.py': 'py', '.js': 'js', '.ts': 'ts', '.jsx': 'jsx', '.tsx': 'tsx',
+    '.java': 'java', '.go': 'go', '.rs': 'rs', '.rb': 'rb', '.php': 'php',
+    '.c': 'c', '.h': 'c', '.cpp': 'cpp', '.hpp': 'cpp', '.cs': 'cs',
+    '.kt': 'kt', '.swift': 'swift', '.sh': 'sh', '.sql': 'sql',
+}
+
+# Palabras clave en las líneas cambiadas -> tipo de cambio
+CHANGE_KEYWORDS = {
+    'bug-fix': ('fix',),
+    'feature': ('feature', 'feat'),
+    'tests': ('test',),
+}
+
+BREAKING_KEYWORDS = ('breaking',)
+
+# Patrones que marcan un hunk como relevante para seguridad
+SECURITY_PATTERNS = [
+    ('keyword', re.compile(r'security|vulnerab')),
+    ('secret', re.compile(r'password|passwd|secret|api[_-]?key|private[_-]?key|token')),
+    ('exec', re.compile(r'\beval\(|\bexec\(|os\.system|shell\s*=\s*true|pickle\.loads')),
+    ('tls', re.compile(r'verify\s*=\s*false|ssl\._create_unverified')),
+    ('permissions', re.compile(r'chmod\s+[0-7]*7[0-7]*7|0o?777')),
+]
+
+_HUNK_HEADER = re.compile(r'^@@ -\d+(?:,(\d+))? \+\d+(?:,(\d+))? @@(.*)')
+
+# Tamaño máximo de lectura por línea: las líneas más largas (minificados,
+# datos generados) se procesan por trozos
+_CHUNK = 64 * 1024
+
+
+@dataclass
+class FileChange:
+    """Cambios de un archivo del diff."""
+    path: str
+    added: int = 0
+    removed: int = 0
+    binary: bool = False
+    language: Optional[str] = None
+    is_test: bool = False
+    security_hunks: int = 0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'path': self.path,
+            'added': self.added,
+            'removed': self.removed,
+            'binary': self.binary,
+            'language': self.language,
+            'is_test': self.is_test,
+            'security_hunks': self.security_hunks,
+        }
+
+
+@dataclass
+class DiffAnalysis:
+    """Resultado acumulado del análisis."""
+    files: List[FileChange] = field(default_factory=list)
+    languages: Set[str] = field(default_factory=set)
+    change_types: List[str] = field(default_factory=list)
+    breaking_changes: bool = False
+    security_hunks: List[Dict[str, str]] = field(default_factory=list)
+    
+    @property
+    def lines_added(self) -> int:
+        return sum(f.added for f in self.files)
+    
+    @property
+    def lines_removed(self) -> int:
+        return sum(f.removed for f in self.files)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Formato de `GitHubIntegration._analyze_code_changes`."""
+        return {
+            'files_changed': len(self.files),
+            'lines_added': self.lines_added,
+            'lines_removed': self.lines_removed,
+            'languages': set(self.languages),
+            'change_types': list(self.change_types),
+            'test_coverage': 'improved' if 'tests' in self.change_types else 'unknown',
+            'breaking_changes': self.breaking_changes,
+            'security_impact': bool(self.security_hunks),
+            'files': [f.to_dict() for f in self.files],
+            'security_hunks': list(self.security_hunks),
+        }
+
+
+def _is_test_path(path: str) -> bool:
+    parts = Path(path).parts
+    name = parts[-1] if parts else path
+    return (name.startswith('test_') or name.endswith(('_test.py', '.test.js', '.test.ts', '.spec.js', '.spec.ts'))
+            or any(part in ('test', 'tests', '__tests__') for part in parts[:-1]))
+
+
+def _numstat_path(raw: str) -> str:
+    """Ruta destino de una línea numstat (renombres: `a => b` o `dir/{a => b}`)."""
+    if ' => ' not in raw:
+        return raw
+    if '{' in raw and '}' in raw:
+        prefix, rest = raw.split('{', 1)
+        inner, suffix = rest.split('}', 1)
+        return (prefix + inner.split(' => ', 1)[1] + suffix).replace('//', '/')
+    return raw.split(' => ', 1)[1]
+
+
+def _read_chunks(stream: IO[str]) -> Iterator[Tuple[str, bool]]:
+    """Trozos de línea acotados a _CHUNK (y si cada uno empieza línea nueva)."""
+    line_start = True
+    while True:
+        chunk = stream.readline(_CHUNK)
+        if not chunk:
+            return
+        yield chunk, line_start
+        line_start = chunk.endswith('\n')
+
+
+class DiffAnalyzer:
+    """
+    Parser incremental de `git diff --numstat -p`.
+    
+    La sección numstat aporta el conteo exacto por archivo (y detecta
+    binarios); el parche, en el mismo orden de archivos, aporta el
+    contenido. Solo se inspeccionan las líneas añadidas o eliminadas, de
+    una en una (las muy largas por trozos), y se conserva únicamente el
+    estado del hunk en curso: la memoria no depende del tamaño del diff.
+    """
+    
+    def __init__(self, max_security_hunks: int = 50):
+        """
+        Args:
+            max_security_hunks: Hunks de seguridad que se guardan con detalle
+        """
+        self.max_security_hunks = max_security_hunks
+        self.analysis = DiffAnalysis()
+        self._change_types: Set[str] = set()
+        self._file_index = -1
+        self._current: Optional[FileChange] = None
+        self._in_patch = False
+        self._old_left = 0
+        self._new_left = 0
+        self._hunk_header = ""
+        self._hunk_reasons: Set[str] = set()
+        self._line_changed = False
+    
+    # --- Entrada -------------------------------------------------------------
+    
+    def feed_stream(self, stream: IO[str]) -> 'DiffAnalyzer':
+        """Procesa un stream de texto completo."""
+        for chunk, line_start in _read_chunks(stream):
+            if line_start:
+                self.feed_line(chunk)
+            elif self._line_changed:
+                # Continuación de una línea cambiada muy larga
+                self._scan(chunk.lower())
+        return self.finish()
+    
+    def feed_line(self, line: str):
+        """Procesa una línea del diff."""
+        line = line.rstrip('\n')
+        self._line_changed = False
+        
+        if self._in_hunk():
+            self._hunk_line(line)
+            return
+        
+        if line.startswith('diff --git '):
+            self._close_hunk()
+            self._in_patch = True
+            self._file_index += 1
+            self._current = (self.analysis.files[self._file_index]
+                             if self._file_index < len(self.analysis.files) else None)
+        elif not self._in_patch:
+            self._numstat_line(line)
+        elif line.startswith('@@'):
+            self._open_hunk(line)
+    
+    def finish(self) -> 'DiffAnalyzer':
+        """Cierra el último hunk y consolida los tipos de cambio."""
+        self._close_hunk()
+        if any(f.is_test for f in self.analysis.files):
+            self._change_types.add('tests')
+        self.analysis.change_types = [t for t in CHANGE_KEYWORDS if t in self._change_types]
+        return self
+    
+    # --- Numstat -------------------------------------------------------------
+    
+    def _numstat_line(self, line: str):
+        parts = line.split('\t', 2)
+        if len(parts) != 3:
+            return
+        added, removed, raw_path = parts
+        path = _numstat_path(raw_path)
+        binary = added == '-'
+        change = FileChange(
+            path=path,
+            added=0 if binary else int(added),
+            removed=0 if binary else int(removed),
+            binary=binary,
+            language=LANGUAGES.get(Path(path).suffix.lower()),
+            is_test=_is_test_path(path)
+        )
+        self.analysis.files.append(change)
+        if change.language:
+            self.analysis.languages.add(change.language)
+    
+    # --- Parche --------------------------------------------------------------
+    
+    def _in_hunk(self) -> bool:
+        return self._old_left > 0 or self._new_left > 0
+    
+    def _open_hunk(self, line: str):
+        self._close_hunk()
+        match = _HUNK_HEADER.match(line)
+        if not match:
+            return
+        old_count, new_count, _ = match.groups()
+        self._old_left = int(old_count) if old_count is not None else 1
+        self._new_left = int(new_count) if new_count is not None else 1
+        self._hunk_header = line[:200]
+        self._hunk_reasons = set()
+    
+    def _hunk_line(self, line: str):
+        marker = line[:1]
+        if marker == '+':
+            self._new_left -= 1
+        elif marker == '-':
+            self._old_left -= 1
+        elif marker == '\\':
+            return  # "\ No newline at end of file"
+        else:
+            self._old_left -= 1
+            self._new_left -= 1
+            return  # contexto: no se analiza
+        
+        if self._current is not None:
+            self._line_changed = True
+            self._scan(line[1:].lower())
+    
+    def _scan(self, text: str):
+        """Busca tipos de cambio y patrones de seguridad en texto cambiado."""
+        for change_type, keywords in CHANGE_KEYWORDS.items():
+            if change_type not in self._change_types and any(k in text for k in keywords):
+                self._change_types.add(change_type)
+        if not self.analysis.breaking_changes and any(k in text for k in BREAKING_KEYWORDS):
+            self.analysis.breaking_changes = True
+        for reason, pattern in SECURITY_PATTERNS:
+            if reason not in self._hunk_reasons and pattern.search(text):
+                self._hunk_reasons.add(reason)
+    
+    def _close_hunk(self):
+        if self._hunk_reasons and self._current is not None:
+            self._current.security_hunks += 1
+            if len(self.analysis.security_hunks) < self.max_security_hunks:
+                self.analysis.security_hunks.append({
+                    'file': self._current.path,
+                    'hunk': self._hunk_header,
+                    'reasons': ', '.join(sorted(self._hunk_reasons)),
+                })
+        self._hunk_reasons = set()
+        self._old_left = self._new_left = 0
+
+
+def analyze_staged_changes(cwd: Optional[str] = None) -> DiffAnalysis:
+    """
+    Analiza los cambios en staging con un único proceso git.
+    
+    Args:
+        cwd: Directorio del repositorio (por defecto el actual)
+    
+    Returns:
+        DiffAnalysis con estadísticas por archivo y hallazgos
+    """
+    # core.quotePath=false: las rutas no ASCII salen tal cual, sin escapes octales
+    process = subprocess.Popen(
+        ['git', '-c', 'core.quotePath=false', 'diff', '--cached', '--numstat', '-p',
+         '--no-color', '--no-ext-diff'],
+        cwd=cwd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+        encoding='utf-8',
+        errors='replace'
+    )
+    try:
+        analyzer = DiffAnalyzer().feed_stream(process.stdout)
+    finally:
+        process.stdout.close()
+        process.wait()
+    return analyzer.analysis
@@ -0,0 +1,523 @@
+"""
+Cliente HTTP de la API de GitHub para Batman Incorporated.
+Reutiliza conexiones keep-alive, hace GETs condicionales con ETag, agrupa
+consultas y mutaciones en un solo documento GraphQL y limita el ritmo con
+un token bucket (respetando además los límites que indique GitHub).
+"""
+
+import http.client
+import json
+import os
+import re
+import select
+import subprocess
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from urllib.parse import urlencode, urlsplit
+
+
+DEFAULT_API_URL = "https://api.github.com"
+
+# Elementos por documento GraphQL (GitHub limita el coste por consulta)
+GRAPHQL_BATCH = 50
+MUTATION_BATCH = 20
+
+# Métodos que se pueden repetir sin efectos duplicados
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS'}
+
+_NEXT_LINK = re.compile(r'<([^>]+)>;\s*rel="next"')
+_ITEM_FIELDS = """
+    __typename
+    ... on Issue { id number title state url }
+    ... on PullRequest { id number title state url }
+"""
+
+
+class GitHubAPIError(RuntimeError):
+    """Respuesta de error de la API de GitHub."""
+    
+    def __init__(self, status: int, message: str, errors: Optional[List[Dict[str, Any]]] = None):
+        self.status = status
+        self.errors = errors or []
+        super().__init__(f"GitHub API {status}: {message}")
+
+
+class TokenBucket:
+    """
+    Token bucket thread-safe: `rate` peticiones por segundo con ráfagas de
+    hasta `capacity`. `pause_until` vacía el bucket hasta un instante dado
+    (cuando GitHub indica Retry-After o X-RateLimit-Reset).
+    """
+    
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+    
+    def acquire(self) -> float:
+        """
+        Espera a que haya un token y lo consume.
+        
+        Returns:
+            Segundos esperados
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now >= self._paused_until:
+                    start = max(self._updated, self._paused_until)
+                    self._tokens = min(self.capacity, self._tokens + (now - start) * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return waited
+                    delay = (1 - self._tokens) / self.rate
+                else:
+                    delay = self._paused_until - now
+            time.sleep(delay)
+            waited += delay
+    
+    def pause_until(self, deadline: float):
+        """Bloquea nuevas peticiones hasta `deadline` (time.monotonic)."""
+        with self._lock:
+            self._tokens = 0.0
+            self._paused_until = max(self._paused_until, deadline)
+
+
+class GitHubAPIClient:
+    """
+    Cliente REST + GraphQL de un repositorio.
+    
+    - Una conexión HTTP/1.1 persistente por hilo (se reabre si el
+      servidor la cierra)
+    - GETs condicionales: las respuestas con ETag se guardan y se
+      revalidan con If-None-Match (un 304 no consume cuota en GitHub)
+    - Lecturas y mutaciones por lotes con alias en un único documento
+      GraphQL: una docena de issues o comentarios es una sola petición
+    - Token bucket local más pausa automática ante 403/429 con
+      Retry-After o X-RateLimit-Remaining a cero
+    """
+    
+    def __init__(self, repo: str, token: str, base_url: str = DEFAULT_API_URL,
+                 rate: float = 1.0, burst: int = 20, timeout: float = 30.0,
+                 max_retries: int = 2, etag_cache_size: int = 256):
+        """
+        Inicializa el cliente.
+        
+        Args:
+            repo: Repositorio "owner/name"
+            token: Token de acceso
+            base_url: URL de la API (GitHub Enterprise o servidor de pruebas)
+            rate: Peticiones por segundo sostenidas
+            burst: Peticiones seguidas permitidas antes de aplicar el ritmo
+            timeout: Timeout de red por petición
+            max_retries: Reintentos ante límites de GitHub o conexiones cerradas
+            etag_cache_size: Respuestas GET guardadas para revalidar
+        """
+        self.repo = repo
+        self.owner, self.name = repo.split('/', 1)
+        self.token = token
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.bucket = TokenBucket(rate, burst)
+        
+        url = urlsplit(base_url)
+        self._scheme = url.scheme
+        self._host = url.hostname
+        self._port = url.port
+        self._prefix = url.path.rstrip('/')
+        # GitHub Enterprise sirve GraphQL en /api/graphql y REST en /api/v3
+        graphql_prefix = self._prefix[:-3] if self._prefix.endswith('/v3') else self._prefix
+        self._graphql_path = f"{graphql_prefix}/graphql"
+        
+        self._local = threading.local()
+        # target -> (ETag, JSON, cabecera Link): el 304 no repite la paginación
+        self._etags: "OrderedDict[str, Tuple[str, Any, Optional[str]]]" = OrderedDict()
+        self._etag_cache_size = etag_cache_size
+        self._etag_lock = threading.Lock()
+        self._repo_ids: Optional[Dict[str, Any]] = None
+        self.stats = {'requests': 0, 'not_modified': 0, 'connections': 0, 'rate_limited': 0}
+    
+    @classmethod
+    def from_environment(cls, repo: Optional[str] = None, **kwargs) -> Optional['GitHubAPIClient']:
+        """
+        Crea un cliente con el token de GITHUB_TOKEN/GH_TOKEN (o `gh auth
+        token`) y el repositorio dado, de GITHUB_REPOSITORY o del remote
+        origin.
+        
+        Returns:
+            El cliente, o None si falta el token o el repositorio
+        """
+        token = os.environ.get('GITHUB_TOKEN') or os.environ.get('GH_TOKEN') or _run(['gh', 'auth', 'token'])
+        repo = repo or os.environ.get('GITHUB_REPOSITORY') or _origin_repo()
+        if not token or not repo:
+            return None
+        return cls(repo, token, **kwargs)
+    
+    # --- Transporte ----------------------------------------------------------
+    
+    def _connection(self, fresh: bool = False) -> http.client.HTTPConnection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and not fresh and not self._dropped(conn):
+            return conn
+        if conn is not None:
+            conn.close()
+        conn_class = http.client.HTTPSConnection if self._scheme == 'https' else http.client.HTTPConnection
+        conn = conn_class(self._host, self._port, timeout=self.timeout)
+        self._local.conn = conn
+        self.stats['connections'] += 1
+        return conn
+    
+    @staticmethod
+    def _dropped(conn: http.client.HTTPConnection) -> bool:
+        """Si el servidor cerró una conexión ociosa (el socket ya es legible)."""
+        if conn.sock is None:
+            return False
+        try:
+            return bool(select.select([conn.sock], [], [], 0)[0])
+        except (OSError, ValueError):
+            return True
+    
+    def close(self):
+        """Cierra la conexión del hilo actual."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+    
+    def request(self, method: str, path: str, body: Optional[Any] = None,
+                params: Optional[Dict[str, Any]] = None,
+                etag: Optional[str] = None,
+                idempotent: Optional[bool] = None) -> Tuple[Any, Dict[str, str]]:
+        """
+        Hace una petición a la API.
+        
+        Args:
+            method: Método HTTP
+            path: Ruta relativa a la API ("/repos/...") o URL absoluta
+            body: Cuerpo JSON
+            params: Parámetros de query string
+            etag: ETag guardado por el llamador (p. ej. en disco); si la
+                respuesta es 304 se devuelve None como JSON
+            idempotent: Si la petición se puede repetir cuando se pierde la
+                respuesta (por defecto según el método)
+        
+        Returns:
+            Tupla (JSON de respuesta, cabeceras en minúsculas)
+        
+        Raises:
+            GitHubAPIError: Si la API responde con error
+        """
+        if path.startswith('http'):
+            url = urlsplit(path)
+            target = url.path + (f"?{url.query}" if url.query else "")
+        else:
+            target = self._prefix + path if not path.startswith(self._graphql_path) else path
+            if params:
+                target += "?" + urlencode({k: v for k, v in params.items() if v is not None})
+        
+        headers = {
+            'Authorization': f"Bearer {self.token}",
+            'Accept': "application/vnd.github+json",
+            'X-GitHub-Api-Version': "2022-11-28",
+            'User-Agent': "batman-incorporated",
+        }
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode('utf-8')
+            headers['Content-Type'] = "application/json"
+        
+        cached = None
+        if etag:
+            headers['If-None-Match'] = etag
+        elif method == 'GET':
+            with self._etag_lock:
+                cached = self._etags.get(target)
+            if cached:
+                headers['If-None-Match'] = cached[0]
+        
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            status, response_headers, data = self._send(method, target, payload, headers, idempotent)
+            self.stats['requests'] += 1
+            
+            if status == 304:
+                self.stats['not_modified'] += 1
+                if not cached:
+                    return None, response_headers
+                with self._etag_lock:
+                    self._etags.move_to_end(target)
+                if cached[2] is not None:
+                    response_headers = dict(response_headers, link=cached[2])
+                return cached[1], response_headers
+            
+            wait = self._rate_limit_wait(status, response_headers)
+            if wait is not None and attempt < self.max_retries:
+                self.stats['rate_limited'] += 1
+                self.bucket.pause_until(time.monotonic() + wait)
+                continue
+            break
+        
+        result = json.loads(data) if data else None
+        if status >= 400:
+            message = result.get('message', '') if isinstance(result, dict) else str(result)
+            raise GitHubAPIError(status, message, result.get('errors') if isinstance(result, dict) else None)
+        
+        etag = response_headers.get('etag')
+        if method == 'GET' and etag:
+            with self._etag_lock:
+                self._etags[target] = (etag, result, response_headers.get('link'))
+                self._etags.move_to_end(target)
+                while len(self._etags) > self._etag_cache_size:
+                    self._etags.popitem(last=False)
+        return result, response_headers
+    
+    def _send(self, method: str, target: str, payload: Optional[bytes],
+              headers: Dict[str, str], idempotent: bool = True) -> Tuple[int, Dict[str, str], bytes]:
+        """
+        Envía la petición por la conexión del hilo.
+        
+        Si la conexión reutilizada falla se reintenta una vez con una nueva,
+        pero las peticiones no idempotentes (POST, PATCH, mutaciones
+        GraphQL) solo si el fallo fue al enviarlas: si ya llegaron al
+        servidor, repetirlas podría duplicar issues o comentarios.
+        """
+        for fresh in (False, True):
+            conn = self._connection(fresh)
+            sent = False
+            try:
+                conn.request(method, target, body=payload, headers=headers)
+                sent = True
+                response = conn.getresponse()
+                data = response.read()
+            except (http.client.RemoteDisconnected, http.client.CannotSendRequest,
+                    ConnectionResetError, BrokenPipeError):
+                if fresh or (sent and not idempotent):
+                    self.close()
+                    raise
+                continue
+            response_headers = {k.lower(): v for k, v in response.getheaders()}
+            if response_headers.get('connection', '').lower() == 'close':
+                self.close()
+            return response.status, response_headers, data
+        raise ConnectionError("unreachable")
+    
+    @staticmethod
+    def _rate_limit_wait(status: int, headers: Dict[str, str]) -> Optional[float]:
+        """Segundos a esperar si la respuesta es un límite de GitHub (None si no lo es)."""
+        if status not in (403, 429):
+            return None
+        if 'retry-after' in headers:
+            return float(headers['retry-after'])
+        if headers.get('x-ratelimit-remaining') == '0' and 'x-ratelimit-reset' in headers:
+            return max(0.0, float(headers['x-ratelimit-reset']) - time.time())
+        return None
+    
+    def paginate(self, path: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """GET con todas las páginas (siguiendo la cabecera Link)."""
+        params = dict(params or {})
+        params.setdefault('per_page', 100)
+        items, headers = self.request('GET', path, params=params)
+        return self.follow_pages(items, headers)
+    
+    def follow_pages(self, items: Optional[List[Dict[str, Any]]],
+                      headers: Dict[str, str]) -> List[Dict[str, Any]]:
+        """Añade a `items` las páginas siguientes de la cabecera Link."""
+        items = list(items or [])
+        while True:
+            match = _NEXT_LINK.search(headers.get('link', ''))
+            if not match:
+                return items
+            page, headers = self.request('GET', match.group(1))
+            items.extend(page or [])
+    
+    def graphql(self, query: str, variables: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Ejecuta un documento GraphQL.
+        
+        Raises:
+            GitHubAPIError: Si la respuesta trae errores y ningún dato
+        """
+        result, _ = self.request('POST', self._graphql_path, {'query': query, 'variables': variables or {}},
+                                 idempotent=not query.lstrip().startswith('mutation'))
+        if result.get('errors') and not result.get('data'):
+            raise GitHubAPIError(200, result['errors'][0].get('message', 'GraphQL error'), result['errors'])
+        return result.get('data') or {}
+    
+    # --- REST ----------------------------------------------------------------
+    
+    def list_issues(self, state: str = "open", labels: Optional[Sequence[str]] = None,
+                    since: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Issues del repositorio (sin PRs), revalidados con ETag."""
+        items = self.paginate(f"/repos/{self.repo}/issues", {
+            'state': state,
+            'labels': ','.join(labels) if labels else None,
+            'since': since,
+        })
+        return [item for item in items if 'pull_request' not in item]
+    
+    def list_pulls(self, state: str = "open") -> List[Dict[str, Any]]:
+        """Pull requests del repositorio, revalidados con ETag."""
+        return self.paginate(f"/repos/{self.repo}/pulls", {'state': state})
+    
+    def create_issue(self, title: str, body: str, labels: Optional[Sequence[str]] = None,
+                     assignees: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        data = {'title': title, 'body': body}
+        if labels:
+            data['labels'] = list(labels)
+        if assignees:
+            data['assignees'] = list(assignees)
+        return self.request('POST', f"/repos/{self.repo}/issues", data)[0]
+    
+    def create_pull(self, title: str, body: str, head: str, base: str = "main",
+                    draft: bool = False) -> Dict[str, Any]:
+        return self.request('POST', f"/repos/{self.repo}/pulls", {
+            'title': title, 'body': body, 'head': head, 'base': base, 'draft': draft
+        })[0]
+    
+    def add_labels(self, number: int, labels: Sequence[str]) -> List[Dict[str, Any]]:
+        return self.request('POST', f"/repos/{self.repo}/issues/{number}/labels",
+                            {'labels': list(labels)})[0]
+    
+    def add_comment(self, number: int, body: str) -> Dict[str, Any]:
+        """Comenta un issue o PR (comparten numeración)."""
+        return self.request('POST', f"/repos/{self.repo}/issues/{number}/comments", {'body': body})[0]
+    
+    def merge_pull(self, number: int, method: str = "squash", delete_branch: bool = False) -> Dict[str, Any]:
+        """Mergea un PR (y borra su rama, como `gh pr merge --delete-branch`)."""
+        head = None
+        if delete_branch:
+            head = self.request('GET', f"/repos/{self.repo}/pulls/{number}")[0]['head']['ref']
+        result = self.request('PUT', f"/repos/{self.repo}/pulls/{number}/merge", {'merge_method': method})[0]
+        if head:
+            self.request('DELETE', f"/repos/{self.repo}/git/refs/heads/{head}")
+        return result
+    
+    # --- GraphQL por lotes ---------------------------------------------------
+    
+    def get_items(self, numbers: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        Issues/PRs por número, de GRAPHQL_BATCH en GRAPHQL_BATCH por petición.
+        
+        Returns:
+            {número: {id, number, title, state, url, __typename}} (los
+            números inexistentes se omiten)
+        """
+        numbers = list(dict.fromkeys(numbers))
+        found: Dict[int, Dict[str, Any]] = {}
+        for start in range(0, len(numbers), GRAPHQL_BATCH):
+            chunk = numbers[start:start + GRAPHQL_BATCH]
+            declarations = ", ".join(f"$n{i}: Int!" for i in range(len(chunk)))
+            fields = "\n".join(f"i{i}: issueOrPullRequest(number: $n{i}) {{ {_ITEM_FIELDS} }}"
+                               for i in range(len(chunk)))
+            query = (f"query($owner: String!, $name: String!, {declarations}) {{\n"
+                     f"repository(owner: $owner, name: $name) {{\n{fields}\n}}\n}}")
+            variables = {'owner': self.owner, 'name': self.name}
+            variables.update({f"n{i}": number for i, number in enumerate(chunk)})
+            repository = self.graphql(query, variables).get('repository') or {}
+            for i, number in enumerate(chunk):
+                item = repository.get(f"i{i}")
+                if item:
+                    found[number] = item
+        return found
+    
+    def _repository_ids(self) -> Dict[str, Any]:
+        """ID del repositorio y de sus labels (una consulta, cacheada)."""
+        if self._repo_ids is None:
+            data = self.graphql(
+                "query($owner: String!, $name: String!) {\n"
+                "repository(owner: $owner, name: $name) { id labels(first: 100) { nodes { id name } } }\n}",
+                {'owner': self.owner, 'name': self.name}
+            )
+            repository = data['repository']
+            self._repo_ids = {
+                'id': repository['id'],
+                'labels': {label['name']: label['id'] for label in repository['labels']['nodes']},
+            }
+        return self._repo_ids
+    
+    def _mutate(self, field: str, input_type: str, inputs: List[Dict[str, Any]],
+                selection: str) -> List[Optional[Dict[str, Any]]]:
+        """Ejecuta `field` una vez por input, con alias, en lotes de MUTATION_BATCH."""
+        results: List[Optional[Dict[str, Any]]] = []
+        for start in range(0, len(inputs), MUTATION_BATCH):
+            chunk = inputs[start:start + MUTATION_BATCH]
+            declarations = ", ".join(f"$m{i}: {input_type}!" for i in range(len(chunk)))
+            fields = "\n".join(f"m{i}: {field}(input: $m{i}) {{ {selection} }}" for i in range(len(chunk)))
+            data = self.graphql(f"mutation({declarations}) {{\n{fields}\n}}",
+                                {f"m{i}": value for i, value in enumerate(chunk)})
+            results.extend(data.get(f"m{i}") for i in range(len(chunk)))
+        return results
+    
+    def create_issues(self, issues: Sequence[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Crea varios issues en una sola petición GraphQL.
+        
+        Args:
+            issues: Dicts con title, body y labels opcionales (las labels
+                que no existen en el repositorio se ignoran)
+        
+        Returns:
+            {number, url, title} por issue (None si falló), en el mismo orden
+        """
+        if not issues:
+            return []
+        ids = self._repository_ids()
+        inputs = []
+        for issue in issues:
+            data = {'repositoryId': ids['id'], 'title': issue['title'], 'body': issue.get('body', '')}
+            label_ids = [ids['labels'][name] for name in issue.get('labels') or [] if name in ids['labels']]
+            if label_ids:
+                data['labelIds'] = label_ids
+            inputs.append(data)
+        results = self._mutate('createIssue', 'CreateIssueInput', inputs, "issue { number url title }")
+        return [result['issue'] if result else None for result in results]
+    
+    def add_comments(self, comments: Sequence[Tuple[int, str]]) -> List[bool]:
+        """
+        Comenta varios issues/PRs: una consulta para los IDs y una mutación.
+        
+        Args:
+            comments: Pares (número, cuerpo)
+        
+        Returns:
+            Si cada comentario se creó, en el mismo orden
+        """
+        if not comments:
+            return []
+        items = self.get_items(number for number, _ in comments)
+        pending = [(index, {'subjectId': items[number]['id'], 'body': body})
+                   for index, (number, body) in enumerate(comments) if number in items]
+        created = [False] * len(comments)
+        results = self._mutate('addComment', 'AddCommentInput', [data for _, data in pending],
+                               "commentEdge { node { id } }")
+        for (index, _), result in zip(pending, results):
+            created[index] = result is not None
+        return created
+
+
+def _run(cmd: List[str]) -> Optional[str]:
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    output = result.stdout.strip() if result.returncode == 0 else ""
+    return output or None
+
+
+def _origin_repo() -> Optional[str]:
+    """owner/name del remote origin (https o ssh)."""
+    url = _run(['git', 'remote', 'get-url', 'origin'])
+    if not url:
+        return None
+    match = re.search(r'github\.com[:/]([^/]+)/([^/]+?)(?:\.git)?/?$', url)
+    return f"{match.group(1)}/{match.group(2)}" if match else None
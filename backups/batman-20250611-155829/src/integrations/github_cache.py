@@ -0,0 +1,301 @@
+"""
+Caché local de issues y PRs de GitHub para Batman Incorporated.
+Guarda los listados en SQLite, los sincroniza de forma incremental (solo
+lo actualizado desde la última vez, con ETag) y mantiene un índice de
+títulos en memoria para detectar duplicados sin consultar GitHub.
+"""
+
+import json
+import re
+import sqlite3
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Union
+from urllib.parse import urlencode
+
+from .github_api import GitHubAPIClient
+
+
+DEFAULT_DB_PATH = Path.home() / ".glados" / "batman-incorporated" / "cache" / "github.db"
+
+# Segundos que un listado se considera al día sin volver a sincronizar
+DEFAULT_MAX_AGE = 300
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS items (
+        repo TEXT NOT NULL,
+        number INTEGER NOT NULL,
+        kind TEXT NOT NULL,
+        title TEXT NOT NULL,
+        state TEXT NOT NULL,
+        author TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL,
+        url TEXT NOT NULL,
+        labels TEXT NOT NULL,
+        PRIMARY KEY (repo, number)
+    );
+    CREATE TABLE IF NOT EXISTS sync_state (
+        repo TEXT PRIMARY KEY,
+        since TEXT,
+        etag TEXT,
+        synced_at REAL NOT NULL
+    );
+"""
+
+_NON_WORD = re.compile(r'[^\w\s]+')
+
+
+def normalize_title(title: str) -> str:
+    """Título para comparar: minúsculas, sin emojis ni puntuación."""
+    return " ".join(_NON_WORD.sub(" ", title.lower()).split())
+
+
+def item_from_rest(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Issue/PR del endpoint REST /issues al formato de la caché."""
+    return {
+        'number': item['number'],
+        'kind': 'pr' if 'pull_request' in item else 'issue',
+        'title': item['title'],
+        'state': item['state'],
+        'author': (item.get('user') or {}).get('login', ''),
+        'createdAt': item.get('created_at', ''),
+        'updatedAt': item.get('updated_at', ''),
+        'url': item.get('html_url', ''),
+        'labels': [label['name'] for label in item.get('labels', [])],
+    }
+
+
+def item_from_gh(item: Dict[str, Any], kind: str) -> Dict[str, Any]:
+    """Issue/PR de `gh issue|pr list --json` al formato de la caché."""
+    state = item.get('state', 'open').lower()
+    return {
+        'number': item['number'],
+        'kind': kind,
+        'title': item['title'],
+        'state': 'closed' if state == 'merged' else state,
+        'author': (item.get('author') or {}).get('login', ''),
+        'createdAt': item.get('createdAt', ''),
+        'updatedAt': item.get('updatedAt', ''),
+        'url': item.get('url', ''),
+        'labels': [label['name'] for label in item.get('labels', [])],
+    }
+
+
+class GitHubCache:
+    """
+    Issues y PRs de un repositorio en SQLite.
+    
+    `sync_api` pide a GitHub solo lo actualizado desde el último
+    `updated_at` visto, con el ETag de la petición anterior: si nada
+    cambió la respuesta es un 304. Los listados y la búsqueda de
+    duplicados se resuelven localmente.
+    """
+    
+    def __init__(self, repo: str, db_path: Optional[Union[str, Path]] = None,
+                 max_age: float = DEFAULT_MAX_AGE):
+        """
+        Abre (o crea) la caché.
+        
+        Args:
+            repo: Repositorio "owner/name"
+            db_path: Ruta del archivo SQLite (":memory:" para pruebas)
+            max_age: Segundos tras los que `is_fresh` deja de ser cierto
+        """
+        if db_path == ":memory:":
+            self.db_path = db_path
+        else:
+            self.db_path = Path(db_path).expanduser() if db_path else DEFAULT_DB_PATH
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        self.repo = repo
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(_SCHEMA)
+        
+        # título normalizado -> números
+        self._titles: Dict[str, Set[int]] = {}
+        for row in self._conn.execute("SELECT number, title FROM items WHERE repo = ?", (repo,)):
+            self._titles.setdefault(normalize_title(row['title']), set()).add(row['number'])
+    
+    def close(self):
+        """Cierra la conexión."""
+        with self._lock:
+            self._conn.close()
+    
+    # --- Escritura -----------------------------------------------------------
+    
+    def upsert(self, items: Iterable[Dict[str, Any]]) -> int:
+        """
+        Inserta o actualiza items (formato de `item_from_rest`).
+        
+        Returns:
+            Número de items escritos
+        """
+        rows = []
+        with self._lock:
+            for item in items:
+                old = self._conn.execute(
+                    "SELECT title FROM items WHERE repo = ? AND number = ?", (self.repo, item['number'])
+                ).fetchone()
+                if old:
+                    self._titles.get(normalize_title(old['title']), set()).discard(item['number'])
+                self._titles.setdefault(normalize_title(item['title']), set()).add(item['number'])
+                rows.append((
+                    self.repo, item['number'], item['kind'], item['title'], item['state'],
+                    item.get('author', ''), item.get('createdAt', ''), item.get('updatedAt', ''),
+                    item.get('url', ''), json.dumps(item.get('labels', []))
+                ))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO items (repo, number, kind, title, state, author, "
+                "created_at, updated_at, url, labels) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+        return len(rows)
+    
+    def sync_state(self) -> Dict[str, Any]:
+        """Último `updated_at` visto, ETag y momento de la última sincronización."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT since, etag, synced_at FROM sync_state WHERE repo = ?", (self.repo,)
+            ).fetchone()
+        return dict(row) if row else {'since': None, 'etag': None, 'synced_at': 0.0}
+    
+    def mark_synced(self, since: Optional[str], etag: Optional[str]):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sync_state (repo, since, etag, synced_at) VALUES (?, ?, ?, ?)",
+                (self.repo, since, etag, time.time())
+            )
+            self._conn.commit()
+    
+    def is_fresh(self) -> bool:
+        """Si la última sincronización tiene menos de `max_age` segundos."""
+        return time.time() - self.sync_state()['synced_at'] < self.max_age
+    
+    def sync_api(self, client: GitHubAPIClient) -> int:
+        """
+        Sincroniza con la API: solo items actualizados desde la última vez.
+        
+        El endpoint /issues devuelve issues y PRs juntos, así que basta una
+        petición (más paginación) por sincronización.
+        
+        Returns:
+            Número de items actualizados
+        """
+        state = self.sync_state()
+        params = {'state': 'all', 'sort': 'updated', 'direction': 'asc',
+                  'per_page': 100, 'since': state['since']}
+        path = f"/repos/{self.repo}/issues"
+        first, headers = client.request('GET', path, params=params,
+                                        etag=state['etag'] if state['since'] else None)
+        if first is None:
+            self.mark_synced(state['since'], state['etag'])
+            return 0
+        
+        items = [item_from_rest(item) for item in client.follow_pages(first, headers)]
+        since = max([state['since'] or ""] + [item['updatedAt'] for item in items]) or None
+        self.upsert(items)
+        self.mark_synced(since, headers.get('etag'))
+        return len(items)
+    
+    def sync_gh(self, timeout: float = 300) -> int:
+        """
+        Sincroniza con gh CLI cuando no hay token para la API.
+        
+        Usa el mismo endpoint que `sync_api` con `gh api --paginate`: un
+        solo proceso recorre todas las páginas (`gh issue list --limit`
+        truncaría en silencio repositorios grandes).
+        
+        Returns:
+            Número de items actualizados
+        
+        Raises:
+            subprocess.CalledProcessError: Si gh falla
+        """
+        since = self.sync_state()['since']
+        params = {'state': 'all', 'sort': 'updated', 'direction': 'asc', 'per_page': 100}
+        if since:
+            params['since'] = since
+        result = subprocess.run(
+            ['gh', 'api', '--paginate', '--jq', '.[]', f"repos/{self.repo}/issues?{urlencode(params)}"],
+            capture_output=True, text=True, check=True, timeout=timeout
+        )
+        items = [item_from_rest(json.loads(line)) for line in result.stdout.splitlines() if line.strip()]
+        
+        self.upsert(items)
+        self.mark_synced(max([since or ""] + [item['updatedAt'] for item in items]) or None, None)
+        return len(items)
+    
+    # --- Lectura -------------------------------------------------------------
+    
+    def _to_dict(self, row: sqlite3.Row) -> Dict[str, Any]:
+        """Fila al formato de `gh issue|pr list --json`."""
+        return {
+            'number': row['number'],
+            'title': row['title'],
+            'state': row['state'],
+            'author': {'login': row['author']},
+            'createdAt': row['created_at'],
+            'updatedAt': row['updated_at'],
+            'url': row['url'],
+            'labels': [{'name': name} for name in json.loads(row['labels'])],
+        }
+    
+    def list(self, kind: str, state: str = "open",
+             labels: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Issues ('issue') o PRs ('pr') de la caché, más recientes primero.
+        
+        Args:
+            kind: 'issue' o 'pr'
+            state: 'open', 'closed' o 'all'
+            labels: Labels que deben tener todos los items devueltos
+        """
+        query = "SELECT * FROM items WHERE repo = ? AND kind = ?"
+        params: List[Any] = [self.repo, kind]
+        if state != 'all':
+            query += " AND state = ?"
+            params.append(state)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY number DESC", params).fetchall()
+        result = [self._to_dict(row) for row in rows]
+        if labels:
+            wanted = set(labels)
+            result = [item for item in result if wanted <= {l['name'] for l in item['labels']}]
+        return result
+    
+    def get(self, number: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM items WHERE repo = ? AND number = ?", (self.repo, number)
+            ).fetchone()
+        return self._to_dict(row) if row else None
+    
+    def find_by_title(self, title: str, state: Optional[str] = "open",
+                      exact: bool = True) -> List[Dict[str, Any]]:
+        """
+        Busca duplicados por título en el índice en memoria.
+        
+        Args:
+            title: Título (se compara normalizado)
+            state: Estado requerido (None para cualquiera)
+            exact: Título idéntico, o False para contenerlo
+        
+        Returns:
+            Items coincidentes, más recientes primero
+        """
+        key = normalize_title(title)
+        if exact:
+            numbers = set(self._titles.get(key, ()))
+        else:
+            numbers = {n for indexed, found in self._titles.items() if key in indexed for n in found}
+        items = [self.get(number) for number in sorted(numbers, reverse=True)]
+        return [item for item in items if item and (state is None or item['state'] == state)]
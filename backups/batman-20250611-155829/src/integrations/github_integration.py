@@ -8,15 +8,40 @@ import json
 from typing import Dict, List, Optional, Tuple, Any
 from pathlib import Path
 
+from .diff_analyzer import DiffAnalysis, analyze_staged_changes
+from .github_api import GitHubAPIClient, GitHubAPIError
+from .github_cache import GitHubCache
+
+
+def _from_rest(item: Dict) -> Dict:
+    """Issue/PR de la API REST con los campos que devuelve `gh ... --json`."""
+    return {
+        'number': item['number'],
+        'title': item['title'],
+        'author': {'login': (item.get('user') or {}).get('login', '')},
+        'createdAt': item.get('created_at', ''),
+        'url': item.get('html_url', ''),
+        'labels': [{'name': label['name']} for label in item.get('labels', [])],
+    }
+
 
 class GitHubIntegration:
     """
-    Gestiona la integración con GitHub usando gh CLI.
+    Gestiona la integración con GitHub usando gh CLI, o la API HTTP
+    directamente si se proporciona un `GitHubAPIClient` (una conexión
+    persistente y operaciones por lotes en vez de un proceso por llamada).
+    
+    Con una `GitHubCache`, los listados y la detección de duplicados se
+    sirven localmente tras una sincronización incremental.
     """
     
-    def __init__(self, logger=None):
+    def __init__(self, logger=None, api: Optional[GitHubAPIClient] = None,
+                 cache: Optional[GitHubCache] = None):
         self.logger = logger
-        self._verify_gh_cli()
+        self.api = api
+        self.cache = cache
+        if api is None:
+            self._verify_gh_cli()
     
     def _log(self, message: str) -> None:
         """Log helper."""
@@ -83,6 +108,15 @@ class GitHubIntegration:
                 check=True
             )
             
+            if self.api:
+                pr = self.api.create_pull(title, body, head=current_branch, base=base, draft=draft)
+                if labels:
+                    self.api.add_labels(pr['number'], labels)
+                pr_data = {'number': pr['number'], 'url': pr['html_url'], 'title': pr['title']}
+                self._remember(pr_data, 'pr', title, labels)
+                self._log(f"✅ PR #{pr_data['number']} creado: {pr_data['url']}")
+                return pr_data
+            
             # Construir comando
             cmd = ['gh', 'pr', 'create', '--json', 'number,url,title']
             cmd.extend(['--title', title])
@@ -104,6 +138,7 @@ class GitHubIntegration:
             )
             
             pr_data = json.loads(result.stdout)
+            self._remember(pr_data, 'pr', title, labels)
             self._log(f"✅ PR #{pr_data['number']} creado: {pr_data['url']}")
             
             return pr_data
@@ -113,6 +148,9 @@ class GitHubIntegration:
             if e.stderr:
                 self._log(f"   {e.stderr}")
             return None
+        except (GitHubAPIError, OSError) as e:
+            self._log(f"❌ Error creando PR: {e}")
+            return None
     
     def create_issue(
         self,
@@ -123,6 +161,13 @@ class GitHubIntegration:
     ) -> Optional[Dict]:
         """Crea un Issue."""
         try:
+            if self.api:
+                issue = self.api.create_issue(title, body, labels=labels, assignees=assignees)
+                issue_data = {'number': issue['number'], 'url': issue['html_url'], 'title': issue['title']}
+                self._remember(issue_data, 'issue', title, labels)
+                self._log(f"✅ Issue #{issue_data['number']} creado: {issue_data['url']}")
+                return issue_data
+            
             cmd = ['gh', 'issue', 'create', '--json', 'number,url,title']
             cmd.extend(['--title', title])
             cmd.extend(['--body', body])
@@ -141,17 +186,89 @@ class GitHubIntegration:
             )
             
             issue_data = json.loads(result.stdout)
+            self._remember(issue_data, 'issue', title, labels)
             self._log(f"✅ Issue #{issue_data['number']} creado: {issue_data['url']}")
             
             return issue_data
             
-        except subprocess.CalledProcessError as e:
+        except (subprocess.CalledProcessError, GitHubAPIError, OSError) as e:
             self._log(f"❌ Error creando issue: {e}")
             return None
     
+    def create_issues(self, issues: List[Dict]) -> List[Optional[Dict]]:
+        """
+        Crea varios issues de una vez.
+        
+        Con la API es una sola petición GraphQL; con gh CLI, un proceso por
+        issue.
+        
+        Args:
+            issues: Dicts con title, body y labels opcionales
+        
+        Returns:
+            {number, url, title} por issue (None si falló), en el mismo orden
+        """
+        if not self.api:
+            return [self.create_issue(i['title'], i.get('body', ''), labels=i.get('labels')) for i in issues]
+        try:
+            created = self.api.create_issues(issues)
+        except (GitHubAPIError, OSError) as e:
+            self._log(f"❌ Error creando issues: {e}")
+            return [None] * len(issues)
+        for spec, issue in zip(issues, created):
+            if issue:
+                self._remember(issue, 'issue', spec['title'], spec.get('labels'))
+                self._log(f"✅ Issue #{issue['number']} creado: {issue['url']}")
+        return created
+    
+    def refresh_cache(self, force: bool = False) -> int:
+        """
+        Sincroniza la caché si ha caducado (o si `force`).
+        
+        Returns:
+            Número de items actualizados
+        """
+        if not self.cache or (not force and self.cache.is_fresh()):
+            return 0
+        try:
+            if self.api:
+                return self.cache.sync_api(self.api)
+            return self.cache.sync_gh()
+        except (subprocess.SubprocessError, GitHubAPIError, OSError, ValueError) as e:
+            self._log(f"⚠️ No se pudo sincronizar la caché de GitHub: {e}")
+            return 0
+    
+    def find_duplicate_issue(self, title: str) -> Optional[Dict]:
+        """
+        Issue abierto con el mismo título, buscado en la caché local.
+        
+        Returns:
+            El issue, o None si no hay o no hay caché configurada
+        """
+        if not self.cache:
+            return None
+        self.refresh_cache()
+        matches = self.cache.find_by_title(title)
+        return matches[0] if matches else None
+    
+    def _remember(self, data: Dict, kind: str, title: str, labels: Optional[List[str]]):
+        """Añade a la caché un item recién creado (visible sin resincronizar)."""
+        if self.cache:
+            self.cache.upsert([{
+                'number': data['number'], 'kind': kind, 'title': title, 'state': 'open',
+                'url': data.get('url', ''), 'labels': list(labels or []),
+            }])
+    
     def list_prs(self, state: str = "open") -> List[Dict]:
         """Lista Pull Requests."""
         try:
+            if self.cache:
+                self.refresh_cache()
+                return self.cache.list('pr', state)
+            
+            if self.api:
+                return [_from_rest(pr) for pr in self.api.list_pulls(state)]
+            
             result = subprocess.run(
                 ['gh', 'pr', 'list', '--state', state, '--json', 
                  'number,title,author,createdAt,url'],
@@ -162,12 +279,19 @@ class GitHubIntegration:
             
             return json.loads(result.stdout)
             
-        except subprocess.CalledProcessError:
+        except (subprocess.CalledProcessError, GitHubAPIError, OSError):
             return []
     
     def list_issues(self, state: str = "open", labels: Optional[List[str]] = None) -> List[Dict]:
         """Lista Issues."""
         try:
+            if self.cache:
+                self.refresh_cache()
+                return self.cache.list('issue', state, labels)
+            
+            if self.api:
+                return [_from_rest(issue) for issue in self.api.list_issues(state, labels)]
+            
             cmd = ['gh', 'issue', 'list', '--state', state, '--json',
                    'number,title,author,createdAt,url,labels']
             
@@ -183,13 +307,18 @@ class GitHubIntegration:
             
             return json.loads(result.stdout)
             
-        except subprocess.CalledProcessError:
+        except (subprocess.CalledProcessError, GitHubAPIError, OSError):
             return []
     
     def add_comment(self, number: int, body: str, is_pr: bool = True) -> bool:
         """Añade comentario a PR o Issue."""
         try:
             cmd_type = 'pr' if is_pr else 'issue'
+            if self.api:
+                self.api.add_comment(number, body)
+                self._log(f"✅ Comentario añadido a {cmd_type} #{number}")
+                return True
+            
             subprocess.run(
                 ['gh', cmd_type, 'comment', str(number), '--body', body],
                 check=True
@@ -198,12 +327,39 @@ class GitHubIntegration:
             self._log(f"✅ Comentario añadido a {cmd_type} #{number}")
             return True
             
-        except subprocess.CalledProcessError:
+        except (subprocess.CalledProcessError, GitHubAPIError, OSError):
             return False
     
+    def add_comments(self, comments: List[Tuple[int, str]]) -> List[bool]:
+        """
+        Añade varios comentarios a PRs o Issues.
+        
+        Con la API son dos peticiones (IDs y mutación) para todo el lote.
+        
+        Args:
+            comments: Pares (número, cuerpo)
+        
+        Returns:
+            Si cada comentario se añadió, en el mismo orden
+        """
+        if not self.api:
+            return [self.add_comment(number, body) for number, body in comments]
+        try:
+            added = self.api.add_comments(comments)
+        except (GitHubAPIError, OSError) as e:
+            self._log(f"❌ Error añadiendo comentarios: {e}")
+            return [False] * len(comments)
+        self._log(f"✅ {sum(added)}/{len(comments)} comentarios añadidos")
+        return added
+    
     def merge_pr(self, number: int, method: str = "squash", delete_branch: bool = True) -> bool:
         """Merge un PR."""
         try:
+            if self.api:
+                self.api.merge_pull(number, method, delete_branch=delete_branch)
+                self._log(f"✅ PR #{number} mergeado con método '{method}'")
+                return True
+            
             cmd = ['gh', 'pr', 'merge', str(number), f'--{method}']
             
             if delete_branch:
@@ -214,7 +370,7 @@ class GitHubIntegration:
             self._log(f"✅ PR #{number} mergeado con método '{method}'")
             return True
             
-        except subprocess.CalledProcessError as e:
+        except (subprocess.CalledProcessError, GitHubAPIError, OSError) as e:
             self._log(f"❌ Error mergeando PR: {e}")
             return False
     
@@ -287,77 +443,12 @@ class GitHubIntegration:
         )
     
     def _analyze_code_changes(self) -> Dict[str, Any]:
-        """Analiza los cambios de código en detalle."""
-        analysis = {
-            'files_changed': 0,
-            'lines_added': 0,
-            'lines_removed': 0,
-            'languages': set(),
-            'change_types': [],
-            'test_coverage': 'unknown',
-            'breaking_changes': False,
-            'security_impact': False
-        }
-        
+        """Analiza los cambios en staging (un solo git diff, en streaming)."""
         try:
-            # Obtener diff estadísticas
-            diff_stat = subprocess.run(
-                ['git', 'diff', '--stat', '--cached'],
-                capture_output=True,
-                text=True
-            ).stdout
-            
-            # Parsear estadísticas
-            lines = diff_stat.strip().split('\n')
-            if lines:
-                # Última línea tiene el resumen
-                summary = lines[-1]
-                if 'changed' in summary:
-                    parts = summary.split(',')
-                    for part in parts:
-                        if 'file' in part:
-                            analysis['files_changed'] = int(part.split()[0])
-                        elif 'insertion' in part:
-                            analysis['lines_added'] = int(part.split()[0])
-                        elif 'deletion' in part:
-                            analysis['lines_removed'] = int(part.split()[0])
-            
-            # Detectar lenguajes
-            files = subprocess.run(
-                ['git', 'diff', '--name-only', '--cached'],
-                capture_output=True,
-                text=True
-            ).stdout.strip().split('\n')
-            
-            for file in files:
-                if file:
-                    ext = Path(file).suffix
-                    if ext in ['.py', '.js', '.ts', '.jsx', '.tsx', '.java', '.go', '.rs']:
-                        analysis['languages'].add(ext[1:])
-            
-            # Detectar tipos de cambios
-            diff_content = subprocess.run(
-                ['git', 'diff', '--cached'],
-                capture_output=True,
-                text=True
-            ).stdout.lower()
-            
-            if 'fix' in diff_content:
-                analysis['change_types'].append('bug-fix')
-            if 'feature' in diff_content or 'feat' in diff_content:
-                analysis['change_types'].append('feature')
-            if 'test' in diff_content:
-                analysis['change_types'].append('tests')
-                analysis['test_coverage'] = 'improved'
-            if 'breaking' in diff_content:
-                analysis['breaking_changes'] = True
-            if 'security' in diff_content or 'vulnerability' in diff_content:
-                analysis['security_impact'] = True
-            
+            return analyze_staged_changes().to_dict()
         except Exception as e:
             self._log(f"Error analizando cambios: {e}")
-        
-        return analysis
+            return DiffAnalysis().to_dict()
     
     def _generate_smart_title(self, analysis: Dict[str, Any]) -> str:
         """Genera un título descriptivo basado en el análisis."""
@@ -523,6 +614,11 @@ class GitHubIntegration:
 🦇 *Reportado automáticamente por Batman Incorporated*
 """
         
+        existing = self.find_duplicate_issue(title)
+        if existing:
+            self._log(f"♻️ Issue #{existing['number']} ya abierto para este error")
+            return {'number': existing['number'], 'url': existing['url'], 'title': existing['title']}
+        
         return self.create_issue(
             title,
             body,
@@ -0,0 +1,144 @@
+"""
+Índice invertido del conocimiento compartido entre agentes.
+Tokeniza tipo y contenido de cada conocimiento (sin stopwords), puntúa con
+BM25 y devuelve los más relevantes para una tarea dentro de un presupuesto
+de tokens. Se actualiza de forma incremental.
+"""
+
+import json
+import math
+import re
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+
+# Palabras vacías en español e inglés (no discriminan entre conocimientos)
+STOPWORDS = frozenset("""
+    a al algo como con de del desde donde el en entre era es esta este esto
+    ha hay la las le lo los mas más me mi muy no o para pero por que qué se
+    si sin sobre su sus también tu un una uno unos y ya
+    an and are as at be by can do for from has have in into is it its of on
+    or that the this to was we were will with you your
+""".split())
+
+# Peso de los tokens del tipo de conocimiento frente a los del contenido
+TYPE_WEIGHT = 2
+
+_CAMEL = re.compile(r'([a-z0-9])([A-Z])')
+_TOKEN = re.compile(r'[^\W_]+')
+
+
+def tokenize(text: str) -> List[str]:
+    """Tokens en minúsculas, separando snake_case y camelCase, sin stopwords."""
+    text = _CAMEL.sub(r'\1 \2', text).lower()
+    return [t for t in _TOKEN.findall(text) if len(t) > 1 and t not in STOPWORDS]
+
+
+def estimate_tokens(text: str) -> int:
+    """Aproximación de tokens del modelo (~4 caracteres por token)."""
+    return len(text) // 4 + 1
+
+
+class KnowledgeIndex:
+    """
+    Índice BM25 de conocimientos identificados por (agente, tipo).
+    
+    Volver a añadir un conocimiento existente sustituye sus postings, así
+    que el índice sigue a `share_agent_knowledge` sin reconstruirse.
+    """
+    
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.clear()
+    
+    def __len__(self) -> int:
+        return len(self._lengths)
+    
+    def add(self, agent: str, knowledge_type: str, data: Any):
+        """Indexa (o reindexa) un conocimiento."""
+        key = (agent, knowledge_type)
+        self.remove(agent, knowledge_type)
+        
+        rendered = json.dumps(data, indent=2, default=str)
+        tokens = tokenize(knowledge_type) * TYPE_WEIGHT + tokenize(rendered)
+        counts: Dict[str, int] = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        for token, count in counts.items():
+            self._postings.setdefault(token, {})[key] = count
+        
+        self._terms[key] = set(counts)
+        self._lengths[key] = len(tokens)
+        self._costs[key] = estimate_tokens(f"- {knowledge_type}: {rendered}")
+        self._total_length += len(tokens)
+    
+    def remove(self, agent: str, knowledge_type: str):
+        key = (agent, knowledge_type)
+        if key not in self._lengths:
+            return
+        for token in self._terms.pop(key):
+            postings = self._postings[token]
+            del postings[key]
+            if not postings:
+                del self._postings[token]
+        self._total_length -= self._lengths.pop(key)
+        del self._costs[key]
+    
+    def clear(self):
+        self._postings: Dict[str, Dict[Tuple[str, str], int]] = {}
+        self._terms: Dict[Tuple[str, str], Set[str]] = {}
+        self._lengths: Dict[Tuple[str, str], int] = {}
+        self._costs: Dict[Tuple[str, str], int] = {}
+        self._total_length = 0
+    
+    def rebuild(self, knowledge: Dict[str, Dict[str, Dict[str, Any]]]):
+        """Reconstruye el índice desde `shared_state["agent_knowledge"]`."""
+        self.clear()
+        for agent, types in knowledge.items():
+            for knowledge_type, entry in types.items():
+                self.add(agent, knowledge_type, entry.get("data"))
+    
+    def search(self, query: str, limit: int = 5, token_budget: Optional[int] = None,
+               exclude_agents: Iterable[str] = ()) -> List[Tuple[str, str, float]]:
+        """
+        Conocimientos más relevantes para `query`.
+        
+        Args:
+            query: Texto de la tarea
+            limit: Máximo de resultados
+            token_budget: Tokens máximos entre todos los resultados (los que
+                no caben se saltan en favor de otros más pequeños)
+            exclude_agents: Agentes cuyo conocimiento se ignora
+        
+        Returns:
+            Lista de (agente, tipo, puntuación), de mayor a menor puntuación
+        """
+        if not self._lengths:
+            return []
+        excluded = set(exclude_agents)
+        n_docs = len(self._lengths)
+        avg_length = self._total_length / n_docs or 1.0
+        
+        scores: Dict[Tuple[str, str], float] = {}
+        for token in set(tokenize(query)):
+            postings = self._postings.get(token)
+            if not postings:
+                continue
+            idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for key, tf in postings.items():
+                if key[0] in excluded:
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[key] / avg_length)
+                scores[key] = scores.get(key, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        
+        results = []
+        remaining = token_budget
+        for key, score in sorted(scores.items(), key=lambda item: (-item[1], item[0])):
+            if len(results) >= limit:
+                break
+            if remaining is not None:
+                if self._costs[key] > remaining:
+                    continue
+                remaining -= self._costs[key]
+            results.append((key[0], key[1], score))
+        return results
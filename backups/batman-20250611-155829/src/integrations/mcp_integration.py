@@ -1,14 +1,58 @@
 """
 Integración con Model Context Protocols (MCPs) para Batman Incorporated.
 Permite compartir contexto entre agentes mediante MCP Memory y otros servers.
+
+El estado compartido se persiste como un log de eventos append-only
+(`shared_state.events.jsonl`) más un snapshot periódico
+(`shared_state.json`): cada cambio escribe una línea en vez de reescribir
+el estado completo. Con `backend: sqlite` el log vive en una base SQLite
+compartida por todos los procesos (ver `mcp_store`).
 """
 
 import json
+import os
+import sqlite3
 import subprocess
+import threading
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional
 from datetime import datetime
 
+from .knowledge_index import KnowledgeIndex
+from .mcp_store import SharedStateStore
+
+
+STATE_FILE = "shared_state.json"
+EVENTS_FILE = "shared_state.events.jsonl"
+DB_FILE = "shared_state.db"
+
+# Segundos entre comprobaciones de cambios de otros procesos (con suscriptores)
+DEFAULT_POLL_INTERVAL = 0.25
+
+# Elementos conservados por categoría (`mcp.retention` en la configuración)
+DEFAULT_RETENTION = {
+    "tasks_completed": 200,
+    "errors_found": 100,
+    "decisions_made": 100
+}
+
+# Eventos acumulados en el log antes de consolidar un snapshot
+DEFAULT_SNAPSHOT_EVERY = 100
+
+# Conocimiento de otros agentes incluido en el contexto de una tarea
+DEFAULT_KNOWLEDGE_TOP_K = 5
+DEFAULT_KNOWLEDGE_TOKEN_BUDGET = 1500
+
+
+def _empty_state() -> Dict[str, Any]:
+    return {
+        "tasks_completed": [],
+        "files_modified": set(),
+        "agent_knowledge": {},
+        "errors_found": [],
+        "decisions_made": []
+    }
+
 
 class MCPIntegration:
     """
@@ -19,47 +63,239 @@ class MCPIntegration:
         self.config = config
         self.mcp_memory_path = Path.home() / ".batman" / "mcp_memory"
         self.mcp_memory_path.mkdir(parents=True, exist_ok=True)
+        self.state_file = self.mcp_memory_path / STATE_FILE
+        self.events_file = self.mcp_memory_path / EVENTS_FILE
+        
+        self.retention = dict(DEFAULT_RETENTION)
+        self.retention.update(config.get('retention', {}))
+        self.snapshot_every = config.get('snapshot_every', DEFAULT_SNAPSHOT_EVERY)
+        self.knowledge_top_k = config.get('knowledge_top_k', DEFAULT_KNOWLEDGE_TOP_K)
+        self.knowledge_token_budget = config.get('knowledge_token_budget', DEFAULT_KNOWLEDGE_TOKEN_BUDGET)
+        self.knowledge_index = KnowledgeIndex()
         
         # Estado compartido entre agentes
-        self.shared_state = {
-            "tasks_completed": [],
-            "files_modified": set(),
-            "agent_knowledge": {},
-            "errors_found": [],
-            "decisions_made": []
-        }
+        self.shared_state = _empty_state()
+        self._seq = 0             # último evento aplicado
+        self._pending_events = 0  # eventos en el log desde el último snapshot
+        self._lock = threading.RLock()
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+        self._watcher: Optional[threading.Thread] = None
+        self._stop_watching = threading.Event()
+        
+        # Backend compartido entre procesos (modo Infinity)
+        self.store: Optional[SharedStateStore] = None
+        self._data_version: Optional[int] = None
+        self.poll_interval = config.get('poll_interval', DEFAULT_POLL_INTERVAL)
+        if config.get('backend', 'file') == 'sqlite':
+            self.store = SharedStateStore(self.mcp_memory_path / DB_FILE)
+            self.refresh()
+            return
         
         # Cargar estado previo si existe
         self._load_shared_state()
+        self.knowledge_index.rebuild(self.shared_state["agent_knowledge"])
+    
+    def _restore(self, loaded: Dict[str, Any]):
+        """Sustituye el estado en memoria por uno serializado."""
+        self.shared_state = _empty_state()
+        self.shared_state.update(loaded)
+        # Convertir listas a sets donde sea necesario
+        self.shared_state['files_modified'] = set(loaded.get('files_modified', []))
+    
+    def _serialize(self) -> Dict[str, Any]:
+        # Convertir sets a listas para JSON
+        to_save = self.shared_state.copy()
+        to_save['files_modified'] = list(to_save.get('files_modified', []))
+        return to_save
     
     def _load_shared_state(self):
-        """Carga el estado compartido desde disco."""
-        state_file = self.mcp_memory_path / "shared_state.json"
-        if state_file.exists():
+        """Carga el snapshot y reaplica los eventos posteriores del log."""
+        if self.state_file.exists():
             try:
-                with open(state_file, 'r') as f:
+                with open(self.state_file, 'r') as f:
                     loaded = json.load(f)
-                    # Convertir listas a sets donde sea necesario
-                    self.shared_state.update(loaded)
-                    if 'files_modified' in loaded:
-                        self.shared_state['files_modified'] = set(loaded['files_modified'])
+                self._seq = loaded.pop('_seq', 0)
+                self._restore(loaded)
             except Exception as e:
                 print(f"Error cargando estado compartido: {e}")
+                self.shared_state = _empty_state()
+                self._seq = 0
+    
+        if self.events_file.exists():
+            try:
+                with open(self.events_file, 'r') as f:
+                    for line in f:
+                        try:
+                            event = json.loads(line)
+                        except ValueError:
+                            continue  # línea incompleta de una escritura interrumpida
+                        if event.get('seq', 0) > self._seq:
+                            self._apply(event)
+                            self._seq = event['seq']
+                            self._pending_events += 1
+            except OSError as e:
+                print(f"Error cargando eventos compartidos: {e}")
+    
+    def _trim(self, key: str):
+        """Recorta una categoría a su ventana de retención (con holgura para amortizar)."""
+        items = self.shared_state[key]
+        limit = self.retention.get(key)
+        if limit and len(items) > limit + max(1, limit // 4):
+            del items[:len(items) - limit]
+    
+    def _apply(self, event: Dict[str, Any]):
+        """Aplica un evento al estado en memoria."""
+        kind = event['kind']
+        data = event.get('data')
+        if kind == 'task_completed':
+            self.shared_state["tasks_completed"].append(data)
+            self.shared_state["files_modified"].update(data.get("result", {}).get("files_modified", []))
+            self._trim("tasks_completed")
+        elif kind == 'knowledge':
+            agent = self.shared_state["agent_knowledge"].setdefault(data["agent"], {})
+            agent[data["type"]] = data["entry"]
+            self.knowledge_index.add(data["agent"], data["type"], data["entry"]["data"])
+        elif kind == 'error':
+            self.shared_state["errors_found"].append(data)
+            self._trim("errors_found")
+        elif kind == 'decision':
+            self.shared_state["decisions_made"].append(data)
+            self._trim("decisions_made")
+        elif kind == 'clear':
+            self.shared_state = _empty_state()
+            self.knowledge_index.clear()
+    
+    def _record(self, kind: str, data: Any = None):
+        """Aplica un cambio en memoria y lo persiste como evento."""
+        if self.store:
+            # La secuencia la asigna SQLite; el evento se aplica al leerlo en
+            # orden junto con los de otros procesos
+            try:
+                self.store.append(kind, data)
+            except sqlite3.Error as e:
+                print(f"Error guardando estado compartido: {e}")
+                return
+            self.refresh(force=True)
+            return
+        
+        with self._lock:
+            self._seq += 1
+            event = {"seq": self._seq, "kind": kind, "data": data}
+            self._apply(event)
+            self._save_shared_state(event)
+        self._notify([event])
     
-    def _save_shared_state(self):
-        """Guarda el estado compartido a disco."""
-        state_file = self.mcp_memory_path / "shared_state.json"
+    def refresh(self, force: bool = False) -> int:
+        """
+        Aplica los eventos escritos por otros procesos (backend sqlite).
+        
+        Sin cambios desde la última lectura (según `PRAGMA data_version`)
+        no consulta la base.
+        
+        Args:
+            force: Leer aunque no haya cambios de otras conexiones (tras
+                una escritura propia)
+        
+        Returns:
+            Número de eventos aplicados
+        """
+        if not self.store:
+            return 0
         try:
-            # Convertir sets a listas para JSON
-            to_save = self.shared_state.copy()
-            if 'files_modified' in to_save:
-                to_save['files_modified'] = list(to_save['files_modified'])
-            
-            with open(state_file, 'w') as f:
-                json.dump(to_save, f, indent=2)
+            with self._lock:
+                version = self.store.data_version()
+                if not force and version == self._data_version:
+                    return 0
+                self._data_version = version
+                
+                snapshot, events = self.store.read_since(self._seq)
+                if snapshot:
+                    # Los eventos pendientes ya se compactaron: partir del snapshot
+                    self._seq, state = snapshot
+                    self._restore(state)
+                    self.knowledge_index.rebuild(self.shared_state["agent_knowledge"])
+                for event in events:
+                    self._apply(event)
+                    self._seq = event['seq']
+                
+                self._pending_events += len(events)
+                if self._pending_events >= self.snapshot_every:
+                    self.store.compact(self._seq, self._serialize())
+                    self._pending_events = 0
+        except sqlite3.Error as e:
+            print(f"Error leyendo estado compartido: {e}")
+            return 0
+        
+        self._notify(events)
+        return len(events)
+    
+    def subscribe(self, listener: Callable[[Dict[str, Any]], None]):
+        """
+        Registra una función que recibe cada evento nuevo (también los de
+        otros procesos, detectados cada `poll_interval` segundos).
+        """
+        self._listeners.append(listener)
+        if self.store and self._watcher is None:
+            self._watcher = threading.Thread(target=self._watch, daemon=True)
+            self._watcher.start()
+    
+    def _watch(self):
+        while not self._stop_watching.wait(self.poll_interval):
+            self.refresh()
+    
+    def _notify(self, events: List[Dict[str, Any]]):
+        for event in events:
+            for listener in self._listeners:
+                try:
+                    listener(event)
+                except Exception as e:
+                    print(f"Error notificando cambio compartido: {e}")
+    
+    def close(self):
+        """Detiene la vigilancia de cambios y cierra el backend."""
+        self._stop_watching.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+        if self.store:
+            self.store.close()
+    
+    def _save_shared_state(self, event: Optional[Dict[str, Any]] = None):
+        """
+        Persiste el estado compartido.
+        
+        Args:
+            event: Evento a añadir al log. Sin evento (o cada
+                `snapshot_every` eventos) se escribe un snapshot completo y
+                se vacía el log.
+        """
+        try:
+            if event is not None:
+                with open(self.events_file, 'a') as f:
+                    f.write(json.dumps(event, default=str) + "\n")
+                self._pending_events += 1
+                if self._pending_events < self.snapshot_every:
+                    return
+            self._write_snapshot()
         except Exception as e:
             print(f"Error guardando estado compartido: {e}")
     
+    def _write_snapshot(self):
+        """Escribe el snapshot de forma atómica y trunca el log."""
+        to_save = self._serialize()
+        to_save['_seq'] = self._seq
+        
+        tmp_file = self.state_file.with_suffix(".json.tmp")
+        with open(tmp_file, 'w') as f:
+            json.dump(to_save, f, default=str)
+        os.replace(tmp_file, self.state_file)
+        
+        # Los eventos ya están en el snapshot; si el truncado no llega a
+        # hacerse, `_seq` evita aplicarlos dos veces al cargar
+        with open(self.events_file, 'w'):
+            pass
+        self._pending_events = 0
+    
     def share_task_completion(self, agent_name: str, task_id: str, result: Dict[str, Any]):
         """
         Comparte que un agente completó una tarea.
@@ -76,13 +312,8 @@ class MCPIntegration:
             "result": result
         }
         
-        self.shared_state["tasks_completed"].append(completion)
-        
-        # Si hay archivos modificados, agregarlos
-        if "files_modified" in result:
-            self.shared_state["files_modified"].update(result["files_modified"])
-        
-        self._save_shared_state()
+        # Los archivos modificados del resultado se agregan al aplicar el evento
+        self._record("task_completed", completion)
     
     def share_agent_knowledge(self, agent_name: str, knowledge_type: str, data: Any):
         """
@@ -93,15 +324,14 @@ class MCPIntegration:
             knowledge_type: Tipo de conocimiento (e.g., "api_endpoints", "test_results")
             data: Datos a compartir
         """
-        if agent_name not in self.shared_state["agent_knowledge"]:
-            self.shared_state["agent_knowledge"][agent_name] = {}
-        
-        self.shared_state["agent_knowledge"][agent_name][knowledge_type] = {
-            "data": data,
-            "timestamp": datetime.now().isoformat()
-        }
-        
-        self._save_shared_state()
+        self._record("knowledge", {
+            "agent": agent_name,
+            "type": knowledge_type,
+            "entry": {
+                "data": data,
+                "timestamp": datetime.now().isoformat()
+            }
+        })
     
     def get_agent_knowledge(self, agent_name: Optional[str] = None, knowledge_type: Optional[str] = None) -> Dict:
         """
@@ -114,6 +344,7 @@ class MCPIntegration:
         Returns:
             Conocimiento filtrado
         """
+        self.refresh()
         knowledge = self.shared_state.get("agent_knowledge", {})
         
         if agent_name:
@@ -133,8 +364,7 @@ class MCPIntegration:
             "timestamp": datetime.now().isoformat()
         }
         
-        self.shared_state["errors_found"].append(error_entry)
-        self._save_shared_state()
+        self._record("error", error_entry)
     
     def share_decision(self, agent_name: str, decision: str, reasoning: str):
         """Comparte una decisión importante tomada por un agente."""
@@ -145,20 +375,22 @@ class MCPIntegration:
             "timestamp": datetime.now().isoformat()
         }
         
-        self.shared_state["decisions_made"].append(decision_entry)
-        self._save_shared_state()
+        self._record("decision", decision_entry)
     
     def get_files_modified(self) -> List[str]:
         """Obtiene la lista de archivos modificados por todos los agentes."""
+        self.refresh()
         return list(self.shared_state.get("files_modified", set()))
     
     def get_recent_errors(self, limit: int = 10) -> List[Dict]:
         """Obtiene los errores más recientes encontrados."""
+        self.refresh()
         errors = self.shared_state.get("errors_found", [])
         return errors[-limit:] if errors else []
     
     def get_recent_decisions(self, limit: int = 10) -> List[Dict]:
         """Obtiene las decisiones más recientes tomadas."""
+        self.refresh()
         decisions = self.shared_state.get("decisions_made", [])
         return decisions[-limit:] if decisions else []
     
@@ -198,23 +430,23 @@ class MCPIntegration:
         if recent_decisions:
             context["recent_decisions"] = recent_decisions
         
-        # Agregar conocimiento de otros agentes que podría ser útil
+        # Agregar conocimiento de otros agentes que podría ser útil: los más
+        # relevantes según el índice BM25, dentro del presupuesto de tokens
         all_knowledge = self.get_agent_knowledge()
         relevant_knowledge = {}
         
-        # Filtrar conocimiento relevante según el tipo de tarea
-        task_keywords = f"{task.title} {task.description}".lower()
-        
-        for other_agent, knowledge_types in all_knowledge.items():
-            if other_agent == agent_name:
-                continue  # Skip propio conocimiento
-                
-            for k_type, k_data in knowledge_types.items():
-                # Simple relevancia: si el tipo de conocimiento contiene palabras de la tarea
-                if any(word in k_type.lower() for word in task_keywords.split()):
-                    if other_agent not in relevant_knowledge:
-                        relevant_knowledge[other_agent] = {}
-                    relevant_knowledge[other_agent][k_type] = k_data
+        query = " ".join([task.title, task.description, task.type.value] + list(task.tags))
+        with self._lock:
+            matches = self.knowledge_index.search(
+                query,
+                limit=self.knowledge_top_k,
+                token_budget=self.knowledge_token_budget,
+                exclude_agents=[agent_name]  # Skip propio conocimiento
+            )
+        for other_agent, k_type, _ in matches:
+            k_data = all_knowledge.get(other_agent, {}).get(k_type)
+            if k_data is not None:
+                relevant_knowledge.setdefault(other_agent, {})[k_type] = k_data
         
         if relevant_knowledge:
             context["shared_knowledge"] = relevant_knowledge
@@ -268,13 +500,12 @@ class MCPIntegration:
     
     def clear_shared_state(self):
         """Limpia el estado compartido (útil para nuevas sesiones)."""
-        self.shared_state = {
-            "tasks_completed": [],
-            "files_modified": set(),
-            "agent_knowledge": {},
-            "errors_found": [],
-            "decisions_made": []
-        }
+        if self.store:
+            self._record("clear")
+            return
+        
+        self._seq += 1
+        self._apply({"seq": self._seq, "kind": "clear"})
         self._save_shared_state()
 
 
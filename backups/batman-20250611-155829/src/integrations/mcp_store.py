@@ -0,0 +1,125 @@
+"""
+Almacén SQLite del estado compartido MCP, seguro entre procesos.
+Las instancias de Batman (p. ej. en modo Infinity) escriben eventos en una
+misma base WAL: la secuencia global la asigna SQLite, cada proceso aplica
+los eventos nuevos en ese orden y `PRAGMA data_version` permite detectar
+cambios de otros procesos sin consultar la tabla.
+"""
+
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS events (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        kind TEXT NOT NULL,
+        data TEXT
+    );
+    CREATE TABLE IF NOT EXISTS snapshot (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        seq INTEGER NOT NULL,
+        state TEXT NOT NULL
+    );
+"""
+
+
+class SharedStateStore:
+    """
+    Log de eventos + snapshot en SQLite (modo WAL).
+    
+    Varios procesos pueden leer y escribir a la vez: cada `append` es una
+    transacción propia y `compact` consolida y borra eventos bajo un lock
+    de escritura, así que no se pierden escrituras concurrentes.
+    """
+    
+    def __init__(self, db_path: Union[str, Path]):
+        """
+        Abre (o crea) el almacén.
+        
+        Args:
+            db_path: Ruta del archivo SQLite
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False,
+                                     isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(_SCHEMA)
+    
+    def close(self):
+        """Cierra la conexión."""
+        with self._lock:
+            self._conn.close()
+    
+    def data_version(self) -> int:
+        """Cambia cuando otra conexión confirma una escritura."""
+        with self._lock:
+            return self._conn.execute("PRAGMA data_version").fetchone()[0]
+    
+    def append(self, kind: str, data: Any = None) -> int:
+        """
+        Añade un evento.
+        
+        Returns:
+            Secuencia global asignada
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO events (kind, data) VALUES (?, ?)",
+                (kind, json.dumps(data, default=str))
+            )
+            return cursor.lastrowid
+    
+    def read_since(self, seq: int) -> Tuple[Optional[Tuple[int, Dict[str, Any]]], List[Dict[str, Any]]]:
+        """
+        Cambios posteriores a `seq`.
+        
+        Si los eventos siguientes a `seq` ya se compactaron, devuelve
+        también el snapshot que los contiene (y los eventos posteriores a
+        él): el llamador debe partir de ese estado.
+        
+        Returns:
+            Tupla ((seq del snapshot, estado) o None, eventos)
+        """
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                snapshot = None
+                row = self._conn.execute("SELECT seq, state FROM snapshot WHERE id = 1").fetchone()
+                if row and row[0] > seq:
+                    snapshot = (row[0], json.loads(row[1]))
+                    seq = row[0]
+                rows = self._conn.execute(
+                    "SELECT seq, kind, data FROM events WHERE seq > ? ORDER BY seq", (seq,)
+                ).fetchall()
+            finally:
+                self._conn.execute("COMMIT")
+        events = [{'seq': s, 'kind': kind, 'data': json.loads(data) if data else None}
+                  for s, kind, data in rows]
+        return snapshot, events
+    
+    def compact(self, seq: int, state: Dict[str, Any]):
+        """
+        Guarda `state` (resultado de aplicar los eventos hasta `seq`) como
+        snapshot y borra esos eventos.
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute("SELECT seq FROM snapshot WHERE id = 1").fetchone()
+                if row is None or row[0] < seq:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO snapshot (id, seq, state) VALUES (1, ?, ?)",
+                        (seq, json.dumps(state, default=str))
+                    )
+                    self._conn.execute("DELETE FROM events WHERE seq <= ?", (seq,))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
@@ -12,6 +12,15 @@ import zipfile
 from pathlib import Path
 from typing import Dict, Any, Optional
 
+try:
+    from core.arsenal import arsenal_config, get_arsenal
+    from core.config import Config
+except ImportError:
+    # Ejecución directa del script: añadir src al path
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from core.arsenal import arsenal_config, get_arsenal
+    from core.config import Config
+
 
 class ToolInstaller:
     """Instala herramientas del Arsenal sin necesidad de sudo."""
@@ -68,9 +77,19 @@ class ToolInstaller:
         }
     }
     
-    def __init__(self):
+    def __init__(self, config: Optional[Config] = None):
+        """
+        Inicializa el instalador.
+        
+        Args:
+            config: Configuración de Batman (por defecto la del usuario), de
+                la que se toma `paths.cache` si el instalador crea el Arsenal
+        """
         self.local_bin = Path.home() / '.local' / 'bin'
         self.temp_dir = Path('/tmp/batman-tools')
+        # Cache de detección compartida con el Arsenal
+        self.arsenal = get_arsenal(arsenal_config(config if config is not None else Config()))
+        self.tool_cache = self.arsenal.tool_cache
         
     def ensure_local_bin(self) -> bool:
         """Asegura que ~/.local/bin existe y está en PATH."""
@@ -91,7 +110,7 @@ class ToolInstaller:
         tool = self.TOOLS.get(tool_key)
         if not tool:
             return False
-        return shutil.which(tool['binary']) is not None
+        return self.tool_cache.which(tool['binary']) is not None
     
     def download_file(self, url: str, dest: Path) -> bool:
         """Descarga un archivo con progreso."""
@@ -183,6 +202,8 @@ class ToolInstaller:
         try:
             shutil.copy2(binary_path, dest_path)
             dest_path.chmod(0o755)  # Hacer ejecutable
+            # Descartar la entrada negativa que dejó is_installed
+            self.arsenal.refresh_tool(tool['binary'])
             print(f"  ✅ {tool['name']} instalado en {dest_path}")
             return True
         except Exception as e:
@@ -235,11 +256,12 @@ class ToolInstaller:
         }
         
         for cmd, (name, install_info) in additional_tools.items():
-            if shutil.which(cmd):
+            if self.tool_cache.which(cmd):
                 print(f"{name:15} ✅ Instalado")
             else:
                 print(f"{name:15} ⚠️  No instalado - Ver: {install_info}")
         
+        self.tool_cache.save()
         return results
     
     def check_status(self) -> None:
@@ -257,9 +279,11 @@ class ToolInstaller:
         
         additional = ['gh', 'jq', 'exa', 'zoxide', 'tldr', 'ncdu', 'cloc', 'htop']
         for cmd in additional:
-            installed = shutil.which(cmd) is not None
+            installed = self.tool_cache.which(cmd) is not None
             status = "✅" if installed else "❌"
             print(f"{status} {cmd}")
+        
+        self.tool_cache.save()
 
 
 def main():
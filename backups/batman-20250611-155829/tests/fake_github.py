@@ -0,0 +1,206 @@
+"""
+Servidor local que imita la API de GitHub para los tests (sin red).
+Implementa los endpoints REST de issues/PRs/comentarios con ETag y el
+subconjunto de GraphQL que usa `GitHubAPIClient`.
+"""
+
+import hashlib
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+_ALIAS = re.compile(r'(\w+):\s*(issueOrPullRequest|createIssue|addComment)\((?:number|input):\s*\$(\w+)\)')
+
+
+class FakeGitHub:
+    """
+    Estado del repositorio falso y servidor HTTP en un hilo.
+    
+    `requests` guarda (método, ruta) de cada petición y `connections` los
+    puertos cliente distintos vistos (para comprobar el keep-alive). Con
+    `drop_next` las siguientes respuestas se pierden: la petición se
+    procesa pero se cierra la conexión sin contestar.
+    """
+    
+    def __init__(self, repo: str = "wayne/batcave"):
+        self.repo = repo
+        self.items = {}
+        self.comments = []
+        self.labels = {'bug': 'L_bug', 'batman-discovery': 'L_discovery'}
+        self.requests = []
+        self.connections = set()
+        self.rate_limit_next = 0
+        self.drop_next = 0
+        self._next_number = 1
+        self._clock = 1700000000
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), _handler(self))
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True)
+    
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+    
+    def start(self) -> 'FakeGitHub':
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+    
+    def add_item(self, title: str, state: str = "open", pull: bool = False, labels=()) -> dict:
+        with self._lock:
+            number = self._next_number
+            self._next_number += 1
+            item = {
+                'id': f"N{number}", 'number': number, 'title': title, 'state': state,
+                'body': "", 'url': f"https://github.com/{self.repo}/issues/{number}",
+                'labels': [{'name': name} for name in labels], 'pull': pull,
+                'user': {'login': "bruce"}, 'created_at': self._tick(),
+            }
+            item['updated_at'] = item['created_at']
+            self.items[number] = item
+            return item
+    
+    def update_item(self, number: int, **changes) -> dict:
+        with self._lock:
+            item = self.items[number]
+            item.update(changes)
+            item['updated_at'] = self._tick()
+            return item
+    
+    def _tick(self) -> str:
+        self._clock += 1
+        return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(self._clock))
+    
+    def rest_item(self, item: dict) -> dict:
+        data = {k: v for k, v in item.items() if k not in ('id', 'pull')}
+        data['html_url'] = data.pop('url')
+        if item['pull']:
+            data['pull_request'] = {}
+        return data
+    
+    def graphql_item(self, item: dict) -> dict:
+        return {
+            '__typename': "PullRequest" if item['pull'] else "Issue",
+            'id': item['id'], 'number': item['number'], 'title': item['title'],
+            'state': item['state'].upper(), 'url': item['url'],
+        }
+    
+    def graphql(self, query: str, variables: dict) -> dict:
+        aliases = _ALIAS.findall(query)
+        if not aliases:
+            return {'repository': {
+                'id': "R_repo",
+                'labels': {'nodes': [{'id': i, 'name': n} for n, i in self.labels.items()]},
+            }}
+        
+        data = {}
+        repository = {}
+        for alias, field, variable in aliases:
+            value = variables[variable]
+            if field == 'issueOrPullRequest':
+                item = self.items.get(value)
+                repository[alias] = self.graphql_item(item) if item else None
+            elif field == 'createIssue':
+                names = {i: n for n, i in self.labels.items()}
+                item = self.add_item(value['title'], labels=[names[i] for i in value.get('labelIds', [])])
+                item['body'] = value['body']
+                data[alias] = {'issue': {'number': item['number'], 'url': item['url'], 'title': item['title']}}
+            elif field == 'addComment':
+                number = int(value['subjectId'][1:])
+                self.comments.append((number, value['body']))
+                data[alias] = {'commentEdge': {'node': {'id': f"C{len(self.comments)}"}}}
+        if repository:
+            data['repository'] = repository
+        return data
+
+
+def _handler(fake: FakeGitHub):
+    prefix = f"/repos/{fake.repo}"
+    
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        
+        def log_message(self, format, *args):
+            pass
+        
+        def _send(self, status: int, payload=None, headers=None):
+            if fake.drop_next:
+                fake.drop_next -= 1
+                self.close_connection = True
+                return
+            body = json.dumps(payload).encode('utf-8') if payload is not None else b""
+            self.send_response(status)
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.send_header('Content-Type', "application/json")
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def _begin(self):
+            fake.requests.append((self.command, self.path))
+            fake.connections.add(self.client_address[1])
+            length = int(self.headers.get('Content-Length') or 0)
+            body = json.loads(self.rfile.read(length)) if length else None
+            if fake.rate_limit_next:
+                fake.rate_limit_next -= 1
+                self._send(429, {'message': "secondary rate limit"}, {'Retry-After': "0"})
+                return None, None
+            return urlsplit(self.path), body
+        
+        def do_GET(self):
+            url, _ = self._begin()
+            if url is None:
+                return
+            query = {k: v[0] for k, v in parse_qs(url.query).items()}
+            if url.path not in (f"{prefix}/issues", f"{prefix}/pulls"):
+                self._send(404, {'message': "Not Found"})
+                return
+            pulls = url.path.endswith('/pulls')
+            state = query.get('state', 'open')
+            items = [fake.rest_item(item) for item in fake.items.values()
+                     if (not pulls or item['pull']) and state in ('all', item['state'])
+                     and item['updated_at'] >= query.get('since', "")]
+            if query.get('sort') == 'updated':
+                items.sort(key=lambda item: item['updated_at'], reverse=query.get('direction') != 'asc')
+            
+            per_page = int(query.get('per_page', 30))
+            page = int(query.get('page', 1))
+            chunk = items[(page - 1) * per_page:page * per_page]
+            headers = {'ETag': '"%s"' % hashlib.sha1(json.dumps(chunk).encode()).hexdigest()}
+            if len(items) > page * per_page:
+                query['page'] = str(page + 1)
+                next_query = "&".join(f"{k}={v}" for k, v in query.items())
+                headers['Link'] = f'<{fake.url}{url.path}?{next_query}>; rel="next"'
+            if self.headers.get('If-None-Match') == headers['ETag']:
+                # Como GitHub: el 304 solo trae el ETag, sin Link
+                self._send(304, None, {'ETag': headers['ETag']})
+                return
+            self._send(200, chunk, headers)
+        
+        def do_POST(self):
+            url, body = self._begin()
+            if url is None:
+                return
+            if url.path == "/graphql":
+                self._send(200, {'data': fake.graphql(body['query'], body['variables'])})
+                return
+            comment = re.fullmatch(rf"{prefix}/issues/(\d+)/comments", url.path)
+            if comment:
+                fake.comments.append((int(comment.group(1)), body['body']))
+                self._send(201, {'id': len(fake.comments), 'body': body['body']})
+            elif url.path in (f"{prefix}/issues", f"{prefix}/pulls"):
+                item = fake.add_item(body['title'], pull=url.path.endswith('/pulls'),
+                                     labels=body.get('labels', []))
+                self._send(201, fake.rest_item(item))
+            else:
+                self._send(404, {'message': "Not Found"})
+    
+    return Handler
@@ -0,0 +1,144 @@
+"""
+Tests para el control de admisión basado en la carga del sistema.
+"""
+
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from core.admission import AdmissionController, AdmissionTimeout, LoadSampler, SystemLoad
+
+
+class FakeSampler:
+    """Devuelve siempre la carga configurada."""
+    
+    def __init__(self, **load):
+        self.load = load
+    
+    def sample(self):
+        return SystemLoad(**self.load)
+
+
+def make_controller(sampler, **config):
+    config.setdefault('launch_interval', 0)
+    config.setdefault('sample_interval', 0)
+    return AdmissionController(config, sampler=sampler)
+
+
+class TestLoadSampler(unittest.TestCase):
+    """Tests de la lectura de /proc."""
+    
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp_dir.name)
+        (self.root / "pressure").mkdir()
+        (self.root / "stat").write_text("cpu  100 0 100 700 100 0 0 0 0 0\ncpu0 1 2 3 4\n")
+        (self.root / "meminfo").write_text("MemTotal: 1000 kB\nMemFree: 100 kB\nMemAvailable: 250 kB\n")
+        (self.root / "pressure" / "io").write_text(
+            "some avg10=12.50 avg60=3.00 avg300=1.00 total=10\n"
+            "full avg10=5.00 avg60=1.00 avg300=0.00 total=5\n"
+        )
+    
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+    
+    def test_sample_reads_proc_files(self):
+        load = LoadSampler(str(self.root)).sample()
+        
+        self.assertAlmostEqual(load.cpu_percent, 20.0)
+        self.assertAlmostEqual(load.memory_percent, 75.0)
+        self.assertEqual(load.io_pressure, 12.5)
+        self.assertIsNone(load.cpu_pressure)
+    
+    def test_cpu_percent_uses_delta_between_samples(self):
+        sampler = LoadSampler(str(self.root))
+        sampler.sample()
+        (self.root / "stat").write_text("cpu  190 0 100 710 100 0 0 0 0 0\n")
+        
+        self.assertAlmostEqual(sampler.sample().cpu_percent, 90.0)
+    
+    def test_missing_proc_gives_none(self):
+        load = LoadSampler(str(self.root / "nope")).sample()
+        
+        self.assertIsNone(load.cpu_percent)
+        self.assertIsNone(load.io_pressure)
+
+
+class TestAdmissionController(unittest.TestCase):
+    """Tests del límite dinámico y la admisión."""
+    
+    def test_pressure_is_max_ratio_over_limits(self):
+        load = SystemLoad(cpu_percent=42.5, io_pressure=50.0)
+        
+        self.assertAlmostEqual(load.pressure({'cpu_percent': 85, 'io_pressure': 25}), 2.0)
+        self.assertEqual(SystemLoad().pressure({'cpu_percent': 85}), 0.0)
+    
+    def test_always_admits_when_idle(self):
+        controller = make_controller(FakeSampler(cpu_percent=100.0))
+        
+        self.assertTrue(controller.acquire("a", timeout=0))
+        self.assertEqual(controller.active, 1)
+    
+    def test_limit_grows_under_low_load(self):
+        controller = make_controller(FakeSampler(cpu_percent=10.0), max_slots=3)
+        
+        for name in "abc":
+            self.assertTrue(controller.acquire(name, timeout=1))
+        self.assertEqual(controller.limit, 3)
+        self.assertFalse(controller.acquire("d", timeout=0.05))
+    
+    def test_overload_halves_limit_and_blocks(self):
+        sampler = FakeSampler(cpu_percent=10.0)
+        controller = make_controller(sampler, max_slots=4)
+        for name in "abcd":
+            controller.acquire(name, timeout=1)
+        
+        sampler.load = {'cpu_percent': 95.0}
+        controller.release("d")
+        
+        self.assertFalse(controller.acquire("d", timeout=0.05))
+        self.assertEqual(controller.limit, 1)
+    
+    def test_release_wakes_waiter(self):
+        controller = make_controller(FakeSampler(memory_percent=99.0))
+        controller.acquire("a")
+        admitted = []
+        waiter = threading.Thread(target=lambda: admitted.append(controller.acquire("b", timeout=2)))
+        waiter.start()
+        
+        time.sleep(0.05)
+        controller.release("a")
+        waiter.join()
+        
+        self.assertEqual(admitted, [True])
+    
+    def test_slot_timeout_raises(self):
+        controller = make_controller(FakeSampler(io_pressure=90.0))
+        
+        with controller.slot("a"):
+            with self.assertRaises(AdmissionTimeout):
+                with controller.slot("b", timeout=0.01):
+                    pass
+        self.assertEqual(controller.active, 0)
+    
+    def test_launch_interval_spaces_launches(self):
+        controller = make_controller(FakeSampler(), max_slots=2, launch_interval=0.2)
+        controller.acquire("a")
+        
+        self.assertFalse(controller.acquire("b", timeout=0.05))
+        self.assertTrue(controller.acquire("b", timeout=1))
+    
+    def test_disabled_admits_everything(self):
+        controller = make_controller(FakeSampler(cpu_percent=100.0), enabled=False, max_slots=1)
+        
+        self.assertTrue(controller.acquire("a", timeout=0))
+        self.assertTrue(controller.acquire("b", timeout=0))
+
+
+if __name__ == '__main__':
+    unittest.main()
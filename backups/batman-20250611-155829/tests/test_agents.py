@@ -16,6 +16,7 @@ import os
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from agents import AlfredAgent, RobinAgent, OracleAgent, BatgirlAgent, LuciusAgent
+from core.run_artifacts import RunArtifactStore
 from core.task import Task, TaskType, TaskPriority, TaskStatus
 from features.chapter_logger import ChapterLogger
 
@@ -411,7 +412,7 @@ class TestBaseAgentMethods(unittest.TestCase):
     
     @patch('subprocess.run')
     def test_execute_claude_saves_files(self, mock_run):
-        """Test que execute_claude guarda archivos de prompt y respuesta."""
+        """Test que execute_claude guarda prompt y respuesta en el almacén de artefactos."""
         mock_run.return_value = MagicMock(
             returncode=0,
             stdout="Test response",
@@ -426,20 +427,18 @@ class TestBaseAgentMethods(unittest.TestCase):
         )
         
         prompt = "Test prompt"
-        success, output, error = self.alfred._execute_claude(prompt, task)
-        
-        # Verificar archivos guardados
-        prompt_file = Path(f"/tmp/batman_prompt_{task.id}.txt")
-        response_file = Path(f"/tmp/batman_response_{task.id}.txt")
-        
-        self.assertTrue(prompt_file.exists())
-        self.assertTrue(response_file.exists())
-        self.assertEqual(prompt_file.read_text(), prompt)
-        self.assertEqual(response_file.read_text(), "Test response")
-        
-        # Limpiar archivos
-        prompt_file.unlink()
-        response_file.unlink()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self.alfred.artifacts = RunArtifactStore(tmp_dir, session_id="sesion-test")
+            success, output, error = self.alfred._execute_claude(prompt, task)
+            self.alfred.artifacts.flush()
+        
+            # Verificar artefactos guardados
+            artifacts = self.alfred.artifacts.list(name=f"alfred/{task.id}")
+            self.assertEqual([a['kind'] for a in artifacts], ['prompt', 'response'])
+            self.assertEqual(self.alfred.artifacts.read(artifacts[0]['id']), prompt)
+            self.assertEqual(self.alfred.artifacts.read(artifacts[1]['id']), "Test response")
+            self.assertFalse(Path(f"/tmp/batman_prompt_{task.id}.txt").exists())
+            self.alfred.artifacts.close()
     
     @patch('subprocess.run')
     def test_execute_claude_command_construction(self, mock_run):
@@ -1124,6 +1123,41 @@ import tempfile
 from unittest.mock import mock_open
 
 
+class TestClaudeTurnAccounting(unittest.TestCase):
+    """prompts_sent cuenta los turnos que usó Claude, no las llamadas."""
+    
+    def setUp(self):
+        self.alfred = AlfredAgent()
+        self.alfred.artifacts = MagicMock()
+        self.task = Task(title="Turnos", type=TaskType.DEVELOPMENT)
+        self.task.metadata['max_turns'] = 12
+    
+    @patch('subprocess.run')
+    def test_num_turns_from_json_output(self, mock_run):
+        mock_run.return_value = MagicMock(
+            returncode=0, stderr="",
+            stdout='{"type": "result", "result": "Hecho", "num_turns": 7}'
+        )
+        
+        success, output, _ = self.alfred._execute_claude("prompt", self.task)
+        
+        self.assertTrue(success)
+        self.assertEqual(output, "Hecho")
+        self.assertEqual(self.alfred.stats['prompts_sent'], 7)
+        cmd = mock_run.call_args[0][0]
+        self.assertEqual(cmd[cmd.index('--output-format') + 1], 'json')
+    
+    @patch('subprocess.run')
+    def test_unknown_usage_counts_max_turns(self, mock_run):
+        mock_run.return_value = MagicMock(returncode=0, stdout="texto plano", stderr="")
+        self.assertEqual(self.alfred._execute_claude("prompt", self.task)[1], "texto plano")
+        self.assertEqual(self.alfred.stats['prompts_sent'], 12)
+        
+        mock_run.side_effect = subprocess.TimeoutExpired('claude', 600)
+        self.assertFalse(self.alfred._execute_claude("prompt", self.task)[0])
+        self.assertEqual(self.alfred.stats['prompts_sent'], 24)
+
+
 if __name__ == '__main__':
     # Ejecutar tests con verbose output
     unittest.main(verbosity=2)
\ No newline at end of file
@@ -8,11 +8,13 @@ from unittest.mock import patch, MagicMock, call
 import sys
 from pathlib import Path
 import subprocess
+import tempfile
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from core.arsenal import Arsenal, get_arsenal
+from core import arsenal as arsenal_module
+from core.arsenal import Arsenal, ToolCache, arsenal_config, get_arsenal
 
 
 class TestArsenal(unittest.TestCase):
@@ -335,5 +337,117 @@ class TestArsenal(unittest.TestCase):
         self.assertIn('PR #123', result.stdout)
 
 
+
+class TestToolCache(unittest.TestCase):
+    """Tests para la detección perezosa y cacheada de herramientas."""
+    
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache_file = Path(self.tmp_dir.name) / "arsenal_tools.json"
+    
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+    
+    @patch('shutil.which')
+    def test_construction_does_not_probe(self, mock_which):
+        """Crear el Arsenal no lanza ningún which."""
+        Arsenal({'tool_cache_file': str(self.cache_file)})
+        mock_which.assert_not_called()
+    
+    @patch('shutil.which')
+    def test_category_resolved_on_first_use(self, mock_which):
+        """Solo se consultan los binarios de la categoría pedida."""
+        mock_which.side_effect = lambda tool: '/bin/sh' if tool == 'grep' else None
+        arsenal = Arsenal({'tool_cache_file': str(self.cache_file)})
+        
+        self.assertEqual(arsenal.get_tool('search'), 'grep')
+        probed = {c.args[0] for c in mock_which.call_args_list}
+        self.assertEqual(probed, {'rg', 'ag', 'ack', 'grep'})
+    
+    @patch('shutil.which')
+    def test_disk_cache_reused_across_instances(self, mock_which):
+        """Una segunda instancia reutiliza la cache en disco."""
+        mock_which.side_effect = lambda tool: '/bin/sh' if tool == 'rg' else None
+        Arsenal({'tool_cache_file': str(self.cache_file)}).get_tool('search')
+        self.assertTrue(self.cache_file.exists())
+        
+        mock_which.reset_mock()
+        arsenal = Arsenal({'tool_cache_file': str(self.cache_file)})
+        self.assertEqual(arsenal.get_tool('search'), 'rg')
+        mock_which.assert_not_called()
+    
+    @patch('shutil.which')
+    def test_cache_invalidated_when_path_changes(self, mock_which):
+        """Cambiar el PATH invalida la cache."""
+        mock_which.return_value = None
+        cache = ToolCache(self.cache_file)
+        self.assertIsNone(cache.which('rg'))
+        cache.save()
+        
+        with patch.dict('os.environ', {'PATH': self.tmp_dir.name}):
+            mock_which.reset_mock()
+            ToolCache(self.cache_file).which('rg')
+            mock_which.assert_called_once_with('rg')
+
+    @patch('shutil.which')
+    def test_refresh_tool_replaces_negative_entry(self, mock_which):
+        """Un binario recién instalado deja de figurar como ausente."""
+        mock_which.side_effect = lambda tool: '/bin/sh' if tool == 'grep' else None
+        arsenal = Arsenal({'tool_cache_file': str(self.cache_file)})
+        self.assertEqual(arsenal.get_tool('search'), 'grep')
+        
+        mock_which.side_effect = lambda tool: '/bin/sh' if tool in ('rg', 'grep') else None
+        self.assertEqual(arsenal.refresh_tool('rg'), '/bin/sh')
+        self.assertEqual(arsenal.get_tool('search'), 'rg')
+        self.assertEqual(ToolCache(self.cache_file).which('rg'), '/bin/sh')
+
+
+class TestToolInstaller(unittest.TestCase):
+    """Tests de la integración del instalador con el Arsenal."""
+    
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp_dir.name)
+        self._saved_arsenal = arsenal_module._arsenal_instance
+        arsenal_module._arsenal_instance = None
+        self.config = {'paths.cache': str(self.root / "cache")}
+    
+    def tearDown(self):
+        arsenal_module._arsenal_instance = self._saved_arsenal
+        self.tmp_dir.cleanup()
+    
+    def test_arsenal_config_uses_paths_cache(self):
+        self.assertEqual(arsenal_config(self.config), {'cache_dir': str(self.root / "cache")})
+    
+    def test_installer_creates_arsenal_with_configured_cache(self):
+        from tools.installer import ToolInstaller
+        
+        installer = ToolInstaller(self.config)
+        
+        self.assertEqual(installer.tool_cache.cache_file, self.root / "cache" / "arsenal_tools.json")
+        self.assertIs(installer.arsenal, get_arsenal())
+    
+    def test_install_refreshes_tool_cache(self):
+        from tools.installer import ToolInstaller
+        
+        installer = ToolInstaller(self.config)
+        installer.local_bin = self.root / "bin"
+        installer.local_bin.mkdir()
+        installer.temp_dir = self.root / "tmp"
+        extracted = self.root / "extract"
+        extracted.mkdir()
+        (extracted / "sd").write_text("#!/bin/sh\n")
+        
+        with patch('shutil.which', side_effect=lambda tool: str(installer.local_bin / tool)
+                   if (installer.local_bin / tool).exists() else None):
+            self.assertFalse(installer.is_installed('sd'))
+            with patch.object(ToolInstaller, 'download_file', return_value=True), \
+                 patch.object(ToolInstaller, 'extract_archive', return_value=extracted):
+                self.assertTrue(installer.install_tool('sd'))
+            
+            self.assertTrue(installer.is_installed('sd'))
+            self.assertEqual(get_arsenal().get_tool('sed'), 'sd')
+
+
 if __name__ == '__main__':
     unittest.main(verbosity=2)
\ No newline at end of file
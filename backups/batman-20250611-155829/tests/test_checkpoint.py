@@ -0,0 +1,217 @@
+"""
+Tests para los checkpoints por tarea y la reanudación de sesiones.
+"""
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from core.task import Task, TaskStatus
+from core.task_store import TaskStore
+from core.batman import BatmanIncorporated
+from execution.safe_mode import SafeMode
+
+
+class TestBatmanResume(unittest.TestCase):
+    """Una sesión caída a mitad del plan se retoma sin repetir trabajo."""
+    
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        
+        batman = BatmanIncorporated.__new__(BatmanIncorporated)
+        batman.config = MagicMock()
+        batman.config.get.side_effect = lambda key, default=None: default
+        batman.logger = MagicMock()
+        batman.agents = {}
+        batman.completed_tasks = []
+        batman.session_stats = {'tasks_completed': 0, 'agents_used': set()}
+        batman.session_id = None
+        batman.session_worktrees = {}
+        batman.deferred_tasks = []
+        batman._restored_worktrees = {}
+        batman.artifacts = MagicMock()
+        batman.task_store = TaskStore(Path(self.tmp_dir.name) / "tasks.db")
+        self.batman = batman
+    
+    def tearDown(self):
+        self.batman.task_store.close()
+        self.tmp_dir.cleanup()
+    
+    def test_execute_task_persists_task_states(self):
+        """execute_task guarda el plan y cada transición en el TaskStore."""
+        tasks = [Task(title=f"Tarea {i}") for i in range(3)]
+        
+        def simulate(task):
+            if task is tasks[2]:
+                raise SystemExit("caída")
+            task.complete("ok")
+        
+        self.batman._analyze_and_plan = lambda description: tasks
+        self.batman._simulate_task_execution = simulate
+        self.batman._execute_plan = lambda plan, mode: self.batman._run_tasks(MagicMock(), plan)
+        self.batman._generate_report = MagicMock()
+        
+        with self.assertRaises(SystemExit):
+            self.batman.execute_task("crear API", mode="rapido")
+        
+        store = self.batman.task_store
+        session = store.get_session(self.batman.session_id)
+        self.assertEqual((session['description'], session['mode'], session['status']),
+                         ("crear API", "rapido", "running"))
+        self.assertEqual([t.status for t in store.load_tasks(session_id=self.batman.session_id)],
+                         [TaskStatus.COMPLETED, TaskStatus.COMPLETED, TaskStatus.IN_PROGRESS])
+    
+    def _crash_mid_plan(self, tasks, executed):
+        """Ejecuta el plan hasta que la tercera tarea tumba el proceso."""
+        def simulate(task):
+            if len(executed) == 2:
+                raise SystemExit("caída")
+            executed.append(task.id)
+            task.complete("ok")
+            self.batman.session_stats['tasks_completed'] += 1
+            self.batman.session_stats['agents_used'].add("alfred")
+        
+        self.batman._simulate_task_execution = simulate
+        self.batman._open_session("sesion-x", "plan", "rapido")
+        self.batman.task_store.save_tasks(tasks, "sesion-x")
+        with self.assertRaises(SystemExit):
+            self.batman._run_tasks(MagicMock(), tasks)
+    
+    def _reset_batman(self):
+        """Simula un proceso nuevo con el mismo TaskStore."""
+        self.batman.session_id = None
+        self.batman.completed_tasks = []
+        self.batman.session_stats = {'tasks_completed': 0, 'agents_used': set()}
+        self.batman._generate_report = MagicMock()
+    
+    def test_crash_and_resume(self):
+        """Las completadas se omiten y las demás se ejecutan al retomar."""
+        executed = []
+        tasks = [Task(title=f"Tarea {i}") for i in range(4)]
+        self._crash_mid_plan(tasks, executed)
+        
+        session = self.batman.task_store.get_session("sesion-x")
+        self.assertEqual(session['status'], "running")
+        self.assertEqual(session['state']['stats'], {'tasks_completed': 2, 'agents_used': ['alfred']})
+        
+        self._reset_batman()
+        resumed = []
+        modes = []
+        
+        def execute_plan(plan, mode):
+            modes.append(mode)
+            for task in plan:
+                resumed.append(task.id)
+                task.complete()
+                self.batman._checkpoint_task(task)
+            return True
+        
+        self.batman._execute_plan = execute_plan
+        self.assertTrue(self.batman.resume_session("last"))
+        
+        self.assertEqual(resumed, [t.id for t in tasks[2:]])
+        self.assertEqual(modes, ["rapido"])
+        self.assertEqual(self.batman.session_stats['tasks_completed'], 2)
+        self.assertEqual(self.batman.session_stats['agents_used'], {'alfred'})
+        self.assertEqual(self.batman.task_store.get_session("sesion-x")['status'], "completed")
+        self.assertEqual(len(self.batman.task_store.completed_ids("sesion-x")), 4)
+    
+    def test_resume_retries_failed_tasks(self):
+        """Las tareas fallidas se re-encolan al retomar."""
+        tasks = [Task(title=f"Tarea {i}") for i in range(2)]
+        tasks[0].complete("ok")
+        tasks[1].fail("timeout")
+        self.batman._open_session("sesion-f", "plan", "rapido")
+        self.batman.task_store.save_tasks(tasks, "sesion-f")
+        self.batman._close_session('failed')
+        
+        self._reset_batman()
+        self.batman.session_stats['tasks_failed'] = 0
+        pending = []
+        self.batman._execute_plan = lambda plan, mode: pending.extend(plan) or True
+        
+        self.assertTrue(self.batman.resume_session("sesion-f"))
+        self.assertEqual([t.id for t in pending], [tasks[1].id])
+        self.assertEqual(pending[0].status, TaskStatus.PENDING)
+    
+    def test_completed_sessions_are_not_resumed(self):
+        """"last" ignora las sesiones que ya terminaron."""
+        self.batman._open_session("terminada", "plan", "rapido")
+        self.batman._close_session('completed')
+        self._reset_batman()
+        self.batman._execute_plan = MagicMock()
+        
+        self.assertFalse(self.batman.resume_session("last"))
+        self.assertTrue(self.batman.resume_session("terminada"))
+        self.batman._execute_plan.assert_not_called()
+    
+    def _run_with_mode(self, tasks, mode):
+        """execute_task con un plan fijo y sin historial de duraciones."""
+        self.batman._analyze_and_plan = lambda description: tasks
+        self.batman._generate_report = MagicMock()
+        self.batman.durations = MagicMock()
+        self.batman.durations.apply.return_value = 0
+        self.batman.execute_task("crear API", mode=mode)
+        return self.batman.task_store.get_session(self.batman.session_id)
+    
+    def test_failed_prepare_leaves_session_resumable(self):
+        """Si el modo no se prepara, la sesión queda 'failed' y se puede retomar."""
+        tasks = [Task(title=f"Tarea {i}") for i in range(2)]
+        self.batman._finalize_session = MagicMock()
+        with patch("core.batman.SafeMode") as safe_mode:
+            safe_mode.return_value.prepare.return_value = False
+            session = self._run_with_mode(tasks, "seguro")
+        
+        self.assertEqual(session['status'], "failed")
+        self.assertEqual(self.batman.task_store.latest_resumable_session(), session['id'])
+        self.batman._finalize_session.assert_not_called()
+    
+    def test_infinity_mode_checkpoints_each_task(self):
+        """Infinity completa las tareas de los agentes que acabaron y falla las demás."""
+        tasks = [Task(title="API", assigned_to="alfred"), Task(title="Tests", assigned_to="robin")]
+        self.batman.session_stats['tasks_failed'] = 0
+        self.batman._finalize_session = MagicMock()
+        
+        with patch("core.batman.InfinityMode") as infinity_mode:
+            infinity_mode.return_value.execute.return_value = {'agents': {
+                'alfred': {'status': 'completed', 'returncode': 0},
+                'robin': {'status': 'timeout', 'returncode': None},
+            }}
+            session = self._run_with_mode(tasks, "infinity")
+        
+        stored = self.batman.task_store.load_tasks(session_id=session['id'])
+        self.assertEqual({t.title: t.status for t in stored},
+                         {"API": TaskStatus.COMPLETED, "Tests": TaskStatus.FAILED})
+        self.assertEqual(session['status'], "failed")
+        self.assertEqual(self.batman.session_stats['tasks_completed'], 1)
+        self.assertEqual(self.batman.session_stats['tasks_failed'], 1)
+    
+    def test_session_with_pending_tasks_is_incomplete(self):
+        """Una sesión con tareas sin ejecutar no se cierra como 'completed'."""
+        tasks = [Task(title=f"Tarea {i}") for i in range(2)]
+        self.batman._open_session("a-medias", "plan", "rapido")
+        self.batman.task_store.save_tasks(tasks, "a-medias")
+        tasks[0].complete("ok")
+        self.batman._checkpoint_task(tasks[0])
+        
+        self.assertEqual(self.batman._session_end_status(), "incomplete")
+        tasks[1].complete("ok")
+        self.batman._checkpoint_task(tasks[1])
+        self.assertEqual(self.batman._session_end_status(), "completed")
+    
+    def test_safe_mode_restores_existing_worktrees(self):
+        mode = SafeMode({}, None)
+        mode.restore_worktrees({
+            'alfred': {'path': self.tmp_dir.name, 'branch': 'batman/alfred-1'},
+            'robin': {'path': '/no/existe', 'branch': 'batman/robin-1'}
+        })
+        self.assertEqual(mode.worktrees, {'alfred': Path(self.tmp_dir.name)})
+        self.assertEqual(mode.branches, {'alfred': 'batman/alfred-1'})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+"""
+Tests para CommandRunner - ejecución de comandos sin shell.
+Verifica argv, timeouts, captura limitada, concurrencia y métricas.
+"""
+
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from core.command_runner import CommandRunner
+
+
+class TestCommandRunner(unittest.TestCase):
+    """Tests para el ejecutor de comandos compartido."""
+    
+    def setUp(self):
+        self.runner = CommandRunner(max_concurrent=2, default_timeout=10)
+    
+    def test_argv_is_not_shell_interpreted(self):
+        """Los metacaracteres de shell llegan literales al proceso."""
+        result = self.runner.run([sys.executable, '-c', 'import sys; print(sys.argv[1])', '$HOME; ls'])
+        self.assertTrue(result.success)
+        self.assertEqual(result.stdout.strip(), '$HOME; ls')
+    
+    def test_string_command_is_split(self):
+        """Los strings se parten con shlex."""
+        result = self.runner.run(f'{sys.executable} -c "print(40 + 2)"')
+        self.assertEqual(result.stdout.strip(), '42')
+    
+    def test_empty_and_missing_commands(self):
+        """Comandos vacíos o inexistentes no lanzan excepción."""
+        self.assertFalse(self.runner.run("").success)
+        result = self.runner.run(['batman-no-existe-xyz'])
+        self.assertEqual(result.returncode, 127)
+    
+    def test_per_command_timeout(self):
+        """Cada comando respeta su propio timeout."""
+        result = self.runner.run([sys.executable, '-c', 'import time; time.sleep(5)'], timeout=0.3)
+        self.assertTrue(result.timed_out)
+        self.assertEqual(result.stderr, "Command timed out")
+        self.assertLess(result.duration, 3)
+    
+    def test_limited_capture_keeps_head_and_tail(self):
+        """Con capture_limit solo se guarda cabeza y cola."""
+        script = "print('INICIO'); print('x' * 100000); print('FINAL')"
+        result = self.runner.run([sys.executable, '-c', script], capture_limit=1000)
+        self.assertTrue(result.success)
+        self.assertTrue(result.truncated)
+        self.assertTrue(result.stdout.startswith('INICIO'))
+        self.assertTrue(result.stdout.rstrip().endswith('FINAL'))
+        self.assertLess(len(result.stdout), 1200)
+    
+    def test_limited_capture_timeout(self):
+        """El modo limitado también mata procesos que exceden el timeout."""
+        result = self.runner.run([sys.executable, '-c', 'import time; time.sleep(5)'],
+                                 timeout=0.3, capture_limit=100)
+        self.assertTrue(result.timed_out)
+    
+    def test_stream_yields_lines(self):
+        """stream entrega la salida línea a línea."""
+        lines = list(self.runner.stream([sys.executable, '-c', 'for i in range(3): print(i)']))
+        self.assertEqual(lines, ['0', '1', '2'])
+    
+    def test_concurrency_limit(self):
+        """Nunca hay más procesos simultáneos que max_concurrent."""
+        active = []
+        peak = []
+        lock = threading.Lock()
+        original = self.runner._run_full
+        
+        def tracking_run(*args, **kwargs):
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            try:
+                time.sleep(0.05)
+                return original(*args, **kwargs)
+            finally:
+                with lock:
+                    active.pop()
+        
+        self.runner._run_full = tracking_run
+        threads = [threading.Thread(target=self.runner.run, args=([sys.executable, '-c', 'pass'],))
+                   for _ in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        
+        self.assertLessEqual(max(peak), 2)
+    
+    def test_metrics_grouped_by_subcommand(self):
+        """Las métricas agrupan git por subcomando."""
+        self.runner.run(['git', '--version'])
+        self.runner.run(['git', 'version'])
+        self.runner.run(['git', 'version'])
+        
+        metrics = self.runner.get_metrics()
+        self.assertEqual(metrics['git version']['count'], 2)
+        self.assertEqual(metrics['git']['count'], 1)
+        self.assertGreaterEqual(metrics['git version']['total_time'], 0)
+        
+        self.runner.reset_metrics()
+        self.assertEqual(self.runner.get_metrics(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -350,6 +350,104 @@ class TestConfig(unittest.TestCase):
         except Exception as e:
             self.fail(f"La configuración válida lanzó excepción: {e}")
     
+    def test_circular_reference_detected(self):
+        """Test detección de referencias circulares entre variables."""
+        with patch.object(Config, 'default_config_path', self.config_dir / "default_config.yaml"):
+            with patch.object(Config, '_create_directories'):
+                config = Config()
+                config.config = {
+                    'paths': {
+                        'a': '${paths.b}/x',
+                        'b': '${paths.a}/y'
+                    }
+                }
+                
+                with self.assertRaises(ValueError) as ctx:
+                    config._expand_variables()
+                self.assertIn('paths.a', str(ctx.exception))
+    
+    def test_unknown_variable_left_untouched(self):
+        """Test variables desconocidas se dejan sin expandir."""
+        with patch.object(Config, 'default_config_path', self.config_dir / "default_config.yaml"):
+            with patch.object(Config, '_create_directories'):
+                config = Config()
+                config.config = {'paths': {'base': '/b', 'x': '${nope}/${paths.base}'}}
+                config._expand_variables()
+                
+                self.assertEqual(config.get('paths.x'), '${nope}//b')
+    
+    def test_compiled_snapshot_cached_by_mtime(self):
+        """Test el YAML solo se vuelve a parsear cuando cambia el archivo."""
+        default_path = self.config_dir / "default_config.yaml"
+        with patch.object(Config, 'default_config_path', default_path):
+            with patch.object(Config, '_create_directories'):
+                first = Config()
+                with patch.object(Config, '_load_default_config') as mock_load:
+                    second = Config()
+                    mock_load.assert_not_called()
+                self.assertEqual(second.get('batman.name'), 'Batman Incorporated')
+                
+                # Modificar el archivo invalida el snapshot
+                self.default_config['batman']['name'] = 'Batman Inc'
+                with open(default_path, 'w') as f:
+                    yaml.dump(self.default_config, f)
+                os.utime(default_path, ns=(0, os.stat(default_path).st_mtime_ns + 10**9))
+                
+                third = Config()
+                self.assertEqual(third.get('batman.name'), 'Batman Inc')
+                self.assertEqual(first.get('batman.name'), 'Batman Incorporated')
+    
+    def test_instances_do_not_share_changes(self):
+        """Test set() en una instancia no afecta al snapshot compartido."""
+        with patch.object(Config, 'default_config_path', self.config_dir / "default_config.yaml"):
+            with patch.object(Config, '_create_directories'):
+                first = Config()
+                second = Config()
+                
+                first.set('execution.mode', 'fast')
+                self.assertEqual(first.get('execution.mode'), 'fast')
+                self.assertEqual(second.get('execution.mode'), 'safe')
+                self.assertEqual(Config().get('execution.mode'), 'safe')
+    
+    def test_get_returns_copies_of_shared_values(self):
+        """Test mutar lo devuelto por get() no altera el snapshot compartido."""
+        with patch.object(Config, 'default_config_path', self.config_dir / "default_config.yaml"):
+            with patch.object(Config, '_create_directories'):
+                first = Config()
+                execution = first.get('execution')
+                execution['mode'] = 'fast'
+                first.get_agent_config('alfred')['enabled'] = False
+                
+                second = Config()
+                self.assertEqual(second.get('execution.mode'), 'safe')
+                self.assertEqual(second.get('execution')['mode'], 'safe')
+                self.assertEqual(first.get('execution.mode'), 'safe')
+                self.assertNotEqual(second.get_agent_config('alfred').get('enabled'), False)
+    
+    def test_typed_accessors(self):
+        """Test accesores tipados."""
+        with patch.object(Config, 'default_config_path', self.config_dir / "default_config.yaml"):
+            with patch.object(Config, '_create_directories'):
+                config = Config()
+                config.config = {
+                    'limits': {'retries': '3', 'ratio': 0.5, 'bad': 'abc'},
+                    'flags': {'on': 'yes', 'off': 'false', 'real': True},
+                    'items': 'solo',
+                    'paths': {'home': '~/batman'}
+                }
+        
+        self.assertEqual(config.get_int('limits.retries'), 3)
+        self.assertEqual(config.get_int('limits.bad', 7), 7)
+        self.assertEqual(config.get_float('limits.ratio'), 0.5)
+        self.assertTrue(config.get_bool('flags.on'))
+        self.assertFalse(config.get_bool('flags.off', True))
+        self.assertTrue(config.get_bool('flags.real'))
+        self.assertFalse(config.get_bool('flags.missing'))
+        self.assertEqual(config.get_list('items'), ['solo'])
+        self.assertEqual(config.get_list('missing'), [])
+        self.assertEqual(config.get_str('limits.ratio'), '0.5')
+        self.assertEqual(config.get_path('paths.home'), Path(os.path.expanduser('~/batman')))
+    
     def test_environment_variable_expansion(self):
         """Test expansión de variables de entorno (feature no implementada)."""
         # Esta funcionalidad no está implementada en la configuración actual
@@ -0,0 +1,134 @@
+"""
+Tests para el analizador de diffs en una sola pasada.
+"""
+
+import io
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from integrations.diff_analyzer import DiffAnalyzer, analyze_staged_changes
+
+
+SAMPLE_DIFF = """\
+-\t-\tassets/logo.png
+3\t1\tsrc/auth.py
+2\t0\ttests/test_auth.py
+1\t1\tsrc/{old.js => new.js}
+
+diff --git a/assets/logo.png b/assets/logo.png
+Binary files a/assets/logo.png and b/assets/logo.png differ
+diff --git a/src/auth.py b/src/auth.py
+--- a/src/auth.py
++++ b/src/auth.py
+@@ -1,3 +1,5 @@ def login():
+ import os
+--- removed comment mentioning fix
++PASSWORD = os.environ["PASSWORD"]
++subprocess.run(cmd, shell=True)
++# new feature
+ user = None
+diff --git a/tests/test_auth.py b/tests/test_auth.py
+--- a/tests/test_auth.py
++++ b/tests/test_auth.py
+@@ -0,0 +1,2 @@
++def test_login():
++    assert True
+diff --git a/src/old.js b/src/new.js
+--- a/src/old.js
++++ b/src/new.js
+@@ -1 +1 @@
+-var a = 1;
++var a = 2; // breaking: changes default
+"""
+
+
+class TestDiffAnalyzer(unittest.TestCase):
+    """Tests del parser incremental."""
+    
+    def setUp(self):
+        self.analysis = DiffAnalyzer().feed_stream(io.StringIO(SAMPLE_DIFF)).analysis
+    
+    def test_per_file_stats_from_numstat(self):
+        files = {f.path: f for f in self.analysis.files}
+        
+        self.assertEqual(list(files), ['assets/logo.png', 'src/auth.py', 'tests/test_auth.py', 'src/new.js'])
+        self.assertTrue(files['assets/logo.png'].binary)
+        self.assertEqual((files['src/auth.py'].added, files['src/auth.py'].removed), (3, 1))
+        self.assertTrue(files['tests/test_auth.py'].is_test)
+        self.assertEqual(self.analysis.lines_added, 6)
+    
+    def test_languages_and_change_types(self):
+        result = self.analysis.to_dict()
+        
+        self.assertEqual(result['languages'], {'py', 'js'})
+        self.assertEqual(result['change_types'], ['bug-fix', 'feature', 'tests'])
+        self.assertEqual(result['test_coverage'], 'improved')
+        self.assertTrue(result['breaking_changes'])
+    
+    def test_security_hunks_are_attributed_to_files(self):
+        hunks = self.analysis.security_hunks
+        
+        self.assertEqual(len(hunks), 1)
+        self.assertEqual(hunks[0]['file'], 'src/auth.py')
+        self.assertEqual(hunks[0]['reasons'], 'exec, secret')
+        self.assertTrue(self.analysis.to_dict()['security_impact'])
+    
+    def test_context_lines_are_ignored(self):
+        diff = "1\t1\ta.py\n\ndiff --git a/a.py b/a.py\n@@ -1,2 +1,2 @@\n password = 1\n-x = 1\n+x = 2\n"
+        
+        analysis = DiffAnalyzer().feed_stream(io.StringIO(diff)).analysis
+        
+        self.assertEqual(analysis.security_hunks, [])
+    
+    def test_long_lines_are_scanned_in_chunks(self):
+        long_line = "+" + "x" * 200000 + " api_key = 'abc'\n"
+        diff = "1\t0\tbundle.min.js\n\ndiff --git a/b b/b\n@@ -0,0 +1 @@\n" + long_line
+        
+        analysis = DiffAnalyzer().feed_stream(io.StringIO(diff)).analysis
+        
+        self.assertEqual(analysis.files[0].security_hunks, 1)
+
+
+class TestAnalyzeStagedChanges(unittest.TestCase):
+    """Test con un repositorio git real."""
+    
+    def test_staged_changes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            def git(*args):
+                subprocess.run(['git', *args], cwd=tmp, check=True, capture_output=True)
+            git('init', '-q')
+            (Path(tmp) / 'main.go').write_text('package main\n// fix token refresh\n')
+            git('add', 'main.go')
+            
+            result = analyze_staged_changes(tmp).to_dict()
+        
+        self.assertEqual(result['files_changed'], 1)
+        self.assertEqual(result['lines_added'], 2)
+        self.assertEqual(result['languages'], {'go'})
+        self.assertIn('bug-fix', result['change_types'])
+        self.assertTrue(result['security_impact'])
+
+    def test_non_ascii_paths(self):
+        """Las rutas con acentos llegan sin comillas ni escapes."""
+        with tempfile.TemporaryDirectory() as tmp:
+            def git(*args):
+                subprocess.run(['git', *args], cwd=tmp, check=True, capture_output=True)
+            git('init', '-q')
+            (Path(tmp) / 'pruebas').mkdir()
+            (Path(tmp) / 'pruebas' / 'test_señal.py').write_text('assert True\n', encoding='utf-8')
+            git('add', '-A')
+            
+            analysis = analyze_staged_changes(tmp)
+        
+        self.assertEqual([f.path for f in analysis.files], ['pruebas/test_señal.py'])
+        self.assertEqual(analysis.files[0].language, 'py')
+        self.assertTrue(analysis.files[0].is_test)
+
+
+if __name__ == '__main__':
+    unittest.main()
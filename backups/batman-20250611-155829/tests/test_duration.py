@@ -0,0 +1,150 @@
+"""
+Tests para el modelo histórico de duración de tareas.
+"""
+
+import sqlite3
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from core.task import Task, TaskType
+from core.duration import (
+    DEFAULT_SETTINGS, DurationEstimate, DurationModel, critical_path,
+    repo_size_bucket, weighted_quantile
+)
+
+
+class TestDurationModel(unittest.TestCase):
+    """Tests de registro y predicción."""
+    
+    def setUp(self):
+        self.model = DurationModel(":memory:")
+    
+    def tearDown(self):
+        self.model.close()
+    
+    def _record(self, hours_list, agent="alfred", repo_bucket=2, tags=(), task_type=TaskType.DEVELOPMENT):
+        for hours in hours_list:
+            task = Task(title="t", type=task_type, assigned_to=agent, tags=list(tags))
+            self.model.record(task, repo_bucket=repo_bucket, hours=hours)
+    
+    def test_no_history_gives_none(self):
+        self._record([1.0, 2.0])
+        
+        self.assertIsNone(self.model.predict(Task(type=TaskType.DEVELOPMENT, assigned_to="alfred")))
+    
+    def test_predicts_quantiles_from_most_specific_group(self):
+        self._record([0.1, 0.2, 0.3, 0.4, 1.0], repo_bucket=2)
+        self._record([5.0, 5.0, 5.0], repo_bucket=4)
+        
+        estimate = self.model.predict(Task(type=TaskType.DEVELOPMENT, assigned_to="alfred"), repo_bucket=2)
+        
+        self.assertEqual(estimate.basis, "tipo+agente+repo")
+        self.assertEqual(estimate.p50_hours, 0.3)
+        self.assertEqual(estimate.p90_hours, 1.0)
+    
+    def test_falls_back_to_task_type(self):
+        self._record([0.5, 0.5, 0.5], agent="robin", task_type=TaskType.TESTING)
+        
+        estimate = self.model.predict(Task(type=TaskType.TESTING, assigned_to="oracle"))
+        
+        self.assertEqual(estimate.basis, "tipo")
+        self.assertEqual(estimate.samples, 3)
+    
+    def test_shared_tags_weigh_more(self):
+        self._record([1.0, 1.0, 1.0], tags=["api"])
+        self._record([3.0, 3.0, 3.0], tags=["ui"])
+        
+        api = self.model.predict(Task(type=TaskType.DEVELOPMENT, assigned_to="alfred", tags=["API"]),
+                                 repo_bucket=2)
+        
+        self.assertEqual(api.p50_hours, 1.0)
+    
+    def test_apply_sets_estimate_timeout_and_turns(self):
+        self._record([0.25, 0.25, 0.5])
+        task = Task(type=TaskType.DEVELOPMENT, assigned_to="alfred", estimated_hours=4.0)
+        other = Task(type=TaskType.RESEARCH, assigned_to="lucius", estimated_hours=2.0)
+        
+        self.assertEqual(self.model.apply([task, other], repo_bucket=2), 1)
+        self.assertEqual(task.estimated_hours, 0.25)
+        self.assertEqual(task.metadata['timeout_seconds'], 2700)
+        self.assertEqual(task.metadata['max_turns'], 30)
+        self.assertEqual(other.estimated_hours, 2.0)
+        self.assertNotIn('timeout_seconds', other.metadata)
+    
+    def test_ignores_tasks_without_duration(self):
+        self.model.record(Task(type=TaskType.DEVELOPMENT))
+        self._record([0.5] * 2)
+        
+        self.assertIsNone(self.model.predict(Task(type=TaskType.DEVELOPMENT, assigned_to="alfred")))
+
+    def test_failed_runs_count_at_least_the_timeout(self):
+        """Las ejecuciones fallidas entran censuradas y suben el p90."""
+        self._record([0.1, 0.1, 0.1, 0.1])
+        timed_out = Task(title="t", type=TaskType.DEVELOPMENT, assigned_to="alfred")
+        timed_out.metadata['timeout_seconds'] = 1800
+        self.model.record(timed_out, repo_bucket=2, hours=0.2, censored=True)
+        self.model.record(Task(title="t", type=TaskType.DEVELOPMENT, assigned_to="alfred"),
+                          repo_bucket=2, censored=True)
+        
+        estimate = self.model.predict(Task(type=TaskType.DEVELOPMENT, assigned_to="alfred"), repo_bucket=2)
+        self.assertEqual(estimate.samples, 6)
+        self.assertEqual(estimate.p90_hours, 0.5)
+        rows = self.model._conn.execute("SELECT hours, censored FROM durations WHERE censored = 1").fetchall()
+        self.assertEqual(sorted(rows), [(DEFAULT_SETTINGS['min_timeout'] / 3600, 1), (0.5, 1)])
+    
+    def test_old_history_gets_censored_column(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = Path(tmp) / "durations.db"
+            conn = sqlite3.connect(str(db_path))
+            conn.execute("CREATE TABLE durations (id INTEGER PRIMARY KEY, task_type TEXT NOT NULL, "
+                         "agent TEXT NOT NULL, repo_bucket INTEGER NOT NULL, tags TEXT NOT NULL, "
+                         "hours REAL NOT NULL, recorded_at REAL NOT NULL)")
+            conn.close()
+            
+            model = DurationModel(db_path)
+            model.record(Task(type=TaskType.DEVELOPMENT), hours=1.0, censored=True)
+            self.assertEqual(model._conn.execute("SELECT censored FROM durations").fetchone(), (1,))
+            model.close()
+
+
+class TestDurationHelpers(unittest.TestCase):
+    """Tests de funciones auxiliares."""
+    
+    def test_limits_are_clamped(self):
+        short = DurationEstimate(p50_hours=0.01, p90_hours=0.02, samples=3, basis="tipo")
+        long = DurationEstimate(p50_hours=5, p90_hours=8, samples=3, basis="tipo")
+        
+        self.assertEqual(short.timeout_seconds(DEFAULT_SETTINGS), DEFAULT_SETTINGS['min_timeout'])
+        self.assertEqual(long.timeout_seconds(DEFAULT_SETTINGS), DEFAULT_SETTINGS['max_timeout'])
+        self.assertEqual(short.max_turns(DEFAULT_SETTINGS), DEFAULT_SETTINGS['min_turns'])
+        self.assertEqual(long.max_turns(DEFAULT_SETTINGS), DEFAULT_SETTINGS['max_turns'])
+    
+    def test_limits_never_go_below_the_old_fixed_ones(self):
+        self.assertGreaterEqual(DEFAULT_SETTINGS['min_timeout'], 600)
+        self.assertGreaterEqual(DEFAULT_SETTINGS['min_turns'], 10)
+    
+    def test_repo_size_bucket(self):
+        self.assertEqual([repo_size_bucket(n) for n in (0, 5, 50, 999, 1000)], [0, 0, 1, 2, 3])
+    
+    def test_weighted_quantile(self):
+        self.assertEqual(weighted_quantile([1, 2, 3], [1, 1, 1], 0.5), 2)
+        self.assertEqual(weighted_quantile([1, 2, 3], [1, 1, 10], 0.5), 3)
+    
+    def test_critical_path_follows_longest_chain(self):
+        a = Task(title="a", estimated_hours=1)
+        b = Task(title="b", estimated_hours=3, depends_on=[a.id])
+        c = Task(title="c", estimated_hours=1, depends_on=[a.id])
+        d = Task(title="d", estimated_hours=1, depends_on=[b.id, c.id])
+        
+        hours, path = critical_path([a, b, c, d])
+        
+        self.assertEqual(hours, 5)
+        self.assertEqual(path, [a.id, b.id, d.id])
+
+
+if __name__ == '__main__':
+    unittest.main()
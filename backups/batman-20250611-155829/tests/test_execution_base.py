@@ -99,8 +99,7 @@ class TestExecutionModeBase(unittest.TestCase):
         self.assertEqual(stdout, "output")
         self.assertEqual(stderr, "")
         mock_run.assert_called_once_with(
-            "echo test",
-            shell=True,
+            ["echo", "test"],
             cwd=str(self.mode.working_dir),
             capture_output=True,
             text=True,
@@ -142,8 +141,7 @@ class TestExecutionModeBase(unittest.TestCase):
         # Verificar
         self.assertTrue(success)
         mock_run.assert_called_once_with(
-            "ls",
-            shell=True,
+            ["ls"],
             cwd=str(test_dir),
             capture_output=True,
             text=True,
@@ -138,7 +138,7 @@ class TestSafeMode(unittest.TestCase):
         expected_branch = "batman/alfred-12345678"
         expected_path = self.mode.worktree_base / "alfred-12345678"
         mock_run.assert_called_once_with(
-            f"git worktree add -b {expected_branch} {expected_path} HEAD"
+            ['git', 'worktree', 'add', '-b', expected_branch, str(expected_path), 'HEAD']
         )
     
     @patch('tempfile.mktemp')
@@ -252,7 +252,7 @@ class TestSafeMode(unittest.TestCase):
         expected_calls = [
             call("git add -A", cwd=worktree_path),
             call("git status --porcelain", cwd=worktree_path),
-            call('git commit -m "alfred: Fix bug\n\nTask ID: task1"', cwd=worktree_path)
+            call(['git', 'commit', '-m', "alfred: Fix bug\n\nTask ID: task1"], cwd=worktree_path)
         ]
         mock_run.assert_has_calls(expected_calls)
     
@@ -299,13 +299,13 @@ class TestSafeMode(unittest.TestCase):
         
         # Verificar llamadas esperadas
         expected_calls = [
-            call("git checkout main"),
-            call("git merge --no-ff batman/alfred-123"),
-            call("git merge --no-ff batman/robin-456"),
-            call("git worktree remove --force /tmp/alfred-123"),
-            call("git branch -d batman/alfred-123"),
-            call("git worktree remove --force /tmp/robin-456"),
-            call("git branch -d batman/robin-456")
+            call(['git', 'checkout', 'main']),
+            call(['git', 'merge', '--no-ff', 'batman/alfred-123']),
+            call(['git', 'merge', '--no-ff', 'batman/robin-456']),
+            call(['git', 'worktree', 'remove', '--force', '/tmp/alfred-123']),
+            call(['git', 'branch', '-d', 'batman/alfred-123']),
+            call(['git', 'worktree', 'remove', '--force', '/tmp/robin-456']),
+            call(['git', 'branch', '-d', 'batman/robin-456'])
         ]
         
         for expected_call in expected_calls:
@@ -340,7 +340,7 @@ class TestSafeMode(unittest.TestCase):
         # No debe eliminar worktree si hay conflicto
         worktree_remove_calls = [
             call for call in mock_run.call_args_list 
-            if "worktree remove" in str(call)
+            if "worktree remove" in " ".join(call.args[0])
         ]
         self.assertEqual(len(worktree_remove_calls), 0)
     
@@ -0,0 +1,121 @@
+"""
+Tests para la caché compartida de contenido de archivos.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from core.file_cache import FileCache, MMAP_THRESHOLD
+from core.prompt_builder import ContextFiles
+
+
+class TestFileCache(unittest.TestCase):
+    """Tests de lectura, invalidación y desalojo."""
+    
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.cache = FileCache()
+    
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+    
+    def _file(self, name, content):
+        path = os.path.join(self.tmp, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return path
+    
+    def test_second_read_is_a_hit(self):
+        path = self._file("README.md", "# Batcave\n")
+        
+        first = self.cache.read(path)
+        second = self.cache.read(path)
+        
+        self.assertEqual(second.text, "# Batcave\n")
+        self.assertIs(first, second)
+        self.assertEqual(self.cache.stats, {'hits': 1, 'misses': 1, 'evictions': 0})
+    
+    def test_modified_file_is_read_again(self):
+        path = self._file("notes.txt", "antes")
+        self.cache.read(path)
+        stat = os.stat(path)
+        
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("después")
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        
+        self.assertEqual(self.cache.read_text(path), "después")
+        self.assertEqual(self.cache.stats['misses'], 2)
+    
+    def test_identical_contents_share_text(self):
+        a = self._file("a.json", '{"name": "batman"}')
+        b = self._file("b.json", '{"name": "batman"}')
+        
+        first = self.cache.read(a)
+        second = self.cache.read(b)
+        
+        self.assertEqual(first.sha1, second.sha1)
+        self.assertIs(first.text, second.text)
+        self.assertEqual(self.cache.size_bytes, len('{"name": "batman"}'))
+        
+        self.cache.invalidate(a)
+        self.assertEqual(self.cache.size_bytes, len('{"name": "batman"}'))
+        self.cache.invalidate(b)
+        self.assertEqual(self.cache.size_bytes, 0)
+    
+    def test_evicts_least_recently_used(self):
+        cache = FileCache(max_bytes=250)
+        a = self._file("a.txt", "a" * 100)
+        b = self._file("b.txt", "b" * 100)
+        c = self._file("c.txt", "c" * 100)
+        
+        cache.read(a)
+        cache.read(b)
+        cache.read(a)
+        cache.read(c)
+        
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.stats['evictions'], 1)
+        cache.read(a)
+        self.assertEqual(cache.stats['hits'], 2)
+    
+    def test_large_files_are_read_with_mmap(self):
+        content = "línea ñ\n" * (MMAP_THRESHOLD // 8)
+        path = self._file("big.txt", content)
+        
+        self.assertEqual(self.cache.read_text(path), content)
+    
+    def test_errors_are_not_cached(self):
+        path = os.path.join(self.tmp, "binary.bin")
+        with open(path, 'wb') as f:
+            f.write(b"\xff\xfe\x00")
+        
+        with self.assertRaises(UnicodeDecodeError):
+            self.cache.read(path)
+        with self.assertRaises(FileNotFoundError):
+            self.cache.read(os.path.join(self.tmp, "missing"))
+        self.assertEqual(len(self.cache), 0)
+    
+    def test_existing_returns_regular_files(self):
+        path = self._file("package.json", "{}")
+        
+        self.assertEqual(self.cache.existing([path, self.tmp, path + ".missing"]), [path])
+    
+    def test_context_files_read_through_cache(self):
+        path = self._file("README.md", "# Batcave\n")
+        
+        ContextFiles([path], cache=self.cache)
+        files = ContextFiles([path], cache=self.cache)
+        
+        self.assertEqual(files.files, [(path, "# Batcave\n")])
+        self.assertEqual(self.cache.stats['hits'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+"""
+Tests para FileIndex - índice persistente de archivos en SQLite.
+"""
+
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from core.file_index import FileIndex
+from core.arsenal import Arsenal
+
+
+class TestFileIndex(unittest.TestCase):
+    """Tests de indexado incremental y consultas."""
+    
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        base = Path(self.tmp_dir.name)
+        self.root = base / "proyecto"
+        (self.root / "src" / "core").mkdir(parents=True)
+        (self.root / "logs").mkdir()
+        (self.root / "src" / "main.py").write_text("print('hola')\n")
+        (self.root / "src" / "core" / "task.py").write_text("x = 1\n")
+        (self.root / "logs" / "grande.log").write_bytes(b"x" * 2 * 1024 * 1024)
+        self.index = FileIndex(base / "index.db")
+    
+    def tearDown(self):
+        self.index.close()
+        self.tmp_dir.cleanup()
+    
+    def _paths(self, files):
+        return sorted(os.path.relpath(f.path, self.root) for f in files)
+    
+    def test_initial_index_and_glob(self):
+        """El primer update indexa todo y el glob filtra por nombre."""
+        stats = self.index.update(self.root)
+        self.assertEqual(stats['files_added'], 3)
+        self.assertEqual(self._paths(self.index.query(glob="*.py")),
+                         ['src/core/task.py', 'src/main.py'])
+        self.assertEqual(self._paths(self.index.query(under=self.root / "src" / "core")),
+                         ['src/core/task.py'])
+    
+    def test_unchanged_directories_are_not_rescanned(self):
+        """Una segunda pasada sin cambios reutiliza todos los directorios."""
+        self.index.update(self.root)
+        stats = self.index.update(self.root)
+        self.assertEqual(stats['dirs_scanned'], 0)
+        self.assertEqual(stats['dirs_reused'], 4)
+    
+    def test_incremental_add_remove_and_growth(self):
+        """Detecta archivos nuevos, borrados y que cambiaron de tamaño."""
+        self.index.update(self.root)
+        
+        (self.root / "src" / "nuevo.py").write_text("")
+        (self.root / "src" / "core" / "task.py").unlink()
+        with open(self.root / "src" / "main.py", "a") as f:
+            f.write("# más contenido\n" * 10)
+        
+        stats = self.index.update(self.root)
+        self.assertEqual(stats['files_added'], 1)
+        self.assertEqual(stats['files_removed'], 1)
+        self.assertEqual(stats['files_updated'], 1)
+        self.assertEqual(self._paths(self.index.query(glob="*.py")),
+                         ['src/main.py', 'src/nuevo.py'])
+    
+    def test_removed_directory(self):
+        """Los directorios borrados se eliminan del índice con sus archivos."""
+        self.index.update(self.root)
+        (self.root / "src" / "core" / "task.py").unlink()
+        (self.root / "src" / "core").rmdir()
+        
+        self.index.update(self.root)
+        self.assertEqual(self._paths(self.index.query(under=self.root / "src")), ['src/main.py'])
+    
+    def test_large_and_stale_queries(self):
+        """Consultas por tamaño y antigüedad."""
+        old = time.time() - 40 * 86400
+        os.utime(self.root / "src" / "main.py", (old, old))
+        self.index.update(self.root)
+        
+        self.assertEqual(self._paths(self.index.large_files(1)), ['logs/grande.log'])
+        self.assertEqual(self._paths(self.index.stale_files(30)), ['src/main.py'])
+    
+    def test_skips_vcs_and_dependency_dirs_by_default(self):
+        """.git y node_modules no se indexan salvo que se pida."""
+        (self.root / ".git").mkdir()
+        (self.root / ".git" / "HEAD").write_text("ref: refs/heads/main\n")
+        (self.root / "node_modules" / "lib").mkdir(parents=True)
+        (self.root / "node_modules" / "lib" / "index.js").write_text("")
+        
+        self.index.update(self.root)
+        self.assertEqual(len(self.index.query()), 3)
+        
+        everything = FileIndex(Path(self.tmp_dir.name) / "todo.db", skip_dirs=set())
+        everything.update(self.root)
+        self.assertEqual(len(everything.query()), 5)
+        everything.close()
+    
+    def test_index_persists_between_instances(self):
+        """El índice sobrevive a cerrar y reabrir la base de datos."""
+        self.index.update(self.root)
+        db_path = self.index.db_path
+        self.index.close()
+        
+        self.index = FileIndex(db_path)
+        self.assertEqual(len(self.index.query()), 3)
+        self.assertIsNotNone(self.index.last_update(self.root))
+    
+    def test_timeout_keeps_progress_for_the_next_pass(self):
+        """Un update cortado no borra nada y la siguiente pasada lo completa."""
+        stats = self.index.update(self.root, timeout=0)
+        self.assertEqual(stats['timed_out'], 1)
+        self.assertIsNone(self.index.last_update(self.root))
+        
+        stats = self.index.update(self.root, timeout=60)
+        self.assertEqual(stats['timed_out'], 0)
+        self.assertEqual(len(self.index.query()), 3)
+        self.assertIsNotNone(self.index.last_update(self.root))
+    
+    def test_arsenal_find_indexed(self):
+        """El Arsenal indexa bajo demanda y reutiliza el índice reciente."""
+        arsenal = Arsenal({'file_index_path': str(Path(self.tmp_dir.name) / "arsenal.db")})
+        self.assertEqual(self._paths(arsenal.find_indexed("*.log", str(self.root))), ['logs/grande.log'])
+        
+        # Dentro de max_age no se vuelve a sincronizar
+        (self.root / "logs" / "otro.log").write_text("")
+        self.assertEqual(len(arsenal.find_indexed("*.log", str(self.root))), 1)
+        self.assertEqual(len(arsenal.find_indexed("*.log", str(self.root), max_age=0)), 2)
+        arsenal.get_file_index().close()
+
+
+if __name__ == "__main__":
+    unittest.main()
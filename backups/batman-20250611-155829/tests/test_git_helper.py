@@ -0,0 +1,94 @@
+"""
+Tests para GitHelper - operaciones Git de los modos de ejecución.
+Usa repositorios temporales reales.
+"""
+
+import unittest
+import subprocess
+import tempfile
+import shutil
+from pathlib import Path
+
+from src.execution.git_helper import GitHelper
+
+
+class TestGitHelper(unittest.TestCase):
+    """Tests para commits por tarea y snapshots."""
+    
+    def setUp(self):
+        """Crea un repositorio temporal con un commit inicial."""
+        self.repo = Path(tempfile.mkdtemp())
+        for args in (['init', '-q'],
+                     ['config', 'user.email', 'batman@wayne.test'],
+                     ['config', 'user.name', 'Batman']):
+            subprocess.run(['git', *args], cwd=self.repo, check=True)
+        (self.repo / "README.md").write_text("inicio\n")
+        subprocess.run(['git', 'add', '-A'], cwd=self.repo, check=True)
+        subprocess.run(['git', 'commit', '-q', '-m', 'init'], cwd=self.repo, check=True)
+        self.git = GitHelper(self.repo)
+    
+    def tearDown(self):
+        shutil.rmtree(self.repo, ignore_errors=True)
+    
+    def _commit_count(self) -> int:
+        result = subprocess.run(['git', 'rev-list', '--count', 'HEAD'],
+                                cwd=self.repo, capture_output=True, text=True)
+        return int(result.stdout.strip())
+    
+    def test_commit_only_when_changed(self):
+        """No crea commits vacíos."""
+        self.assertFalse(self.git.commit_all("sin cambios"))
+        self.assertEqual(self._commit_count(), 1)
+        
+        (self.repo / "nuevo.py").write_text("print('hola')\n")
+        self.assertTrue(self.git.commit_all('alfred: "tarea" con comillas'))
+        self.assertEqual(self._commit_count(), 2)
+        self.assertFalse(self.git.has_worktree_changes())
+    
+    def test_commit_in_repo_without_commits(self):
+        """En un repo sin HEAD el índice se compara con el árbol vacío."""
+        repo = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, repo, True)
+        for args in (['init', '-q'],
+                     ['config', 'user.email', 'batman@wayne.test'],
+                     ['config', 'user.name', 'Batman']):
+            subprocess.run(['git', *args], cwd=repo, check=True)
+        git = GitHelper(repo)
+        
+        self.assertFalse(git.commit_all("vacío"))
+        (repo / "a.txt").write_text("a\n")
+        self.assertTrue(git.commit_all("primero"))
+    
+    def test_commit_runs_hooks(self):
+        """commit_all respeta los hooks del usuario."""
+        hook = self.repo / ".git" / "hooks" / "pre-commit"
+        hook.write_text("#!/bin/sh\nexit 1\n")
+        hook.chmod(0o755)
+        
+        (self.repo / "nuevo.py").write_text("print('hola')\n")
+        self.assertFalse(self.git.commit_all("bloqueado por el hook"))
+        self.assertEqual(self._commit_count(), 1)
+    
+    def test_snapshot_does_not_touch_stash_list(self):
+        """El snapshot se guarda en memoria y puede reaplicarse."""
+        (self.repo / "README.md").write_text("cambio local\n")
+        
+        ref = self.git.snapshot()
+        self.assertIsNotNone(ref)
+        self.assertEqual(self.git.stash_ref, ref)
+        stashes = subprocess.run(['git', 'stash', 'list'], cwd=self.repo,
+                                 capture_output=True, text=True).stdout
+        self.assertEqual(stashes, "")
+        
+        subprocess.run(['git', 'checkout', '-q', '--', 'README.md'], cwd=self.repo, check=True)
+        subprocess.run(['git', 'stash', 'apply', '-q', ref], cwd=self.repo, check=True)
+        self.assertEqual((self.repo / "README.md").read_text(), "cambio local\n")
+    
+    def test_snapshot_clean_tree(self):
+        """Sin cambios no hay stash."""
+        self.assertIsNone(self.git.snapshot())
+        self.assertIsNone(self.git.stash_ref)
+
+
+if __name__ == "__main__":
+    unittest.main()
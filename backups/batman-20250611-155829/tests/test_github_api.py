@@ -0,0 +1,189 @@
+"""
+Tests para el cliente HTTP de la API de GitHub (contra un servidor local).
+"""
+
+import sys
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from fake_github import FakeGitHub
+from integrations.github_api import GitHubAPIClient, GitHubAPIError, TokenBucket
+from integrations.github_integration import GitHubIntegration
+
+
+class GitHubAPITestCase(unittest.TestCase):
+    """Levanta un FakeGitHub por test."""
+    
+    def setUp(self):
+        self.fake = FakeGitHub().start()
+        self.client = GitHubAPIClient(self.fake.repo, "test-token", base_url=self.fake.url,
+                                      rate=1000, burst=1000)
+    
+    def tearDown(self):
+        self.client.close()
+        self.fake.stop()
+
+
+class TestGitHubAPIClient(GitHubAPITestCase):
+    """Tests del transporte y las operaciones REST."""
+    
+    def test_connection_is_reused(self):
+        self.client.create_issue("uno", "")
+        self.client.create_issue("dos", "")
+        self.client.list_issues()
+        
+        self.assertEqual(len(self.fake.requests), 3)
+        self.assertEqual(len(self.fake.connections), 1)
+        self.assertEqual(self.client.stats['connections'], 1)
+    
+    def test_conditional_get_reuses_cached_listing(self):
+        self.fake.add_item("bug A")
+        
+        first = self.client.list_issues()
+        second = self.client.list_issues()
+        
+        self.assertEqual(first, second)
+        self.assertEqual(self.client.stats['not_modified'], 1)
+        
+        self.fake.add_item("bug B")
+        self.assertEqual(len(self.client.list_issues()), 2)
+    
+    def test_list_issues_paginates_and_skips_pulls(self):
+        for i in range(5):
+            self.fake.add_item(f"issue {i}")
+        self.fake.add_item("pr", pull=True)
+        
+        issues = self.client.paginate(f"/repos/{self.fake.repo}/issues", {'per_page': 2})
+        
+        self.assertEqual(len(issues), 6)
+        self.assertEqual(len(self.client.list_issues()), 5)
+        self.assertEqual([p['title'] for p in self.client.list_pulls()], ["pr"])
+    
+    def test_revalidated_pages_keep_following_links(self):
+        """Un 304 reutiliza la cabecera Link guardada y sigue paginando."""
+        for i in range(5):
+            self.fake.add_item(f"issue {i}")
+        
+        first = self.client.paginate(f"/repos/{self.fake.repo}/issues", {'per_page': 2})
+        second = self.client.paginate(f"/repos/{self.fake.repo}/issues", {'per_page': 2})
+        
+        self.assertEqual(len(second), 5)
+        self.assertEqual(first, second)
+        self.assertEqual(self.client.stats['not_modified'], 3)
+    
+    def test_retries_after_rate_limit(self):
+        self.fake.rate_limit_next = 1
+        
+        issue = self.client.create_issue("tras el límite", "")
+        
+        self.assertEqual(issue['title'], "tras el límite")
+        self.assertEqual(self.client.stats['rate_limited'], 1)
+        self.assertEqual(len(self.fake.items), 1)
+    
+    def test_lost_response_retries_only_idempotent_requests(self):
+        """Un GET se repite; un POST que llegó al servidor no se duplica."""
+        self.fake.add_item("existente")
+        self.fake.drop_next = 1
+        self.assertEqual(len(self.client.list_issues()), 1)
+        self.assertEqual(len(self.fake.requests), 2)
+        
+        self.fake.drop_next = 1
+        with self.assertRaises(ConnectionError):
+            self.client.create_issue("una sola vez", "")
+        self.assertEqual(len(self.fake.items), 2)
+        
+        self.assertEqual(self.client.create_issue("siguiente", "")['title'], "siguiente")
+        self.assertEqual(len(self.fake.items), 3)
+    
+    def test_errors_raise(self):
+        with self.assertRaises(GitHubAPIError) as ctx:
+            self.client.request('GET', "/repos/otro/repo/issues")
+        
+        self.assertEqual(ctx.exception.status, 404)
+
+
+class TestGraphQLBatching(GitHubAPITestCase):
+    """Tests de lecturas y mutaciones por lotes."""
+    
+    def test_get_items_in_one_request(self):
+        for i in range(3):
+            self.fake.add_item(f"item {i}", pull=(i == 1))
+        
+        items = self.client.get_items([1, 2, 3, 99])
+        
+        self.assertEqual(sorted(items), [1, 2, 3])
+        self.assertEqual(items[2]['__typename'], "PullRequest")
+        self.assertEqual(len(self.fake.requests), 1)
+    
+    def test_create_issues_is_one_mutation(self):
+        created = self.client.create_issues([
+            {'title': f"hallazgo {i}", 'body': "...", 'labels': ["bug", "inexistente"]}
+            for i in range(12)
+        ])
+        
+        self.assertEqual([c['number'] for c in created], list(range(1, 13)))
+        self.assertEqual(self.fake.items[1]['labels'], [{'name': "bug"}])
+        # Consulta de IDs del repo + una mutación
+        self.assertEqual(len(self.fake.requests), 2)
+        
+        self.client.create_issues([{'title': "otro"}])
+        self.assertEqual(len(self.fake.requests), 3)
+    
+    def test_add_comments(self):
+        self.fake.add_item("a")
+        self.fake.add_item("b", pull=True)
+        
+        added = self.client.add_comments([(1, "hola"), (2, "adiós"), (42, "nadie")])
+        
+        self.assertEqual(added, [True, True, False])
+        self.assertEqual(self.fake.comments, [(1, "hola"), (2, "adiós")])
+        self.assertEqual(len(self.fake.requests), 2)
+
+
+class TestGitHubIntegrationWithAPI(GitHubAPITestCase):
+    """GitHubIntegration usando el cliente HTTP en vez de gh CLI."""
+    
+    def test_issue_operations(self):
+        github = GitHubIntegration(logger=None, api=self.client)
+        
+        issue = github.create_issue("Error", "cuerpo", labels=["bug"])
+        created = github.create_issues([{'title': "x"}, {'title': "y"}])
+        
+        self.assertEqual(issue['number'], 1)
+        self.assertEqual([c['title'] for c in created], ["x", "y"])
+        self.assertEqual(github.add_comments([(1, "visto")]), [True])
+        self.assertEqual([i['title'] for i in github.list_issues()], ["Error", "x", "y"])
+        self.assertEqual(github.list_issues()[0]['labels'], [{'name': "bug"}])
+    
+    def test_api_errors_are_reported_not_raised(self):
+        self.client.repo = "otro/repo"
+        github = GitHubIntegration(logger=None, api=self.client)
+        
+        self.assertIsNone(github.create_issue("x", ""))
+        self.assertEqual(github.list_issues(), [])
+
+
+class TestTokenBucket(unittest.TestCase):
+    """Tests del limitador de ritmo."""
+    
+    def test_burst_then_rate(self):
+        bucket = TokenBucket(rate=50, capacity=3)
+        
+        waits = [bucket.acquire() for _ in range(4)]
+        
+        self.assertEqual(waits[:3], [0.0, 0.0, 0.0])
+        self.assertGreater(waits[3], 0)
+    
+    def test_pause_until_blocks(self):
+        bucket = TokenBucket(rate=1000, capacity=10)
+        bucket.pause_until(time.monotonic() + 0.05)
+        
+        self.assertGreaterEqual(bucket.acquire(), 0.04)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+"""
+Tests para la caché local de issues y PRs.
+"""
+
+import json
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from fake_github import FakeGitHub
+from integrations.github_api import GitHubAPIClient
+from integrations.github_cache import GitHubCache, item_from_gh, normalize_title
+from integrations.github_integration import GitHubIntegration
+
+
+class TestGitHubCacheSync(unittest.TestCase):
+    """Sincronización incremental contra el servidor local."""
+    
+    def setUp(self):
+        self.fake = FakeGitHub().start()
+        self.client = GitHubAPIClient(self.fake.repo, "test-token", base_url=self.fake.url,
+                                      rate=1000, burst=1000)
+        self.cache = GitHubCache(self.fake.repo, ":memory:")
+    
+    def tearDown(self):
+        self.cache.close()
+        self.client.close()
+        self.fake.stop()
+    
+    def test_initial_sync_splits_issues_and_prs(self):
+        self.fake.add_item("🦇 Batman: Puerto abierto", labels=["batman-found"])
+        self.fake.add_item("Fix login", pull=True)
+        self.fake.add_item("Viejo", state="closed")
+        
+        self.assertEqual(self.cache.sync_api(self.client), 3)
+        
+        self.assertEqual([i['title'] for i in self.cache.list('issue')], ["🦇 Batman: Puerto abierto"])
+        self.assertEqual(len(self.cache.list('issue', state='all')), 2)
+        self.assertEqual([p['title'] for p in self.cache.list('pr')], ["Fix login"])
+        self.assertEqual(len(self.cache.list('issue', labels=["batman-found"])), 1)
+    
+    def test_incremental_sync_fetches_only_changes(self):
+        self.fake.add_item("a")
+        self.fake.add_item("b")
+        self.cache.sync_api(self.client)
+        
+        self.fake.update_item(2, state="closed")
+        
+        self.assertEqual(self.cache.sync_api(self.client), 1)
+        self.assertEqual([i['number'] for i in self.cache.list('issue')], [1])
+    
+    def test_unchanged_repo_is_not_modified(self):
+        self.fake.add_item("a")
+        self.cache.sync_api(self.client)
+        self.cache.sync_api(self.client)
+        
+        # Un proceso nuevo: la caché conserva `since` y el ETag en disco
+        fresh_client = GitHubAPIClient(self.fake.repo, "t", base_url=self.fake.url, rate=1000, burst=1000)
+        self.assertEqual(self.cache.sync_api(fresh_client), 0)
+        fresh_client.close()
+        
+        self.assertEqual(self.client.stats['not_modified'], 1)
+        self.assertEqual(fresh_client.stats['not_modified'], 1)
+    
+    def test_gh_sync_is_not_truncated(self):
+        """Sin token, `gh api --paginate` trae todos los items (no solo 1000)."""
+        for i in range(1200):
+            self.fake.add_item(f"issue {i}")
+        output = "\n".join(json.dumps(self.fake.rest_item(item)) for item in self.fake.items.values())
+        
+        with patch('integrations.github_cache.subprocess.run',
+                   return_value=subprocess.CompletedProcess([], 0, output, "")) as run:
+            self.assertEqual(self.cache.sync_gh(), 1200)
+            cmd = run.call_args[0][0]
+            self.assertEqual(cmd[:3], ['gh', 'api', '--paginate'])
+            self.assertNotIn('since=', cmd[-1])
+            
+            self.cache.sync_gh()
+            self.assertIn('since=', run.call_args[0][0][-1])
+        
+        self.assertEqual(len(self.cache.list('issue')), 1200)
+    
+    def test_dedup_through_integration_is_local(self):
+        self.fake.add_item("🐛 Error: Division by zero")
+        github = GitHubIntegration(logger=None, api=self.client, cache=self.cache)
+        error = {'message': 'Division by zero'}
+        
+        first = github.create_issue_for_error(error)
+        requests = len(self.fake.requests)
+        second = github.create_issue_for_error({'message': 'Otro fallo'})
+        third = github.create_issue_for_error({'message': 'Otro fallo'})
+        
+        self.assertEqual(first['number'], 1)
+        self.assertEqual(second['number'], third['number'])
+        # Solo se creó el issue nuevo: las comprobaciones no consultan GitHub
+        self.assertEqual(len(self.fake.requests), requests + 1)
+        self.assertEqual(len(self.fake.items), 2)
+
+
+class TestGitHubCacheIndex(unittest.TestCase):
+    """Índice de títulos."""
+    
+    def setUp(self):
+        self.cache = GitHubCache("wayne/batcave", ":memory:")
+        self.cache.upsert([
+            item_from_gh({'number': 1, 'title': "🦇 Batman: Disco lleno", 'state': "OPEN"}, 'issue'),
+            item_from_gh({'number': 2, 'title': "Batman - disco LLENO!", 'state': "CLOSED"}, 'issue'),
+            item_from_gh({'number': 3, 'title': "Refactor", 'state': "MERGED"}, 'pr'),
+        ])
+    
+    def tearDown(self):
+        self.cache.close()
+    
+    def test_normalize_title(self):
+        self.assertEqual(normalize_title("🦇 Batman:  Disco LLENO!"), "batman disco lleno")
+    
+    def test_find_by_title(self):
+        self.assertEqual([i['number'] for i in self.cache.find_by_title("batman disco lleno")], [1])
+        self.assertEqual([i['number'] for i in self.cache.find_by_title("Batman: disco lleno", state=None)],
+                         [2, 1])
+        self.assertEqual([i['number'] for i in self.cache.find_by_title("disco", exact=False)], [1])
+    
+    def test_retitled_item_leaves_old_title(self):
+        self.cache.upsert([item_from_gh({'number': 1, 'title': "Disco al 90%", 'state': "OPEN"}, 'issue')])
+        
+        self.assertEqual(self.cache.find_by_title("batman disco lleno"), [])
+        self.assertEqual(self.cache.find_by_title("disco al 90")[0]['number'], 1)
+    
+    def test_merged_prs_are_closed(self):
+        self.assertEqual(self.cache.get(3)['state'], "closed")
+    
+    def test_index_is_rebuilt_from_disk(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            db = Path(tmp) / "github.db"
+            first = GitHubCache("wayne/batcave", db)
+            first.upsert([item_from_gh({'number': 7, 'title': "Persistente", 'state': "OPEN"}, 'issue')])
+            first.close()
+            
+            second = GitHubCache("wayne/batcave", db)
+            self.assertEqual(second.find_by_title("persistente")[0]['number'], 7)
+            second.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+"""
+Tests para el índice BM25 del conocimiento compartido.
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from integrations.knowledge_index import KnowledgeIndex, estimate_tokens, tokenize
+
+
+class TestTokenize(unittest.TestCase):
+    """Tests del tokenizador."""
+    
+    def test_splits_identifiers_and_drops_stopwords(self):
+        self.assertEqual(tokenize("api_endpoints de la apiVersion y the DB"),
+                         ["api", "endpoints", "api", "version", "db"])
+    
+    def test_keeps_accented_words(self):
+        self.assertEqual(tokenize("Autenticación JWT"), ["autenticación", "jwt"])
+
+
+class TestKnowledgeIndex(unittest.TestCase):
+    """Tests de indexado y búsqueda."""
+    
+    def setUp(self):
+        self.index = KnowledgeIndex()
+        self.index.add("alfred", "api_endpoints", {"endpoints": ["/users", "/login"], "auth": "JWT"})
+        self.index.add("oracle", "test_results", {"framework": "pytest", "failing": ["test_login"]})
+        self.index.add("lucius", "database_schema", {"tables": ["users", "sessions"], "engine": "PostgreSQL"})
+    
+    def test_ranks_by_relevance(self):
+        results = self.index.search("Arreglar el login con JWT")
+        
+        self.assertEqual(results[0][:2], ("alfred", "api_endpoints"))
+        self.assertIn(("oracle", "test_results"), [r[:2] for r in results])
+        self.assertNotIn(("lucius", "database_schema"), [r[:2] for r in results])
+    
+    def test_stopwords_do_not_match(self):
+        self.assertEqual(self.index.search("de la para the and"), [])
+    
+    def test_knowledge_type_weighs_more_than_payload(self):
+        self.index.add("robin", "users", {"note": "ok"})
+        
+        self.assertEqual(self.index.search("users")[0][:2], ("robin", "users"))
+    
+    def test_reindex_replaces_old_terms(self):
+        self.index.add("alfred", "api_endpoints", {"endpoints": ["/orders"]})
+        
+        self.assertNotIn("alfred", [r[0] for r in self.index.search("JWT login")])
+        self.assertEqual(self.index.search("orders")[0][0], "alfred")
+        self.assertEqual(len(self.index), 3)
+    
+    def test_limit_exclusion_and_budget(self):
+        query = "users login pytest"
+        self.assertEqual(len(self.index.search(query, limit=1)), 1)
+        self.assertNotIn("alfred", [r[0] for r in self.index.search(query, exclude_agents=["alfred"])])
+        
+        self.index.add("bane", "users_dump", {"users": ["x" * 4000]})
+        budgeted = self.index.search("users", token_budget=200)
+        self.assertNotIn("bane", [r[0] for r in budgeted])
+        self.assertTrue(budgeted)
+    
+    def test_remove_and_rebuild(self):
+        self.index.remove("oracle", "test_results")
+        self.assertNotIn("oracle", [r[0] for r in self.index.search("pytest login")])
+        
+        self.index.rebuild({"oracle": {"test_results": {"data": {"framework": "pytest"}}}})
+        self.assertEqual(len(self.index), 1)
+        self.assertEqual(self.index.search("pytest")[0][0], "oracle")
+    
+    def test_estimate_tokens(self):
+        self.assertEqual(estimate_tokens("x" * 400), 101)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -338,6 +338,78 @@ class TestMCPIntegration(unittest.TestCase):
         except Exception:
             self.fail("MCPIntegration should handle corrupt state files gracefully")
 
+    def test_changes_are_appended_as_events(self):
+        """Test que cada cambio añade una línea al log sin reescribir el snapshot."""
+        self.mcp.share_error("robin", "ImportError", "falta requests")
+        self.mcp.share_decision("alfred", "usar SQLite", "sin dependencias")
+        
+        self.assertFalse(self.mcp.state_file.exists())
+        lines = self.mcp.events_file.read_text().splitlines()
+        self.assertEqual([json.loads(line)["kind"] for line in lines], ["error", "decision"])
+        
+        mcp2 = MCPIntegration(self.config)
+        self.assertEqual(mcp2.get_recent_errors()[0]["type"], "ImportError")
+        self.assertEqual(mcp2.get_recent_decisions()[0]["decision"], "usar SQLite")
+    
+    def test_snapshot_compacts_log(self):
+        """Test que el snapshot periódico vacía el log y conserva el estado."""
+        mcp = MCPIntegration({'snapshot_every': 3})
+        for i in range(4):
+            mcp.share_task_completion("alfred", f"task-{i}", {"files_modified": [f"f{i}.py"]})
+        
+        self.assertEqual(len(mcp.events_file.read_text().splitlines()), 1)
+        
+        mcp2 = MCPIntegration(self.config)
+        self.assertEqual([t["task_id"] for t in mcp2.shared_state["tasks_completed"]],
+                         ["task-0", "task-1", "task-2", "task-3"])
+        self.assertEqual(len(mcp2.get_files_modified()), 4)
+    
+    def test_events_already_in_snapshot_are_not_replayed(self):
+        """Test que un log no truncado tras el snapshot no duplica eventos."""
+        self.mcp.share_error("robin", "E1", "x")
+        log = self.mcp.events_file.read_text()
+        self.mcp._save_shared_state()
+        self.mcp.events_file.write_text(log + '{"seq": 99, "kind": "err')  # + línea cortada
+        
+        mcp2 = MCPIntegration(self.config)
+        
+        self.assertEqual(len(mcp2.shared_state["errors_found"]), 1)
+    
+    def test_retention_bounds_categories(self):
+        """Test que las categorías no crecen sin límite."""
+        mcp = MCPIntegration({'retention': {'errors_found': 8}})
+        for i in range(30):
+            mcp.share_error("robin", f"Error{i}", "x")
+        
+        self.assertLessEqual(len(mcp.shared_state["errors_found"]), 10)
+        self.assertEqual(mcp.get_recent_errors(3)[-1]["type"], "Error29")
+        
+        mcp2 = MCPIntegration({'retention': {'errors_found': 8}})
+        self.assertLessEqual(len(mcp2.shared_state["errors_found"]), 10)
+    
+    def test_agent_context_includes_relevant_knowledge_only(self):
+        """Test que el contexto incluye el conocimiento relevante de otros agentes."""
+        self.mcp.share_agent_knowledge("alfred", "api_endpoints", {"auth": "JWT", "login": "/auth/login"})
+        self.mcp.share_agent_knowledge("lucius", "database_schema", {"tables": ["orders"]})
+        self.mcp.share_agent_knowledge("robin", "login_flow", {"auth": "JWT"})
+        task = Task(title="Fix the login", description="JWT expira antes de tiempo", type=TaskType.DEVELOPMENT)
+        
+        context = self.mcp.create_agent_context("robin", task)
+        
+        self.assertEqual(list(context["shared_knowledge"]), ["alfred"])
+        self.assertIn("api_endpoints", context["shared_knowledge"]["alfred"])
+        
+        mcp2 = MCPIntegration(self.config)
+        self.assertIn("alfred", mcp2.create_agent_context("robin", task)["shared_knowledge"])
+    
+    def test_clear_shared_state_persists(self):
+        """Test que limpiar el estado sobrevive a una recarga."""
+        self.mcp.share_error("robin", "E1", "x")
+        self.mcp.clear_shared_state()
+        
+        mcp2 = MCPIntegration(self.config)
+        self.assertEqual(mcp2.get_recent_errors(), [])
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
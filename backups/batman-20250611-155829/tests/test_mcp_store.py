@@ -0,0 +1,148 @@
+"""
+Tests para el backend SQLite del estado compartido MCP (entre procesos).
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+SRC = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(SRC))
+
+from integrations.mcp_integration import MCPIntegration
+from integrations.mcp_store import SharedStateStore
+
+
+WRITER = """
+import sys
+sys.path.insert(0, {src!r})
+from integrations.mcp_integration import MCPIntegration
+mcp = MCPIntegration({{'backend': 'sqlite', 'snapshot_every': 7,
+                       'retention': {{'errors_found': 1000}}}})
+for i in range({count}):
+    mcp.share_error({agent!r}, f"E{{i}}", "x")
+    mcp.share_agent_knowledge({agent!r}, f"k{{i % 3}}", i)
+mcp.close()
+"""
+
+
+class TestSharedStateStore(unittest.TestCase):
+    """Tests del almacén SQLite."""
+    
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = SharedStateStore(Path(self.tmp.name) / "state.db")
+    
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+    
+    def test_append_and_read_since(self):
+        first = self.store.append("error", {"type": "E1"})
+        self.store.append("error", {"type": "E2"})
+        
+        snapshot, events = self.store.read_since(first)
+        
+        self.assertIsNone(snapshot)
+        self.assertEqual([e['data']['type'] for e in events], ["E2"])
+    
+    def test_compacted_events_come_back_as_snapshot(self):
+        for i in range(3):
+            self.store.append("error", {"type": f"E{i}"})
+        self.store.compact(2, {"errors_found": ["E0", "E1"]})
+        
+        snapshot, events = self.store.read_since(1)
+        
+        self.assertEqual(snapshot, (2, {"errors_found": ["E0", "E1"]}))
+        self.assertEqual([e['seq'] for e in events], [3])
+        self.assertEqual(self.store.read_since(2), (None, events))
+    
+    def test_data_version_tracks_other_connections(self):
+        other = SharedStateStore(self.store.db_path)
+        version = self.store.data_version()
+        
+        self.store.append("error")
+        self.assertEqual(self.store.data_version(), version)
+        other.append("error")
+        self.assertNotEqual(self.store.data_version(), version)
+        other.close()
+
+
+class TestSharedBackend(unittest.TestCase):
+    """Tests de MCPIntegration con backend sqlite."""
+    
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.home_patcher = patch('pathlib.Path.home', return_value=Path(self.tmp.name))
+        self.home_patcher.start()
+        self.config = {'backend': 'sqlite', 'poll_interval': 0.05}
+    
+    def tearDown(self):
+        self.home_patcher.stop()
+        self.tmp.cleanup()
+    
+    def test_instances_see_each_others_writes(self):
+        alfred = MCPIntegration(self.config)
+        robin = MCPIntegration(self.config)
+        
+        alfred.share_agent_knowledge("alfred", "api_endpoints", {"auth": "JWT"})
+        robin.share_error("robin", "ImportError", "x")
+        
+        self.assertEqual(robin.get_agent_knowledge("alfred", "api_endpoints")["data"], {"auth": "JWT"})
+        self.assertEqual(alfred.get_recent_errors()[0]["type"], "ImportError")
+        self.assertIn("alfred", robin.knowledge_index.search("JWT")[0])
+        
+        robin.clear_shared_state()
+        self.assertEqual(alfred.get_agent_knowledge(), {})
+        alfred.close()
+        robin.close()
+    
+    def test_subscribers_are_notified_of_other_processes(self):
+        writer = MCPIntegration(self.config)
+        reader = MCPIntegration(self.config)
+        received = threading.Event()
+        reader.subscribe(lambda event: event['kind'] == 'decision' and received.set())
+        
+        writer.share_decision("alfred", "usar SQLite", "WAL")
+        
+        self.assertTrue(received.wait(1.0))
+        writer.close()
+        reader.close()
+    
+    def test_late_reader_starts_from_snapshot(self):
+        writer = MCPIntegration(dict(self.config, snapshot_every=3))
+        reader = MCPIntegration(self.config)
+        for i in range(7):
+            writer.share_error("alfred", f"E{i}", "x")
+        
+        self.assertEqual([e["type"] for e in reader.get_recent_errors()], [f"E{i}" for i in range(7)])
+        writer.close()
+        reader.close()
+    
+    def test_concurrent_processes_lose_no_writes(self):
+        env = dict(os.environ, HOME=self.tmp.name)
+        processes = [
+            subprocess.Popen([sys.executable, "-c", WRITER.format(src=str(SRC), count=40, agent=f"agent{n}")],
+                             env=env)
+            for n in range(4)
+        ]
+        for process in processes:
+            self.assertEqual(process.wait(timeout=60), 0)
+        
+        mcp = MCPIntegration(dict(self.config, retention={'errors_found': 1000}))
+        errors = mcp.get_recent_errors(limit=1000)
+        
+        self.assertEqual(len(errors), 160)
+        for n in range(4):
+            self.assertEqual(len(mcp.get_agent_knowledge(f"agent{n}")), 3)
+            self.assertEqual(mcp.get_agent_knowledge(f"agent{n}", "k0")["data"], 39)
+        mcp.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,175 @@
+"""
+Tests para el ensamblador de prompts con presupuesto de tokens.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from core.prompt_builder import ContextFiles, PromptBuilder, TRUNCATED, excerpt
+from integrations.knowledge_index import estimate_tokens
+
+
+def _module(functions):
+    """Módulo Python con una función por nombre, cada una de ~1500 caracteres."""
+    parts = ["import os", "import sys", ""]
+    for name in functions:
+        parts.append(f"def {name}(value):")
+        parts.append(f'    """Procesa {name.replace("_", " ")}."""')
+        parts.extend(f"    value = value + {i}  # relleno" for i in range(50))
+        parts.append("    return value")
+        parts.append("")
+    return "\n".join(parts)
+
+
+class TestExcerpt(unittest.TestCase):
+    """Tests del recorte por relevancia."""
+    
+    def test_small_content_is_untouched(self):
+        self.assertEqual(excerpt("def a():\n    pass\n", {"login"}, 1000), "def a():\n    pass\n")
+    
+    def test_keeps_symbols_matching_keywords(self):
+        content = _module(["parse_config", "validate_login", "render_report", "send_email"])
+        
+        result = excerpt(content, {"login", "validate"}, 2500)
+        
+        self.assertIn("def validate_login(value):", result)
+        self.assertNotIn("def render_report", result)
+        self.assertIn("import os", result)
+        self.assertIn("líneas omitidas", result)
+        self.assertTrue(result.endswith(TRUNCATED))
+        self.assertLessEqual(len(result), 2500)
+    
+    def test_keeps_original_order(self):
+        content = _module(["login_user", "parse_config", "logout_user"])
+        
+        result = excerpt(content, {"user"}, 4000)
+        
+        self.assertLess(result.index("def login_user"), result.index("def logout_user"))
+        self.assertNotIn("def parse_config", result)
+    
+    def test_splits_large_classes_into_methods(self):
+        methods = []
+        for name in ["load", "save", "refresh_token", "delete"]:
+            methods.append(f"    def {name}(self):")
+            methods.extend(f"        self.x += {i}" for i in range(60))
+        content = "class Session:\n" + "\n".join(methods)
+        
+        result = excerpt(content, {"token"}, 2000)
+        
+        self.assertIn("def refresh_token(self):", result)
+        self.assertNotIn("def delete(self):", result)
+    
+    def test_falls_back_to_head_without_matches(self):
+        result = excerpt("x" * 15000, {"login"}, 10000)
+        
+        self.assertTrue(result.startswith("x" * 9000))
+        self.assertTrue(result.endswith("\n" + TRUNCATED))
+        self.assertEqual(len(result), 10000)
+
+
+class TestContextFiles(unittest.TestCase):
+    """Tests del reparto entre archivos de contexto."""
+    
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+    
+    def _file(self, name, content):
+        path = os.path.join(self.tmp, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return path
+    
+    def test_skips_repeated_paths_and_contents(self):
+        a = self._file("a.py", "print('a')\n")
+        b = self._file("b.py", "print('a')\n")
+        c = self._file("c.py", "print('c')\n")
+        
+        files = ContextFiles([a, a, b, c, os.path.join(self.tmp, "missing.py")])
+        
+        self.assertEqual([path for path, _ in files.files], [a, c])
+        self.assertEqual(files.skipped, [b])
+    
+    def test_small_files_leave_room_for_large_ones(self):
+        small = self._file("small.py", "x = 1\n")
+        large = self._file("large.py", "y" * 8000)
+        
+        text = ContextFiles([small, large]).render(1500)
+        
+        self.assertIn("x = 1", text)
+        self.assertIn(TRUNCATED, text)
+        self.assertLessEqual(estimate_tokens(text), 1500)
+        self.assertGreater(text.count("y"), 5000)
+    
+    def test_drops_least_relevant_files_when_budget_is_tight(self):
+        first = self._file("first.py", "a" * 2000)
+        second = self._file("second.py", "b" * 2000)
+        
+        text = ContextFiles([first, second]).render(150)
+        
+        self.assertIn(first, text)
+        self.assertNotIn(second, text)
+
+
+class TestPromptBuilder(unittest.TestCase):
+    """Tests del reparto del presupuesto entre secciones."""
+    
+    def test_keeps_insertion_order(self):
+        builder = PromptBuilder(1000)
+        builder.add("a", "primero", priority=5)
+        builder.add("b", "segundo", required=True)
+        builder.add("c", "tercero", priority=0)
+        
+        self.assertEqual(builder.build(), "primero\nsegundo\ntercero")
+    
+    def test_drops_low_priority_sections_that_do_not_fit(self):
+        builder = PromptBuilder(300)
+        builder.add("system", "s" * 400, required=True)
+        builder.add("important", "i" * 400, priority=0)
+        builder.add("extra", "e" * 400, priority=3)
+        
+        prompt = builder.build()
+        
+        self.assertIn("i" * 400, prompt)
+        self.assertNotIn("e", prompt)
+        self.assertEqual(builder.dropped, ["extra"])
+        self.assertEqual(set(builder.usage), {"system", "important"})
+    
+    def test_elastic_section_gets_the_remaining_budget(self):
+        received = []
+        
+        def render(tokens):
+            received.append(tokens)
+            return "f" * (tokens * 4 - 4)
+        
+        builder = PromptBuilder(1000)
+        builder.add("system", "s" * 400, required=True)
+        builder.add("files", priority=1, render=render, min_tokens=100)
+        builder.add("tools", "t" * 400, priority=0)
+        
+        builder.build()
+        
+        self.assertEqual(received, [1000 - 101 - 101])
+    
+    def test_dedupes_lines_already_in_prompt(self):
+        shared = "- **memory**: Compartir conocimiento entre agentes"
+        builder = PromptBuilder(1000)
+        builder.add("mcp_list", "## MCPs Disponibles\n" + shared, required=True)
+        builder.add("mcp_context", "## Contexto Compartido\n" + shared + "\n- nuevo", dedupe=True)
+        
+        prompt = builder.build()
+        
+        self.assertEqual(prompt.count(shared), 1)
+        self.assertIn("## Contexto Compartido\n- nuevo", prompt)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,185 @@
+"""
+Tests para la planificación de tareas según la cuota de Claude.
+"""
+
+import json
+import multiprocessing
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from core.task import Task, TaskPriority, TaskType
+from core.quota import QUOTA_PERIOD, PromptHistory, QuotaLedger, QuotaScheduler, QuotaUsage
+
+
+class TestQuotaScheduler(unittest.TestCase):
+    """Tests de reserva, ritmo y prioridad."""
+    
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.quota_file = Path(self.tmp_dir.name) / "quota_tracking.json"
+        self.history_file = Path(self.tmp_dir.name) / "prompt_history.json"
+    
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+    
+    def write_usage(self, used: int, elapsed: float):
+        self.quota_file.write_text(json.dumps({
+            'period_start': time.time() - elapsed,
+            'prompt_count': used,
+            'opus_count': used,
+            'sonnet_count': 0,
+            'model_switches': [],
+            'morning_activation': None
+        }))
+    
+    def make_scheduler(self, **config):
+        config.setdefault('budget', 100)
+        config.setdefault('quota_dir', self.tmp_dir.name)
+        config.setdefault('history_file', str(self.history_file))
+        return QuotaScheduler(config)
+    
+    def test_runs_with_empty_period(self):
+        decision = self.make_scheduler().decide(Task(title="t"))
+        
+        self.assertTrue(decision.can_run)
+        self.assertEqual(decision.estimate, 3)
+    
+    def test_low_priority_deferred_when_share_exhausted(self):
+        self.write_usage(used=59, elapsed=QUOTA_PERIOD * 0.9)
+        scheduler = self.make_scheduler()
+        
+        low = scheduler.decide(Task(title="low", priority=TaskPriority.LOW))
+        high = scheduler.decide(Task(title="high", priority=TaskPriority.HIGH))
+        
+        self.assertEqual(low.action, 'defer')
+        self.assertTrue(high.can_run)
+    
+    def test_critical_always_runs(self):
+        self.write_usage(used=150, elapsed=60)
+        
+        decision = self.make_scheduler().decide(Task(title="c", priority=TaskPriority.CRITICAL))
+        
+        self.assertTrue(decision.can_run)
+    
+    def test_pacing_waits_early_in_period(self):
+        self.write_usage(used=35, elapsed=QUOTA_PERIOD * 0.1)
+        
+        decision = self.make_scheduler(max_wait=60).decide(Task(title="m"))
+        
+        self.assertEqual(decision.action, 'wait')
+        self.assertEqual(decision.delay, 60)
+    
+    def test_reservations_count_until_settled(self):
+        scheduler = self.make_scheduler(burst=0.05)
+        first = Task(title="a")
+        scheduler.reserve(first, 5)
+        
+        self.assertEqual(scheduler.decide(Task(title="b")).action, 'wait')
+        
+        scheduler.settle(first, 2)
+        self.assertEqual(scheduler.reserved, 0)
+        self.assertEqual(scheduler.status()['used'], 2)
+    
+    def test_disabled_always_runs(self):
+        self.write_usage(used=100, elapsed=60)
+        
+        decision = self.make_scheduler(enabled=False).decide(Task(title="t", priority=TaskPriority.LOW))
+        
+        self.assertTrue(decision.can_run)
+
+
+def _record_many(directory: str, count: int):
+    ledger = QuotaLedger(directory, compact_bytes=2048)
+    for _ in range(count):
+        ledger.record(1, 'opus')
+    
+            
+class TestQuotaLedger(unittest.TestCase):
+    """Tests del registro append-only compartido con claude-quota-monitor."""
+            
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp_dir.name)
+    
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+    
+    def test_migrates_legacy_tracking_file(self):
+        (self.dir / "quota_tracking.json").write_text(json.dumps({
+            'period_start': time.time() - 60, 'prompt_count': 7, 'opus_count': 7, 'sonnet_count': 0
+        }))
+        ledger = QuotaLedger(self.dir)
+        ledger.record(2, 'sonnet')
+        
+        state = QuotaLedger(self.dir).summary()
+        self.assertEqual(state['prompt_count'], 9)
+        self.assertEqual(state['sonnet_count'], 2)
+    
+    def test_expired_period_starts_new_one(self):
+        (self.dir / "quota_tracking.json").write_text(json.dumps({
+            'period_start': time.time() - QUOTA_PERIOD - 1, 'prompt_count': 400
+        }))
+        usage = QuotaUsage(self.dir)
+        
+        self.assertEqual(usage.snapshot()['used'], 0)
+        usage.record_prompts(3, 'sonnet')
+        
+        self.assertEqual(usage.snapshot()['used'], 3)
+    
+    def test_summary_cache_reads_only_new_events(self):
+        ledger = QuotaLedger(self.dir)
+        ledger.record(1)
+        self.assertEqual(ledger.summary()['prompt_count'], 1)
+        
+        with open(self.dir / "quota_ledger.jsonl", 'ab') as f:
+            f.write(b'{"ts": %f, "event": "prompt", "n": 4}\n{"ts": 1, "ev' % time.time())
+        
+        self.assertEqual(ledger.summary()['prompt_count'], 5)
+        cache = json.loads((self.dir / "quota_tracking.json").read_text())
+        self.assertEqual(cache['prompt_count'], 5)
+    
+    def test_compaction_folds_segments_and_archives_periods(self):
+        ledger = QuotaLedger(self.dir)
+        ledger.append('prompt', n=10, model='opus')
+        ledger.reset()
+        ledger.record(2)
+        ledger.compact()
+        
+        self.assertEqual(ledger.summary()['prompt_count'], 2)
+        self.assertEqual(list(self.dir.glob("*.seg")), [])
+        history = [json.loads(line) for line in (self.dir / "quota_history.jsonl").read_text().splitlines()]
+        self.assertEqual([h['stats']['prompt_count'] for h in history], [10])
+    
+    def test_concurrent_writers_do_not_lose_counts(self):
+        workers = [multiprocessing.Process(target=_record_many, args=(self.tmp_dir.name, 60))
+                   for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        
+        self.assertEqual(QuotaLedger(self.dir).summary()['prompt_count'], 240)
+
+
+class TestPromptHistory(unittest.TestCase):
+    """Tests de la estimación por tipo de tarea."""
+    
+    def test_estimate_uses_high_percentile_per_type(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "history.json"
+            history = PromptHistory(path, default_estimate=4)
+            testing = Task(title="t", type=TaskType.TESTING)
+            for prompts in [1, 2, 2, 3, 10]:
+                history.record(testing, prompts)
+            
+            self.assertEqual(PromptHistory(path).estimate(testing), 10)
+            self.assertEqual(history.estimate(Task(title="d")), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
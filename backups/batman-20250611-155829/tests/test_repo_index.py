@@ -0,0 +1,140 @@
+"""
+Tests para el índice de símbolos del repositorio.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from core.repo_index import RepoIndex, scan_javascript, scan_python
+
+
+class TestScanners(unittest.TestCase):
+    """Tests de extracción de símbolos e imports."""
+    
+    def test_python_symbols_imports_and_docstrings(self):
+        symbols, imports, docs = scan_python(
+            '"""Sesiones de usuario."""\n'
+            "import os\n"
+            "from .tokens import sign\n"
+            "\n"
+            "class SessionStore:\n"
+            '    """Guarda sesiones."""\n'
+            "    def refresh(self):\n"
+            "        pass\n"
+            "\n"
+            "async def login(user):\n"
+            "    pass\n"
+        )
+        
+        self.assertEqual(symbols, [("SessionStore", "class", 5),
+                                   ("SessionStore.refresh", "method", 7),
+                                   ("login", "function", 10)])
+        self.assertEqual(imports, ["os", ".tokens"])
+        self.assertEqual(docs, ["Sesiones de usuario.", "Guarda sesiones."])
+    
+    def test_python_falls_back_to_regex_on_syntax_errors(self):
+        symbols, imports, _ = scan_python("from core import task\ndef broken(:\n    pass\n")
+        
+        self.assertEqual(symbols, [("broken", "function", 2)])
+        self.assertEqual(imports, ["core"])
+    
+    def test_javascript_symbols_and_imports(self):
+        symbols, imports, docs = scan_javascript(
+            "import React from 'react';\n"
+            "const api = require('./api');\n"
+            "/** Formulario de login */\n"
+            "export default function LoginForm() {}\n"
+            "export const validateEmail = (email) => email.includes('@');\n"
+            "export interface User { id: string }\n"
+            "class AuthService {}\n"
+        )
+        
+        self.assertEqual(symbols, [("LoginForm", "function", 4), ("validateEmail", "function", 5),
+                                   ("User", "interface", 6), ("AuthService", "class", 7)])
+        self.assertEqual(imports, ["react", "./api"])
+        self.assertEqual([d.strip() for d in docs], ["Formulario de login"])
+
+
+class TestRepoIndex(unittest.TestCase):
+    """Tests de actualización incremental y búsqueda."""
+    
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.repo = os.path.join(self.tmp, "repo")
+        self.index = RepoIndex(os.path.join(self.tmp, "index.db"))
+        self._write("src/auth/session.py",
+                    '"""Gestión de sesiones y tokens JWT."""\n'
+                    "from .tokens import sign_token\n\n"
+                    "def create_session(user):\n    return sign_token(user)\n")
+        self._write("src/auth/tokens.py", "def sign_token(payload):\n    return payload\n")
+        self._write("src/billing/invoice.py", "class InvoiceGenerator:\n    def render_pdf(self):\n        pass\n")
+        self._write("web/LoginForm.tsx", "export function LoginForm() {}\n")
+        self._write("node_modules/lib/index.js", "function session() {}\n")
+        self._write("README.md", "# Proyecto\n")
+    
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.tmp)
+    
+    def _write(self, relative, content):
+        path = os.path.join(self.repo, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return path
+    
+    def _relative(self, results):
+        return [os.path.relpath(path, self.repo) for path, _ in results]
+    
+    def test_indexes_code_files_only(self):
+        stats = self.index.update(self.repo)
+        
+        self.assertEqual(stats, {'parsed': 4, 'unchanged': 0, 'removed': 0})
+        self.assertEqual(self.index.symbols(os.path.join(self.repo, "src/billing/invoice.py")),
+                         [("InvoiceGenerator", "class", 1), ("InvoiceGenerator.render_pdf", "method", 2)])
+    
+    def test_search_ranks_relevant_files(self):
+        self.index.update(self.repo)
+        
+        results = self._relative(self.index.search("Arreglar la sesión JWT al crear session", self.repo))
+        
+        self.assertEqual(results[0], "src/auth/session.py")
+        self.assertNotIn("src/billing/invoice.py", results)
+        self.assertEqual(self._relative(self.index.search("login form", self.repo))[0], "web/LoginForm.tsx")
+    
+    def test_imported_modules_get_a_boost(self):
+        self.index.update(self.repo)
+        
+        results = self._relative(self.index.search("create session", self.repo))
+        
+        self.assertEqual(results[:2], ["src/auth/session.py", "src/auth/tokens.py"])
+    
+    def test_update_is_incremental(self):
+        self.index.update(self.repo)
+        path = self._write("src/billing/invoice.py", "def send_reminder():\n    pass\n")
+        os.utime(path, (time.time() + 5, time.time() + 5))
+        os.remove(os.path.join(self.repo, "web/LoginForm.tsx"))
+        
+        stats = self.index.update(self.repo)
+        
+        self.assertEqual(stats, {'parsed': 1, 'unchanged': 2, 'removed': 1})
+        self.assertEqual(self._relative(self.index.search("reminder", self.repo)), ["src/billing/invoice.py"])
+        self.assertEqual(self.index.search("login form", self.repo), [])
+    
+    def test_max_age_skips_recent_updates(self):
+        self.index.update(self.repo)
+        self._write("src/new_module.py", "def fresh():\n    pass\n")
+        
+        self.assertEqual(self.index.update(self.repo, max_age=60)['parsed'], 0)
+        self.assertEqual(self.index.update(self.repo)['parsed'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
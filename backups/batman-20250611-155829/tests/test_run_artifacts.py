@@ -0,0 +1,133 @@
+"""
+Tests para el almacén de artefactos de ejecución.
+"""
+
+import gzip
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from core import run_artifacts
+from core.run_artifacts import RunArtifactStore
+
+
+class TestRunArtifactStore(unittest.TestCase):
+    """Tests de escritura, lectura, límites y retención."""
+    
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.base = Path(self.tmp_dir.name)
+        self.stores = []
+    
+    def tearDown(self):
+        for store in self.stores:
+            store.close()
+        self.tmp_dir.cleanup()
+    
+    def _store(self, **kwargs):
+        kwargs.setdefault('compression', 'gzip')
+        store = RunArtifactStore(self.base, **kwargs)
+        self.stores.append(store)
+        return store
+    
+    def test_async_writes_are_indexed_and_readable(self):
+        store = self._store(session_id="s1")
+        
+        store.put('prompt', "alfred/t1", "Construye la API", agent="alfred")
+        store.put('response', "alfred/t1", "Hecho ✅", returncode=0)
+        store.flush()
+        
+        artifacts = store.list(session="s1")
+        self.assertEqual([(a['kind'], a['name']) for a in artifacts],
+                         [('prompt', "alfred/t1"), ('response', "alfred/t1")])
+        self.assertEqual(artifacts[0]['meta'], {'agent': "alfred"})
+        self.assertEqual(store.read(artifacts[1]['id']), "Hecho ✅")
+        self.assertEqual(store.stats['written'], 2)
+    
+    def test_archive_is_a_plain_gzip_stream(self):
+        store = self._store(session_id="s1", asynchronous=False)
+        store.put('prompt', "a", "uno\n")
+        store.put('prompt', "b", "dos\n")
+        
+        with gzip.open(self.base / "s1.gz", 'rt', encoding='utf-8') as f:
+            self.assertEqual(f.read(), "uno\ndos\n")
+        self.assertEqual(list(self.base.glob("*.txt")), [])
+    
+    def test_large_artifacts_are_truncated(self):
+        store = self._store(asynchronous=False, max_artifact_bytes=10)
+        
+        store.put('response', "r", "ñ" * 20)
+        
+        artifact = store.list()[0]
+        self.assertTrue(artifact['truncated'])
+        self.assertEqual(store.read(artifact['id']), "ñ" * 5)
+    
+    def test_session_cap_drops_further_artifacts(self):
+        store = self._store(asynchronous=False, max_session_bytes=1000)
+        
+        # Hexadecimal aleatorio: apenas se comprime
+        store.put('prompt', "a", os.urandom(600).hex())
+        store.put('prompt', "b", os.urandom(600).hex())
+        
+        self.assertEqual([a['name'] for a in store.list()], ["a"])
+        self.assertEqual(store.stats['dropped'], 1)
+    
+    def test_start_session_switches_archive(self):
+        store = self._store(session_id="s1")
+        store.put('prompt', "a", "uno")
+        store.start_session("s2")
+        store.put('prompt', "b", "dos")
+        store.flush()
+        
+        self.assertEqual([a['session'] for a in store.list()], ["s1", "s2"])
+        self.assertEqual({s['archive'] for s in store.sessions()}, {"s1.gz", "s2.gz"})
+    
+    def test_prunes_expired_sessions(self):
+        store = self._store(session_id="old", asynchronous=False, retention_days=1)
+        store.put('prompt', "a", "viejo")
+        store.start_session("new")
+        store.put('prompt', "b", "nuevo")
+        
+        removed = store.prune(now=time.time() + 2 * 86400)
+        
+        self.assertEqual(removed, ["old"])
+        self.assertFalse((self.base / "old.gz").exists())
+        self.assertEqual([a['session'] for a in store.list()], ["new"])
+    
+    def test_total_cap_removes_oldest_sessions_first(self):
+        store = self._store(session_id="s1", asynchronous=False)
+        for session in ("s1", "s2", "s3"):
+            store.start_session(session)
+            store.put('prompt', "p", session * 100)
+        session_bytes = store.sessions()[0]['bytes']
+        
+        store.max_total_bytes = session_bytes * 2
+        self.assertEqual(store.prune(), ["s1"])
+        self.assertEqual({s['session'] for s in store.sessions()}, {"s2", "s3"})
+    
+    def test_index_survives_reopening(self):
+        store = self._store(session_id="s1", asynchronous=False)
+        store.put('prompt', "a", "persistente")
+        store.close()
+        self.stores.remove(store)
+        
+        reopened = self._store(session_id="s2")
+        
+        self.assertEqual(reopened.read(reopened.list(session="s1")[0]['id']), "persistente")
+    
+    @unittest.skipIf(run_artifacts.zstandard is None, "zstandard no instalado")
+    def test_zstd_compression(self):
+        store = self._store(session_id="z", compression='zstd', asynchronous=False)
+        store.put('prompt', "a", "comprimido con zstd")
+        
+        self.assertTrue((self.base / "z.zst").exists())
+        self.assertEqual(store.read(store.list()[0]['id']), "comprimido con zstd")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+"""
+Tests para task_codec - serialización binaria de tareas.
+"""
+
+import sys
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from core.task import Task, TaskPriority, TaskStatus, TaskType
+from core.task_codec import (
+    encode_task, decode_task, encode_tasks, decode_tasks, TaskCodecError, SCHEMA_VERSION
+)
+
+
+def _state(task):
+    return {name: getattr(task, name) for name in Task.__slots__}
+
+
+class TestTaskCodec(unittest.TestCase):
+    """Tests de ida y vuelta y validación del formato."""
+    
+    def _full_task(self):
+        task = Task(
+            title="Migrar API 🦇",
+            description="Descripción con acentos: canción, pingüino",
+            type=TaskType.SECURITY,
+            priority=TaskPriority.CRITICAL,
+            tags=['backend', 'seguridad'],
+            assigned_to='oracle',
+            estimated_hours=2.5,
+            depends_on=['a', 'b'],
+            blocks=['c'],
+            command=None,
+            working_dir='/tmp/proyecto',
+            environment={'DEBUG': '1'},
+            artifacts=['report.md'],
+            metrics={'files': 3, 'ratio': 0.5, 'nested': {'ok': True}},
+            allow_parallel=False,
+            max_parallel_instances=4,
+            parallel_mode='worktree',
+            metadata={'source': 'test'}
+        )
+        task.start()
+        task.fail("x" * 5000)
+        return task
+    
+    def test_round_trip_preserves_every_field(self):
+        """Todos los campos sobreviven, incluidos output/error largos."""
+        task = self._full_task()
+        restored = decode_task(encode_task(task))
+        self.assertEqual(_state(restored), _state(task))
+        self.assertEqual(len(restored.error), 5000)
+    
+    def test_defaults_and_none_values(self):
+        """Valores None y por defecto se conservan."""
+        task = Task()
+        task.created_at = None
+        restored = decode_task(encode_task(task))
+        self.assertEqual(_state(restored), _state(task))
+        self.assertIsNone(restored.started_at)
+        self.assertIsNone(restored.assigned_to)
+    
+    def test_batch_interns_repeated_strings(self):
+        """Los nombres de agente repetidos comparten el mismo objeto."""
+        tasks = [Task(title=f"t{i}", assigned_to="al" + "fred", tags=["api"]) for i in range(50)]
+        restored = decode_tasks(encode_tasks(tasks))
+        
+        self.assertEqual([t.id for t in restored], [t.id for t in tasks])
+        self.assertIs(restored[0].assigned_to, restored[49].assigned_to)
+        self.assertIs(restored[0].tags[0], restored[1].tags[0])
+    
+    def test_empty_batch(self):
+        self.assertEqual(decode_tasks(encode_tasks([])), [])
+    
+    def test_datetime_precision(self):
+        """Los datetime se guardan con precisión de microsegundos."""
+        task = Task()
+        task.started_at = datetime(2025, 6, 11, 15, 58, 29, 123456)
+        task.completed_at = task.started_at + timedelta(hours=7, microseconds=1)
+        restored = decode_task(encode_task(task))
+        self.assertEqual(restored.started_at, task.started_at)
+        self.assertEqual(restored.completed_at, task.completed_at)
+    
+    def test_rejects_other_schema_versions_and_garbage(self):
+        """Versiones desconocidas y datos corruptos lanzan TaskCodecError."""
+        data = bytearray(encode_task(self._full_task()))
+        
+        wrong_version = bytes(data[:4]) + bytes([SCHEMA_VERSION + 1]) + bytes(data[5:])
+        with self.assertRaises(TaskCodecError):
+            decode_tasks(wrong_version)
+        with self.assertRaises(TaskCodecError):
+            decode_tasks(b"no es un lote")
+        with self.assertRaises(TaskCodecError):
+            decode_tasks(bytes(data[:len(data) // 2]))
+    
+    def test_task_is_slotted(self):
+        """Task no tiene __dict__ por instancia."""
+        task = Task()
+        self.assertFalse(hasattr(task, '__dict__'))
+        with self.assertRaises(AttributeError):
+            task.campo_inexistente = 1
+    
+    def test_from_dict_matches_to_dict(self):
+        """from_dict sigue aceptando la salida de to_dict."""
+        task = self._full_task()
+        restored = Task.from_dict(task.to_dict())
+        self.assertEqual(restored.id, task.id)
+        self.assertEqual(restored.status, TaskStatus.FAILED)
+        self.assertEqual(restored.priority, TaskPriority.CRITICAL)
+        self.assertEqual(restored.started_at, task.started_at)
+        self.assertEqual(restored.tags, task.tags)
+
+
+if __name__ == "__main__":
+    unittest.main()
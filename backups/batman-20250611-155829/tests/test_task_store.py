@@ -0,0 +1,161 @@
+"""
+Tests para TaskStore - persistencia de tareas en SQLite.
+"""
+
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from core.task import Task, TaskBatch, TaskPriority, TaskStatus
+from core.task_store import TaskStore
+
+
+class TestTaskStore(unittest.TestCase):
+    """Tests del almacén de tareas."""
+    
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmp_dir.name) / "tasks.db"
+        self.store = TaskStore(self.db_path)
+    
+    def tearDown(self):
+        self.store.close()
+        self.tmp_dir.cleanup()
+    
+    def _plan(self, count=5):
+        return [
+            Task(title=f"Tarea {i}", assigned_to="alfred" if i % 2 else "robin",
+                 priority=TaskPriority.HIGH if i == 3 else TaskPriority.MEDIUM)
+            for i in range(count)
+        ]
+    
+    def test_wal_mode_enabled(self):
+        mode = self.store._conn.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode.lower(), "wal")
+    
+    def test_save_and_load_preserves_order_and_fields(self):
+        """Las tareas se guardan en lote y vuelven en el orden del plan."""
+        tasks = self._plan()
+        tasks[0].output = "x" * 3000
+        self.assertEqual(self.store.save_tasks(tasks, session_id="s1"), 5)
+        
+        loaded = self.store.load_tasks(session_id="s1")
+        self.assertEqual([t.id for t in loaded], [t.id for t in tasks])
+        self.assertEqual(len(loaded[0].output), 3000)
+        self.assertEqual(self.store.get_task(tasks[2].id).title, "Tarea 2")
+    
+    def test_filters_and_priority_order(self):
+        """Consultas por estado, agente y prioridad."""
+        tasks = self._plan()
+        tasks[1].start()
+        self.store.save_tasks(tasks, session_id="s1")
+        
+        self.assertEqual(len(self.store.load_tasks(assigned_to="alfred")), 2)
+        self.assertEqual([t.id for t in self.store.load_tasks(status=TaskStatus.IN_PROGRESS)], [tasks[1].id])
+        self.assertEqual(self.store.load_tasks(order_by="priority")[0].id, tasks[3].id)
+        self.assertEqual(self.store.count_by_status("s1"), {'pending': 4, 'in_progress': 1})
+    
+    def test_update_keeps_position(self):
+        """update_tasks modifica el estado sin alterar el orden."""
+        tasks = self._plan(3)
+        self.store.save_tasks(tasks, session_id="s1")
+        
+        tasks[0].start()
+        tasks[0].complete("hecho")
+        self.assertTrue(self.store.update_task(tasks[0]))
+        self.assertFalse(self.store.update_task(Task(title="no guardada")))
+        
+        loaded = self.store.load_tasks(session_id="s1")
+        self.assertEqual(loaded[0].id, tasks[0].id)
+        self.assertEqual(loaded[0].status, TaskStatus.COMPLETED)
+        self.assertEqual(loaded[0].output, "hecho")
+    
+    def test_resume_after_crash(self):
+        """Una sesión interrumpida continúa donde se quedó."""
+        tasks = self._plan(4)
+        self.store.save_session("s1", description="plan", mode="seguro")
+        self.store.save_tasks(tasks, session_id="s1")
+        tasks[0].start()
+        tasks[0].complete()
+        tasks[1].start()
+        self.store.update_tasks(tasks[:2])
+        
+        # Simular caída: se reabre la base de datos desde otro proceso
+        self.store.close()
+        self.store = TaskStore(self.db_path)
+        
+        completed, pending = self.store.resume_session("s1")
+        self.assertEqual(completed, [tasks[0].id])
+        self.assertEqual([t.id for t in pending], [t.id for t in tasks[1:]])
+        self.assertEqual(pending[0].status, TaskStatus.PENDING)
+        self.assertIsNone(pending[0].started_at)
+        self.assertEqual(self.store.get_task(tasks[1].id).status, TaskStatus.PENDING)
+        self.assertEqual(self.store.get_session("s1")['mode'], "seguro")
+    
+    def test_resume_requeues_failed_tasks(self):
+        """Las fallidas se reintentan al retomar, salvo retry_failed=False."""
+        tasks = self._plan(3)
+        self.store.save_tasks(tasks, session_id="s1")
+        tasks[0].complete()
+        tasks[1].fail("timeout")
+        tasks[2].status = TaskStatus.CANCELLED
+        self.store.update_tasks(tasks)
+        
+        _, pending = self.store.resume_session("s1", retry_failed=False)
+        self.assertEqual(pending, [])
+        
+        completed, pending = self.store.resume_session("s1")
+        self.assertEqual(completed, [tasks[0].id])
+        self.assertEqual([t.id for t in pending], [tasks[1].id])
+        self.assertEqual((pending[0].status, pending[0].error), (TaskStatus.PENDING, ""))
+        self.assertEqual(self.store.get_task(tasks[1].id).status, TaskStatus.PENDING)
+    
+    def test_session_state_and_latest_resumable(self):
+        """El estado JSON se conserva y las sesiones completadas no se retoman."""
+        self.store.save_session("viejo", mode="rapido", state={'stats': {'tasks_completed': 2}})
+        self.store.save_session("viejo", status="interrupted")
+        self.store.save_session("nuevo", mode="seguro")
+        self.store.save_session("nuevo", status="completed")
+        
+        self.assertEqual(self.store.get_session("viejo")['state'], {'stats': {'tasks_completed': 2}})
+        self.assertEqual(self.store.get_session("nuevo")['state'], {})
+        self.assertEqual(self.store.latest_resumable_session(), "viejo")
+        self.store.save_session("viejo", status="completed")
+        self.assertIsNone(self.store.latest_resumable_session())
+    
+    def test_batch_round_trip(self):
+        batch = TaskBatch(name="Sprint", parallel=True, tasks=self._plan(3))
+        self.store.save_batch(batch, session_id="s1")
+        
+        loaded = self.store.load_batch(batch.id)
+        self.assertEqual(loaded.name, "Sprint")
+        self.assertTrue(loaded.parallel)
+        self.assertEqual([t.id for t in loaded.tasks], [t.id for t in batch.tasks])
+    
+    def test_failed_transaction_rolls_back(self):
+        """Un error dentro de transaction() no deja escrituras parciales."""
+        with self.assertRaises(RuntimeError):
+            with self.store.transaction():
+                self.store.save_tasks(self._plan(2), session_id="s1")
+                raise RuntimeError("fallo")
+        self.assertEqual(self.store.load_tasks(session_id="s1"), [])
+    
+    def test_concurrent_writers(self):
+        """La conexión compartida admite escrituras desde varios hilos."""
+        def writer(n):
+            self.store.save_tasks(self._plan(10), session_id=f"s{n}")
+        
+        threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(sum(self.store.count_by_status().values()), 40)
+
+
+if __name__ == "__main__":
+    unittest.main()
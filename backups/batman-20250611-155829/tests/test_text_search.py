@@ -0,0 +1,106 @@
+"""
+Tests para TextSearcher - búsqueda estructurada multi-patrón.
+Compara el motor en proceso con los backends externos disponibles.
+"""
+
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from core.text_search import TextSearcher, SearchMatch
+from core.arsenal import Arsenal
+
+
+class TestTextSearcher(unittest.TestCase):
+    """Tests para los backends de búsqueda."""
+    
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp_dir.name)
+        (self.root / "src").mkdir()
+        (self.root / "src" / "app.py").write_text(
+            "import os\n"
+            "# TODO: limpiar\n"
+            "def main():\n"
+            "    return os.getcwd()  # FIXME y TODO\n"
+        )
+        (self.root / "README.md").write_text("Proyecto\nSin pendientes\nTodo bien\n")
+        (self.root / "binario.bin").write_bytes(b"\0\0TODO\0")
+        (self.root / ".git").mkdir()
+        (self.root / ".git" / "config").write_text("TODO en git\n")
+    
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+    
+    def _normalized(self, matches):
+        return sorted(
+            (Path(m.path).name, m.line_number, m.line, m.pattern) for m in matches
+        )
+    
+    def test_in_process_multi_pattern(self):
+        """Una sola pasada devuelve coincidencias de todos los patrones."""
+        matches = TextSearcher(None).search_all(['TODO', r'def \w+'], str(self.root))
+        
+        self.assertTrue(all(isinstance(m, SearchMatch) for m in matches))
+        self.assertEqual(self._normalized(matches), [
+            ('app.py', 2, '# TODO: limpiar', 'TODO'),
+            ('app.py', 3, 'def main():', r'def \w+'),
+            ('app.py', 4, '    return os.getcwd()  # FIXME y TODO', 'TODO'),
+        ])
+    
+    def test_in_process_skips_binary_and_vcs(self):
+        """Los binarios y .git no se recorren."""
+        paths = {Path(m.path).name for m in TextSearcher(None).search('TODO', str(self.root))}
+        self.assertEqual(paths, {'app.py'})
+    
+    def test_ignore_case_and_fixed_strings(self):
+        """Opciones de mayúsculas y texto literal."""
+        searcher = TextSearcher(None)
+        lines = {m.line for m in searcher.search('todo', str(self.root), ignore_case=True)}
+        self.assertIn('Todo bien', lines)
+        
+        self.assertEqual(searcher.search_all('os.getcwd()', str(self.root), fixed_strings=True)[0].line_number, 4)
+        self.assertEqual(searcher.search_all('(', str(self.root), fixed_strings=True)[0].pattern, '(')
+    
+    def test_in_process_non_ascii(self):
+        """\\w e ignore_case cubren letras no ASCII como grep."""
+        (self.root / "notas.txt").write_text("primera línea\nun café aquí\n", encoding='utf-8')
+        searcher = TextSearcher(None)
+        
+        self.assertEqual([(m.line_number, m.line) for m in searcher.search(r'caf\w', str(self.root))],
+                         [(2, 'un café aquí')])
+        self.assertEqual([m.line for m in searcher.search('CAFÉ', str(self.root), ignore_case=True)],
+                         ['un café aquí'])
+        self.assertEqual([m.line_number for m in searcher.search('aquí', str(self.root))], [2])
+    
+    def test_max_matches_stops_stream(self):
+        """max_matches corta la búsqueda."""
+        matches = TextSearcher(None).search_all('o', str(self.root), max_matches=2)
+        self.assertEqual(len(matches), 2)
+    
+    def test_external_backends_match_in_process(self):
+        """rg y grep producen las mismas coincidencias que el motor en proceso."""
+        expected = self._normalized(TextSearcher(None).search(['TODO', 'FIXME'], str(self.root / "src")))
+        
+        for tool in ('rg', 'grep'):
+            if not shutil.which(tool):
+                continue
+            with self.subTest(tool=tool):
+                matches = TextSearcher(tool).search(['TODO', 'FIXME'], str(self.root / "src"))
+                self.assertEqual(self._normalized(matches), expected)
+    
+    def test_arsenal_search_uses_in_process_fallback(self):
+        """Sin herramienta de búsqueda el Arsenal usa el motor en proceso."""
+        arsenal = Arsenal()
+        arsenal.available_tools = {}
+        matches = list(arsenal.search('FIXME', str(self.root)))
+        self.assertEqual(len(matches), 1)
+        self.assertEqual(matches[0].line_number, 4)
+
+
+if __name__ == "__main__":
+    unittest.main()